@@ -0,0 +1,33 @@
+"""add embedding cache stats to index_attempt
+
+Revision ID: 8e3f1a7c2b94
+Revises: 631fd2504136
+Create Date: 2026-10-17 10:12:31.402117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8e3f1a7c2b94"
+down_revision = "631fd2504136"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "index_attempt",
+        sa.Column("embedding_cache_hits", sa.Integer(), nullable=True),
+    )
+    op.add_column(
+        "index_attempt",
+        sa.Column("embedding_cache_misses", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("index_attempt", "embedding_cache_misses")
+    op.drop_column("index_attempt", "embedding_cache_hits")
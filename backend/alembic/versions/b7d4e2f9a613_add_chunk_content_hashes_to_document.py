@@ -0,0 +1,29 @@
+"""add chunk content hashes to document
+
+Revision ID: b7d4e2f9a613
+Revises: 8e3f1a7c2b94
+Create Date: 2026-10-17 14:36:08.215903
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "b7d4e2f9a613"
+down_revision = "8e3f1a7c2b94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document",
+        sa.Column("chunk_content_hashes", postgresql.ARRAY(sa.String()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("document", "chunk_content_hashes")
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+from ee.onyx.access.acl_cache import get_cached_acl_for_user
 from ee.onyx.db.external_perm import fetch_external_groups_for_user
 from ee.onyx.db.external_perm import fetch_public_external_group_ids
 from ee.onyx.db.user_group import fetch_user_groups_for_documents
@@ -124,6 +125,17 @@ def _get_acl_for_user(user: User, db_session: Session) -> set[str]:
 
     NOTE: is imported in onyx.access.access by `fetch_versioned_implementation`
     DO NOT REMOVE."""
+    if user.is_anonymous:
+        return _build_acl_for_user(user, db_session)
+
+    # Users can be part of thousands of synced external groups, so the resolved
+    # ACL is cached until any group membership changes
+    return get_cached_acl_for_user(
+        user.id, lambda: _build_acl_for_user(user, db_session)
+    )
+
+
+def _build_acl_for_user(user: User, db_session: Session) -> set[str]:
     is_anonymous = user.is_anonymous
     db_user_groups = (
         [] if is_anonymous else fetch_user_groups_for_user(db_session, user.id)
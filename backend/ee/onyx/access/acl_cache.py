@@ -0,0 +1,163 @@
+"""Per-tenant cache of resolved user ACLs.
+
+Resolving a user's ACL requires fetching all of their user groups and external
+groups, which is slow for users that are part of thousands of synced groups. The
+resolved ACLs are cached in-process and in Redis, keyed by user ID and a
+per-tenant version stamp. Any change to group memberships bumps the version via
+`invalidate_user_acl_cache`, which makes all previously cached ACLs unreachable.
+
+The version is always read before the ACL is computed and bumped only after the
+membership change is committed, so an ACL computed from outdated memberships is
+only ever stored under an outdated version.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from uuid import UUID
+
+from prometheus_client import Counter
+from prometheus_client import Histogram
+from redis import Redis
+
+from ee.onyx.configs.app_configs import USER_ACL_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_ACL_VERSION_KEY = "user_acl_cache:version"
+_ACL_KEY_PREFIX = "user_acl_cache:acl"
+
+_MAX_LOCAL_ENTRIES = 10_000
+
+_acl_cache_lookups = Counter(
+    "onyx_user_acl_cache_lookups_total",
+    "Total user ACL lookups by where the ACL was found",
+    ["result"],
+)
+_acl_size = Histogram(
+    "onyx_user_acl_size",
+    "Number of entries in resolved user ACLs",
+    buckets=(1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+
+
+@dataclass(frozen=True)
+class _CachedAcl:
+    version: int
+    expires_at: float
+    acl: frozenset[str]
+
+
+_local_cache: OrderedDict[tuple[str, UUID], _CachedAcl] = OrderedDict()
+_local_cache_lock = threading.Lock()
+
+
+def _get_acl_version(redis_client: Redis) -> int:
+    version = redis_client.get(_ACL_VERSION_KEY)
+    return int(version) if version is not None else 0  # type: ignore[arg-type]
+
+
+def _redis_acl_key(version: int, user_id: UUID) -> str:
+    return f"{_ACL_KEY_PREFIX}:{version}:{user_id}"
+
+
+def _get_local(tenant_id: str, user_id: UUID, version: int) -> frozenset[str] | None:
+    with _local_cache_lock:
+        cached = _local_cache.get((tenant_id, user_id))
+        if cached is None:
+            return None
+        if cached.version != version or cached.expires_at < time.monotonic():
+            del _local_cache[(tenant_id, user_id)]
+            return None
+        _local_cache.move_to_end((tenant_id, user_id))
+        return cached.acl
+
+
+def _set_local(
+    tenant_id: str, user_id: UUID, version: int, acl: frozenset[str]
+) -> None:
+    with _local_cache_lock:
+        _local_cache[(tenant_id, user_id)] = _CachedAcl(
+            version=version,
+            expires_at=time.monotonic() + USER_ACL_CACHE_TTL_SECONDS,
+            acl=acl,
+        )
+        _local_cache.move_to_end((tenant_id, user_id))
+        while len(_local_cache) > _MAX_LOCAL_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def _get_cached_acl(
+    redis_client: Redis, tenant_id: str, user_id: UUID, version: int
+) -> frozenset[str] | None:
+    local_acl = _get_local(tenant_id, user_id, version)
+    if local_acl is not None:
+        _acl_cache_lookups.labels(result="memory_hit").inc()
+        return local_acl
+
+    stored_acl = redis_client.get(_redis_acl_key(version, user_id))
+    if stored_acl is None:
+        return None
+
+    acl = frozenset(json.loads(stored_acl))  # type: ignore[arg-type]
+    _set_local(tenant_id, user_id, version, acl)
+    _acl_cache_lookups.labels(result="redis_hit").inc()
+    return acl
+
+
+def get_cached_acl_for_user(
+    user_id: UUID, compute_acl: Callable[[], set[str]]
+) -> set[str]:
+    """Returns the ACL for the user from the cache, calling `compute_acl` to
+    resolve and cache it if it is not cached for the current version. Falls back
+    to `compute_acl` if Redis is unavailable."""
+    if USER_ACL_CACHE_TTL_SECONDS <= 0:
+        return compute_acl()
+
+    tenant_id = get_current_tenant_id()
+    try:
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        version = _get_acl_version(redis_client)
+        cached_acl = _get_cached_acl(redis_client, tenant_id, user_id, version)
+    except Exception:
+        logger.exception(f"Failed to look up the cached ACL for user {user_id}")
+        _acl_cache_lookups.labels(result="error").inc()
+        return compute_acl()
+
+    if cached_acl is not None:
+        return set(cached_acl)
+
+    acl = frozenset(compute_acl())
+    _acl_cache_lookups.labels(result="miss").inc()
+    _acl_size.observe(len(acl))
+
+    try:
+        redis_client.set(
+            _redis_acl_key(version, user_id),
+            json.dumps(sorted(acl)),
+            ex=USER_ACL_CACHE_TTL_SECONDS,
+        )
+    except Exception:
+        logger.exception(f"Failed to store the cached ACL for user {user_id}")
+    _set_local(tenant_id, user_id, version, acl)
+
+    return set(acl)
+
+
+def invalidate_user_acl_cache(tenant_id: str | None = None) -> None:
+    """Invalidates all cached user ACLs for the tenant. Must be called after any
+    change to user group or external group memberships has been committed."""
+    if USER_ACL_CACHE_TTL_SECONDS <= 0:
+        return
+
+    try:
+        get_redis_client(tenant_id=tenant_id).incr(_ACL_VERSION_KEY)
+    except Exception:
+        # Cached ACLs still expire after USER_ACL_CACHE_TTL_SECONDS
+        logger.exception("Failed to invalidate the user ACL cache")
@@ -14,6 +14,7 @@ from pydantic import ValidationError
 from redis import Redis
 from redis.lock import Lock as RedisLock
 
+from ee.onyx.access.acl_cache import invalidate_user_acl_cache
 from ee.onyx.background.celery.tasks.external_group_syncing.group_sync_utils import (
     mark_all_relevant_cc_pairs_as_external_group_synced,
 )
@@ -566,6 +567,9 @@ def _perform_external_group_sync(
         except Exception as e:
             format_error_for_logging(e)
 
+            # the batches upserted so far are committed
+            invalidate_user_acl_cache()
+
             # Mark as failed (this also updates progress to show partial progress)
             mark_external_group_sync_attempt_failed(
                 attempt_id, db_session, error_message=str(e)
@@ -12,6 +12,29 @@ DEFAULT_PERMISSION_DOC_SYNC_FREQUENCY = int(
     os.environ.get("DEFAULT_PERMISSION_DOC_SYNC_FREQUENCY") or 5 * 60
 )
 
+# Number of documents / hierarchy nodes whose synced permissions are written to
+# the DB together
+DOC_PERMISSION_SYNC_BATCH_SIZE = int(
+    os.environ.get("DOC_PERMISSION_SYNC_BATCH_SIZE") or 100
+)
+
+# How long a user's resolved ACL (user groups + external groups) is cached for.
+# Group changes invalidate the cache immediately, this is just an upper bound.
+# Set to 0 to disable the cache
+USER_ACL_CACHE_TTL_SECONDS = int(os.environ.get("USER_ACL_CACHE_TTL_SECONDS") or 5 * 60)
+
+# Time budget for censoring search results with the censoring functions of all
+# sources (e.g. Salesforce), the chunks of sources that time out are dropped
+POST_QUERY_CENSORING_TIMEOUT_SECONDS = float(
+    os.environ.get("POST_QUERY_CENSORING_TIMEOUT_SECONDS") or 10
+)
+# How long the censoring result of a chunk for a user is reused, so repeated
+# searches in a chat session don't re-check the same documents.
+# Set to 0 to disable the cache
+CENSORING_DECISION_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_DECISION_CACHE_TTL_SECONDS") or 60
+)
+
 
 #####
 # Confluence
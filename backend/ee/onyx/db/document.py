@@ -2,6 +2,8 @@ from datetime import datetime
 from datetime import timezone
 
 from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from onyx.access.models import ExternalAccess
@@ -101,3 +103,112 @@ def upsert_document_external_perms(
         db_session.commit()
 
     return False
+
+
+def batch_upsert_document_external_perms(
+    db_session: Session,
+    external_access_by_doc_id: dict[str, ExternalAccess],
+    source_type: DocumentSource,
+) -> list[str]:
+    """
+    Same as `upsert_document_external_perms`, but for a batch of documents in a
+    single transaction. Returns the IDs of the documents that were newly created.
+    NOTE: this will replace any existing external access, it will not do a union
+    """
+    if not external_access_by_doc_id:
+        return []
+
+    # sorted to always lock the rows in the same order across concurrent syncs
+    doc_ids = sorted(external_access_by_doc_id)
+    prefixed_external_groups_by_doc_id: dict[str, set[str]] = {
+        doc_id: {
+            build_ext_group_name_for_onyx(
+                ext_group_name=group_id,
+                source=source_type,
+            )
+            for group_id in external_access_by_doc_id[doc_id].external_user_group_ids
+        }
+        for doc_id in doc_ids
+    }
+
+    existing_documents = db_session.execute(
+        select(
+            DbDocument.id,
+            DbDocument.external_user_emails,
+            DbDocument.external_user_group_ids,
+            DbDocument.is_public,
+        ).where(DbDocument.id.in_(doc_ids))
+    ).all()
+    existing_doc_ids = {document.id for document in existing_documents}
+
+    # Only documents whose external access has changed are updated, since
+    # updating last_modified will trigger a sync to the document index
+    changed_doc_ids = [
+        document.id
+        for document in existing_documents
+        if (
+            external_access_by_doc_id[document.id].external_user_emails
+            != set(document.external_user_emails or [])
+            or prefixed_external_groups_by_doc_id[document.id]
+            != set(document.external_user_group_ids or [])
+            or external_access_by_doc_id[document.id].is_public != document.is_public
+        )
+    ]
+
+    created_doc_ids: list[str] = []
+    new_doc_ids = [doc_id for doc_id in doc_ids if doc_id not in existing_doc_ids]
+    if new_doc_ids:
+        # If the document does not exist, still store the external access
+        # So that if the document is added later, the external access is already stored
+        # The upsert function in the indexing pipeline does not overwrite the permissions fields
+        insert_stmt = (
+            insert(DbDocument)
+            .values(
+                [
+                    {
+                        "id": doc_id,
+                        "semantic_id": "",
+                        "external_user_emails": list(
+                            external_access_by_doc_id[doc_id].external_user_emails
+                        ),
+                        "external_user_group_ids": list(
+                            prefixed_external_groups_by_doc_id[doc_id]
+                        ),
+                        "is_public": external_access_by_doc_id[doc_id].is_public,
+                    }
+                    for doc_id in new_doc_ids
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(DbDocument.id)
+        )
+        created_doc_ids = list(db_session.scalars(insert_stmt).all())
+
+        # documents created concurrently since the select are updated instead
+        created_doc_ids_set = set(created_doc_ids)
+        changed_doc_ids.extend(
+            doc_id for doc_id in new_doc_ids if doc_id not in created_doc_ids_set
+        )
+
+    if changed_doc_ids:
+        now = datetime.now(timezone.utc)
+        db_session.execute(
+            update(DbDocument),
+            [
+                {
+                    "id": doc_id,
+                    "external_user_emails": list(
+                        external_access_by_doc_id[doc_id].external_user_emails
+                    ),
+                    "external_user_group_ids": list(
+                        prefixed_external_groups_by_doc_id[doc_id]
+                    ),
+                    "is_public": external_access_by_doc_id[doc_id].is_public,
+                    "last_modified": now,
+                }
+                for doc_id in sorted(changed_doc_ids)
+            ],
+        )
+
+    db_session.commit()
+    return created_doc_ids
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from ee.onyx.access.acl_cache import invalidate_user_acl_cache
 from onyx.access.utils import build_ext_group_name_for_onyx
 from onyx.configs.constants import DocumentSource
 from onyx.db.models import PublicExternalUserGroup
@@ -90,6 +91,9 @@ def upsert_external_groups(
     - For existing groups (same user_id, external_user_group_id, cc_pair_id), updates the stale flag to False
     - For new groups, inserts them with stale=False
     - For public groups, uses upsert logic as well
+
+    Does not invalidate the cached user ACLs, a sync upserts many batches and
+    invalidates them once when it is done (see `remove_stale_external_groups`).
     """
     # If there are no groups to add, return early
     if not external_groups:
@@ -193,6 +197,7 @@ def remove_stale_external_groups(
         )
     )
     db_session.commit()
+    invalidate_user_acl_cache()
 
 
 def fetch_external_groups_for_user(
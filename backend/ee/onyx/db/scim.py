@@ -31,7 +31,9 @@ from sqlalchemy import Select
 from sqlalchemy import select
 from sqlalchemy import SQLColumnExpression
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
 
+from ee.onyx.access.acl_cache import invalidate_user_acl_cache
 from ee.onyx.server.scim.filtering import ScimFilter
 from ee.onyx.server.scim.filtering import ScimFilterOperator
 from onyx.db.dal import DAL
@@ -53,8 +55,23 @@ class ScimDAL(DAL):
     Methods mutate but do NOT commit — call ``dal.commit()`` explicitly
     when you want to persist changes. This follows the existing ``_no_commit``
     convention and lets callers batch multiple operations into one transaction.
+    Committing group membership changes invalidates the cached user ACLs.
     """
 
+    def __init__(self, db_session: Session) -> None:
+        super().__init__(db_session)
+        self._group_members_changed = False
+
+    def commit(self) -> None:
+        super().commit()
+        if self._group_members_changed:
+            self._group_members_changed = False
+            invalidate_user_acl_cache()
+
+    def rollback(self) -> None:
+        super().rollback()
+        self._group_members_changed = False
+
     # ------------------------------------------------------------------
     # Token operations
     # ------------------------------------------------------------------
@@ -514,6 +531,7 @@ class ScimDAL(DAL):
         """Add user-group relationships, ignoring duplicates."""
         if not user_ids:
             return
+        self._group_members_changed = True
         self._session.execute(
             pg_insert(User__UserGroup)
             .values([{"user_id": uid, "user_group_id": group_id} for uid in user_ids])
@@ -527,6 +545,7 @@ class ScimDAL(DAL):
 
     def replace_group_members(self, group_id: int, user_ids: list[UUID]) -> None:
         """Replace all members of a group."""
+        self._group_members_changed = True
         self._session.execute(
             sa_delete(User__UserGroup).where(User__UserGroup.user_group_id == group_id)
         )
@@ -536,6 +555,7 @@ class ScimDAL(DAL):
         """Remove specific members from a group."""
         if not user_ids:
             return
+        self._group_members_changed = True
         self._session.execute(
             sa_delete(User__UserGroup).where(
                 User__UserGroup.user_group_id == group_id,
@@ -545,6 +565,7 @@ class ScimDAL(DAL):
 
     def delete_group_with_members(self, group: UserGroup) -> None:
         """Remove all member relationships and delete the group."""
+        self._group_members_changed = True
         self._session.execute(
             sa_delete(User__UserGroup).where(User__UserGroup.user_group_id == group.id)
         )
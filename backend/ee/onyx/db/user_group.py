@@ -11,6 +11,7 @@ from sqlalchemy import update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from ee.onyx.access.acl_cache import invalidate_user_acl_cache
 from ee.onyx.server.user_group.models import SetCuratorRequest
 from ee.onyx.server.user_group.models import UserGroupCreate
 from ee.onyx.server.user_group.models import UserGroupUpdate
@@ -422,6 +423,8 @@ def insert_user_group(db_session: Session, user_group: UserGroupCreate) -> UserG
     )
 
     db_session.commit()
+    if user_group.user_ids:
+        invalidate_user_acl_cache()
     return db_user_group
 
 
@@ -730,6 +733,8 @@ def update_user_group(
     db_user_group.time_last_modified_by_user = func.now()
 
     db_session.commit()
+    if added_user_ids or removed_user_ids:
+        invalidate_user_acl_cache()
     return db_user_group
 
 
@@ -772,6 +777,7 @@ def prepare_user_group_for_deletion(db_session: Session, user_group_id: int) ->
     db_user_group.is_up_to_date = False
     db_user_group.is_up_for_deletion = True
     db_session.commit()
+    invalidate_user_acl_cache()
 
 
 def delete_user_group(db_session: Session, user_group: UserGroup) -> None:
@@ -1,3 +1,11 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import cast
+
+from ee.onyx.configs.app_configs import CENSORING_DECISION_CACHE_TTL_SECONDS
+from ee.onyx.configs.app_configs import POST_QUERY_CENSORING_TIMEOUT_SECONDS
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
 from ee.onyx.external_permissions.sync_params import get_all_censoring_enabled_sources
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
@@ -5,10 +13,44 @@ from onyx.configs.constants import DocumentSource
 from onyx.context.search.pipeline import InferenceChunk
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.models import User
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+_CENSORING_SOURCES_VERSION_KEY = "censoring_enabled_sources:version"
+# Upper bound in case an invalidation is missed, e.g. if Redis was unavailable
+_CENSORING_SOURCES_CACHE_TTL_SECONDS = 5 * 60
+
+# tenant_id -> (version, expires_at, sources)
+_censoring_sources_cache: dict[str, tuple[int, float, frozenset[DocumentSource]]] = {}
+_censoring_sources_cache_lock = threading.Lock()
+
+# The fields of a chunk that censoring functions are allowed to change
+_CENSORED_CHUNK_FIELDS = ("content", "blurb", "source_links")
+_MAX_CENSORING_DECISIONS = 100_000
+
+# (tenant_id, user_email, document_id, chunk_id) -> (expires_at, censored fields)
+# the censored fields are None if the user may not see any of the chunk
+_CensoringDecisionKey = tuple[str, str, str, int]
+_censoring_decisions: OrderedDict[
+    _CensoringDecisionKey, tuple[float, dict[str, Any] | None]
+] = OrderedDict()
+_censoring_decisions_lock = threading.Lock()
+
+
+def _fetch_all_censoring_enabled_sources() -> set[DocumentSource]:
+    all_censoring_enabled_sources = get_all_censoring_enabled_sources()
+    with get_session_with_current_tenant() as db_session:
+        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
+        return {
+            cc_pair.connector.source
+            for cc_pair in enabled_sync_connectors
+            if cc_pair.connector.source in all_censoring_enabled_sources
+        }
+
 
 def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     """
@@ -16,19 +58,151 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     This is based on if the access_type is set to sync and the connector
     source has a censoring config.
 
+    The result is cached per tenant until a cc_pair is added or removed, see
+    `invalidate_censoring_enabled_sources_cache`.
+
     NOTE: This means if there is a source has a single cc_pair that is sync,
     all chunks for that source will be censored, even if the connector that
     indexed that chunk is not sync. This was done to avoid getting the cc_pair
     for every single chunk.
     """
-    all_censoring_enabled_sources = get_all_censoring_enabled_sources()
-    with get_session_with_current_tenant() as db_session:
-        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
-        return {
-            cc_pair.connector.source
-            for cc_pair in enabled_sync_connectors
-            if cc_pair.connector.source in all_censoring_enabled_sources
-        }
+    tenant_id = get_current_tenant_id()
+    try:
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        version = int(
+            cast(bytes, redis_client.get(_CENSORING_SOURCES_VERSION_KEY) or b"0")
+        )
+    except Exception:
+        logger.exception("Failed to get the censoring enabled sources version")
+        return _fetch_all_censoring_enabled_sources()
+
+    with _censoring_sources_cache_lock:
+        cached = _censoring_sources_cache.get(tenant_id)
+    if cached is not None:
+        cached_version, expires_at, cached_sources = cached
+        if cached_version == version and expires_at > time.monotonic():
+            return set(cached_sources)
+
+    # The version is read before fetching, so sources fetched before an
+    # invalidation are never cached under the newer version
+    sources = _fetch_all_censoring_enabled_sources()
+    with _censoring_sources_cache_lock:
+        _censoring_sources_cache[tenant_id] = (
+            version,
+            time.monotonic() + _CENSORING_SOURCES_CACHE_TTL_SECONDS,
+            frozenset(sources),
+        )
+    return sources
+
+
+def invalidate_censoring_enabled_sources_cache() -> None:
+    """Must be called after a cc_pair has been added or removed.
+
+    NOTE: is called through `fetch_ee_implementation_or_noop`, DO NOT REMOVE."""
+    try:
+        get_redis_client().incr(_CENSORING_SOURCES_VERSION_KEY)
+    except Exception:
+        logger.exception("Failed to invalidate the censoring enabled sources cache")
+
+
+def _get_cached_censoring_decisions(
+    chunks: list[InferenceChunk], user_email: str
+) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
+    """Returns the censored chunks that have a cached decision and the chunks that
+    still need to be censored."""
+    if CENSORING_DECISION_CACHE_TTL_SECONDS <= 0:
+        return [], chunks
+
+    tenant_id = get_current_tenant_id()
+    now = time.monotonic()
+    censored_chunks: list[InferenceChunk] = []
+    uncensored_chunks: list[InferenceChunk] = []
+    with _censoring_decisions_lock:
+        for chunk in chunks:
+            key = (tenant_id, user_email, chunk.document_id, chunk.chunk_id)
+            decision = _censoring_decisions.get(key)
+            if decision is None or decision[0] < now:
+                uncensored_chunks.append(chunk)
+                continue
+
+            _censoring_decisions.move_to_end(key)
+            censored_fields = decision[1]
+            if censored_fields is not None:
+                censored_chunks.append(chunk.model_copy(update=censored_fields))
+
+    return censored_chunks, uncensored_chunks
+
+
+def _cache_censoring_decisions(
+    uncensored_chunks: list[InferenceChunk],
+    censored_chunks: list[InferenceChunk],
+    user_email: str,
+) -> None:
+    if CENSORING_DECISION_CACHE_TTL_SECONDS <= 0:
+        return
+
+    tenant_id = get_current_tenant_id()
+    expires_at = time.monotonic() + CENSORING_DECISION_CACHE_TTL_SECONDS
+    censored_chunks_by_id = {chunk.unique_id: chunk for chunk in censored_chunks}
+    with _censoring_decisions_lock:
+        for chunk in uncensored_chunks:
+            censored_chunk = censored_chunks_by_id.get(chunk.unique_id)
+            key = (tenant_id, user_email, chunk.document_id, chunk.chunk_id)
+            _censoring_decisions[key] = (
+                expires_at,
+                (
+                    {
+                        field: getattr(censored_chunk, field)
+                        for field in _CENSORED_CHUNK_FIELDS
+                    }
+                    if censored_chunk is not None
+                    else None
+                ),
+            )
+            _censoring_decisions.move_to_end(key)
+
+        while len(_censoring_decisions) > _MAX_CENSORING_DECISIONS:
+            _censoring_decisions.popitem(last=False)
+
+
+def _censor_chunks_for_source(
+    source: DocumentSource,
+    chunks_for_source: list[InferenceChunk],
+    user_email: str,
+) -> list[InferenceChunk] | None:
+    """Returns the censored chunks, or None if the censoring failed."""
+    sync_config = get_source_perm_sync_config(source)
+    if sync_config is None or sync_config.censoring_config is None:
+        raise ValueError(f"No sync config found for {source}")
+
+    censored_chunks, uncensored_chunks = _get_cached_censoring_decisions(
+        chunks_for_source, user_email
+    )
+    if not uncensored_chunks:
+        return censored_chunks
+
+    censor_chunks_for_source = sync_config.censoring_config.chunk_censoring_func
+    try:
+        newly_censored_chunks = censor_chunks_for_source(uncensored_chunks, user_email)
+    except Exception as e:
+        logger.exception(
+            f"Failed to censor chunks for source {source} so throwing out all"
+            f" chunks for this source and continuing: {e}"
+        )
+        return None
+
+    _cache_censoring_decisions(uncensored_chunks, newly_censored_chunks, user_email)
+    return censored_chunks + newly_censored_chunks
+
+
+def _log_censoring_timeout(
+    index: int, func: Any, args: tuple[Any, ...]  # noqa: ARG001
+) -> None:
+    logger.warning(
+        f"Censoring chunks for source {args[0]} timed out after "
+        f"{POST_QUERY_CENSORING_TIMEOUT_SECONDS} seconds so throwing out all"
+        f" chunks for this source and continuing"
+    )
 
 
 # NOTE: This is only called if ee is enabled.
@@ -56,25 +230,20 @@ def _post_query_chunk_censoring(
         else:
             final_chunk_dict[chunk.unique_id] = chunk
 
-    # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
-    for source, chunks_for_source in chunks_to_process.items():
-        sync_config = get_source_perm_sync_config(source)
-        if sync_config is None or sync_config.censoring_config is None:
-            raise ValueError(f"No sync config found for {source}")
-
-        censor_chunks_for_source = sync_config.censoring_config.chunk_censoring_func
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
-                f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
-            )
-            continue
+    # For each source, filter out the chunks using the permission check function
+    # for that source. The sources are censored in parallel, sources that fail or
+    # don't finish within the time budget have all of their chunks thrown out
+    censored_chunks_per_source = run_functions_tuples_in_parallel(
+        [
+            (_censor_chunks_for_source, (source, chunks_for_source, user.email))
+            for source, chunks_for_source in chunks_to_process.items()
+        ],
+        timeout=POST_QUERY_CENSORING_TIMEOUT_SECONDS,
+        timeout_callback=_log_censoring_timeout,
+    )
 
-        for censored_chunk in censored_chunks:
+    for censored_chunks in censored_chunks_per_source:
+        for censored_chunk in censored_chunks or []:
             final_chunk_dict[censored_chunk.unique_id] = censored_chunk
 
     # IMPORTANT: make sure to retain the same ordering as the original `chunks` passed in
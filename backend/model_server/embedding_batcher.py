@@ -0,0 +1,286 @@
+"""Request coalescing for the bi-encoder endpoint.
+
+Every /encoder/bi-encoder-embed request used to run its own forward pass. Under
+load that means many tiny query requests each paying for a full pass while large
+indexing requests hog the executor. Instead, texts from concurrent requests for
+the same model are queued and run together in micro-batches:
+
+- a micro-batch runs once it holds max_batch_size texts or the text at the head
+  of the queue has waited max_wait_seconds
+- query texts are always taken before passage texts, so a large indexing request
+  cannot starve interactive search
+- requests are split into individual texts, so a large passage request is
+  interleaved with queries rather than blocking them until it is done
+- texts are ordered by length inside a micro-batch to keep padding low
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_queue_depth = Gauge(
+    "onyx_model_server_embedding_queue_depth",
+    "Texts waiting to be embedded",
+    ["model"],
+)
+
+_batch_fill_ratio = Histogram(
+    "onyx_model_server_embedding_batch_fill_ratio",
+    "Texts per micro-batch relative to the max batch size",
+    ["model"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+
+_queue_wait_seconds = Histogram(
+    "onyx_model_server_embedding_queue_wait_seconds",
+    "Time a text waited in the queue before its micro-batch started",
+    ["model", "text_type"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_TEXT_TYPE_PRIORITY = {
+    EmbedTextType.QUERY: 0,
+    EmbedTextType.PASSAGE: 1,
+}
+
+
+@dataclass
+class _PendingRequest:
+    future: asyncio.Future[list[Embedding]]
+    embeddings: list[Embedding | None]
+    remaining: int
+
+
+@dataclass(order=True)
+class _PendingText:
+    priority: int
+    # Tie breaker so that texts of the same priority are served first come first serve
+    seq: int
+    enqueued_at: float = field(compare=False)
+    text: str = field(compare=False)
+    text_type: EmbedTextType = field(compare=False)
+    index: int = field(compare=False)
+    request: _PendingRequest = field(compare=False)
+
+
+class _ModelBatchQueue:
+    """Queue and worker for one model configuration, bound to one event loop."""
+
+    def __init__(
+        self,
+        model_label: str,
+        encode: Callable[[list[str]], Any],
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._model_label = model_label
+        self._encode = encode
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait_seconds = max_wait_seconds
+        self._heap: list[_PendingText] = []
+        self._seq = itertools.count()
+        self._has_items = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+
+    async def embed(
+        self, texts: list[str], text_type: EmbedTextType
+    ) -> list[Embedding]:
+        request = _PendingRequest(
+            future=self.loop.create_future(),
+            embeddings=[None] * len(texts),
+            remaining=len(texts),
+        )
+        now = time.monotonic()
+        priority = _TEXT_TYPE_PRIORITY.get(text_type, len(_TEXT_TYPE_PRIORITY))
+        for index, text in enumerate(texts):
+            heapq.heappush(
+                self._heap,
+                _PendingText(
+                    priority=priority,
+                    seq=next(self._seq),
+                    enqueued_at=now,
+                    text=text,
+                    text_type=text_type,
+                    index=index,
+                    request=request,
+                ),
+            )
+        _queue_depth.labels(model=self._model_label).set(len(self._heap))
+        self._has_items.set()
+
+        if self._worker is None or self._worker.done():
+            self._worker = self.loop.create_task(self._run())
+
+        return await request.future
+
+    async def _wait_for_batch(self) -> None:
+        while not self._heap:
+            self._has_items.clear()
+            await self._has_items.wait()
+
+        # Texts that queued up during the previous forward pass have already waited
+        deadline = self._heap[0].enqueued_at + self._max_wait_seconds
+        while len(self._heap) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._has_items.clear()
+            try:
+                await asyncio.wait_for(self._has_items.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def _pop_batch(self) -> list[_PendingText]:
+        batch: list[_PendingText] = []
+        while self._heap and len(batch) < self._max_batch_size:
+            pending_text = heapq.heappop(self._heap)
+            # Skip texts of requests that were cancelled or already failed
+            if not pending_text.request.future.done():
+                batch.append(pending_text)
+        _queue_depth.labels(model=self._model_label).set(len(self._heap))
+        return batch
+
+    async def _run_batch(self, batch: list[_PendingText]) -> None:
+        now = time.monotonic()
+        for pending_text in batch:
+            _queue_wait_seconds.labels(
+                model=self._model_label, text_type=pending_text.text_type.value
+            ).observe(now - pending_text.enqueued_at)
+        _batch_fill_ratio.labels(model=self._model_label).observe(
+            len(batch) / self._max_batch_size
+        )
+
+        # Texts of similar length end up padded together
+        batch.sort(key=lambda pending_text: len(pending_text.text))
+        texts = [pending_text.text for pending_text in batch]
+
+        try:
+            vectors = await self._encode_texts(texts)
+        except Exception as e:
+            requests = {id(pending_text.request) for pending_text in batch}
+            if len(requests) == 1:
+                logger.exception(
+                    f"Failed to embed {len(texts)} texts with model {self._model_label}"
+                )
+                self._fail(batch, e)
+                return
+
+            # One bad request must not fail the requests it was merged with
+            logger.warning(
+                f"Failed to embed micro-batch of {len(texts)} texts from "
+                f"{len(requests)} requests with model {self._model_label}, "
+                "retrying each request separately"
+            )
+            await self._run_requests_separately(batch)
+            return
+
+        self._complete(batch, vectors)
+
+    async def _encode_texts(self, texts: list[str]) -> list[Embedding]:
+        raw_vectors = await self.loop.run_in_executor(None, self._encode, texts)
+        vectors: list[Embedding] = [
+            vector if isinstance(vector, list) else vector.tolist()
+            for vector in raw_vectors
+        ]
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        return vectors
+
+    async def _run_requests_separately(self, batch: list[_PendingText]) -> None:
+        batch_by_request: dict[int, list[_PendingText]] = {}
+        for pending_text in batch:
+            batch_by_request.setdefault(id(pending_text.request), []).append(
+                pending_text
+            )
+
+        for request_batch in batch_by_request.values():
+            if request_batch[0].request.future.done():
+                continue
+            texts = [pending_text.text for pending_text in request_batch]
+            try:
+                vectors = await self._encode_texts(texts)
+            except Exception as e:
+                logger.exception(
+                    f"Failed to embed {len(texts)} texts with model {self._model_label}"
+                )
+                self._fail(request_batch, e)
+                continue
+            self._complete(request_batch, vectors)
+
+    @staticmethod
+    def _fail(batch: list[_PendingText], e: Exception) -> None:
+        for pending_text in batch:
+            if not pending_text.request.future.done():
+                pending_text.request.future.set_exception(e)
+
+    @staticmethod
+    def _complete(batch: list[_PendingText], vectors: list[Embedding]) -> None:
+        for pending_text, vector in zip(batch, vectors):
+            request = pending_text.request
+            if request.future.done():
+                continue
+            request.embeddings[pending_text.index] = vector
+            request.remaining -= 1
+            if request.remaining == 0:
+                request.future.set_result(
+                    [
+                        embedding
+                        for embedding in request.embeddings
+                        if embedding is not None
+                    ]
+                )
+
+    async def _run(self) -> None:
+        while True:
+            await self._wait_for_batch()
+            batch = self._pop_batch()
+            if batch:
+                await self._run_batch(batch)
+
+
+class EmbeddingBatcher:
+    """Routes texts to a per model micro-batching queue. Requests are only merged
+    if they would have been encoded identically on their own, i.e. they share the
+    batch key (model, max context length, normalization). Prefixes are applied to
+    the texts before they are queued."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self._max_batch_size = max_batch_size
+        self._max_wait_seconds = max_wait_ms / 1000
+        self._queues: dict[Hashable, _ModelBatchQueue] = {}
+
+    async def embed(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        batch_key: Hashable,
+        model_label: str,
+        encode: Callable[[list[str]], Any],
+    ) -> list[Embedding]:
+        queue = self._queues.get(batch_key)
+        if queue is None or queue.loop is not asyncio.get_running_loop():
+            queue = _ModelBatchQueue(
+                model_label=model_label,
+                encode=encode,
+                max_batch_size=self._max_batch_size,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+            self._queues[batch_key] = queue
+
+        return await queue.embed(texts, text_type)
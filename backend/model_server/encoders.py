@@ -7,8 +7,12 @@ from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
 
+from model_server.embedding_batcher import EmbeddingBatcher
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
+from shared_configs.configs import EMBEDDING_DYNAMIC_BATCHING_ENABLED
+from shared_configs.configs import EMBEDDING_MAX_BATCH_SIZE
+from shared_configs.configs import EMBEDDING_MAX_BATCH_WAIT_MS
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
@@ -24,6 +28,11 @@ router = APIRouter(prefix="/encoder")
 
 _GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
 
+_EMBEDDING_BATCHER = EmbeddingBatcher(
+    max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+    max_wait_ms=EMBEDDING_MAX_BATCH_WAIT_MS,
+)
+
 
 def get_embedding_model(
     model_name: str,
@@ -107,6 +116,7 @@ async def embed_text(
     normalize_embeddings: bool,
     prefix: str | None,
     gpu_type: str = "UNKNOWN",
+    text_type: EmbedTextType = EmbedTextType.PASSAGE,
 ) -> list[Embedding]:
     if not all(texts):
         logger.error("Empty strings provided for embedding")
@@ -135,17 +145,34 @@ async def embed_text(
         local_model = get_embedding_model(
             model_name=model_name, max_context_length=max_context_length
         )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        if EMBEDDING_DYNAMIC_BATCHING_ENABLED:
+            # Merged with concurrent requests for the same model into micro-batches
+            embeddings = await _EMBEDDING_BATCHER.embed(
+                texts=prefixed_texts,
+                text_type=text_type,
+                batch_key=(model_name, max_context_length, normalize_embeddings),
+                model_label=model_name,
+                # The queue outlives this request, so look the model up per batch
+                encode=lambda batch_texts: _concurrent_embedding(
+                    batch_texts,
+                    get_embedding_model(
+                        model_name=model_name, max_context_length=max_context_length
+                    ),
+                    normalize_embeddings,
+                ),
+            )
+        else:
+            # Run CPU-bound embedding in a thread pool
+            embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: _concurrent_embedding(
+                    prefixed_texts, local_model, normalize_embeddings
+                ),
+            )
+            embeddings = [
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings_vectors
+            ]
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -208,6 +235,7 @@ async def process_embed_request(
             normalize_embeddings=embed_request.normalize_embeddings,
             prefix=prefix,
             gpu_type=gpu_type,
+            text_type=embed_request.text_type,
         )
         return EmbedResponse(embeddings=embeddings)
     except RateLimitError as e:
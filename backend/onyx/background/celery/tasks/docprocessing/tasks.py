@@ -1508,6 +1508,8 @@ def _docprocessing_task(
                 total_docs_indexed=index_pipeline_result.total_docs,
                 new_docs_indexed=index_pipeline_result.new_docs,
                 total_chunks=index_pipeline_result.total_chunks,
+                embedding_cache_hits=embedding_model.embedding_cache_hits,
+                embedding_cache_misses=embedding_model.embedding_cache_misses,
             )
 
             _resolve_indexing_document_errors(
@@ -1565,8 +1567,6 @@ def _docprocessing_task(
 
         # FIX: Explicitly clear document batch from memory and force garbage collection
         # This helps prevent memory accumulation across multiple batches
-        # NOTE: Thread-local event loops in embedding threads are cleaned up automatically
-        # via the _cleanup_thread_local decorator in search_nlp_models.py
         del documents
         gc.collect()
 
@@ -1584,6 +1584,19 @@ def _docprocessing_task(
             },
         )
 
+        # fraction of the pipeline's wall-clock time each stage spent working
+        stage_utilization = ",".join(
+            f"{stage}={seconds / index_pipeline_result.pipeline_seconds:.2f}"
+            for stage, seconds in index_pipeline_result.stage_seconds.items()
+            if index_pipeline_result.pipeline_seconds > 0
+        )
+
+        # extra calls spent isolating the documents that failed a batch
+        failure_isolation_calls = ",".join(
+            f"{stage}={calls}"
+            for stage, calls in index_pipeline_result.failure_isolation_calls.items()
+        )
+
         elapsed_time = time.monotonic() - start_time
         task_logger.info(
             f"Completed document batch processing: "
@@ -1594,6 +1607,10 @@ def _docprocessing_task(
             f"docs={len(index_pipeline_result.failures) + index_pipeline_result.total_docs} "
             f"chunks={index_pipeline_result.total_chunks} "
             f"failures={len(index_pipeline_result.failures)} "
+            f"failure_isolation_calls={failure_isolation_calls or 'n/a'} "
+            f"embedding_cache_hits={embedding_model.embedding_cache_hits} "
+            f"embedding_cache_misses={embedding_model.embedding_cache_misses} "
+            f"stage_utilization={stage_utilization or 'n/a'} "
             f"elapsed={elapsed_time:.2f}s"
         )
 
@@ -38,6 +38,7 @@ from onyx.db.search_settings import get_active_search_settings_list
 from onyx.document_index.factory import get_all_document_indices
 from onyx.document_index.interfaces import VespaDocumentUserFields
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
+from onyx.file_store.chat_file_text_cache import delete_chat_file_text
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.utils import store_user_file_plaintext
 from onyx.file_store.utils import user_file_id_to_plaintext_file_name
@@ -523,6 +524,7 @@ def process_single_user_file_delete(
             # 2) Delete the user-uploaded file content from filestore (blob + metadata)
             file_store = get_default_file_store()
             try:
+                delete_chat_file_text(user_file.file_id)
                 file_store.delete_file(user_file.file_id)
                 file_store.delete_file(
                     user_file_id_to_plaintext_file_name(user_file.id)
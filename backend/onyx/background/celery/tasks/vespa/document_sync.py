@@ -1,4 +1,5 @@
 import time
+from itertools import islice
 from typing import cast
 from uuid import uuid4
 
@@ -8,6 +9,7 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_SIZE
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryPriority
 from onyx.configs.constants import OnyxCeleryQueues
@@ -15,6 +17,7 @@ from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.db.document import construct_document_id_select_by_needs_sync
 from onyx.db.document import count_documents_by_needs_sync
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 
 # Redis keys for document sync tracking
@@ -33,7 +36,7 @@ def is_document_sync_fenced(r: Redis) -> bool:
 
 
 def get_document_sync_payload(r: Redis) -> int | None:
-    """Get the initial number of tasks that were created."""
+    """Get the initial number of tasks (i.e. document batches) that were created."""
     bytes_result = r.get(DOCUMENT_SYNC_FENCE_KEY)
     if bytes_result is None:
         return None
@@ -70,17 +73,18 @@ def reset_document_sync(r: Redis) -> None:
 
 def generate_document_sync_tasks(
     r: Redis,
-    max_tasks: int,
+    max_docs: int,
     celery_app: Celery,
     db_session: Session,
     lock: RedisLock,
     tenant_id: str,
 ) -> tuple[int, int]:
-    """Generate sync tasks for all documents that need syncing.
+    """Generate sync tasks for all documents that need syncing. Each task syncs a
+    batch of up to VESPA_SYNC_BATCH_SIZE documents.
 
     Args:
         r: Redis client
-        max_tasks: Maximum number of tasks to generate
+        max_docs: Maximum number of documents to generate tasks for
         celery_app: Celery application instance
         db_session: Database session
         lock: Redis lock for coordination
@@ -96,8 +100,12 @@ def generate_document_sync_tasks(
     # Get all documents that need syncing
     stmt = construct_document_id_select_by_needs_sync()
 
-    for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
-        doc_id = cast(str, doc_id)
+    # Each task syncs a batch of documents, so the taskset tracks batches
+    for doc_id_batch in batch_generator(
+        islice(db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT), max_docs),
+        VESPA_SYNC_BATCH_SIZE,
+    ):
+        doc_ids = [cast(str, doc_id) for doc_id in doc_id_batch]
         current_time = time.monotonic()
 
         # Reacquire lock periodically to prevent timeout
@@ -105,7 +113,7 @@ def generate_document_sync_tasks(
             lock.reacquire()
             last_lock_time = current_time
 
-        num_docs += 1
+        num_docs += len(doc_ids)
 
         # Create a unique task ID
         custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
@@ -116,8 +124,8 @@ def generate_document_sync_tasks(
 
         # Create the Celery task
         celery_app.send_task(
-            OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
-            kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
+            OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+            kwargs=dict(document_ids=doc_ids, tenant_id=tenant_id),
             queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
             task_id=custom_task_id,
             priority=OnyxCeleryPriority.MEDIUM,
@@ -126,15 +134,12 @@ def generate_document_sync_tasks(
 
         num_tasks_sent += 1
 
-        if num_tasks_sent >= max_tasks:
-            break
-
     return num_tasks_sent, num_docs
 
 
 def try_generate_stale_document_sync_tasks(
     celery_app: Celery,
-    max_tasks: int,
+    max_docs: int,
     db_session: Session,
     r: Redis,
     lock_beat: RedisLock,
@@ -158,7 +163,7 @@ def try_generate_stale_document_sync_tasks(
 
     # Generate all tasks in one pass
     result = generate_document_sync_tasks(
-        r, max_tasks, celery_app, db_session, lock_beat, tenant_id
+        r, max_docs, celery_app, db_session, lock_beat, tenant_id
     )
 
     if result is None:
@@ -166,10 +171,11 @@ def try_generate_stale_document_sync_tasks(
 
     tasks_generated, total_docs = result
 
-    if tasks_generated >= max_tasks:
+    if total_docs >= max_docs:
         logger.info(
-            f"generate_document_sync_tasks reached the task generation limit: "
-            f"tasks_generated={tasks_generated} max_tasks={max_tasks}"
+            f"generate_document_sync_tasks reached the document limit: "
+            f"tasks_generated={tasks_generated} total_docs_found={total_docs} "
+            f"max_docs={max_docs}"
         )
     else:
         logger.info(
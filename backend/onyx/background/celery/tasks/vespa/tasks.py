@@ -15,6 +15,8 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
+from onyx.access.access import get_null_document_access
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -34,10 +36,13 @@ from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
@@ -51,6 +56,7 @@ from onyx.db.sync_record import insert_sync_record
 from onyx.db.sync_record import update_sync_record_status
 from onyx.document_index.factory import get_all_document_indices
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.redis.redis_document_set import RedisDocumentSet
 from onyx.redis.redis_pool import get_redis_client
@@ -67,6 +73,11 @@ from onyx.utils.variable_functionality import noop_fallback
 
 logger = setup_logger()
 
+# A batch touches many documents, so it gets a proportionally longer budget than
+# the single document sync task.
+VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT = 600
+VESPA_METADATA_SYNC_BATCH_TIME_LIMIT = VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT + 15
+
 
 # celery auto associates tasks created inside another task,
 # which bloats the result metadata considerably. trail=False prevents this.
@@ -581,3 +592,149 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT,
+    time_limit=VESPA_METADATA_SYNC_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task.
+
+    Resolves document sets and access for every document in the batch with bulk
+    queries, then pushes all of the updates to each document index in a single
+    call. The taskset fence tracks one entry per batch rather than per document.
+    """
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+    num_synced = 0
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            # This flow is for updates so we get all indices.
+            document_indices = get_all_document_indices(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_document_indices: list[RetryDocumentIndex] = [
+                RetryDocumentIndex(document_index)
+                for document_index in document_indices
+            ]
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            if not docs:
+                elapsed = time.monotonic() - start
+                task_logger.info(
+                    f"docs={len(document_ids)} "
+                    f"action=no_operation "
+                    f"elapsed={elapsed:.2f}"
+                )
+                completion_status = OnyxCeleryTaskCompletionStatus.SKIPPED
+            else:
+                found_doc_ids = [doc.id for doc in docs]
+
+                # document set sync
+                doc_id_to_doc_sets: dict[str, list[str]] = dict(
+                    fetch_document_sets_for_documents(found_doc_ids, db_session)
+                )
+
+                # User group sync
+                doc_id_to_access = get_access_for_documents(
+                    document_ids=found_doc_ids, db_session=db_session
+                )
+
+                updates = [
+                    VespaDocumentUpdate(
+                        doc_id=doc.id,
+                        chunk_count=doc.chunk_count,
+                        fields=VespaDocumentFields(
+                            document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                            access=doc_id_to_access.get(
+                                doc.id, get_null_document_access()
+                            ),
+                            boost=doc.boost,
+                            hidden=doc.hidden,
+                        ),
+                    )
+                    for doc in docs
+                ]
+
+                for retry_document_index in retry_document_indices:
+                    retry_document_index.update_multiple(updates, tenant_id=tenant_id)
+
+                # update db last. Worst case = we crash right before this and
+                # the sync might repeat again later
+                mark_documents_as_synced(found_doc_ids, db_session)
+                num_synced = len(found_doc_ids)
+
+                elapsed = time.monotonic() - start
+                task_logger.info(
+                    f"docs={len(document_ids)} "
+                    f"synced={num_synced} "
+                    f"action=sync "
+                    f"elapsed={elapsed:.2f}"
+                )
+                completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(f"SoftTimeLimitExceeded exception. docs={len(document_ids)}")
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        e: Exception | None = None
+        while True:
+            if isinstance(ex, RetryError):
+                task_logger.warning(
+                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+                )
+
+                # only set the inner exception if it is of type Exception
+                e_temp = ex.last_attempt.exception()
+                if isinstance(e_temp, Exception):
+                    e = e_temp
+            else:
+                e = ex
+
+            if isinstance(e, httpx.HTTPStatusError):
+                if e.response.status_code == HTTPStatus.BAD_REQUEST:
+                    task_logger.exception(
+                        f"Non-retryable HTTPStatusError: "
+                        f"docs={len(document_ids)} "
+                        f"status={e.response.status_code}"
+                    )
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+                break
+
+            task_logger.exception(
+                f"vespa_metadata_sync_batch_task exceptioned: docs={len(document_ids)}"
+            )
+
+            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+            if (
+                self.max_retries is not None
+                and self.request.retries >= self.max_retries
+            ):
+                completion_status = (
+                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                )
+
+            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+            countdown = 2 ** (self.request.retries + 4)
+            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
+            break  # we won't hit this, but it looks weird not to have it
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_batch_task completed: status={completion_status.value} "
+            f"docs={len(document_ids)} synced={num_synced}"
+        )
+
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
@@ -1,9 +1,12 @@
 import re
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import cast
 from uuid import UUID
 
 from fastapi.datastructures import Headers
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from onyx.chat.models import ChatHistoryResult
@@ -11,12 +14,14 @@ from onyx.chat.models import ChatLoadedFile
 from onyx.chat.models import ChatMessageSimple
 from onyx.chat.models import FileToolMetadata
 from onyx.chat.models import ToolCallSimple
+from onyx.configs.chat_configs import CHAT_HISTORY_CACHE_MAX_SESSIONS
 from onyx.configs.constants import DEFAULT_PERSONA_ID
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import TMP_DRALPHA_PERSONA_NAME
 from onyx.db.chat import create_chat_session
-from onyx.db.chat import get_chat_messages_by_session
+from onyx.db.chat import get_mainline_chat_messages
 from onyx.db.chat import get_or_create_root_message
+from onyx.db.chat import prefetch_chat_message_tool_calls
 from onyx.db.kg_config import get_kg_config_settings
 from onyx.db.kg_config import is_kg_config_settings_enabled_valid
 from onyx.db.models import ChatMessage
@@ -26,6 +31,9 @@ from onyx.db.models import SearchDoc as DbSearchDoc
 from onyx.db.models import UserFile
 from onyx.db.projects import check_project_ownership
 from onyx.file_processing.extract_file_text import extract_file_text
+from onyx.file_store.chat_file_text_cache import ChatFileText
+from onyx.file_store.chat_file_text_cache import get_chat_file_text
+from onyx.file_store.chat_file_text_cache import store_chat_file_text
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import FileDescriptor
@@ -42,6 +50,7 @@ from onyx.tools.models import ToolCallKickoff
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.timing import log_function_time
+from shared_configs.contextvars import get_current_tenant_id
 
 
 logger = setup_logger()
@@ -92,24 +101,20 @@ def create_chat_history_chain(
     """Build the linear chain of messages without including the root message"""
     mainline_messages: list[ChatMessage] = []
 
-    all_chat_messages = get_chat_messages_by_session(
+    # Only the messages of the active branch are loaded, so following the
+    # latest_child_message pointers below is served from the identity map
+    chain_messages = get_mainline_chat_messages(
         chat_session_id=chat_session_id,
-        user_id=None,
         db_session=db_session,
-        skip_permission_check=True,
         prefetch_top_two_level_tool_calls=prefetch_top_two_level_tool_calls,
     )
 
-    if not all_chat_messages:
+    if not chain_messages:
         root_message = get_or_create_root_message(
             chat_session_id=chat_session_id, db_session=db_session
         )
     else:
-        root_message = all_chat_messages[0]
-        if root_message.parent_message is not None:
-            raise RuntimeError(
-                "Invalid root message, unable to fetch valid chat message sequence"
-            )
+        root_message = chain_messages[0]
 
     current_message: ChatMessage | None = root_message
     previous_message: ChatMessage | None = None
@@ -284,73 +289,107 @@ def process_kg_commands(
         raise KGException("KG setup done")
 
 
+def _get_user_file_token_count(
+    file_descriptor: FileDescriptor, db_session: Session
+) -> int | None:
+    """Returns None if the file is not a user file or its token count is not known
+    yet (e.g. the user file is still being processed)."""
+    user_file_id_str = file_descriptor.get("user_file_id")
+    if not user_file_id_str:
+        return None
+
+    try:
+        user_file_id = UUID(user_file_id_str)
+    except (ValueError, TypeError) as e:
+        logger.warning(
+            f"Failed to get token count for file {file_descriptor['id']}: {e}"
+        )
+        return None
+
+    user_file = db_session.query(UserFile).filter(UserFile.id == user_file_id).first()
+    if user_file and user_file.token_count:
+        return user_file.token_count
+    return None
+
+
 @log_function_time(print_only=True)
 def load_chat_file(
-    file_descriptor: FileDescriptor, db_session: Session
+    file_descriptor: FileDescriptor,
+    db_session: Session,
+    load_content: bool = True,
 ) -> ChatLoadedFile:
-    file_io = get_default_file_store().read_file(file_descriptor["id"], mode="b")
-    content = file_io.read()
-
-    # Extract text content if it's a text file type (not an image)
-    content_text = None
+    """The text of a text file is only extracted the first time the file is loaded,
+    after that it comes from the chat file text cache. If load_content is False,
+    the raw bytes of such a text file are not downloaded at all and `content` is
+    left empty, images are always loaded since they are sent to the LLM as is."""
+    file_id = file_descriptor["id"]
     # `FileDescriptor` is often JSON-roundtripped (e.g. JSONB / API), so `type`
     # may arrive as a raw string value instead of a `ChatFileType`.
     file_type = ChatFileType(file_descriptor["type"])
 
-    if file_type.is_text_file():
-        try:
-            content_text = extract_file_text(
-                file=file_io,
-                file_name=file_descriptor.get("name") or "",
-                break_on_unprocessable=False,
-            )
-        except Exception as e:
-            logger.warning(
-                f"Failed to retrieve content for file {file_descriptor['id']}: {str(e)}"
-            )
+    chat_file_text = get_chat_file_text(file_id) if file_type.is_text_file() else None
+
+    content = b""
+    content_text = chat_file_text.content_text if chat_file_text else None
+    if chat_file_text is None or load_content:
+        file_io = get_default_file_store().read_file(file_id, mode="b")
+        content = file_io.read()
+
+        # Extract text content if it's a text file type (not an image)
+        if file_type.is_text_file() and chat_file_text is None:
+            try:
+                content_text = extract_file_text(
+                    file=file_io,
+                    file_name=file_descriptor.get("name") or "",
+                    break_on_unprocessable=False,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Failed to retrieve content for file {file_id}: {str(e)}"
+                )
 
-    # Get token count from UserFile if available
-    token_count = 0
-    user_file_id_str = file_descriptor.get("user_file_id")
-    if user_file_id_str:
-        try:
-            user_file_id = UUID(user_file_id_str)
-            user_file = (
-                db_session.query(UserFile).filter(UserFile.id == user_file_id).first()
-            )
-            if user_file and user_file.token_count:
-                token_count = user_file.token_count
-        except (ValueError, TypeError) as e:
-            logger.warning(
-                f"Failed to get token count for file {file_descriptor['id']}: {e}"
+    # Get token count from UserFile if it was not stored with the text
+    token_count = chat_file_text.token_count if chat_file_text else None
+    if token_count is None:
+        token_count = _get_user_file_token_count(file_descriptor, db_session)
+        if file_type.is_text_file() and (
+            chat_file_text is None or token_count is not None
+        ):
+            store_chat_file_text(
+                file_id,
+                ChatFileText(content_text=content_text, token_count=token_count),
             )
 
     return ChatLoadedFile(
-        file_id=file_descriptor["id"],
+        file_id=file_id,
         content=content,
         file_type=file_type,
         filename=file_descriptor.get("name"),
         content_text=content_text,
-        token_count=token_count,
+        token_count=token_count or 0,
     )
 
 
 def load_all_chat_files(
     chat_messages: list[ChatMessage],
     db_session: Session,
+    load_content: bool = True,
 ) -> list[ChatLoadedFile]:
-    # TODO There is likely a more efficient/standard way to load the files here.
-    file_descriptors_for_history: list[FileDescriptor] = []
+    """Loads every file attached to the chat history, see `load_chat_file` for
+    load_content."""
+    file_descriptors_for_history: dict[str, FileDescriptor] = {}
     for chat_message in chat_messages:
-        if chat_message.files:
-            file_descriptors_for_history.extend(chat_message.files)
+        for file_descriptor in chat_message.files or []:
+            file_descriptors_for_history.setdefault(
+                file_descriptor["id"], file_descriptor
+            )
 
     files = cast(
         list[ChatLoadedFile],
         run_functions_tuples_in_parallel(
             [
-                (load_chat_file, (file, db_session))
-                for file in file_descriptors_for_history
+                (load_chat_file, (file, db_session, load_content))
+                for file in file_descriptors_for_history.values()
             ]
         ),
     )
@@ -422,6 +461,150 @@ def convert_chat_history_basic(
     return list(reversed(trimmed_reversed))
 
 
+class _ConvertedAssistantMessage(BaseModel):
+    # An assistant message only changes while its answer is being saved, the token
+    # count and length of the message detect that
+    token_count: int
+    message_length: int
+    simple_messages: list[ChatMessageSimple]
+
+    def matches(self, chat_message: ChatMessage) -> bool:
+        return (
+            self.token_count == chat_message.token_count
+            and self.message_length == len(chat_message.message)
+        )
+
+
+class _SessionSimpleHistory(BaseModel):
+    tool_id_to_name_map: dict[int, str]
+    # Only the assistant messages of the branch converted last
+    assistant_messages: dict[int, _ConvertedAssistantMessage]
+
+
+# tenant ID, chat session ID
+_SessionKey = tuple[str, UUID]
+
+
+class _SimpleHistoryCache:
+    """Thread safe in-process LRU of the converted assistant messages (including
+    their tool calls) per chat session, so that each turn only loads and converts
+    the tool calls of messages that were added since the previous turn."""
+
+    def __init__(self, max_sessions: int) -> None:
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[_SessionKey, _SessionSimpleHistory] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, chat_session_id: UUID, tool_id_to_name_map: dict[int, str]
+    ) -> dict[int, _ConvertedAssistantMessage]:
+        key = (get_current_tenant_id(), chat_session_id)
+        with self._lock:
+            session_history = self._sessions.get(key)
+            if session_history is None:
+                return {}
+            self._sessions.move_to_end(key)
+
+        # Tool names are baked into the converted tool calls
+        if session_history.tool_id_to_name_map != tool_id_to_name_map:
+            return {}
+        return dict(session_history.assistant_messages)
+
+    def put(
+        self,
+        chat_session_id: UUID,
+        tool_id_to_name_map: dict[int, str],
+        assistant_messages: dict[int, _ConvertedAssistantMessage],
+    ) -> None:
+        key = (get_current_tenant_id(), chat_session_id)
+        session_history = _SessionSimpleHistory(
+            tool_id_to_name_map=dict(tool_id_to_name_map),
+            assistant_messages=assistant_messages,
+        )
+        with self._lock:
+            self._sessions[key] = session_history
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+
+_simple_history_cache = _SimpleHistoryCache(
+    max_sessions=CHAT_HISTORY_CACHE_MAX_SESSIONS
+)
+
+
+def _convert_assistant_message(
+    chat_message: ChatMessage, tool_id_to_name_map: dict[int, str]
+) -> list[ChatMessageSimple]:
+    simple_messages: list[ChatMessageSimple] = []
+    # Handle tool calls if present using OpenAI parallel tool calling format:
+    # 1. Group tool calls by turn_number
+    # 2. For each turn: ONE ASSISTANT message with tool_calls array
+    # 3. Followed by N TOOL_CALL_RESPONSE messages (one per tool call)
+    if chat_message.tool_calls:
+        # Group tool calls by turn number
+        tool_calls_by_turn: dict[int, list] = {}
+        for tool_call in chat_message.tool_calls:
+            if tool_call.turn_number not in tool_calls_by_turn:
+                tool_calls_by_turn[tool_call.turn_number] = []
+            tool_calls_by_turn[tool_call.turn_number].append(tool_call)
+
+        # Sort turns and process each turn
+        for turn_number in sorted(tool_calls_by_turn.keys()):
+            turn_tool_calls = tool_calls_by_turn[turn_number]
+            # Sort by tool_id within the turn for consistent ordering
+            turn_tool_calls.sort(key=lambda tc: tc.tool_id)
+
+            # Build ToolCallSimple list for this turn
+            tool_calls_simple: list[ToolCallSimple] = []
+            for tool_call in turn_tool_calls:
+                tool_name = tool_id_to_name_map.get(tool_call.tool_id, "unknown")
+                tool_calls_simple.append(
+                    ToolCallSimple(
+                        tool_call_id=tool_call.tool_call_id,
+                        tool_name=tool_name,
+                        tool_arguments=tool_call.tool_call_arguments or {},
+                        token_count=tool_call.tool_call_tokens,
+                    )
+                )
+
+            # Create ONE ASSISTANT message with all tool calls for this turn
+            total_tool_call_tokens = sum(tc.token_count for tc in tool_calls_simple)
+            simple_messages.append(
+                ChatMessageSimple(
+                    message="",  # No text content when making tool calls
+                    token_count=total_tool_call_tokens,
+                    message_type=MessageType.ASSISTANT,
+                    tool_calls=tool_calls_simple,
+                    image_files=None,
+                )
+            )
+
+            # Add TOOL_CALL_RESPONSE messages for each tool call in this turn
+            for tool_call in turn_tool_calls:
+                simple_messages.append(
+                    ChatMessageSimple(
+                        message=TOOL_CALL_RESPONSE_CROSS_MESSAGE,
+                        token_count=20,  # Tiny overestimate
+                        message_type=MessageType.TOOL_CALL_RESPONSE,
+                        tool_call_id=tool_call.tool_call_id,
+                        image_files=None,
+                    )
+                )
+
+    # Add the assistant message itself (the final answer)
+    simple_messages.append(
+        ChatMessageSimple(
+            message=chat_message.message,
+            token_count=chat_message.token_count,
+            message_type=MessageType.ASSISTANT,
+            image_files=None,
+        )
+    )
+
+    return simple_messages
+
+
 def convert_chat_history(
     chat_history: list[ChatMessage],
     files: list[ChatLoadedFile],
@@ -429,6 +612,7 @@ def convert_chat_history(
     additional_context: str | None,
     token_counter: Callable[[str], int],
     tool_id_to_name_map: dict[int, str],
+    db_session: Session | None = None,
 ) -> ChatHistoryResult:
     """Convert ChatMessage history to ChatMessageSimple format.
 
@@ -442,10 +626,32 @@ def convert_chat_history(
     After context-window truncation, callers compare surviving ``file_id`` tags
     against this map to discover "forgotten" files and provide their metadata
     to the FileReaderTool.
+
+    Assistant messages converted on a previous turn of the session are reused. If
+    a db_session is passed, the tool calls of all other assistant messages are
+    loaded with a single query.
     """
     simple_messages: list[ChatMessageSimple] = []
     all_injected_file_metadata: dict[str, FileToolMetadata] = {}
 
+    chat_session_id = chat_history[0].chat_session_id if chat_history else None
+    cached_assistant_messages = (
+        _simple_history_cache.get(chat_session_id, tool_id_to_name_map)
+        if chat_session_id
+        else {}
+    )
+    converted_assistant_messages: dict[int, _ConvertedAssistantMessage] = {}
+    if db_session is not None:
+        prefetch_chat_message_tool_calls(
+            [
+                chat_message
+                for chat_message in chat_history
+                if chat_message.message_type == MessageType.ASSISTANT
+                and chat_message.id not in cached_assistant_messages
+            ],
+            db_session,
+        )
+
     # Create a mapping of file IDs to loaded files for quick lookup
     file_map = {str(f.file_id): f for f in files}
 
@@ -533,79 +739,31 @@ def convert_chat_history(
             )
 
         elif chat_message.message_type == MessageType.ASSISTANT:
-            # Handle tool calls if present using OpenAI parallel tool calling format:
-            # 1. Group tool calls by turn_number
-            # 2. For each turn: ONE ASSISTANT message with tool_calls array
-            # 3. Followed by N TOOL_CALL_RESPONSE messages (one per tool call)
-            if chat_message.tool_calls:
-                # Group tool calls by turn number
-                tool_calls_by_turn: dict[int, list] = {}
-                for tool_call in chat_message.tool_calls:
-                    if tool_call.turn_number not in tool_calls_by_turn:
-                        tool_calls_by_turn[tool_call.turn_number] = []
-                    tool_calls_by_turn[tool_call.turn_number].append(tool_call)
-
-                # Sort turns and process each turn
-                for turn_number in sorted(tool_calls_by_turn.keys()):
-                    turn_tool_calls = tool_calls_by_turn[turn_number]
-                    # Sort by tool_id within the turn for consistent ordering
-                    turn_tool_calls.sort(key=lambda tc: tc.tool_id)
-
-                    # Build ToolCallSimple list for this turn
-                    tool_calls_simple: list[ToolCallSimple] = []
-                    for tool_call in turn_tool_calls:
-                        tool_name = tool_id_to_name_map.get(
-                            tool_call.tool_id, "unknown"
-                        )
-                        tool_calls_simple.append(
-                            ToolCallSimple(
-                                tool_call_id=tool_call.tool_call_id,
-                                tool_name=tool_name,
-                                tool_arguments=tool_call.tool_call_arguments or {},
-                                token_count=tool_call.tool_call_tokens,
-                            )
-                        )
-
-                    # Create ONE ASSISTANT message with all tool calls for this turn
-                    total_tool_call_tokens = sum(
-                        tc.token_count for tc in tool_calls_simple
-                    )
-                    simple_messages.append(
-                        ChatMessageSimple(
-                            message="",  # No text content when making tool calls
-                            token_count=total_tool_call_tokens,
-                            message_type=MessageType.ASSISTANT,
-                            tool_calls=tool_calls_simple,
-                            image_files=None,
-                        )
-                    )
-
-                    # Add TOOL_CALL_RESPONSE messages for each tool call in this turn
-                    for tool_call in turn_tool_calls:
-                        simple_messages.append(
-                            ChatMessageSimple(
-                                message=TOOL_CALL_RESPONSE_CROSS_MESSAGE,
-                                token_count=20,  # Tiny overestimate
-                                message_type=MessageType.TOOL_CALL_RESPONSE,
-                                tool_call_id=tool_call.tool_call_id,
-                                image_files=None,
-                            )
-                        )
-
-            # Add the assistant message itself (the final answer)
-            simple_messages.append(
-                ChatMessageSimple(
-                    message=chat_message.message,
+            converted_message = cached_assistant_messages.get(chat_message.id)
+            if converted_message is None or not converted_message.matches(chat_message):
+                converted_message = _ConvertedAssistantMessage(
                     token_count=chat_message.token_count,
-                    message_type=MessageType.ASSISTANT,
-                    image_files=None,
+                    message_length=len(chat_message.message),
+                    simple_messages=_convert_assistant_message(
+                        chat_message, tool_id_to_name_map
+                    ),
                 )
+            converted_assistant_messages[chat_message.id] = converted_message
+            # Copies since the LLM loop sets flags on the history messages
+            simple_messages.extend(
+                simple_message.model_copy()
+                for simple_message in converted_message.simple_messages
             )
         else:
             raise ValueError(
                 f"Invalid message type when constructing simple history: {chat_message.message_type}"
             )
 
+    if chat_session_id:
+        _simple_history_cache.put(
+            chat_session_id, tool_id_to_name_map, converted_assistant_messages
+        )
+
     return ChatHistoryResult(
         simple_messages=simple_messages,
         all_injected_file_metadata=all_injected_file_metadata,
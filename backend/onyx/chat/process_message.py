@@ -55,6 +55,7 @@ from onyx.context.search.models import SearchDoc
 from onyx.db.chat import create_new_chat_message
 from onyx.db.chat import get_chat_session_by_id
 from onyx.db.chat import get_or_create_root_message
+from onyx.db.chat import prefetch_chat_message_tool_calls
 from onyx.db.chat import reserve_message_id
 from onyx.db.memory import get_memories
 from onyx.db.models import ChatMessage
@@ -64,7 +65,7 @@ from onyx.db.models import User
 from onyx.db.models import UserFile
 from onyx.db.projects import get_project_token_count
 from onyx.db.projects import get_user_files_from_project
-from onyx.db.tools import get_tools
+from onyx.db.tools import get_tool_snapshots
 from onyx.deep_research.dr_loop import run_deep_research_llm_loop
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.utils import load_in_memory_chat_files
@@ -97,6 +98,7 @@ from onyx.tools.tool_constructor import SearchToolConfig
 from onyx.tools.tool_implementations.file_reader.file_reader_tool import (
     FileReaderTool,
 )
+from onyx.tools.tool_implementations.python.python_tool import PythonTool
 from onyx.utils.logger import setup_logger
 from onyx.utils.telemetry import mt_cloud_telemetry
 from onyx.utils.timing import log_function_time
@@ -541,9 +543,12 @@ def handle_stream_message_objects(
             project_id=chat_session.project_id,
         )
 
-        # re-create linear history of messages
+        # re-create linear history of messages. Tool calls are only needed for the
+        # messages after the summary cutoff, convert_chat_history loads them.
         chat_history = create_chat_history_chain(
-            chat_session_id=chat_session.id, db_session=db_session
+            chat_session_id=chat_session.id,
+            db_session=db_session,
+            prefetch_top_two_level_tool_calls=False,
         )
 
         # Determine the parent message based on the request:
@@ -681,7 +686,7 @@ def handle_stream_message_objects(
             extracted_project_files.file_metadata_for_tool.extend(persona_file_metadata)
 
         # Build a mapping of tool_id to tool_name for history reconstruction
-        all_tools = get_tools(db_session)
+        all_tools = get_tool_snapshots(db_session)
         tool_id_to_name_map = {tool.id: tool.name for tool in all_tools}
 
         search_tool_id = next(
@@ -754,8 +759,14 @@ def handle_stream_message_objects(
             raise ValueError(f"Forced tool {forced_tool_id} not found in tools")
 
         # TODO Once summarization is done, we don't need to load all the files from the beginning anymore.
-        # load all files needed for this chat chain in memory
-        files = load_all_chat_files(chat_history, db_session)
+        # load all files needed for this chat chain in memory. The raw bytes of text
+        # files are only needed if they can be handed to the PythonTool, otherwise
+        # their previously extracted text is enough.
+        files = load_all_chat_files(
+            chat_history,
+            db_session,
+            load_content=any(isinstance(tool, PythonTool) for tool in tools),
+        )
 
         # Convert loaded files to ChatFile format for tools like PythonTool
         chat_files_for_tools = _convert_loaded_files_to_chat_files(files)
@@ -787,6 +798,7 @@ def handle_stream_message_objects(
             additional_context=additional_context,
             token_counter=token_counter,
             tool_id_to_name_map=tool_id_to_name_map,
+            db_session=db_session,
         )
         simple_chat_history = chat_history_result.simple_messages
 
@@ -1027,6 +1039,7 @@ def llm_loop_completion_handle(
     updated_chat_history = create_chat_history_chain(
         chat_session_id=chat_session_id,
         db_session=db_session,
+        prefetch_top_two_level_tool_calls=False,
     )
     total_tokens = calculate_total_history_tokens(updated_chat_history)
 
@@ -1037,9 +1050,11 @@ def llm_loop_completion_handle(
     )
     if compression_params.should_compress:
         # Build tool mapping for formatting messages
-        all_tools = get_tools(db_session)
+        all_tools = get_tool_snapshots(db_session)
         tool_id_to_name = {tool.id: tool.name for tool in all_tools}
 
+        # The summarized messages are formatted with their tool calls
+        prefetch_chat_message_tool_calls(updated_chat_history, db_session)
         compress_chat_history(
             db_session=db_session,
             chat_history=updated_chat_history,
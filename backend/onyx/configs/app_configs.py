@@ -304,9 +304,56 @@ VESPA_CLOUD_URL = os.environ.get("VESPA_CLOUD_URL", "")
 VESPA_CLOUD_CERT_PATH = os.environ.get("VESPA_CLOUD_CERT_PATH")
 VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 
+# If set, chunks are written to Vespa through a pipelined async HTTP/2 feed and
+# legacy chunk existence checks use a single visit per document instead of one
+# request per chunk
+VESPA_USE_BULK_FEED = os.environ.get("VESPA_USE_BULK_FEED", "").lower() == "true"
+# Upper bound on concurrent feed requests. The feed shrinks this window when
+# Vespa pushes back with 429/503 and grows it again as requests succeed.
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or 64)
+
+# When indexing into more than one document index (e.g. while dual writing to
+# Vespa and OpenSearch), write the same chunk batch to all of them concurrently
+# rather than one after the other
+ENABLE_PARALLEL_DOCUMENT_INDEX_WRITES = (
+    os.environ.get("ENABLE_PARALLEL_DOCUMENT_INDEX_WRITES") or "true"
+).lower() == "true"
+
+# When set, each document batch is split into sub-batches of this many documents
+# that flow through chunking, embedding and document index writes concurrently,
+# so that the model server and the document index are busy at the same time.
+# 0 processes the whole batch one stage at a time.
+INDEXING_PIPELINE_SUB_BATCH_SIZE = int(
+    os.environ.get("INDEXING_PIPELINE_SUB_BATCH_SIZE") or 0
+)
+# Max number of processed sub-batches waiting for the next stage
+INDEXING_PIPELINE_QUEUE_SIZE = int(os.environ.get("INDEXING_PIPELINE_QUEUE_SIZE") or 2)
+
+# Stores a content hash of every chunk of a document so that on reindex only the
+# chunks that changed are embedded and written, and only the trailing chunks of a
+# document that got shorter are deleted. Only applies when every document index
+# being written to supports it (currently Vespa).
+ENABLE_INCREMENTAL_CHUNK_INDEXING = (
+    os.environ.get("ENABLE_INCREMENTAL_CHUNK_INDEXING") or "false"
+).lower() == "true"
+
+# Size of the process wide thread pool run_functions_tuples_in_parallel runs on.
+# Calls made from inside that pool (nested parallelism) and calls with a timeout
+# still get their own short lived pool
+SHARED_THREAD_POOL_MAX_WORKERS = int(
+    os.environ.get("SHARED_THREAD_POOL_MAX_WORKERS") or 64
+)
+
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
+# Store the document batches handed from docfetching to docprocessing as gzip
+# compressed JSON lines instead of indented JSON. Batches are read back in either
+# format, so this can be turned off while older docprocessing workers are running
+COMPRESS_DOCUMENT_BATCHES = (
+    os.environ.get("COMPRESS_DOCUMENT_BATCHES") or "true"
+).lower() == "true"
+
 MAX_DRIVE_WORKERS = int(os.environ.get("MAX_DRIVE_WORKERS", 4))
 
 # Below are intended to match the env variables names used by the official postgres docker image
@@ -405,6 +452,19 @@ REDIS_POOL_MAX_CONNECTIONS = int(os.environ.get("REDIS_POOL_MAX_CONNECTIONS", 12
 REDIS_SSL_CERT_REQS = os.getenv("REDIS_SSL_CERT_REQS", "none")
 REDIS_SSL_CA_CERTS = os.getenv("REDIS_SSL_CA_CERTS", None)
 
+# Rarely changing configuration read on every chat turn (tools, the default LLM,
+# user memories) is cached in-process. Writes invalidate it immediately through
+# a version stored in Redis, the TTL only bounds the staleness of writes that
+# bypass the ORM. Set to 0 to disable the cache
+HOT_CONFIG_CACHE_TTL_SECONDS = int(
+    os.environ.get("HOT_CONFIG_CACHE_TTL_SECONDS") or 5 * 60
+)
+# How long the versions read from Redis are reused before checking them again,
+# i.e. how long writes made by other processes may go unnoticed
+HOT_CONFIG_VERSION_CHECK_SECONDS = float(
+    os.environ.get("HOT_CONFIG_VERSION_CHECK_SECONDS") or 1.0
+)
+
 CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))  # seconds
 
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#broker-pool-limit
@@ -497,9 +557,14 @@ CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY = int(
     os.environ.get("CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY") or 2
 )
 
-# The maximum number of tasks that can be queued up to sync to Vespa in a single pass
+# The maximum number of documents that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
 
+# The number of documents handled by a single metadata sync task. Each task
+# resolves document sets and ACLs for its whole batch with bulk queries and
+# pushes the updates to the document indices in one call.
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 256)
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -685,6 +750,20 @@ MAX_SLACK_THREAD_CONTEXT_MESSAGES = int(
     os.environ.get("MAX_SLACK_THREAD_CONTEXT_MESSAGES", "5")
 )
 
+# Slack channel and user metadata looked up by the Slack bot and federated search is
+# cached in process and in Redis for this long, set to 0 to disable the cache
+SLACK_METADATA_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_METADATA_CACHE_TTL_SECONDS") or 60 * 60
+)
+# How long lookups of channels / users / emails that do not exist are cached
+SLACK_METADATA_NEGATIVE_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_METADATA_NEGATIVE_CACHE_TTL_SECONDS") or 5 * 60
+)
+# Upper bound on the number of Slack metadata entries kept in memory per process
+SLACK_METADATA_CACHE_MAX_ENTRIES = int(
+    os.environ.get("SLACK_METADATA_CACHE_MAX_ENTRIES") or 10_000
+)
+
 # TestRail specific configs
 TESTRAIL_BASE_URL = os.environ.get("TESTRAIL_BASE_URL", "")
 TESTRAIL_USERNAME = os.environ.get("TESTRAIL_USERNAME", "")
@@ -735,6 +814,19 @@ ENABLE_CONTEXTUAL_RAG = os.environ.get("ENABLE_CONTEXTUAL_RAG", "").lower() == "
 
 DEFAULT_CONTEXTUAL_RAG_LLM_NAME = "gpt-4o-mini"
 DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER = "DevEnvPresetOpenAI"
+# Max number of contextual RAG LLM calls in flight per process, across all documents
+CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS = int(
+    os.environ.get("CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS") or 16
+)
+# Number of times a rate limited contextual RAG LLM call is retried with backoff
+CONTEXTUAL_RAG_RATE_LIMIT_RETRIES = int(
+    os.environ.get("CONTEXTUAL_RAG_RATE_LIMIT_RETRIES") or 5
+)
+# Document summaries and chunk contexts are cached per tenant by LLM, prompt and
+# content, so reindexing an unchanged document makes no LLM calls. 0 disables it.
+CONTEXTUAL_RAG_CACHE_TTL_SECONDS = int(
+    os.environ.get("CONTEXTUAL_RAG_CACHE_TTL_SECONDS") or 30 * 24 * 60 * 60  # 30 days
+)
 # Finer grained chunking for more detail retention
 # Slightly larger since the sentence aware split is a max cutoff so most minichunks will be under MINI_CHUNK_SIZE
 # tokens. But we need it to be at least as big as 1/4th chunk size to avoid having a tiny mini-chunk at the end
@@ -761,6 +853,11 @@ INDEXING_TRACER_INTERVAL = int(os.environ.get("INDEXING_TRACER_INTERVAL") or 0)
 INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 8
 )
+# Same as above but for self-hosted embedding models, requests to the model server
+# are overlapped so that it is not idle while a batch is serialized and sent over
+INDEXING_LOCAL_EMBEDDING_MODEL_NUM_THREADS = int(
+    os.environ.get("INDEXING_LOCAL_EMBEDDING_MODEL_NUM_THREADS") or 2
+)
 
 # Maximum file size in a document to be indexed
 MAX_DOCUMENT_CHARS = int(os.environ.get("MAX_DOCUMENT_CHARS") or 5_000_000)
@@ -1049,6 +1146,17 @@ IMAGE_SUMMARIZATION_USER_PROMPT = os.environ.get(
     DEFAULT_IMAGE_SUMMARIZATION_USER_PROMPT,
 )
 
+# Max number of images summarized at the same time while indexing a batch
+IMAGE_SUMMARIZATION_MAX_CONCURRENCY = int(
+    os.environ.get("IMAGE_SUMMARIZATION_MAX_CONCURRENCY") or 8
+)
+# Image summaries are cached per tenant by image content, vision model and prompts,
+# so images repeated across documents (logos, diagrams) are summarized once.
+# 0 disables the cache.
+IMAGE_SUMMARY_CACHE_TTL_SECONDS = int(
+    os.environ.get("IMAGE_SUMMARY_CACHE_TTL_SECONDS") or 30 * 24 * 60 * 60  # 30 days
+)
+
 # Knowledge Graph Read Only User Configuration
 DB_READONLY_USER: str = os.environ.get("DB_READONLY_USER", "db_readonly_user")
 DB_READONLY_PASSWORD: str = urllib.parse.quote_plus(
@@ -57,6 +57,18 @@ USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH = (
     == "true"
 )
 
+# Upper bound on the total number of characters of extracted chat file texts kept
+# in memory per process, the texts are also persisted in the file store
+CHAT_FILE_TEXT_CACHE_MAX_CHARS = int(
+    os.environ.get("CHAT_FILE_TEXT_CACHE_MAX_CHARS") or 50_000_000
+)
+
+# Number of chat sessions per process for which the converted chat history is kept
+# in memory, so that a turn only converts the messages added since the last one
+CHAT_HISTORY_CACHE_MAX_SESSIONS = int(
+    os.environ.get("CHAT_HISTORY_CACHE_MAX_SESSIONS") or 1024
+)
+
 # Chat History Compression
 # Trigger compression when history exceeds this ratio of available context window
 COMPRESSION_TRIGGER_RATIO = float(os.environ.get("COMPRESSION_TRIGGER_RATIO", "0.75"))
@@ -42,10 +42,55 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Texts are grouped into embedding batches of similar token length, each batch is
+# capped at this many tokens after padding every text to the longest one in the
+# batch. Defaults to the batch size times the max sequence length, i.e. the worst
+# case of a batch of fixed size, so batches of short texts hold more texts.
+EMBEDDING_BATCH_TOKEN_BUDGET = (
+    int(os.environ.get("EMBEDDING_BATCH_TOKEN_BUDGET") or 0) or None
+)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
 
+# Caches passage embeddings in Redis, keyed on the embedding model settings and a
+# hash of the exact text that was embedded. Re-indexing a document whose chunks did
+# not change then costs no embedding calls.
+ENABLE_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_EMBEDDING_CACHE") or "false"
+).lower() == "true"
+# Per tenant. Least recently used entries are evicted past this size.
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES") or 100_000
+)
+EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("EMBEDDING_CACHE_TTL_SECONDS") or 14 * 24 * 60 * 60  # 2 weeks
+)
+
+# Query embeddings are kept in an in-process LRU keyed on the search settings and
+# the normalized query, so repeated queries (Slack bot retries, rephrasings that
+# collapse to the same text, multi-step search) skip the embedding model.
+ENABLE_QUERY_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_QUERY_EMBEDDING_CACHE") or "true"
+).lower() == "true"
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_MAX_ENTRIES") or 4096
+)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60  # 1 hour
+)
+# Additionally share query embeddings across processes through the Redis embedding
+# cache. Only useful with several api server / slack bot replicas.
+QUERY_EMBEDDING_REDIS_CACHE = (
+    os.environ.get("QUERY_EMBEDDING_REDIS_CACHE") or "false"
+).lower() == "true"
+# How long the query embedding model built from the current search settings is
+# reused before the search settings are read from the DB again. A search settings
+# swap takes up to this long to be picked up by the query path.
+QUERY_EMBEDDING_MODEL_REFRESH_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_MODEL_REFRESH_SECONDS") or 30
+)
+
 
 #####
 # Generative AI Model Configs
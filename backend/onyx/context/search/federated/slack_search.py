@@ -1,9 +1,7 @@
-import json
 import re
 import time
 from datetime import datetime
 from typing import Any
-from typing import cast
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
@@ -41,9 +39,11 @@ from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.models import DocAwareChunk
 from onyx.llm.factory import get_default_llm
+from onyx.onyxbot.slack.metadata_cache import get_slack_channel_info
+from onyx.onyxbot.slack.metadata_cache import get_slack_metadata
+from onyx.onyxbot.slack.metadata_cache import SlackMetadataKind
 from onyx.onyxbot.slack.models import ChannelType
 from onyx.onyxbot.slack.models import SlackContext
-from onyx.redis.redis_pool import get_redis_client
 from onyx.server.federated.models import FederatedConnectorDetail
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
@@ -62,6 +62,15 @@ CHANNEL_METADATA_MAX_RETRIES = 3  # Maximum retry attempts for channel metadata
 CHANNEL_METADATA_RETRY_DELAY = 1  # Initial retry delay in seconds (exponential backoff)
 
 
+class _PartialChannelMetadataError(Exception):
+    """Carries the channel metadata fetched before the fetching failed, which is
+    returned but not cached."""
+
+    def __init__(self, channel_metadata: dict[str, ChannelMetadata]) -> None:
+        super().__init__()
+        self.channel_metadata = channel_metadata
+
+
 def fetch_and_cache_channel_metadata(
     access_token: str, team_id: str, include_private: bool = True
 ) -> dict[str, ChannelMetadata]:
@@ -74,33 +83,34 @@ def fetch_and_cache_channel_metadata(
     Note: We ALWAYS fetch all channel types (including private) and cache them together.
     This ensures a single cache entry per team, avoiding duplicate API calls.
     """
-    # Use tenant-specific Redis client
-    redis_client = get_redis_client()
-    # (tenant_id prefix is added automatically by TenantRedis)
-    cache_key = f"slack_federated_search:{team_id}:channels:metadata"
-
     try:
-        cached = redis_client.get(cache_key)
-        if cached:
-            logger.debug(f"Channel metadata cache HIT for team {team_id}")
-            cached_str: str = (
-                cached.decode("utf-8") if isinstance(cached, bytes) else str(cached)
+        channel_metadata = (
+            get_slack_metadata(
+                SlackMetadataKind.CHANNEL_LIST,
+                team_id,
+                "all",
+                lambda: _fetch_channel_metadata(access_token, team_id),
+                ttl_seconds=CHANNEL_METADATA_CACHE_TTL,
             )
-            cached_data = cast(dict[str, ChannelMetadata], json.loads(cached_str))
-            logger.debug(f"Loaded {len(cached_data)} channels from cache")
-            if not include_private:
-                filtered: dict[str, ChannelMetadata] = {
-                    k: v
-                    for k, v in cached_data.items()
-                    if v.get("type") != ChannelType.PRIVATE_CHANNEL.value
-                }
-                logger.debug(f"Filtered to {len(filtered)} channels (exclude private)")
-                return filtered
-            return cached_data
-    except Exception as e:
-        logger.warning(f"Error reading from channel metadata cache: {e}")
+            or {}
+        )
+    except _PartialChannelMetadataError as e:
+        channel_metadata = e.channel_metadata
+
+    if not include_private:
+        filtered: dict[str, ChannelMetadata] = {
+            k: v
+            for k, v in channel_metadata.items()
+            if v.get("type") != ChannelType.PRIVATE_CHANNEL.value
+        }
+        logger.debug(f"Filtered to {len(filtered)} channels (exclude private)")
+        return filtered
+    return channel_metadata
+
 
-    # Cache miss - fetch from Slack API with retry logic
+def _fetch_channel_metadata(
+    access_token: str, team_id: str
+) -> dict[str, ChannelMetadata]:
     logger.debug(f"Channel metadata cache MISS for team {team_id} - fetching from API")
     slack_client = WebClient(token=access_token)
     channel_metadata: dict[str, ChannelMetadata] = {}
@@ -150,20 +160,6 @@ def fetch_and_cache_channel_metadata(
                     break
 
             logger.info(f"Fetched {channel_count} channels for team {team_id}")
-
-            # Cache the results
-            try:
-                redis_client.set(
-                    cache_key,
-                    json.dumps(channel_metadata),
-                    ex=CHANNEL_METADATA_CACHE_TTL,
-                )
-                logger.info(
-                    f"Cached {channel_count} channels for team {team_id} (TTL: {CHANNEL_METADATA_CACHE_TTL}s, key: {cache_key})"
-                )
-            except Exception as e:
-                logger.warning(f"Error caching channel metadata: {e}")
-
             return channel_metadata
 
         except SlackApiError as e:
@@ -222,7 +218,7 @@ def fetch_and_cache_channel_metadata(
             f"Returning partial channel metadata ({len(channel_metadata)} channels) despite errors. "
             f"Last error: {last_exception}"
         )
-        return channel_metadata
+        raise _PartialChannelMetadataError(channel_metadata)
 
     # If we exhausted all retries and have no data, raise the last exception
     if last_exception:
@@ -248,43 +244,31 @@ def get_cached_user_profile(
     """
     Get a user's display name from cache or fetch from Slack API.
 
-    Uses Redis caching to avoid repeated API calls and rate limiting.
+    Uses the Slack metadata cache to avoid repeated API calls and rate limiting.
     Returns the user's real_name or email, or None if not found.
     """
-    redis_client = get_redis_client()
-    cache_key = f"slack_federated_search:{team_id}:user:{user_id}"
-
-    # Check cache first
     try:
-        cached = redis_client.get(cache_key)
-        if cached is not None:
-            cached_str = (
-                cached.decode("utf-8") if isinstance(cached, bytes) else str(cached)
-            )
-            # Empty string means user was not found previously
-            return cached_str if cached_str else None
-    except Exception as e:
-        logger.debug(f"Error reading user profile cache: {e}")
+        return get_slack_metadata(
+            SlackMetadataKind.USER_PROFILE_NAME,
+            team_id,
+            user_id,
+            lambda: _fetch_user_profile_name(access_token, user_id),
+            ttl_seconds=USER_PROFILE_CACHE_TTL,
+            negative_ttl_seconds=USER_PROFILE_CACHE_TTL,
+        )
+    except SlackApiError:
+        # Don't cache rate limit errors - we'll retry later
+        logger.debug(f"Rate limited fetching user {user_id}, will retry later")
+        return None
+
 
-    # Cache miss - fetch from Slack API
+def _fetch_user_profile_name(access_token: str, user_id: str) -> str | None:
     slack_client = WebClient(token=access_token)
     try:
         response = slack_client.users_profile_get(user=user_id)
         response.validate()
         profile: dict[str, Any] = response.get("profile", {})
-        name: str | None = profile.get("real_name") or profile.get("email")
-
-        # Cache the result (empty string for not found)
-        try:
-            redis_client.set(
-                cache_key,
-                name or "",
-                ex=USER_PROFILE_CACHE_TTL,
-            )
-        except Exception as e:
-            logger.debug(f"Error caching user profile: {e}")
-
-        return name
+        return profile.get("real_name") or profile.get("email")
 
     except SlackApiError as e:
         error_str = str(e)
@@ -293,18 +277,11 @@ def get_cached_user_profile(
                 f"User {user_id} not found in Slack workspace (likely deleted/deactivated)"
             )
         elif "ratelimited" in error_str:
-            # Don't cache rate limit errors - we'll retry later
-            logger.debug(f"Rate limited fetching user {user_id}, will retry later")
-            return None
+            raise
         else:
             logger.warning(f"Could not fetch profile for user {user_id}: {e}")
 
         # Cache negative result to avoid repeated lookups for missing users
-        try:
-            redis_client.set(cache_key, "", ex=USER_PROFILE_CACHE_TTL)
-        except Exception:
-            pass
-
         return None
 
 
@@ -392,19 +369,16 @@ def _should_skip_channel(
             # Fallback: API call only if not in cache (should be rare)
             token_to_use = bot_token or access_token
             channel_client = WebClient(token=token_to_use)
-            channel_info = channel_client.conversations_info(channel=channel_id)
-
-            if isinstance(channel_info.data, dict):
-                channel_data = channel_info.data.get("channel", {})
-                channel_type = get_channel_type(channel_info=channel_data)
-                is_private_or_dm = channel_type in [
-                    ChannelType.PRIVATE_CHANNEL,
-                    ChannelType.IM,
-                    ChannelType.MPIM,
-                ]
+            channel_data = get_slack_channel_info(channel_client, channel_id)
+            channel_type = get_channel_type(channel_info=channel_data)
+            is_private_or_dm = channel_type in [
+                ChannelType.PRIVATE_CHANNEL,
+                ChannelType.IM,
+                ChannelType.MPIM,
+            ]
 
-                if is_private_or_dm and channel_id != allowed_private_channel:
-                    return True
+            if is_private_or_dm and channel_id != allowed_private_channel:
+                return True
         except Exception as e:
             logger.warning(
                 f"Could not determine channel type for {channel_id}, filtering out: {e}"
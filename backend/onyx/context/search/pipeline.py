@@ -1,3 +1,4 @@
+import time
 from collections import defaultdict
 from datetime import datetime
 from uuid import UUID
@@ -14,6 +15,8 @@ from onyx.context.search.preprocessing.access_filters import (
     build_access_filters_for_user,
 )
 from onyx.context.search.retrieval.search_runner import search_chunks
+from onyx.context.search.retrieval.search_runner import search_chunks_multi_query
+from onyx.context.search.utils import get_query_embeddings
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.db.models import Persona
 from onyx.db.models import User
@@ -241,23 +244,17 @@ def merge_individual_chunks(
     return result
 
 
-@log_function_time(print_only=True, debug_only=True)
-def search_pipeline(
-    # Query and settings
-    chunk_search_request: ChunkSearchRequest,
-    # Document index to search over
-    # Note that federated sources will also be used (not related to this arg)
-    document_index: DocumentIndex,
-    # Used for ACLs and federated search, anonymous users only see public docs
+def _build_search_filters(
+    user_selected_filters: BaseFilters | None,
+    bypass_acl: bool,
     user: User,
-    # Used for default filters and settings
     persona: Persona | None,
+    project_id: int | None,
     db_session: Session,
     auto_detect_filters: bool = False,
+    query: str | None = None,
     llm: LLM | None = None,
-    # If a project ID is provided, it will be exclusively scoped to that project
-    project_id: int | None = None,
-) -> list[InferenceChunk]:
+) -> IndexFilters:
     user_uploaded_persona_files: list[UUID] | None = (
         [user_file.id for user_file in persona.user_files] if persona else None
     )
@@ -283,8 +280,8 @@ def search_pipeline(
         else None
     )
 
-    filters = _build_index_filters(
-        user_provided_filters=chunk_search_request.user_selected_filters,
+    return _build_index_filters(
+        user_provided_filters=user_selected_filters,
         user=user,
         project_id=project_id,
         user_file_ids=user_uploaded_persona_files,
@@ -292,13 +289,60 @@ def search_pipeline(
         persona_time_cutoff=persona_time_cutoff,
         db_session=db_session,
         auto_detect_filters=auto_detect_filters,
-        query=chunk_search_request.query,
+        query=query,
         llm=llm,
-        bypass_acl=chunk_search_request.bypass_acl,
+        bypass_acl=bypass_acl,
         attached_document_ids=attached_document_ids,
         hierarchy_node_ids=hierarchy_node_ids,
     )
 
+
+# the only fields post query censoring rewrites
+_CENSORED_FIELDS = ("content", "blurb", "source_links")
+
+
+def _censor_chunks(chunks: list[InferenceChunk], user: User) -> list[InferenceChunk]:
+    # For some specific connectors like Salesforce, a user that has access to an object doesn't mean
+    # that they have access to all of the fields of the object.
+    return fetch_ee_implementation_or_noop(
+        "onyx.external_permissions.post_query_censoring",
+        "_post_query_chunk_censoring",
+        chunks,
+    )(
+        chunks=chunks,
+        user=user,
+    )
+
+
+@log_function_time(print_only=True, debug_only=True)
+def search_pipeline(
+    # Query and settings
+    chunk_search_request: ChunkSearchRequest,
+    # Document index to search over
+    # Note that federated sources will also be used (not related to this arg)
+    document_index: DocumentIndex,
+    # Used for ACLs and federated search, anonymous users only see public docs
+    user: User,
+    # Used for default filters and settings
+    persona: Persona | None,
+    db_session: Session,
+    auto_detect_filters: bool = False,
+    llm: LLM | None = None,
+    # If a project ID is provided, it will be exclusively scoped to that project
+    project_id: int | None = None,
+) -> list[InferenceChunk]:
+    filters = _build_search_filters(
+        user_selected_filters=chunk_search_request.user_selected_filters,
+        bypass_acl=chunk_search_request.bypass_acl,
+        user=user,
+        persona=persona,
+        project_id=project_id,
+        db_session=db_session,
+        auto_detect_filters=auto_detect_filters,
+        query=chunk_search_request.query,
+        llm=llm,
+    )
+
     query_keywords = strip_stopwords(chunk_search_request.query)
 
     query_request = ChunkIndexRequest(
@@ -317,15 +361,123 @@ def search_pipeline(
         db_session=db_session,
     )
 
-    # For some specific connectors like Salesforce, a user that has access to an object doesn't mean
-    # that they have access to all of the fields of the object.
-    censored_chunks: list[InferenceChunk] = fetch_ee_implementation_or_noop(
-        "onyx.external_permissions.post_query_censoring",
-        "_post_query_chunk_censoring",
-        retrieved_chunks,
-    )(
-        chunks=retrieved_chunks,
+    return _censor_chunks(retrieved_chunks, user)
+
+
+def _apply_censoring(
+    chunk: InferenceChunk,
+    censored_input_chunk: InferenceChunk,
+    censored_chunk: InferenceChunk,
+) -> InferenceChunk:
+    """Applies the censoring of a chunk retrieved by one query to the same chunk
+    retrieved by another, keeping the query specific score and highlights."""
+    if censored_chunk is censored_input_chunk:
+        return chunk
+    if chunk is censored_input_chunk:
+        return censored_chunk
+    return chunk.model_copy(
+        update={field: getattr(censored_chunk, field) for field in _CENSORED_FIELDS}
+    )
+
+
+@log_function_time(print_only=True, debug_only=True)
+def multi_query_search_pipeline(
+    # One request per query. The filters and ACLs are only computed once, so all
+    # requests must share the same user_selected_filters and bypass_acl
+    chunk_search_requests: list[ChunkSearchRequest],
+    document_index: DocumentIndex,
+    user: User,
+    persona: Persona | None,
+    db_session: Session,
+    project_id: int | None = None,
+) -> list[list[InferenceChunk]]:
+    """Runs search_pipeline for several queries at once. The index filters (and
+    the ACL lookups behind them) are built once, all queries are embedded in a
+    single batch and the retrievals for all of them run concurrently.
+
+    Returns the retrieved chunks of each request, in order."""
+    if not chunk_search_requests:
+        return []
+
+    first_request = chunk_search_requests[0]
+    if any(
+        request.user_selected_filters != first_request.user_selected_filters
+        or request.bypass_acl != first_request.bypass_acl
+        for request in chunk_search_requests[1:]
+    ):
+        raise ValueError(
+            "All requests of a multi query search must share the same filters"
+        )
+
+    start = time.monotonic()
+    filters = _build_search_filters(
+        user_selected_filters=first_request.user_selected_filters,
+        bypass_acl=first_request.bypass_acl,
         user=user,
+        persona=persona,
+        project_id=project_id,
+        db_session=db_session,
+    )
+    filters_elapsed = time.monotonic() - start
+
+    start = time.monotonic()
+    query_embeddings = get_query_embeddings(
+        [request.query for request in chunk_search_requests], db_session
+    )
+    embedding_elapsed = time.monotonic() - start
+
+    query_requests = [
+        ChunkIndexRequest(
+            query=request.query,
+            hybrid_alpha=request.hybrid_alpha,
+            recency_bias_multiplier=request.recency_bias_multiplier,
+            query_keywords=strip_stopwords(request.query),
+            filters=filters,
+            limit=request.limit,
+        )
+        for request in chunk_search_requests
+    ]
+
+    start = time.monotonic()
+    retrieved_chunks_per_query = search_chunks_multi_query(
+        query_requests=query_requests,
+        query_embeddings=query_embeddings,
+        user_id=user.id if user else None,
+        document_index=document_index,
+        db_session=db_session,
+    )
+    retrieval_elapsed = time.monotonic() - start
+
+    # Censor the chunks of all queries in one go, chunks retrieved by several
+    # queries only need to be checked once
+    start = time.monotonic()
+    unique_chunks = {
+        (chunk.document_id, chunk.chunk_id): chunk
+        for retrieved_chunks in retrieved_chunks_per_query
+        for chunk in retrieved_chunks
+    }
+    censored_chunks = {
+        (chunk.document_id, chunk.chunk_id): chunk
+        for chunk in _censor_chunks(list(unique_chunks.values()), user)
+    }
+    censored_chunks_per_query = [
+        [
+            _apply_censoring(chunk, unique_chunks[key], censored_chunks[key])
+            for chunk in retrieved_chunks
+            if (key := (chunk.document_id, chunk.chunk_id)) in censored_chunks
+        ]
+        for retrieved_chunks in retrieved_chunks_per_query
+    ]
+    censoring_elapsed = time.monotonic() - start
+
+    total_elapsed = (
+        filters_elapsed + embedding_elapsed + retrieval_elapsed + censoring_elapsed
+    )
+    logger.debug(
+        f"Multi query search for {len(chunk_search_requests)} queries took "
+        f"{total_elapsed:.3f}s "
+        f"(filters: {filters_elapsed:.3f}s, embedding: {embedding_elapsed:.3f}s, "
+        f"retrieval: {retrieval_elapsed:.3f}s, censoring: {censoring_elapsed:.3f}s)"
     )
 
-    return censored_chunks
+    return censored_chunks_per_query
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from sqlalchemy.orm import Session
+
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.configs.model_configs import QUERY_EMBEDDING_MODEL_REFRESH_SECONDS
+from onyx.configs.model_configs import QUERY_EMBEDDING_REDIS_CACHE
+from onyx.db.models import SearchSettings
+from onyx.db.search_settings import get_current_search_settings
+from onyx.indexing.embedding_cache import EmbeddingCache
+from onyx.indexing.embedding_cache import RedisEmbeddingCache
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_HOST
+from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+
+def normalize_query_for_embedding(query: str) -> str:
+    """Queries that only differ in surrounding or repeated whitespace embed to the
+    same vector. Casing is kept since it is meaningful to most embedding models."""
+    return " ".join(query.split())
+
+
+class LRUTTLCache:
+    """Thread safe, size bounded in-process cache where entries also expire after
+    ttl_seconds."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Embedding]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Embedding | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Embedding) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class QueryEmbeddingModelSnapshot(BaseModel):
+    """The query embedding model for the current search settings of a tenant"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    search_settings_id: int
+    # Every search settings field EmbeddingModel.from_db_model reads, the model is
+    # only rebuilt (and the tokenizer looked up again) if one of these changes
+    settings_fingerprint: tuple
+    model: EmbeddingModel
+    redis_cache: EmbeddingCache | None
+    refresh_at: float
+
+
+_QUERY_EMBEDDING_CACHE = LRUTTLCache(
+    max_entries=QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+    ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+_model_snapshots: dict[str, QueryEmbeddingModelSnapshot] = {}
+_model_snapshots_lock = threading.Lock()
+
+
+def _settings_fingerprint(search_settings: SearchSettings) -> tuple:
+    return (
+        search_settings.id,
+        search_settings.model_name,
+        search_settings.normalize,
+        search_settings.query_prefix,
+        search_settings.passage_prefix,
+        search_settings.provider_type,
+        search_settings.api_key,
+        search_settings.api_url,
+        search_settings.api_version,
+        search_settings.deployment_name,
+        search_settings.reduced_dimension,
+    )
+
+
+def get_query_embedding_model(
+    db_session: Session,
+) -> QueryEmbeddingModelSnapshot:
+    """Returns the query embedding model of the current search settings. The search
+    settings are only read from the DB once every
+    QUERY_EMBEDDING_MODEL_REFRESH_SECONDS per tenant."""
+    tenant_id = get_current_tenant_id()
+    now = time.monotonic()
+
+    with _model_snapshots_lock:
+        snapshot = _model_snapshots.get(tenant_id)
+    if snapshot is not None and now < snapshot.refresh_at:
+        return snapshot
+
+    search_settings = get_current_search_settings(db_session)
+    fingerprint = _settings_fingerprint(search_settings)
+
+    if snapshot is not None and snapshot.settings_fingerprint == fingerprint:
+        snapshot = snapshot.model_copy(
+            update={"refresh_at": now + QUERY_EMBEDDING_MODEL_REFRESH_SECONDS}
+        )
+    else:
+        snapshot = QueryEmbeddingModelSnapshot(
+            search_settings_id=search_settings.id,
+            settings_fingerprint=fingerprint,
+            model=EmbeddingModel.from_db_model(
+                search_settings=search_settings,
+                # The below are globally set, this flow always uses the indexing one
+                server_host=MODEL_SERVER_HOST,
+                server_port=MODEL_SERVER_PORT,
+            ),
+            redis_cache=(
+                RedisEmbeddingCache(
+                    model_name=search_settings.model_name,
+                    normalize=search_settings.normalize,
+                    prefix=search_settings.query_prefix,
+                    reduced_dimension=search_settings.reduced_dimension,
+                    text_type=EmbedTextType.QUERY,
+                )
+                if QUERY_EMBEDDING_REDIS_CACHE
+                else None
+            ),
+            refresh_at=now + QUERY_EMBEDDING_MODEL_REFRESH_SECONDS,
+        )
+
+    with _model_snapshots_lock:
+        _model_snapshots[tenant_id] = snapshot
+    return snapshot
+
+
+def embed_queries_with_cache(
+    queries: list[str],
+    snapshot: QueryEmbeddingModelSnapshot,
+    cache: LRUTTLCache = _QUERY_EMBEDDING_CACHE,
+) -> list[Embedding]:
+    """Embeds the normalized queries, checking the in-process cache and then the
+    Redis cache (if enabled) first. Each distinct query is embedded at most once."""
+    tenant_id = get_current_tenant_id()
+    normalized_queries = [normalize_query_for_embedding(query) for query in queries]
+
+    embeddings: dict[str, Embedding] = {}
+    for query in normalized_queries:
+        cached = cache.get((tenant_id, snapshot.search_settings_id, query))
+        if cached is not None:
+            embeddings[query] = cached
+
+    misses = list(
+        dict.fromkeys(query for query in normalized_queries if query not in embeddings)
+    )
+
+    if misses and snapshot.redis_cache is not None:
+        for query, cached in zip(
+            misses, snapshot.redis_cache.get_many(misses, tenant_id=tenant_id)
+        ):
+            if cached is not None:
+                embeddings[query] = cached
+                cache.put((tenant_id, snapshot.search_settings_id, query), cached)
+        misses = [query for query in misses if query not in embeddings]
+
+    if misses:
+        new_embeddings = snapshot.model.encode(misses, text_type=EmbedTextType.QUERY)
+        for query, embedding in zip(misses, new_embeddings):
+            embeddings[query] = embedding
+            cache.put((tenant_id, snapshot.search_settings_id, query), embedding)
+        if snapshot.redis_cache is not None:
+            snapshot.redis_cache.put_many(misses, new_embeddings, tenant_id=tenant_id)
+
+    logger.debug(
+        f"Query embedding cache: {len(normalized_queries) - len(misses)} hits, "
+        f"{len(misses)} misses"
+    )
+    return [embeddings[query] for query in normalized_queries]
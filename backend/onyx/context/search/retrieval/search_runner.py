@@ -14,11 +14,13 @@ from onyx.context.search.utils import get_query_embedding
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.federated_connectors.federated_retrieval import FederatedRetrievalInfo
 from onyx.federated_connectors.federated_retrieval import (
     get_federated_retrieval_functions,
 )
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.model_server_models import Embedding
 
 logger = setup_logger()
 
@@ -53,7 +55,14 @@ def _embed_and_search(
     db_session: Session,
 ) -> list[InferenceChunk]:
     query_embedding = get_query_embedding(query_request.query, db_session)
+    return _hybrid_search(query_request, query_embedding, document_index)
 
+
+def _hybrid_search(
+    query_request: ChunkIndexRequest,
+    query_embedding: Embedding,
+    document_index: DocumentIndex,
+) -> list[InferenceChunk]:
     hybrid_alpha = query_request.hybrid_alpha or HYBRID_ALPHA
 
     top_chunks = document_index.hybrid_retrieval(
@@ -74,21 +83,19 @@ def _embed_and_search(
     return top_chunks
 
 
-def search_chunks(
+def _get_federated_retrieval_infos(
     query_request: ChunkIndexRequest,
     user_id: UUID | None,
-    document_index: DocumentIndex,
     db_session: Session,
-) -> list[InferenceChunk]:
-    run_queries: list[tuple[Callable, tuple]] = []
-
+) -> tuple[list[FederatedRetrievalInfo], bool]:
+    """Returns the federated retrieval functions to run for the query filters and
+    whether the normal hybrid search has any indexed sources left to search over."""
     source_filters = (
         set(query_request.filters.source_type)
         if query_request.filters.source_type
         else None
     )
 
-    # Federated retrieval
     federated_retrieval_infos = get_federated_retrieval_functions(
         db_session=db_session,
         user_id=user_id,
@@ -101,10 +108,6 @@ def search_chunks(
         federated_retrieval_info.source.to_non_federated_source()
         for federated_retrieval_info in federated_retrieval_infos
     )
-    for federated_retrieval_info in federated_retrieval_infos:
-        run_queries.append(
-            (federated_retrieval_info.retrieval_function, (query_request,))
-        )
 
     # Don't run normal hybrid search if there are no indexed sources to
     # search over
@@ -112,6 +115,26 @@ def search_chunks(
         len(set(source_filters) - federated_sources) > 0
     )
 
+    return federated_retrieval_infos, normal_search_enabled
+
+
+def search_chunks(
+    query_request: ChunkIndexRequest,
+    user_id: UUID | None,
+    document_index: DocumentIndex,
+    db_session: Session,
+) -> list[InferenceChunk]:
+    run_queries: list[tuple[Callable, tuple]] = []
+
+    # Federated retrieval
+    federated_retrieval_infos, normal_search_enabled = _get_federated_retrieval_infos(
+        query_request=query_request, user_id=user_id, db_session=db_session
+    )
+    for federated_retrieval_info in federated_retrieval_infos:
+        run_queries.append(
+            (federated_retrieval_info.retrieval_function, (query_request,))
+        )
+
     if normal_search_enabled:
         run_queries.append(
             (_embed_and_search, (query_request, document_index, db_session))
@@ -130,6 +153,56 @@ def search_chunks(
     return top_chunks
 
 
+def search_chunks_multi_query(
+    query_requests: list[ChunkIndexRequest],
+    query_embeddings: list[Embedding],
+    user_id: UUID | None,
+    document_index: DocumentIndex,
+    db_session: Session,
+) -> list[list[InferenceChunk]]:
+    """Same as search_chunks for each of the query requests, but with the query
+    embeddings already computed and all of the hybrid and federated retrievals run
+    concurrently. All query requests must share the same filters.
+
+    Returns the retrieved chunks of each query request, in order."""
+    if not query_requests:
+        return []
+
+    federated_retrieval_infos, normal_search_enabled = _get_federated_retrieval_infos(
+        query_request=query_requests[0], user_id=user_id, db_session=db_session
+    )
+
+    run_queries: list[tuple[Callable, tuple]] = []
+    # Index of the query request each retrieval function belongs to
+    query_indices: list[int] = []
+    for query_index, (query_request, query_embedding) in enumerate(
+        zip(query_requests, query_embeddings)
+    ):
+        for federated_retrieval_info in federated_retrieval_infos:
+            run_queries.append(
+                (federated_retrieval_info.retrieval_function, (query_request,))
+            )
+            query_indices.append(query_index)
+
+        if normal_search_enabled:
+            run_queries.append(
+                (_hybrid_search, (query_request, query_embedding, document_index))
+            )
+            query_indices.append(query_index)
+
+    parallel_search_results = run_functions_tuples_in_parallel(run_queries)
+
+    chunk_sets_per_query: list[list[list[InferenceChunk]]] = [
+        [] for _ in query_requests
+    ]
+    for query_index, search_result in zip(query_indices, parallel_search_results):
+        chunk_sets_per_query[query_index].append(search_result)
+
+    return [
+        combine_retrieval_results(chunk_sets) for chunk_sets in chunk_sets_per_query
+    ]
+
+
 # TODO: This is unused code.
 def inference_sections_from_ids(
     doc_identifiers: list[tuple[str, int]],
@@ -2,17 +2,16 @@ from typing import TypeVar
 
 from sqlalchemy.orm import Session
 
+from onyx.configs.model_configs import ENABLE_QUERY_EMBEDDING_CACHE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SavedSearchDoc
 from onyx.context.search.models import SavedSearchDocWithContent
 from onyx.context.search.models import SearchDoc
-from onyx.db.search_settings import get_current_search_settings
-from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from onyx.context.search.query_embedding_cache import embed_queries_with_cache
+from onyx.context.search.query_embedding_cache import get_query_embedding_model
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
-from shared_configs.configs import MODEL_SERVER_HOST
-from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 
@@ -65,16 +64,12 @@ def inference_section_from_single_chunk(
 
 
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
-    search_settings = get_current_search_settings(db_session)
+    snapshot = get_query_embedding_model(db_session)
 
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
-    )
+    if ENABLE_QUERY_EMBEDDING_CACHE:
+        return embed_queries_with_cache(queries, snapshot)
 
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
+    query_embedding = snapshot.model.encode(queries, text_type=EmbedTextType.QUERY)
     return query_embedding
 
 
@@ -10,6 +10,7 @@ from sqlalchemy import delete
 from sqlalchemy import desc
 from sqlalchemy import exists
 from sqlalchemy import func
+from sqlalchemy import literal
 from sqlalchemy import nullsfirst
 from sqlalchemy import or_
 from sqlalchemy import Row
@@ -529,6 +530,75 @@ def get_chat_messages_by_session(
     return list(result)
 
 
+def get_mainline_chat_messages(
+    chat_session_id: UUID,
+    db_session: Session,
+    prefetch_top_two_level_tool_calls: bool = True,
+) -> list[ChatMessage]:
+    """Returns the root message followed by the active branch of the session, i.e.
+    the messages reached by following the latest_child_message_id pointers from the
+    root. Messages on other branches (edits, regenerations) are never loaded."""
+    root_id = (
+        select(func.min(ChatMessage.id))
+        .where(
+            ChatMessage.chat_session_id == chat_session_id,
+            ChatMessage.parent_message_id.is_(None),
+        )
+        .scalar_subquery()
+    )
+    mainline = (
+        select(
+            ChatMessage.id,
+            ChatMessage.latest_child_message_id,
+            literal(0).label("depth"),
+        )
+        .where(ChatMessage.id == root_id)
+        .cte("mainline", recursive=True)
+    )
+    mainline = mainline.union_all(
+        select(
+            ChatMessage.id,
+            ChatMessage.latest_child_message_id,
+            mainline.c.depth + 1,
+        ).where(ChatMessage.id == mainline.c.latest_child_message_id)
+    )
+
+    stmt = (
+        select(ChatMessage)
+        .join(mainline, ChatMessage.id == mainline.c.id)
+        .order_by(mainline.c.depth)
+    )
+    if prefetch_top_two_level_tool_calls:
+        stmt = stmt.options(
+            selectinload(ChatMessage.tool_calls).selectinload(
+                ToolCall.tool_call_children
+            )
+        )
+        return list(db_session.scalars(stmt).unique().all())
+
+    return list(db_session.scalars(stmt).all())
+
+
+def prefetch_chat_message_tool_calls(
+    chat_messages: list[ChatMessage], db_session: Session
+) -> None:
+    """Loads the top two levels of tool calls of messages that were loaded without
+    them in one round trip, rather than lazily one query per message."""
+    if not chat_messages:
+        return
+
+    stmt = (
+        select(ChatMessage)
+        .where(ChatMessage.id.in_([chat_message.id for chat_message in chat_messages]))
+        .options(
+            selectinload(ChatMessage.tool_calls).selectinload(
+                ToolCall.tool_call_children
+            )
+        )
+    )
+    db_session.scalars(stmt).unique().all()
+
+
 def get_or_create_root_message(
     chat_session_id: UUID,
     db_session: Session,
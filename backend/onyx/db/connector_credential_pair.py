@@ -592,6 +592,12 @@ def add_credential_to_connector(
 
     db_session.commit()
 
+    if access_type == AccessType.SYNC:
+        fetch_ee_implementation_or_noop(
+            "onyx.external_permissions.post_query_censoring",
+            "invalidate_censoring_enabled_sources_cache",
+        )()
+
     return StatusResponse(
         success=True,
         message=f"Creating new association between Connector {connector_id} and Credential {credential_id}",
@@ -640,6 +646,13 @@ def remove_credential_from_connector(
         )
         db_session.delete(association)
         db_session.commit()
+        fetch_ee_implementation_or_noop(
+            "onyx.external_permissions.post_query_censoring",
+            "invalidate_censoring_enabled_sources_cache",
+        )()
+        fetch_ee_implementation_or_noop(
+            "onyx.access.acl_cache", "invalidate_user_acl_cache"
+        )()
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
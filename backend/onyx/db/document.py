@@ -819,12 +819,18 @@ def update_docs_chunk_count__no_commit(
     document_ids: list[str],
     doc_id_to_chunk_count: dict[str, int],
     db_session: Session,
+    doc_id_to_chunk_content_hashes: dict[str, list[str] | None] | None = None,
 ) -> None:
+    """The chunk content hashes of documents missing from
+    doc_id_to_chunk_content_hashes are cleared, since their chunks were rewritten
+    without them."""
+    doc_id_to_chunk_content_hashes = doc_id_to_chunk_content_hashes or {}
     documents_to_update = (
         db_session.query(DbDocument).filter(DbDocument.id.in_(document_ids)).all()
     )
     for doc in documents_to_update:
         doc.chunk_count = doc_id_to_chunk_count[doc.id]
+        doc.chunk_content_hashes = doc_id_to_chunk_content_hashes.get(doc.id)
 
 
 def mark_document_as_modified(
@@ -852,6 +858,21 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    """Bulk version of mark_document_as_synced. Document IDs that do not exist
+    are ignored."""
+    if not document_ids:
+        return
+
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -3,6 +3,7 @@
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from onyx.access.models import ExternalAccess
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import HierarchyNode as PydanticHierarchyNode
 from onyx.db.enums import HierarchyNodeType
@@ -571,3 +572,53 @@ def update_hierarchy_node_permissions(
         db_session.flush()
 
     return True
+
+
+def batch_update_hierarchy_node_permissions(
+    db_session: Session,
+    source: DocumentSource,
+    external_access_by_raw_node_id: dict[str, ExternalAccess],
+) -> int:
+    """
+    Update permissions for a batch of existing hierarchy nodes of the same source
+    with a single lookup and commit. See `update_hierarchy_node_permissions`.
+
+    Returns:
+        The number of nodes that were found and updated
+    """
+    if not external_access_by_raw_node_id:
+        return 0
+
+    existing_nodes = db_session.scalars(
+        select(HierarchyNode).where(
+            HierarchyNode.raw_node_id.in_(list(external_access_by_raw_node_id)),
+            HierarchyNode.source == source,
+        )
+    ).all()
+
+    for node in existing_nodes:
+        external_access = external_access_by_raw_node_id[node.raw_node_id]
+        node.is_public = external_access.is_public
+        node.external_user_emails = (
+            list(external_access.external_user_emails)
+            if external_access.external_user_emails
+            else None
+        )
+        node.external_user_group_ids = (
+            list(external_access.external_user_group_ids)
+            if external_access.external_user_group_ids
+            else None
+        )
+
+    missing_raw_node_ids = set(external_access_by_raw_node_id) - {
+        node.raw_node_id for node in existing_nodes
+    }
+    if missing_raw_node_ids:
+        logger.warning(
+            f"Hierarchy nodes not found for permission update: "
+            f"num_missing={len(missing_raw_node_ids)}, source={source}, "
+            f"raw_node_ids={sorted(missing_raw_node_ids)[:10]}"
+        )
+
+    db_session.commit()
+    return len(existing_nodes)
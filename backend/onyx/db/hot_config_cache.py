@@ -0,0 +1,277 @@
+"""Per-tenant read-through cache for configuration that is read on every chat turn
+but rarely changes, e.g. the tools and the default LLM provider.
+
+Every cached value belongs to a namespace which has a per-tenant version stored
+in Redis. Any commit that inserts, updates or deletes rows of the namespace's
+tables bumps the version (see the session event listeners at the bottom), which
+makes the values cached under the previous version unreachable in every process.
+The versions of all namespaces are read with a single MGET and then reused for
+HOT_CONFIG_VERSION_CHECK_SECONDS, so a chat turn does at most one version check
+regardless of how many cached values it reads.
+
+The version is always read before a value is loaded, so a value loaded from
+outdated rows is only ever stored under an outdated version. Values still
+expire after HOT_CONFIG_CACHE_TTL_SECONDS to bound the staleness caused by
+writes that bypass the ORM session (e.g. migrations).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from itertools import chain
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+from prometheus_client import Counter
+from sqlalchemy import Connection
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import UOWTransaction
+
+from onyx.configs.app_configs import HOT_CONFIG_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import HOT_CONFIG_VERSION_CHECK_SECONDS
+from onyx.db.models import LLMModelFlow
+from onyx.db.models import LLMProvider
+from onyx.db.models import LLMProvider__Persona
+from onyx.db.models import LLMProvider__UserGroup
+from onyx.db.models import Memory
+from onyx.db.models import ModelConfiguration
+from onyx.db.models import Tool
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_VERSION_KEY_PREFIX = "hot_config_cache:version"
+# Session.info key of the namespaces changed by the session's uncommitted flushes
+_CHANGED_NAMESPACES_KEY = "hot_config_cache_changed_namespaces"
+
+_MAX_LOCAL_ENTRIES = 10_000
+
+
+class HotConfigNamespace(str, Enum):
+    TOOLS = "tools"
+    LLM_PROVIDERS = "llm_providers"
+    MEMORIES = "memories"
+
+
+_NAMESPACE_MODELS: dict[HotConfigNamespace, tuple[type, ...]] = {
+    HotConfigNamespace.TOOLS: (Tool,),
+    HotConfigNamespace.LLM_PROVIDERS: (
+        LLMProvider,
+        ModelConfiguration,
+        LLMModelFlow,
+        LLMProvider__Persona,
+        LLMProvider__UserGroup,
+    ),
+    HotConfigNamespace.MEMORIES: (Memory,),
+}
+_MODEL_NAMESPACES: dict[type, HotConfigNamespace] = {
+    model: namespace
+    for namespace, models in _NAMESPACE_MODELS.items()
+    for model in models
+}
+
+_hot_config_lookups = Counter(
+    "onyx_hot_config_cache_lookups_total",
+    "Total hot config cache lookups by namespace and result",
+    ["namespace", "result"],
+)
+_hot_config_version_checks = Counter(
+    "onyx_hot_config_cache_version_checks_total",
+    "Total reads of the hot config versions of a tenant from Redis",
+)
+_hot_config_invalidations = Counter(
+    "onyx_hot_config_cache_invalidations_total",
+    "Total hot config version bumps by namespace",
+    ["namespace"],
+)
+
+
+@dataclass(frozen=True)
+class _TenantVersions:
+    checked_at: float
+    versions: dict[HotConfigNamespace, int]
+
+
+@dataclass(frozen=True)
+class _CachedValue:
+    version: int
+    expires_at: float
+    value: Any
+
+
+# tenant ID, namespace, key
+_CacheKey = tuple[str, HotConfigNamespace, str]
+
+_tenant_versions: dict[str, _TenantVersions] = {}
+_local_cache: OrderedDict[_CacheKey, _CachedValue] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version_key(namespace: HotConfigNamespace) -> str:
+    return f"{_VERSION_KEY_PREFIX}:{namespace.value}"
+
+
+def _get_versions(tenant_id: str) -> dict[HotConfigNamespace, int]:
+    with _lock:
+        tenant_versions = _tenant_versions.get(tenant_id)
+    if (
+        tenant_versions is not None
+        and time.monotonic() - tenant_versions.checked_at
+        < HOT_CONFIG_VERSION_CHECK_SECONDS
+    ):
+        return tenant_versions.versions
+
+    namespaces = list(HotConfigNamespace)
+    checked_at = time.monotonic()
+    # mget doesn't automatically add the tenant_id prefix, unlike incr
+    raw_versions = cast(
+        list[bytes | None],
+        get_redis_client(tenant_id=tenant_id).mget(
+            [f"{tenant_id}:{_version_key(namespace)}" for namespace in namespaces]
+        ),
+    )
+    _hot_config_version_checks.inc()
+    versions = {
+        namespace: int(raw_version) if raw_version is not None else 0
+        for namespace, raw_version in zip(namespaces, raw_versions)
+    }
+    with _lock:
+        _tenant_versions[tenant_id] = _TenantVersions(
+            checked_at=checked_at, versions=versions
+        )
+    return versions
+
+
+def get_hot_config(namespace: HotConfigNamespace, key: str, load: Callable[[], T]) -> T:
+    """Returns the value cached under `key` for the current version of the
+    namespace, calling `load` to load and cache it otherwise. `load` must return
+    plain data (no ORM objects) and callers must not modify the returned value
+    since it is shared. Falls back to `load` if Redis is unavailable."""
+    if HOT_CONFIG_CACHE_TTL_SECONDS <= 0:
+        return load()
+
+    tenant_id = get_current_tenant_id()
+    try:
+        version = _get_versions(tenant_id)[namespace]
+    except Exception:
+        logger.exception(f"Failed to check the hot config version of {namespace}")
+        _hot_config_lookups.labels(namespace=namespace.value, result="error").inc()
+        return load()
+
+    cache_key = (tenant_id, namespace, key)
+    with _lock:
+        cached = _local_cache.get(cache_key)
+        if (
+            cached is not None
+            and cached.version == version
+            and cached.expires_at > time.monotonic()
+        ):
+            _local_cache.move_to_end(cache_key)
+            _hot_config_lookups.labels(namespace=namespace.value, result="hit").inc()
+            return cached.value
+
+    value = load()
+    _hot_config_lookups.labels(namespace=namespace.value, result="miss").inc()
+    with _lock:
+        _local_cache[cache_key] = _CachedValue(
+            version=version,
+            expires_at=time.monotonic() + HOT_CONFIG_CACHE_TTL_SECONDS,
+            value=value,
+        )
+        _local_cache.move_to_end(cache_key)
+        while len(_local_cache) > _MAX_LOCAL_ENTRIES:
+            _local_cache.popitem(last=False)
+    return value
+
+
+def invalidate_hot_config(
+    namespaces: Iterable[HotConfigNamespace], tenant_id: str | None = None
+) -> None:
+    """Invalidates everything cached in the namespaces for the tenant. Called
+    automatically for commits through an ORM session, only writes which bypass
+    the session need to call this explicitly (after committing)."""
+    if HOT_CONFIG_CACHE_TTL_SECONDS <= 0:
+        return
+
+    tenant_id = tenant_id or get_current_tenant_id()
+    try:
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        for namespace in namespaces:
+            redis_client.incr(_version_key(namespace))
+            _hot_config_invalidations.labels(namespace=namespace.value).inc()
+    except Exception:
+        # Cached values still expire after HOT_CONFIG_CACHE_TTL_SECONDS
+        logger.exception("Failed to invalidate the hot config cache")
+    finally:
+        # Writes made by this process are visible to its next lookup right away
+        with _lock:
+            _tenant_versions.pop(tenant_id, None)
+
+
+def _get_session_tenant_id(session: Session) -> str:
+    # Multi tenant sessions are bound to a connection which translates the default
+    # schema to the tenant's schema
+    bind = session.bind
+    if isinstance(bind, Connection):
+        schema_translate_map = bind.get_execution_options().get("schema_translate_map")
+        if schema_translate_map and schema_translate_map.get(None):
+            return schema_translate_map[None]
+    return get_current_tenant_id()
+
+
+def _mark_changed(session: Session, namespaces: Iterable[HotConfigNamespace]) -> None:
+    # Kept across rollbacks, invalidating a namespace that did not change is harmless
+    session.info.setdefault(_CHANGED_NAMESPACES_KEY, set()).update(namespaces)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_changes(
+    session: Session, flush_context: UOWTransaction  # noqa: ARG001
+) -> None:
+    _mark_changed(
+        session,
+        {
+            _MODEL_NAMESPACES[type(instance)]
+            for instance in chain(session.new, session.dirty, session.deleted)
+            if type(instance) in _MODEL_NAMESPACES
+        },
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_changes(orm_execute_state: ORMExecuteState) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _MODEL_NAMESPACES:
+        _mark_changed(orm_execute_state.session, {_MODEL_NAMESPACES[mapper.class_]})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    namespaces = session.info.pop(_CHANGED_NAMESPACES_KEY, None)
+    if not namespaces:
+        return
+
+    try:
+        tenant_id = _get_session_tenant_id(session)
+    except Exception:
+        logger.exception("Failed to determine the tenant of the committed session")
+        return
+    invalidate_hot_config(namespaces, tenant_id=tenant_id)
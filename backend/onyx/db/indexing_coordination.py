@@ -155,6 +155,8 @@ class IndexingCoordination:
         total_docs_indexed: int,
         new_docs_indexed: int,
         total_chunks: int,
+        embedding_cache_hits: int = 0,
+        embedding_cache_misses: int = 0,
     ) -> tuple[int, int | None]:
         """
         Update batch completion and document counts atomically.
@@ -179,6 +181,12 @@ class IndexingCoordination:
             # New coordination updates
             attempt.completed_batches = (attempt.completed_batches or 0) + 1
             attempt.total_chunks = (attempt.total_chunks or 0) + total_chunks
+            attempt.embedding_cache_hits = (
+                attempt.embedding_cache_hits or 0
+            ) + embedding_cache_hits
+            attempt.embedding_cache_misses = (
+                attempt.embedding_cache_misses or 0
+            ) + embedding_cache_misses
 
             db_session.commit()
 
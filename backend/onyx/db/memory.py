@@ -5,6 +5,8 @@ from pydantic import ConfigDict
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from onyx.db.hot_config_cache import get_hot_config
+from onyx.db.hot_config_cache import HotConfigNamespace
 from onyx.db.models import Memory
 from onyx.db.models import User
 
@@ -67,10 +69,13 @@ def get_memories(user: User, db_session: Session) -> UserMemoryContext:
     if user.user_preferences:
         user_preferences = user.user_preferences
 
-    memory_rows = db_session.scalars(
-        select(Memory).where(Memory.user_id == user.id).order_by(Memory.id.asc())
-    ).all()
-    memories = tuple(memory.memory_text for memory in memory_rows if memory.memory_text)
+    def _load_memories() -> tuple[str, ...]:
+        memory_rows = db_session.scalars(
+            select(Memory).where(Memory.user_id == user.id).order_by(Memory.id.asc())
+        ).all()
+        return tuple(memory.memory_text for memory in memory_rows if memory.memory_text)
+
+    memories = get_hot_config(HotConfigNamespace.MEMORIES, str(user.id), _load_memories)
 
     return UserMemoryContext(
         user_id=user.id,
@@ -862,6 +862,12 @@ class Document(Base):
     # Number of chunks in the document (in Vespa)
     # Only null for documents indexed prior to this change
     chunk_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Content hash of each chunk, in the order the chunker produced them. Used to
+    # skip rewriting unchanged chunks on reindex. Null if unknown or if the last
+    # write of the document may not have fully succeeded.
+    chunk_content_hashes: Mapped[list[str] | None] = mapped_column(
+        postgresql.ARRAY(String), nullable=True
+    )
 
     # last time any vespa relevant row metadata or the doc changed.
     # does not include last_synced
@@ -2148,6 +2154,9 @@ class IndexAttempt(Base):
     # TODO: unused, remove this column
     total_failures_batch_level: Mapped[int] = mapped_column(Integer, default=0)
     total_chunks: Mapped[int] = mapped_column(Integer, default=0)
+    # Passage embeddings served from / missing in the embedding cache
+    embedding_cache_hits: Mapped[int | None] = mapped_column(Integer, default=0)
+    embedding_cache_misses: Mapped[int | None] = mapped_column(Integer, default=0)
 
     # Progress tracking for stall detection
     last_progress_time: Mapped[datetime.datetime | None] = mapped_column(
@@ -4,6 +4,8 @@ from typing import Type
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from pydantic import BaseModel
+from pydantic import ConfigDict
 from sqlalchemy import func
 from sqlalchemy import or_
 from sqlalchemy import select
@@ -12,6 +14,8 @@ from sqlalchemy.orm import Session
 from onyx.db.constants import UNSET
 from onyx.db.constants import UnsetType
 from onyx.db.enums import MCPServerStatus
+from onyx.db.hot_config_cache import get_hot_config
+from onyx.db.hot_config_cache import HotConfigNamespace
 from onyx.db.models import MCPServer
 from onyx.db.models import Tool
 from onyx.db.models import ToolCall
@@ -62,6 +66,29 @@ def get_tools(
     return list(db_session.scalars(query).all())
 
 
+class ToolSnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    in_code_tool_id: str | None
+
+
+def get_tool_snapshots(db_session: Session) -> tuple[ToolSnapshot, ...]:
+    """Returns the identifying fields of all tools, cached per tenant until a tool
+    changes. Used on every chat turn to map the tool calls of the history."""
+    return get_hot_config(
+        HotConfigNamespace.TOOLS,
+        "all",
+        lambda: tuple(
+            ToolSnapshot(
+                id=tool.id, name=tool.name, in_code_tool_id=tool.in_code_tool_id
+            )
+            for tool in get_tools(db_session)
+        ),
+    )
+
+
 def get_tools_by_mcp_server_id(
     mcp_server_id: int,
     db_session: Session,
@@ -354,6 +354,9 @@ def delete_user_from_db(
     ).delete()
     db_session.delete(user_to_delete)
     db_session.commit()
+    fetch_ee_implementation_or_noop(
+        "onyx.access.acl_cache", "invalidate_user_acl_cache"
+    )()
 
     # NOTE: edge case may exist with race conditions
     # with this `invited user` scheme generally.
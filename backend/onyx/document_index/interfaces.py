@@ -123,6 +123,18 @@ class VespaDocumentUserFields:
     user_projects: list[int] | None = None
 
 
+@dataclass
+class VespaDocumentUpdate:
+    """
+    A set of field updates for a single document. Used to batch metadata updates
+    for many documents into a single call to the document index.
+    """
+
+    doc_id: str
+    chunk_count: int | None
+    fields: VespaDocumentFields
+
+
 @dataclass
 class UpdateRequest:
     """
@@ -202,6 +214,11 @@ class Indexable(abc.ABC):
     Class must implement the ability to index document chunks
     """
 
+    # Whether index() may be passed only the changed chunks of a reindexed
+    # document. If so, chunks must be overwritten by chunk ID and only the chunks
+    # at or past the document's new chunk count may be deleted.
+    supports_partial_document_writes: bool = False
+
     @abc.abstractmethod
     def index(
         self,
@@ -216,6 +233,9 @@ class Indexable(abc.ABC):
         last run. Therefore, upserting the first 0 through n chunks may leave some old chunks that
         have not been written over.
 
+        NOTE: If supports_partial_document_writes is set, the chunks of a reindexed document that
+        did not change may be left out, in which case the untouched chunks must be kept.
+
         NOTE: The chunks of a document are never separated into separate index() calls. So there is
         no worry of receiving the first 0 through n chunks in one index call and the next n through
         m chunks of a docu in the next index call.
@@ -296,6 +316,28 @@ class Updatable(abc.ABC):
         """
         raise NotImplementedError
 
+    def update_multiple(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> None:
+        """
+        Updates all chunks for each of the given documents. Semantically equivalent to
+        calling update_single once per document, but implementations may override this
+        to push all of the updates to the document index in bulk.
+
+        The default implementation simply loops over update_single.
+        """
+        for update in updates:
+            self.update_single(
+                update.doc_id,
+                tenant_id=tenant_id,
+                chunk_count=update.chunk_count,
+                fields=update.fields,
+                user_fields=None,
+            )
+
 
 class IdRetrievalCapable(abc.ABC):
     """
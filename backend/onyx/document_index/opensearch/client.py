@@ -1,9 +1,11 @@
 import logging
 import time
 from typing import Any
+from typing import cast
 from typing import Generic
 from typing import TypeVar
 
+from opensearchpy import NotFoundError
 from opensearchpy import OpenSearch
 from opensearchpy import TransportError
 from opensearchpy.helpers import bulk
@@ -15,8 +17,11 @@ from onyx.configs.app_configs import OPENSEARCH_ADMIN_USERNAME
 from onyx.configs.app_configs import OPENSEARCH_HOST
 from onyx.configs.app_configs import OPENSEARCH_REST_API_PORT
 from onyx.document_index.interfaces_new import TenantState
+from onyx.document_index.opensearch.constants import BULK_REQUEST_MAX_ACTIONS
+from onyx.document_index.opensearch.constants import BULK_REQUEST_MAX_BYTES
 from onyx.document_index.opensearch.schema import DocumentChunk
 from onyx.document_index.opensearch.schema import get_opensearch_doc_chunk_id
+from onyx.document_index.opensearch.search import CHUNK_COUNTS_AGGREGATION_NAME
 from onyx.document_index.opensearch.search import DEFAULT_OPENSEARCH_MAX_RESULT_WINDOW
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
@@ -573,6 +578,113 @@ class OpenSearchClient:
                     "This is unexpected."
                 )
 
+    @log_function_time(
+        print_only=True,
+        debug_only=True,
+        include_args_subset={"updates": len},
+    )
+    def bulk_update_documents(self, updates: list[tuple[str, dict[str, Any]]]) -> None:
+        """Partially updates many document chunks with _bulk requests.
+
+        The updates are split into as few requests as possible while keeping
+        each request under BULK_REQUEST_MAX_BYTES.
+
+        Retries on 429 too many requests.
+
+        Args:
+            updates: Pairs of the OpenSearch ID of a document chunk and the
+                properties of it to update. Each property should exist in the
+                schema.
+
+        Raises:
+            NotFoundError: Some of the document chunks do not exist. All other
+                document chunks were updated.
+            Exception: There was an error updating some or all of the document
+                chunks.
+        """
+        if not updates:
+            return
+        logger.debug(
+            f"Bulk updating {len(updates)} document chunks for index {self._index_name}."
+        )
+        data = [
+            {
+                "_index": self._index_name,
+                "_id": document_chunk_id,
+                "_op_type": "update",
+                "doc": properties_to_update,
+            }
+            for document_chunk_id, properties_to_update in updates
+        ]
+        # max_retries is the number of times to retry a request if we get a 429.
+        # Per item errors are returned rather than raised so that missing
+        # document chunks can be told apart from other failures.
+        success, errors = bulk(
+            self._client,
+            data,
+            chunk_size=BULK_REQUEST_MAX_ACTIONS,
+            max_chunk_bytes=BULK_REQUEST_MAX_BYTES,
+            max_retries=3,
+            raise_on_error=False,
+        )
+        error_items = [
+            error_item
+            for error in cast(list[dict[str, Any]], errors)
+            for error_item in error.values()
+        ]
+        not_found_ids = [
+            error_item.get("_id")
+            for error_item in error_items
+            if error_item.get("status") == 404
+        ]
+        other_errors = [
+            error_item for error_item in error_items if error_item.get("status") != 404
+        ]
+        if other_errors:
+            raise RuntimeError(
+                f"Failed to bulk update document chunks for index {self._index_name}. Errors: {other_errors}"
+            )
+        if not_found_ids:
+            raise NotFoundError(
+                404,
+                "document_missing_exception",
+                {"not_found_document_chunk_ids": not_found_ids},
+            )
+        if success != len(updates):
+            raise RuntimeError(
+                f"OpenSearch reported no errors during bulk update but the number of successful operations "
+                f"({success}) does not match the number of updates ({len(updates)})."
+            )
+        logger.debug(f"Successfully bulk updated {len(updates)} document chunks.")
+
+    @log_function_time(print_only=True, debug_only=True)
+    def get_chunk_counts_by_document_id(self, body: dict[str, Any]) -> dict[str, int]:
+        """Counts the document chunks per Onyx document ID.
+
+        Args:
+            body: A search request body with a terms aggregation named
+                CHUNK_COUNTS_AGGREGATION_NAME on the document ID field. See
+                DocumentQuery.get_chunk_counts_by_document_id_query.
+
+        Raises:
+            Exception: There was an error searching the index.
+
+        Returns:
+            Map of document ID to the number of chunks it has in the index.
+            Documents without any chunks are not in the map.
+        """
+        result: dict[str, Any] = self._client.search(index=self._index_name, body=body)
+        if result.get("timed_out", False):
+            raise RuntimeError(
+                f"Counting document chunks timed out for index {self._index_name}."
+            )
+        buckets: list[dict[str, Any]] = (
+            result.get("aggregations", {})
+            .get(CHUNK_COUNTS_AGGREGATION_NAME, {})
+            .get("buckets", [])
+        )
+        return {bucket["key"]: bucket["doc_count"] for bucket in buckets}
+
     @log_function_time(print_only=True, debug_only=True, include_args=True)
     def get_document(self, document_chunk_id: str) -> DocumentChunk:
         """Gets an OpenSearch document chunk.
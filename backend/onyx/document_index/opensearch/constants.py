@@ -2,6 +2,12 @@
 # specified when creating an index.
 DEFAULT_MAX_CHUNK_SIZE = 512
 
+# Limits for a single _bulk request made by the client helpers. Partial updates
+# are small, so the action limit is what usually applies to them; the byte limit
+# keeps requests well under OpenSearch's default http.max_content_length of 100MB.
+BULK_REQUEST_MAX_ACTIONS = 2000
+BULK_REQUEST_MAX_BYTES = 10 * 1024 * 1024
+
 # Size of the dynamic list used to consider elements during kNN graph creation.
 # Higher values improve search quality but increase indexing time. Values
 # typically range between 100 - 512.
@@ -32,6 +32,7 @@ from onyx.document_index.interfaces import (
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.document_index.interfaces import VespaDocumentUserFields
 from onyx.document_index.interfaces_new import DocumentIndex
 from onyx.document_index.interfaces_new import DocumentInsertionRecord
@@ -65,7 +66,6 @@ from onyx.document_index.opensearch.search import (
     ZSCORE_NORMALIZATION_PIPELINE_NAME,
 )
 from onyx.indexing.models import DocMetadataAwareIndexChunk
-from onyx.indexing.models import Document
 from onyx.utils.logger import setup_logger
 from onyx.utils.text_processing import remove_invalid_unicode_chars
 from shared_configs.configs import MULTI_TENANT
@@ -380,6 +380,46 @@ class OpenSearchOldDocumentIndex(OldDocumentIndex):
             )
             return
 
+    def update_multiple(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> None:
+        # Documents with an unknown chunk count can't be updated in OpenSearch
+        # yet; skip them up front so they don't fail the whole batch.
+        known_updates: list[VespaDocumentUpdate] = []
+        update_requests: list[MetadataUpdateRequest] = []
+        for update in updates:
+            if update.chunk_count is None or update.chunk_count <= 0:
+                logger.warning(
+                    f"Tried to update document {update.doc_id} but its chunk count is not known. "
+                    "Skipping update for now..."
+                )
+                continue
+            known_updates.append(update)
+            update_requests.append(
+                MetadataUpdateRequest(
+                    document_ids=[update.doc_id],
+                    doc_id_to_chunk_cnt={update.doc_id: update.chunk_count},
+                    access=update.fields.access,
+                    document_sets=update.fields.document_sets,
+                    boost=update.fields.boost,
+                    hidden=update.fields.hidden,
+                )
+            )
+
+        try:
+            self._real_index.update(update_requests)
+        except NotFoundError:
+            # At least one document has not been fully indexed yet. Fall back to
+            # updating one document at a time so the others still go through.
+            logger.warning(
+                "Batched update hit a missing chunk in OpenSearch. "
+                "Falling back to per-document updates."
+            )
+            super().update_multiple(known_updates, tenant_id=tenant_id)
+
     def id_based_retrieval(
         self,
         chunk_requests: list[VespaChunkRequest],
@@ -546,12 +586,12 @@ class OpenSearchDocumentIndex(DocumentIndex):
     def index(
         self,
         chunks: list[DocMetadataAwareIndexChunk],
-        indexing_metadata: IndexingMetadata,  # noqa: ARG002
+        indexing_metadata: IndexingMetadata,
     ) -> list[DocumentInsertionRecord]:
         """Indexes a list of document chunks into the document index.
 
-        Groups chunks by document ID and for each document, deletes existing
-        chunks and indexes the new chunks in bulk.
+        Deletes the existing chunks of every document in the batch with a single
+        delete by query, then indexes all of the new chunks in bulk.
 
         NOTE: It is assumed that chunks for a given document are not spread out
         over multiple index() calls.
@@ -581,45 +621,62 @@ class OpenSearchDocumentIndex(DocumentIndex):
             f"[OpenSearchDocumentIndex] Indexing {len(chunks)} chunks from {len(doc_id_to_chunks)} "
             f"documents for index {self._index_name}."
         )
+        if not doc_id_to_chunks:
+            return []
+
+        # Create a batch of OpenSearch-formatted chunks for bulk insertion. Do
+        # this before deleting existing chunks to reduce the amount of time the
+        # document index has no content for a given document, and to reduce the
+        # chance of entering a state where we delete chunks, then some error
+        # happens, and never successfully index new chunks.
+        chunk_batch: list[DocumentChunk] = [
+            _convert_onyx_chunk_to_opensearch_document(chunk) for chunk in chunks
+        ]
 
-        document_indexing_results: list[DocumentInsertionRecord] = []
-        # Try to index per-document.
-        for _, chunks in doc_id_to_chunks.items():
-            # Create a batch of OpenSearch-formatted chunks for bulk insertion.
-            # Do this before deleting existing chunks to reduce the amount of
-            # time the document index has no content for a given document, and
-            # to reduce the chance of entering a state where we delete chunks,
-            # then some error happens, and never successfully index new chunks.
-            chunk_batch: list[DocumentChunk] = [
-                _convert_onyx_chunk_to_opensearch_document(chunk) for chunk in chunks
-            ]
-            onyx_document: Document = chunks[0].source_document
-            # First delete the doc's chunks from the index. This is so that
-            # there are no dangling chunks in the index, in the event that the
-            # new document's content contains fewer chunks than the previous
-            # content.
-            # TODO(andrei): This can possibly be made more efficient by checking
-            # if the chunk count has actually decreased. This assumes that
-            # overlapping chunks are perfectly overwritten. If we can't
-            # guarantee that then we need the code as-is.
-            num_chunks_deleted = self.delete(
-                onyx_document.id, onyx_document.chunk_count
-            )
-            # If we see that chunks were deleted we assume the doc already
-            # existed.
-            document_insertion_record = DocumentInsertionRecord(
-                document_id=onyx_document.id,
-                already_existed=num_chunks_deleted > 0,
-            )
-            # Now index. This will raise if a chunk of the same ID exists, which
-            # we do not expect because we should have deleted all chunks.
-            self._os_client.bulk_index_documents(
-                documents=chunk_batch,
-                tenant_state=self._tenant_state,
+        # A previous chunk count of 0 means either a new document or one whose
+        # chunk count was never recorded, so only ask OpenSearch about those.
+        existing_doc_ids: set[str] = set()
+        unknown_doc_ids: list[str] = []
+        for doc_id in doc_id_to_chunks:
+            chunk_counts = indexing_metadata.doc_id_to_chunk_cnt_diff.get(doc_id)
+            if chunk_counts is not None and chunk_counts.old_chunk_cnt > 0:
+                existing_doc_ids.add(doc_id)
+            else:
+                unknown_doc_ids.append(doc_id)
+        if unknown_doc_ids:
+            doc_id_to_indexed_chunk_cnt = (
+                self._os_client.get_chunk_counts_by_document_id(
+                    DocumentQuery.get_chunk_counts_by_document_id_query(
+                        document_ids=unknown_doc_ids,
+                        tenant_state=self._tenant_state,
+                    )
+                )
             )
-            document_indexing_results.append(document_insertion_record)
+            existing_doc_ids.update(doc_id_to_indexed_chunk_cnt.keys())
+
+        # First delete the docs' chunks from the index. This is so that there
+        # are no dangling chunks in the index, in the event that the new
+        # document's content contains fewer chunks than the previous content.
+        # This is done for all documents at once by document ID rather than by
+        # computed chunk IDs since large chunks are stored under a different
+        # chunk size and would otherwise be missed.
+        if existing_doc_ids:
+            self.delete_multiple(list(existing_doc_ids))
+
+        # Now index. This will raise if a chunk of the same ID exists, which we
+        # do not expect because we should have deleted all chunks.
+        self._os_client.bulk_index_documents(
+            documents=chunk_batch,
+            tenant_state=self._tenant_state,
+        )
 
-        return document_indexing_results
+        return [
+            DocumentInsertionRecord(
+                document_id=doc_id,
+                already_existed=doc_id in existing_doc_ids,
+            )
+            for doc_id in doc_id_to_chunks
+        ]
 
     def delete(
         self, document_id: str, chunk_count: int | None = None  # noqa: ARG002
@@ -655,6 +712,34 @@ class OpenSearchDocumentIndex(DocumentIndex):
 
         return self._os_client.delete_by_query(query_body)
 
+    def delete_multiple(self, document_ids: list[str]) -> int:
+        """Deletes all chunks for the given documents with a single request.
+
+        Does nothing for document IDs which do not exist.
+
+        Args:
+            document_ids: The unique identifiers for the documents as
+                represented in Onyx, not necessarily in the document index.
+
+        Raises:
+            Exception: Failed to delete some or all of the chunks for the
+                documents.
+
+        Returns:
+            The number of chunks successfully deleted across all documents.
+        """
+        logger.debug(
+            f"[OpenSearchDocumentIndex] Deleting {len(document_ids)} documents from index {self._index_name}."
+        )
+        if not document_ids:
+            return 0
+        query_body = DocumentQuery.delete_from_document_ids_query(
+            document_ids=document_ids,
+            tenant_state=self._tenant_state,
+        )
+
+        return self._os_client.delete_by_query(query_body)
+
     def update(
         self,
         update_requests: list[MetadataUpdateRequest],
@@ -669,8 +754,8 @@ class OpenSearchDocumentIndex(DocumentIndex):
         This may be caused by the same situation outlined above.
         NOTE: Will no-op if an update request has no fields to update.
 
-        TODO(andrei): Consider exploring a batch API for OpenSearch for this
-        operation.
+        The partial updates for every chunk of every document across all update
+        requests are sent together through the _bulk API.
 
         Args:
             update_requests: A list of update requests, each containing a list
@@ -684,6 +769,7 @@ class OpenSearchDocumentIndex(DocumentIndex):
         logger.debug(
             f"[OpenSearchDocumentIndex] Updating {len(update_requests)} chunks for index {self._index_name}."
         )
+        chunk_updates: list[tuple[str, dict[str, Any]]] = []
         for update_request in update_requests:
             properties_to_update: dict[str, Any] = dict()
             # TODO(andrei): Nit but consider if we can use DocumentChunk
@@ -749,10 +835,9 @@ class OpenSearchDocumentIndex(DocumentIndex):
                         document_id=doc_id,
                         chunk_index=chunk_index,
                     )
-                    self._os_client.update_document(
-                        document_chunk_id=document_chunk_id,
-                        properties_to_update=properties_to_update,
-                    )
+                    chunk_updates.append((document_chunk_id, properties_to_update))
+
+        self._os_client.bulk_update_documents(chunk_updates)
 
     def id_based_retrieval(
         self,
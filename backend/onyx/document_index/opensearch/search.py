@@ -86,6 +86,9 @@ DEFAULT_OPENSEARCH_MAX_RESULT_WINDOW = 10_000
 # cutoff filtering during retrieval.
 ASSUMED_DOCUMENT_AGE_DAYS = 90
 
+# Name of the terms aggregation which counts chunks per document ID.
+CHUNK_COUNTS_AGGREGATION_NAME = "chunk_counts"
+
 
 class DocumentQuery:
     """
@@ -217,6 +220,101 @@ class DocumentQuery:
 
         return final_delete_query
 
+    @staticmethod
+    def delete_from_document_ids_query(
+        document_ids: list[str],
+        tenant_state: TenantState,
+    ) -> dict[str, Any]:
+        """
+        Returns a final search query which deletes chunks from any of the given
+        document IDs.
+
+        Like delete_from_document_id_query, but lets a single delete_by_query
+        call clean up many documents at once.
+
+        Args:
+            document_ids: Onyx document IDs. Notably not OpenSearch document
+                IDs, which point to what Onyx would refer to as chunks.
+            tenant_state: Tenant state containing the tenant ID.
+
+        Returns:
+            A dictionary representing the final delete query.
+        """
+        filter_clauses = DocumentQuery._get_search_filters(
+            tenant_state=tenant_state,
+            # Delete hidden docs too.
+            include_hidden=True,
+            access_control_list=None,
+            source_types=[],
+            tags=[],
+            document_sets=[],
+            user_file_ids=[],
+            project_id=None,
+            time_cutoff=None,
+            min_chunk_index=None,
+            max_chunk_index=None,
+            max_chunk_size=None,
+        )
+        filter_clauses.append({"terms": {DOCUMENT_ID_FIELD_NAME: document_ids}})
+        final_delete_query: dict[str, Any] = {
+            "query": {"bool": {"filter": filter_clauses}},
+            "timeout": f"{DEFAULT_OPENSEARCH_QUERY_TIMEOUT_S}s",
+        }
+        if not OPENSEARCH_PROFILING_DISABLED:
+            final_delete_query["profile"] = True
+
+        return final_delete_query
+
+    @staticmethod
+    def get_chunk_counts_by_document_id_query(
+        document_ids: list[str],
+        tenant_state: TenantState,
+    ) -> dict[str, Any]:
+        """
+        Returns a final search query which counts the chunks of each of the
+        given document IDs, including hidden chunks.
+
+        Intended to be supplied to the OpenSearch client's
+        get_chunk_counts_by_document_id method.
+
+        Args:
+            document_ids: Onyx document IDs. Notably not OpenSearch document
+                IDs, which point to what Onyx would refer to as chunks.
+            tenant_state: Tenant state containing the tenant ID.
+
+        Returns:
+            A dictionary representing the final aggregation query.
+        """
+        filter_clauses = DocumentQuery._get_search_filters(
+            tenant_state=tenant_state,
+            include_hidden=True,
+            access_control_list=None,
+            source_types=[],
+            tags=[],
+            document_sets=[],
+            user_file_ids=[],
+            project_id=None,
+            time_cutoff=None,
+            min_chunk_index=None,
+            max_chunk_index=None,
+            max_chunk_size=None,
+        )
+        filter_clauses.append({"terms": {DOCUMENT_ID_FIELD_NAME: document_ids}})
+        return {
+            "query": {"bool": {"filter": filter_clauses}},
+            # Only the aggregation is needed, not the hits.
+            "size": 0,
+            "aggs": {
+                CHUNK_COUNTS_AGGREGATION_NAME: {
+                    "terms": {
+                        "field": DOCUMENT_ID_FIELD_NAME,
+                        "size": len(document_ids),
+                    }
+                }
+            },
+            "timeout": f"{DEFAULT_OPENSEARCH_QUERY_TIMEOUT_S}s",
+        }
+
     @staticmethod
     def get_hybrid_search_query(
         query_text: str,
@@ -20,6 +20,7 @@ from pydantic import BaseModel
 from retry import retry
 
 from onyx.configs.app_configs import BLURB_SIZE
+from onyx.configs.app_configs import VESPA_USE_BULK_FEED
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
 from onyx.configs.chat_configs import VESPA_SEARCHER_THREADS
@@ -41,6 +42,7 @@ from onyx.document_index.interfaces import IndexBatchParams
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
 from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.interfaces import VespaDocumentUpdate
 from onyx.document_index.interfaces import VespaDocumentUserFields
 from onyx.document_index.interfaces_new import DocumentSectionRequest
 from onyx.document_index.interfaces_new import IndexingMetadata
@@ -223,6 +225,10 @@ class VespaIndex(DocumentIndex):
 
     VESPA_SCHEMA_JINJA_FILENAME = "danswer_chunk.sd.jinja"
 
+    # Chunks are fed by chunk ID and only the tail past the new chunk count is
+    # deleted, so unchanged chunks can be left out on reindex
+    supports_partial_document_writes = True
+
     def __init__(
         self,
         index_name: str,
@@ -231,6 +237,7 @@ class VespaIndex(DocumentIndex):
         secondary_large_chunks_enabled: bool | None,
         multitenant: bool = False,
         httpx_client: httpx.Client | None = None,
+        use_bulk_feed: bool = VESPA_USE_BULK_FEED,
     ) -> None:
         self.index_name = index_name
         self.secondary_index_name = secondary_index_name
@@ -239,6 +246,7 @@ class VespaIndex(DocumentIndex):
         self.secondary_large_chunks_enabled = secondary_large_chunks_enabled
 
         self.multitenant = multitenant
+        self.use_bulk_feed = use_bulk_feed
 
         # Temporary until we refactor the entirety of this class.
         self.httpx_client = httpx_client
@@ -499,6 +507,7 @@ class VespaIndex(DocumentIndex):
             tenant_state=tenant_state,
             large_chunks_enabled=self.large_chunks_enabled,
             httpx_client=self.httpx_client,
+            use_bulk_feed=self.use_bulk_feed,
         )
         # This conversion from list to set only to be converted again to a list
         # upstream is suboptimal and only temporary until we refactor the
@@ -703,6 +712,53 @@ class VespaIndex(DocumentIndex):
 
         vespa_document_index.update([update_request])
 
+    def update_multiple(
+        self,
+        updates: list[VespaDocumentUpdate],
+        *,
+        tenant_id: str,
+    ) -> None:
+        if not updates:
+            return
+
+        tenant_state = TenantState(
+            tenant_id=get_current_tenant_id(),
+            multitenant=MULTI_TENANT,
+        )
+        if tenant_state.multitenant != self.multitenant:
+            raise ValueError(
+                f"Bug: Multitenant mismatch. Expected {tenant_state.multitenant}, got {self.multitenant}."
+            )
+        if tenant_state.multitenant and tenant_state.tenant_id != tenant_id:
+            raise ValueError(
+                f"Bug: Tenant ID mismatch. Expected {tenant_state.tenant_id}, got {tenant_id}."
+            )
+
+        vespa_document_index = VespaDocumentIndex(
+            index_name=self.index_name,
+            tenant_state=tenant_state,
+            large_chunks_enabled=self.large_chunks_enabled,
+            httpx_client=self.httpx_client,
+        )
+
+        update_requests = [
+            MetadataUpdateRequest(
+                document_ids=[update.doc_id],
+                doc_id_to_chunk_cnt={
+                    update.doc_id: (
+                        update.chunk_count if update.chunk_count is not None else -1
+                    )
+                },  # NOTE: -1 represents an unknown chunk count.
+                access=update.fields.access,
+                document_sets=update.fields.document_sets,
+                boost=update.fields.boost,
+                hidden=update.fields.hidden,
+            )
+            for update in updates
+        ]
+
+        vespa_document_index.update(update_requests)
+
     def delete_single(
         self,
         doc_id: str,
@@ -727,6 +783,7 @@ class VespaIndex(DocumentIndex):
             tenant_state=tenant_state,
             large_chunks_enabled=self.large_chunks_enabled,
             httpx_client=self.httpx_client,
+            use_bulk_feed=self.use_bulk_feed,
         )
         return vespa_document_index.delete(document_id=doc_id, chunk_count=chunk_count)
 
@@ -1,3 +1,4 @@
+import asyncio
 import concurrent.futures
 import json
 import random
@@ -13,6 +14,7 @@ from http import HTTPStatus
 import httpx
 from retry import retry
 
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
@@ -22,6 +24,7 @@ from onyx.document_index.chunk_content_enrichment import (
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_async_http_client
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
@@ -57,6 +60,7 @@ from onyx.document_index.vespa_constants import TENANT_ID
 from onyx.document_index.vespa_constants import TITLE
 from onyx.document_index.vespa_constants import TITLE_EMBEDDING
 from onyx.document_index.vespa_constants import USER_PROJECT
+from onyx.httpx.httpx_pool import AsyncHttpxPool
 from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.utils.logger import setup_logger
 from onyx.utils.text_processing import remove_invalid_unicode_chars
@@ -69,6 +73,12 @@ INDEXING_MAX_RETRIES = 5
 INDEXING_BASE_DELAY = 1.0
 INDEXING_MAX_DELAY = 60.0
 
+# Statuses with which Vespa signals that it is overloaded and the feed should slow down
+FEED_BACKPRESSURE_STATUSES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+)
+
 
 @retry(tries=3, delay=1, backoff=2)
 def _does_doc_chunk_exist(
@@ -136,15 +146,11 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-def _index_vespa_chunk(
+def _build_vespa_chunk_fields(
     chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
     multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+) -> tuple[str, dict]:
+    """Returns the Vespa document ID of the chunk and the fields to write for it."""
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
@@ -225,6 +231,23 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
+
+    return vespa_chunk_id, vespa_document_fields
+
+
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+) -> None:
+    json_header = {
+        "Content-Type": "application/json",
+    }
+    document = chunk.source_document
+    vespa_chunk_id, vespa_document_fields = _build_vespa_chunk_fields(
+        chunk, multitenant
+    )
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
 
@@ -348,6 +371,155 @@ def batch_index_vespa_chunks(
             executor.shutdown(wait=True)
 
 
+class _FeedWindow:
+    """Bounds the number of in-flight feed requests. The bound is halved whenever
+    Vespa pushes back and grows by one with every successful request, up to
+    max_in_flight."""
+
+    def __init__(self, max_in_flight: int) -> None:
+        self._max_in_flight = max(1, max_in_flight)
+        self.limit = self._max_in_flight
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, backpressure: bool) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if backpressure:
+                self.limit = max(1, self.limit // 2)
+            elif self.limit < self._max_in_flight:
+                self.limit += 1
+            self._condition.notify_all()
+
+
+async def _feed_vespa_chunk(
+    http_client: httpx.AsyncClient,
+    window: _FeedWindow,
+    vespa_url: str,
+    vespa_document_fields: dict,
+    document_id: str,
+) -> None:
+    last_error: Exception | None = None
+    for attempt in range(INDEXING_MAX_RETRIES):
+        await window.acquire()
+        backpressure = False
+        try:
+            res = await http_client.post(
+                vespa_url, json={"fields": vespa_document_fields}
+            )
+            backpressure = res.status_code in FEED_BACKPRESSURE_STATUSES
+            res.raise_for_status()
+            return
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+                logger.error(
+                    f"Failed to index document: '{document_id}'. Got response: '{e.response.text}'"
+                )
+                logger.error(
+                    "NOTE: HTTP Status 507 Insufficient Storage usually means "
+                    "you need to allocate more memory or disk space to the "
+                    "Vespa/index container."
+                )
+                raise
+            if not backpressure and e.response.status_code < 500:
+                logger.error(
+                    f"Non-retryable HTTP {e.response.status_code} error for document '{document_id}'"
+                )
+                raise
+            last_error = e
+        except httpx.TransportError as e:
+            last_error = e
+        finally:
+            await window.release(backpressure)
+
+        if attempt < INDEXING_MAX_RETRIES - 1:
+            delay = min(
+                INDEXING_BASE_DELAY * (2**attempt), INDEXING_MAX_DELAY
+            ) * random.uniform(0.5, 1.0)
+            logger.warning(
+                f"Error while feeding document '{document_id}' "
+                f"(attempt {attempt + 1}/{INDEXING_MAX_RETRIES}): {str(last_error)}. "
+                f"Feed window is now {window.limit}. "
+                f"Retrying in {delay:.2f} seconds."
+            )
+            await asyncio.sleep(delay)
+
+    raise RuntimeError(
+        f"Failed to index document '{document_id}' after {INDEXING_MAX_RETRIES} attempts"
+    ) from last_error
+
+
+async def _feed_vespa_chunks(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+    max_in_flight: int,
+) -> None:
+    window = _FeedWindow(max_in_flight)
+    # Shared with every other feed of this process, so connections are kept
+    http_client = get_vespa_async_http_client()
+    feed_tasks: list[asyncio.Task[None]] = []
+    for chunk in chunks:
+        vespa_chunk_id, vespa_document_fields = _build_vespa_chunk_fields(
+            chunk, multitenant
+        )
+        feed_tasks.append(
+            asyncio.create_task(
+                _feed_vespa_chunk(
+                    http_client=http_client,
+                    window=window,
+                    vespa_url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}",
+                    vespa_document_fields=vespa_document_fields,
+                    document_id=chunk.source_document.id,
+                )
+            )
+        )
+
+    try:
+        await asyncio.gather(*feed_tasks)
+    finally:
+        # On failure, stop feeding the remaining chunks
+        for feed_task in feed_tasks:
+            feed_task.cancel()
+        await asyncio.gather(*feed_tasks, return_exceptions=True)
+
+
+def feed_vespa_chunks(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    multitenant: bool,
+    max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+) -> None:
+    """Streams chunks into a Vespa index over a single HTTP/2 connection.
+
+    Unlike batch_index_vespa_chunks, this does not need a thread per request.
+    Requests are pipelined on the long-lived AsyncHttpxPool event loop, bounded
+    by an in-flight window that adapts to 429/503 responses from Vespa.
+
+    Args:
+        chunks: List of chunks to index.
+        index_name: Name of the index to index into.
+        multitenant: Whether the index is multitenant.
+        max_in_flight: Upper bound on concurrent requests.
+    """
+    if not chunks:
+        return
+
+    AsyncHttpxPool.run(
+        _feed_vespa_chunks(
+            chunks=chunks,
+            index_name=index_name,
+            multitenant=multitenant,
+            max_in_flight=max_in_flight,
+        )
+    )
+
+
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
 ) -> DocMetadataAwareIndexChunk:
@@ -381,6 +553,53 @@ def check_for_final_chunk_existence(
         index += 1
 
 
+@retry(tries=3, delay=1, backoff=2)
+def get_final_chunk_index_via_visit(
+    document_id: str,
+    start_index: int,
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None = None,
+) -> int:
+    """Same result as check_for_final_chunk_existence, but fetches the chunk IDs of
+    the document with a single visit instead of one request per chunk. tenant_id
+    restricts the visit to the chunks of the tenant and must be set for
+    multitenant indices."""
+    selection = (
+        f"{index_name}.document_id=='{document_id}'"
+        f" and {index_name}.chunk_id>={start_index}"
+        f" and {index_name}.large_chunk_reference_ids == null"
+    )
+    if tenant_id:
+        selection += f" and {index_name}.tenant_id=='{tenant_id}'"
+    params: dict[str, str | int] = {
+        "selection": selection,
+        "fieldSet": f"{index_name}:{CHUNK_ID}",
+        "wantedDocumentCount": 1_000,
+    }
+
+    existing_chunk_ids: set[int] = set()
+    while True:
+        response = http_client.get(
+            DOCUMENT_ID_ENDPOINT.format(index_name=index_name), params=params
+        )
+        response.raise_for_status()
+        response_data = response.json()
+
+        for document in response_data.get("documents", []):
+            existing_chunk_ids.add(document["fields"][CHUNK_ID])
+
+        if response_data.get("continuation"):
+            params["continuation"] = response_data["continuation"]
+        else:
+            break
+
+    index = start_index
+    while index in existing_chunk_ids:
+        index += 1
+    return index
+
+
 class BaseHTTPXClientContext(ABC):
     """Abstract base class for an HTTPX client context manager."""
 
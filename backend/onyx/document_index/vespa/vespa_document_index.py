@@ -10,6 +10,7 @@ from retry import retry
 
 from onyx.configs.app_configs import RECENCY_BIAS_MULTIPLIER
 from onyx.configs.app_configs import RERANK_COUNT
+from onyx.configs.app_configs import VESPA_USE_BULK_FEED
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import HYBRID_ALPHA
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -41,6 +42,8 @@ from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import feed_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import get_final_chunk_index_via_visit
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
@@ -80,6 +83,8 @@ def _enrich_basic_chunk_info(
     document_id: str,
     previous_chunk_count: int | None,
     new_chunk_count: int,
+    use_visit_api: bool = False,
+    tenant_id: str | None = None,
 ) -> EnrichedDocumentIndexingInfo:
     """Determines which chunks need to be deleted during document reindexing.
 
@@ -100,6 +105,10 @@ def _enrich_basic_chunk_info(
         new_chunk_count: The total number of chunks the document has after
             reindexing. This becomes the starting index for deletion since
             chunks are 0-indexed.
+        use_visit_api: Whether to find the final chunk of legacy documents with
+            a single visit rather than one request per chunk.
+        tenant_id: The tenant to restrict the visit to. Must be set for
+            multitenant indices.
 
     Returns:
         EnrichedDocumentIndexingInfo with chunk_start_index set to
@@ -113,15 +122,24 @@ def _enrich_basic_chunk_info(
     is_old_version = False
     if last_indexed_chunk is None:
         is_old_version = True
-        minimal_doc_info = MinimalDocumentIndexingInfo(
-            doc_id=document_id, chunk_start_index=new_chunk_count
-        )
-        last_indexed_chunk = check_for_final_chunk_existence(
-            minimal_doc_info=minimal_doc_info,
-            start_index=new_chunk_count,
-            index_name=index_name,
-            http_client=http_client,
-        )
+        if use_visit_api:
+            last_indexed_chunk = get_final_chunk_index_via_visit(
+                document_id=document_id,
+                start_index=new_chunk_count,
+                index_name=index_name,
+                http_client=http_client,
+                tenant_id=tenant_id,
+            )
+        else:
+            minimal_doc_info = MinimalDocumentIndexingInfo(
+                doc_id=document_id, chunk_start_index=new_chunk_count
+            )
+            last_indexed_chunk = check_for_final_chunk_existence(
+                minimal_doc_info=minimal_doc_info,
+                start_index=new_chunk_count,
+                index_name=index_name,
+                http_client=http_client,
+            )
 
     assert (
         last_indexed_chunk is not None and last_indexed_chunk >= 0
@@ -283,6 +301,7 @@ class VespaDocumentIndex(DocumentIndex):
         tenant_state: TenantState,
         large_chunks_enabled: bool,
         httpx_client: httpx.Client | None = None,
+        use_bulk_feed: bool = VESPA_USE_BULK_FEED,
     ) -> None:
         self._index_name = index_name
         self._tenant_id = tenant_state.tenant_id
@@ -302,6 +321,8 @@ class VespaDocumentIndex(DocumentIndex):
                 get_vespa_http_client
             )
         self._multitenant = tenant_state.multitenant
+        # Write chunks through the pipelined feed instead of the thread pool.
+        self._use_bulk_feed = use_bulk_feed
 
     def verify_and_create_index_if_necessary(
         self, embedding_dim: int, embedding_precision: EmbeddingPrecision
@@ -364,6 +385,8 @@ class VespaDocumentIndex(DocumentIndex):
                     document_id=doc_id,
                     previous_chunk_count=doc_id_to_previous_chunk_cnt[doc_id],
                     new_chunk_count=doc_id_to_new_chunk_cnt[doc_id],
+                    use_visit_api=self._use_bulk_feed,
+                    tenant_id=self._tenant_id if self._multitenant else None,
                 )
                 for doc_id in doc_id_to_chunk_cnt_diff.keys()
                 # TODO(andrei), WARNING: Don't we need to sanitize these doc IDs?
@@ -402,14 +425,22 @@ class VespaDocumentIndex(DocumentIndex):
                 )
 
             # Insert new Vespa documents.
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
+            if self._use_bulk_feed:
+                # The feed bounds its own concurrency, no need to batch.
+                feed_vespa_chunks(
+                    chunks=cleaned_chunks,
                     index_name=self._index_name,
-                    http_client=http_client,
                     multitenant=self._multitenant,
-                    executor=executor,
                 )
+            else:
+                for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
+                    batch_index_vespa_chunks(
+                        chunks=chunk_batch,
+                        index_name=self._index_name,
+                        http_client=http_client,
+                        multitenant=self._multitenant,
+                        executor=executor,
+                    )
 
         all_cleaned_doc_ids: set[str] = {
             chunk.source_document.id for chunk in cleaned_chunks
@@ -438,6 +469,8 @@ class VespaDocumentIndex(DocumentIndex):
                 document_id=sanitized_doc_id,
                 previous_chunk_count=chunk_count,
                 new_chunk_count=0,
+                use_visit_api=self._use_bulk_feed,
+                tenant_id=self._tenant_id if self._multitenant else None,
             )
             chunks_to_delete = get_document_chunk_ids(
                 enriched_document_info_list=[enriched_doc_info],
@@ -469,7 +502,16 @@ class VespaDocumentIndex(DocumentIndex):
         # on connectors that are still indexing, and therefore do not yet have a
         # chunk count because update_docs_chunk_count__no_commit has not been
         # run yet.
-        with self._httpx_client_context as httpx_client:
+        #
+        # Chunk updates are independent of each other, so they are sent
+        # concurrently. This matters for batched metadata syncs which pass in
+        # hundreds of documents at once.
+        doc_id_to_num_chunks: dict[str, int] = {}
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            self._httpx_client_context as httpx_client,
+        ):
+            futures: list[concurrent.futures.Future[None]] = []
             # Each invocation of this method can contain multiple update requests.
             for update_request in update_requests:
                 # Each update request can correspond to multiple documents.
@@ -492,18 +534,25 @@ class VespaDocumentIndex(DocumentIndex):
                     )
 
                     for doc_chunk_id in doc_chunk_ids:
-                        _update_single_chunk(
-                            doc_chunk_id,
-                            self._index_name,
-                            # NOTE: Used only for logging, raw ID is ok here.
-                            doc_id,
-                            httpx_client,
-                            update_request,
+                        futures.append(
+                            executor.submit(
+                                _update_single_chunk,
+                                doc_chunk_id,
+                                self._index_name,
+                                # NOTE: Used only for logging, raw ID is ok here.
+                                doc_id,
+                                httpx_client,
+                                update_request,
+                            )
                         )
+                    doc_id_to_num_chunks[doc_id] = len(doc_chunk_ids)
 
-                    logger.info(
-                        f"Updated {len(doc_chunk_ids)} chunks for document {doc_id}."
-                    )
+            for future in concurrent.futures.as_completed(futures):
+                # Raises if the chunk update failed.
+                future.result()
+
+        for doc_id, num_chunks in doc_id_to_num_chunks.items():
+            logger.info(f"Updated {num_chunks} chunks for document {doc_id}.")
 
     def id_based_retrieval(
         self,
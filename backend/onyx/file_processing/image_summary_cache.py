@@ -0,0 +1,49 @@
+import hashlib
+from typing import cast
+
+from onyx.configs.app_configs import IMAGE_SUMMARY_CACHE_TTL_SECONDS
+from onyx.llm.interfaces import LLM
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+IMAGE_SUMMARY_CACHE_PREFIX = "image_summary_cache"
+
+
+def get_image_summary_cache_key(
+    llm: LLM, image_data: bytes, system_prompt: str, user_prompt_template: str
+) -> str:
+    """Identical images summarized by the same vision model with the same prompts
+    share a key, regardless of which file or document they came from."""
+    settings_str = (
+        f"{llm.config.model_provider}|{llm.config.model_name}"
+        f"|{system_prompt}|{user_prompt_template}"
+    )
+    settings_digest = hashlib.sha256(settings_str.encode("utf-8")).hexdigest()[:16]
+    image_digest = hashlib.sha256(image_data).hexdigest()
+    return f"{IMAGE_SUMMARY_CACHE_PREFIX}:{settings_digest}:{image_digest}"
+
+
+def get_cached_image_summary(cache_key: str) -> str | None:
+    """Returns None on a miss. Redis failures are logged and treated as misses so
+    that indexing never fails because of the cache."""
+    if IMAGE_SUMMARY_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    try:
+        cached = cast(bytes | None, get_redis_client().get(cache_key))
+    except Exception:
+        logger.exception("Failed to read from the image summary cache")
+        return None
+    return cached.decode("utf-8") if cached is not None else None
+
+
+def cache_image_summary(cache_key: str, summary: str) -> None:
+    if IMAGE_SUMMARY_CACHE_TTL_SECONDS <= 0:
+        return
+
+    try:
+        get_redis_client().set(cache_key, summary, ex=IMAGE_SUMMARY_CACHE_TTL_SECONDS)
+    except Exception:
+        logger.exception("Failed to write to the image summary cache")
@@ -0,0 +1,147 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from pydantic import BaseModel
+
+from onyx.configs.chat_configs import CHAT_FILE_TEXT_CACHE_MAX_CHARS
+from onyx.configs.constants import FileOrigin
+from onyx.file_store.file_store import get_default_file_store
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_TOKEN_COUNT_METADATA_KEY = "token_count"
+
+
+class ChatFileText(BaseModel):
+    """The text extracted from a chat file. token_count is None if it was not known
+    yet when the text was extracted, e.g. because the user file was still being
+    processed."""
+
+    content_text: str | None
+    token_count: int | None
+
+
+class _ChatFileTextLRU:
+    """Thread safe in-process LRU which is bounded by the total number of
+    characters of the cached texts rather than by the number of files."""
+
+    def __init__(self, max_chars: int) -> None:
+        self._max_chars = max_chars
+        self._total_chars = 0
+        self._entries: OrderedDict[tuple[str, str], ChatFileText] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> ChatFileText | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple[str, str], value: ChatFileText) -> None:
+        num_chars = len(value.content_text or "")
+        if num_chars > self._max_chars:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = value
+            self._total_chars += num_chars
+            while self._total_chars > self._max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_chars -= len(evicted.content_text or "")
+
+    def remove(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_chars -= len(entry.content_text or "")
+
+
+_chat_file_text_lru = _ChatFileTextLRU(max_chars=CHAT_FILE_TEXT_CACHE_MAX_CHARS)
+
+
+def chat_file_id_to_plaintext_file_name(file_id: str) -> str:
+    """Generate a consistent file name for storing the extracted text of a chat
+    file. Keyed by the file store ID, unlike the plaintext of user files which is
+    keyed by the user file ID."""
+    return f"chat_plaintext_{file_id}"
+
+
+def get_chat_file_text(file_id: str) -> ChatFileText | None:
+    """Returns the text extracted from the chat file the last time it was loaded,
+    from memory if possible and otherwise from its plaintext file in the file
+    store. Returns None if the text was never stored (or can't be read)."""
+    lru_key = (get_current_tenant_id(), file_id)
+    chat_file_text = _chat_file_text_lru.get(lru_key)
+    if chat_file_text is not None:
+        return chat_file_text
+
+    plaintext_file_name = chat_file_id_to_plaintext_file_name(file_id)
+    file_store = get_default_file_store()
+    try:
+        file_record = file_store.read_file_record(plaintext_file_name)
+    except Exception:
+        # Raised when there is no plaintext file yet
+        return None
+
+    try:
+        file_io = file_store.read_file(plaintext_file_name, mode="b")
+        content_text = file_io.read().decode("utf-8")
+    except Exception as e:
+        logger.warning(f"Failed to load plaintext for chat file {file_id}: {e}")
+        return None
+
+    token_count = None
+    if isinstance(file_record.file_metadata, dict):
+        token_count = file_record.file_metadata.get(_TOKEN_COUNT_METADATA_KEY)
+    chat_file_text = ChatFileText(content_text=content_text, token_count=token_count)
+    _chat_file_text_lru.put(lru_key, chat_file_text)
+    return chat_file_text
+
+
+def store_chat_file_text(file_id: str, chat_file_text: ChatFileText) -> None:
+    """Persists the extracted text so that later chat turns don't have to download
+    and parse the original file again. Failures are only logged since the text can
+    always be extracted again."""
+    # A failed extraction is not cached so that it is retried on the next turn
+    if chat_file_text.content_text is None:
+        return
+
+    _chat_file_text_lru.put((get_current_tenant_id(), file_id), chat_file_text)
+
+    file_metadata = (
+        {_TOKEN_COUNT_METADATA_KEY: chat_file_text.token_count}
+        if chat_file_text.token_count is not None
+        else None
+    )
+    try:
+        get_default_file_store().save_file(
+            content=BytesIO(chat_file_text.content_text.encode("utf-8")),
+            display_name=f"Plaintext for chat file {file_id}",
+            file_origin=FileOrigin.PLAINTEXT_CACHE,
+            file_type="text/plain",
+            file_metadata=file_metadata,
+            file_id=chat_file_id_to_plaintext_file_name(file_id),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store plaintext for chat file {file_id}: {e}")
+
+
+def delete_chat_file_text(file_id: str) -> None:
+    _chat_file_text_lru.remove((get_current_tenant_id(), file_id))
+
+    plaintext_file_name = chat_file_id_to_plaintext_file_name(file_id)
+    file_store = get_default_file_store()
+    try:
+        file_store.read_file_record(plaintext_file_name)
+    except Exception:
+        # The text of the file was never stored
+        return
+    file_store.delete_file(plaintext_file_name)
@@ -1,14 +1,19 @@
+import gzip
 import json
+import tempfile
+import time
 from abc import ABC
 from abc import abstractmethod
 from enum import Enum
 from io import StringIO
+from typing import IO
 from typing import List
 from typing import Optional
 from typing import TypeAlias
 
 from pydantic import BaseModel
 
+from onyx.configs.app_configs import COMPRESS_DOCUMENT_BATCHES
 from onyx.configs.constants import FileOrigin
 from onyx.connectors.models import DocExtractionContext
 from onyx.connectors.models import DocIndexingContext
@@ -19,6 +24,15 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+_GZIP_MAGIC = b"\x1f\x8b"
+# Low levels are much faster and compress the repetitive JSON nearly as well
+_GZIP_COMPRESS_LEVEL = 3
+# Serialized batches larger than this are spooled to disk rather than memory
+_MAX_IN_MEMORY_BATCH_BYTES = 32 * 1024 * 1024
+
+_JSON_FILE_TYPE = "application/json"
+_COMPRESSED_FILE_TYPE = "application/gzip"
+
 
 class DocumentBatchStorageStateType(str, Enum):
     EXTRACTION = "extraction"
@@ -96,6 +110,33 @@ class DocumentBatchStorage(ABC):
             for doc_dict in doc_dicts
         ]
 
+    def _write_compressed_documents(
+        self, documents: list[Document], file: IO[bytes]
+    ) -> None:
+        """Write documents to file as gzip compressed JSON lines, one document at
+        a time so that the batch is never held in memory as one large string."""
+        with gzip.GzipFile(
+            fileobj=file, mode="wb", compresslevel=_GZIP_COMPRESS_LEVEL
+        ) as gzip_file:
+            for doc in documents:
+                gzip_file.write(doc.model_dump_json().encode("utf-8"))
+                gzip_file.write(b"\n")
+
+    def _read_documents(self, file: IO[bytes]) -> list[Document]:
+        """Read documents written either as gzip compressed JSON lines or, for
+        batches stored before compression was added, as a single JSON array."""
+        if file.read(len(_GZIP_MAGIC)) != _GZIP_MAGIC:
+            file.seek(0)
+            return self._deserialize_documents(file.read().decode("utf-8"))
+
+        file.seek(0)
+        with gzip.GzipFile(fileobj=file, mode="rb") as gzip_file:
+            return [
+                Document.model_validate(self._normalize_doc_dict(json.loads(line)))
+                for line in gzip_file
+                if line.strip()
+            ]
+
     def _normalize_doc_dict(self, doc_dict: dict) -> dict:
         """Normalize document dict to handle legacy data with non-string metadata values.
 
@@ -151,23 +192,40 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         """Store a batch of documents using FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            data = self._serialize_documents(documents)
-            content = StringIO(data)
-
-            self.file_store.save_file(
-                file_id=file_name,
-                content=content,
-                display_name=f"Document Batch {batch_num}",
-                file_origin=FileOrigin.OTHER,
-                file_type="application/json",
-                file_metadata={
-                    "batch_num": batch_num,
-                    "document_count": str(len(documents)),
-                },
-            )
+            start = time.monotonic()
+            content: IO
+            if COMPRESS_DOCUMENT_BATCHES:
+                content = tempfile.SpooledTemporaryFile(
+                    max_size=_MAX_IN_MEMORY_BATCH_BYTES
+                )
+                self._write_compressed_documents(documents, content)
+                num_bytes = content.tell()
+                content.seek(0)
+                file_type = _COMPRESSED_FILE_TYPE
+            else:
+                data = self._serialize_documents(documents)
+                num_bytes = len(data.encode("utf-8"))
+                content = StringIO(data)
+                file_type = _JSON_FILE_TYPE
+            serialize_seconds = time.monotonic() - start
+
+            with content:
+                self.file_store.save_file(
+                    file_id=file_name,
+                    content=content,
+                    display_name=f"Document Batch {batch_num}",
+                    file_origin=FileOrigin.OTHER,
+                    file_type=file_type,
+                    file_metadata={
+                        "batch_num": batch_num,
+                        "document_count": str(len(documents)),
+                    },
+                )
 
-            logger.debug(
-                f"Stored batch {batch_num} with {len(documents)} documents to FileStore as {file_name}"
+            logger.info(
+                f"Stored batch {batch_num} with {len(documents)} documents to FileStore "
+                f"as {file_name}: {num_bytes} bytes, serialized in "
+                f"{serialize_seconds:.3f}s"
             )
         except Exception as e:
             logger.error(f"Failed to store batch {batch_num}: {e}")
@@ -177,23 +235,31 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         """Retrieve a batch of documents from FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            # Check if file exists
-            if not self.file_store.has_file(
-                file_id=file_name,
-                file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+            # Check if file exists, batches may have been stored in either format
+            if not any(
+                self.file_store.has_file(
+                    file_id=file_name,
+                    file_origin=FileOrigin.OTHER,
+                    file_type=file_type,
+                )
+                for file_type in (_COMPRESSED_FILE_TYPE, _JSON_FILE_TYPE)
             ):
                 logger.warning(
                     f"Batch {batch_num} not found in FileStore with name {file_name}"
                 )
                 return None
 
-            content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
-
-            documents = self._deserialize_documents(data)
-            logger.debug(
-                f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
+            with self.file_store.read_file(file_name, use_tempfile=True) as content_io:
+                num_bytes = content_io.seek(0, 2)
+                content_io.seek(0)
+                start = time.monotonic()
+                documents = self._read_documents(content_io)
+                deserialize_seconds = time.monotonic() - start
+
+            logger.info(
+                f"Retrieved batch {batch_num} with {len(documents)} documents from "
+                f"FileStore: {num_bytes} bytes, deserialized in "
+                f"{deserialize_seconds:.3f}s"
             )
             return documents
         except Exception as e:
@@ -1,7 +1,31 @@
+import asyncio
+import os
 import threading
+import weakref
+from collections.abc import Coroutine
 from typing import Any
+from typing import TypeVar
 
 import httpx
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+_pool_requests = Counter(
+    "onyx_httpx_pool_requests_total",
+    "Total requests sent through pooled httpx clients",
+    ["pool"],
+)
+# requests - new connections = requests that reused a kept-alive connection
+_pool_new_connections = Counter(
+    "onyx_httpx_pool_new_connections_total",
+    "Total new TCP connections opened by pooled httpx clients",
+    ["pool"],
+)
+
+# httpcore emits a trace event for every step of a request, this one is only
+# emitted when a new connection has to be opened
+_NEW_CONNECTION_TRACE_EVENT = "connection.connect_tcp.complete"
 
 
 def make_default_kwargs() -> dict[str, Any]:
@@ -11,6 +35,44 @@ def make_default_kwargs() -> dict[str, Any]:
     }
 
 
+def _with_event_hook(kwargs: dict[str, Any], event: str, hook: Any) -> dict[str, Any]:
+    event_hooks = {
+        name: list(hooks) for name, hooks in (kwargs.get("event_hooks") or {}).items()
+    }
+    event_hooks.setdefault(event, []).append(hook)
+    return {**kwargs, "event_hooks": event_hooks}
+
+
+def _make_request_hook(name: str) -> Any:
+    """Returns a request hook that records the request and whether it had to
+    open a new connection."""
+
+    def _trace(event_name: str, info: dict[str, Any]) -> None:  # noqa: ARG001
+        if event_name == _NEW_CONNECTION_TRACE_EVENT:
+            _pool_new_connections.labels(pool=name).inc()
+
+    def _on_request(request: httpx.Request) -> None:
+        _pool_requests.labels(pool=name).inc()
+        request.extensions.setdefault("trace", _trace)
+
+    return _on_request
+
+
+def _make_async_request_hook(name: str) -> Any:
+    """Async version of `_make_request_hook`, httpx awaits both the hooks and
+    the trace callbacks of async clients."""
+
+    async def _trace(event_name: str, info: dict[str, Any]) -> None:  # noqa: ARG001
+        if event_name == _NEW_CONNECTION_TRACE_EVENT:
+            _pool_new_connections.labels(pool=name).inc()
+
+    async def _on_request(request: httpx.Request) -> None:
+        _pool_requests.labels(pool=name).inc()
+        request.extensions.setdefault("trace", _trace)
+
+    return _on_request
+
+
 class HttpxPool:
     """Class to manage a global httpx Client instance"""
 
@@ -23,9 +85,12 @@ class HttpxPool:
         pass
 
     @classmethod
-    def _init_client(cls, **kwargs: Any) -> httpx.Client:
+    def _init_client(cls, name: str, **kwargs: Any) -> httpx.Client:
         """Private helper method to create and return an httpx.Client."""
         merged_kwargs = {**(make_default_kwargs()), **kwargs}
+        merged_kwargs = _with_event_hook(
+            merged_kwargs, "request", _make_request_hook(name)
+        )
         return httpx.Client(**merged_kwargs)
 
     @classmethod
@@ -33,7 +98,7 @@ class HttpxPool:
         """Allow the caller to init the client with extra params."""
         with cls._lock:
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client(**kwargs)
+                cls._clients[name] = cls._init_client(name, **kwargs)
 
     @classmethod
     def close_client(cls, name: str) -> None:
@@ -56,5 +121,74 @@ class HttpxPool:
         """Gets the httpx.Client. Will init to default settings if not init'd."""
         with cls._lock:
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client()
+                cls._clients[name] = cls._init_client(name)
             return cls._clients[name]
+
+
+class AsyncHttpxPool:
+    """Class to manage shared httpx AsyncClient instances.
+
+    An AsyncClient's connections are bound to the event loop they were opened
+    in, so clients are kept per event loop. Coroutines passed to `run` all run
+    on one long-lived event loop of the process, so the clients they get are
+    reused for as long as the process lives. Callers that close their own event
+    loop should call `aclose_loop_clients` from that loop first."""
+
+    _clients: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]
+    ] = weakref.WeakKeyDictionary()
+    _lock: threading.Lock = threading.Lock()
+
+    _loop: asyncio.AbstractEventLoop | None = None
+    # The loop thread does not survive a fork, children start their own
+    _loop_pid: int | None = None
+
+    @classmethod
+    def _init_client(cls, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        merged_kwargs = {**(make_default_kwargs()), **kwargs}
+        merged_kwargs = _with_event_hook(
+            merged_kwargs, "request", _make_async_request_hook(name)
+        )
+        return httpx.AsyncClient(**merged_kwargs)
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None or cls._loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="async-httpx-pool", daemon=True
+                ).start()
+                cls._loop = loop
+                cls._loop_pid = os.getpid()
+            return cls._loop
+
+    @classmethod
+    def run(cls, coro: Coroutine[Any, Any, T]) -> T:
+        """Runs the coroutine on the pool's event loop and waits for its result.
+        The caller's contextvars are visible to the coroutine. Must not be called
+        from the pool's event loop itself."""
+        future = asyncio.run_coroutine_threadsafe(coro, cls._get_loop())
+        return future.result()
+
+    @classmethod
+    def get(cls, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        """Gets the AsyncClient for the running event loop, creating it with the
+        given params if it does not exist yet."""
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            loop_clients = cls._clients.setdefault(loop, {})
+            client = loop_clients.get(name)
+            if client is None or client.is_closed:
+                client = cls._init_client(name, **kwargs)
+                loop_clients[name] = client
+            return client
+
+    @classmethod
+    async def aclose_loop_clients(cls) -> None:
+        """Closes all clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            loop_clients = cls._clients.pop(loop, {})
+        for client in loop_clients.values():
+            await client.aclose()
@@ -122,6 +122,7 @@ class DocumentIndexingBatchAdapter:
             )
         }
 
+        # Unchanged chunks that were left out are still part of the document
         doc_id_to_new_chunk_cnt: dict[str, int] = {
             document_id: len(
                 [
@@ -130,6 +131,7 @@ class DocumentIndexingBatchAdapter:
                     if chunk.source_document.id == document_id
                 ]
             )
+            + context.doc_id_to_unchanged_chunk_cnt.get(document_id, 0)
             for document_id in updatable_ids
         }
 
@@ -232,6 +234,7 @@ class DocumentIndexingBatchAdapter:
             document_ids=updatable_ids,
             doc_id_to_chunk_count=result.doc_id_to_new_chunk_cnt,
             db_session=self.db_session,
+            doc_id_to_chunk_content_hashes=context.doc_id_to_chunk_content_hashes,
         )
 
         # these documents can now be counted as part of the CC Pairs
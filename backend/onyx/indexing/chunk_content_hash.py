@@ -0,0 +1,71 @@
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+
+from onyx.indexing.models import DocAwareChunk
+
+# Fields of the source document that are never written into a chunk, the
+# sections are already represented by the chunk content
+_UNINDEXED_DOCUMENT_FIELDS = {
+    "sections",
+    "processed_sections",
+    "chunk_count",
+    "additional_info",
+    "external_access",
+}
+
+
+@dataclass
+class ChunkDiff:
+    # chunks that are new, changed or moved and need to be embedded and written
+    changed_chunks: list[DocAwareChunk]
+    # the hash of every chunk of each document, in chunker order
+    doc_id_to_chunk_hashes: dict[str, list[str]]
+    # number of chunks of each document that are already in the document index
+    doc_id_to_unchanged_chunk_cnt: dict[str, int]
+
+
+def compute_chunk_content_hash(chunk: DocAwareChunk, seed: str) -> str:
+    """Hashes everything about a chunk that ends up in the document index other
+    than the embeddings and the metadata that is kept in sync separately (access,
+    document sets, boost). This includes the document level fields, e.g. the
+    title or doc_updated_at, since they are stored on every chunk.
+
+    The seed should identify where the chunk is written to, e.g. the index names,
+    so that hashes never carry over to a different index or embedding model."""
+    chunk_data = chunk.model_dump(
+        exclude={"source_document": _UNINDEXED_DOCUMENT_FIELDS}
+    )
+    serialized = json.dumps(chunk_data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{seed}\n{serialized}".encode("utf-8")).hexdigest()
+
+
+def diff_chunks(
+    chunks: list[DocAwareChunk],
+    doc_id_to_previous_chunk_hashes: dict[str, list[str]],
+    seed: str,
+) -> ChunkDiff:
+    """A chunk is unchanged if the previous indexing of its document produced the
+    same hash at the same position. The hash covers the chunk ID, so an unchanged
+    chunk is still stored under the same ID in the document index."""
+    doc_id_to_chunk_hashes: dict[str, list[str]] = defaultdict(list)
+    doc_id_to_unchanged_chunk_cnt: dict[str, int] = defaultdict(int)
+    changed_chunks: list[DocAwareChunk] = []
+    for chunk in chunks:
+        doc_id = chunk.source_document.id
+        chunk_hash = compute_chunk_content_hash(chunk, seed)
+        previous_hashes = doc_id_to_previous_chunk_hashes.get(doc_id, [])
+        position = len(doc_id_to_chunk_hashes[doc_id])
+        doc_id_to_chunk_hashes[doc_id].append(chunk_hash)
+
+        if position < len(previous_hashes) and previous_hashes[position] == chunk_hash:
+            doc_id_to_unchanged_chunk_cnt[doc_id] += 1
+        else:
+            changed_chunks.append(chunk)
+
+    return ChunkDiff(
+        changed_chunks=changed_chunks,
+        doc_id_to_chunk_hashes=dict(doc_id_to_chunk_hashes),
+        doc_id_to_unchanged_chunk_cnt=dict(doc_id_to_unchanged_chunk_cnt),
+    )
@@ -0,0 +1,48 @@
+import hashlib
+from typing import cast
+
+from onyx.configs.app_configs import CONTEXTUAL_RAG_CACHE_TTL_SECONDS
+from onyx.llm.interfaces import LLM
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+CONTEXTUAL_RAG_CACHE_PREFIX = "contextual_rag_cache"
+
+
+def get_contextual_rag_cache_key(llm: LLM, *prompt_parts: str) -> str:
+    """prompt_parts must determine the prompt sent to the LLM, i.e. the prompt
+    templates and the content filled into them (or digests of it). Since the
+    templates are part of the key, changing a prompt invalidates its entries."""
+    hasher = hashlib.sha256(
+        f"{llm.config.model_provider}|{llm.config.model_name}".encode("utf-8")
+    )
+    for prompt_part in prompt_parts:
+        part_digest = hashlib.sha256(prompt_part.encode("utf-8")).digest()
+        hasher.update(part_digest)
+    return f"{CONTEXTUAL_RAG_CACHE_PREFIX}:{hasher.hexdigest()}"
+
+
+def get_cached_contextual_rag_response(cache_key: str) -> str | None:
+    """Returns None on a miss. Redis failures are logged and treated as misses so
+    that indexing never fails because of the cache."""
+    if CONTEXTUAL_RAG_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    try:
+        cached = cast(bytes | None, get_redis_client().get(cache_key))
+    except Exception:
+        logger.exception("Failed to read from the contextual RAG cache")
+        return None
+    return cached.decode("utf-8") if cached is not None else None
+
+
+def cache_contextual_rag_response(cache_key: str, response: str) -> None:
+    if CONTEXTUAL_RAG_CACHE_TTL_SECONDS <= 0:
+        return
+
+    try:
+        get_redis_client().set(cache_key, response, ex=CONTEXTUAL_RAG_CACHE_TTL_SECONDS)
+    except Exception:
+        logger.exception("Failed to write to the contextual RAG cache")
@@ -1,16 +1,19 @@
 import time
 from abc import ABC
 from abc import abstractmethod
-from collections import defaultdict
+from collections.abc import Callable
 
+from onyx.configs.model_configs import ENABLE_EMBEDDING_CACHE
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import ConnectorStopSignal
-from onyx.connectors.models import DocumentFailure
 from onyx.db.models import SearchSettings
 from onyx.document_index.chunk_content_enrichment import (
     generate_enriched_content_for_chunk_embedding,
 )
+from onyx.indexing.embedding_cache import EmbeddingCache
+from onyx.indexing.embedding_cache import RedisEmbeddingCache
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.failure_isolation import isolate_failed_documents
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
@@ -97,6 +100,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ):
         super().__init__(
             model_name,
@@ -111,6 +115,37 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             reduced_dimension,
             callback,
         )
+        self.embedding_cache = embedding_cache
+        # Running totals across every embed_chunks call made with this embedder
+        self.embedding_cache_hits = 0
+        self.embedding_cache_misses = 0
+
+    def _encode_with_cache(
+        self,
+        texts: list[str],
+        encode: Callable[[list[str]], list[Embedding]],
+        tenant_id: str | None,
+    ) -> list[Embedding]:
+        """Only the texts missing from the embedding cache are passed to encode,
+        the results are merged back in the original order."""
+        if self.embedding_cache is None:
+            return encode(texts)
+
+        cached = self.embedding_cache.get_many(texts, tenant_id=tenant_id)
+        miss_indices = [i for i, embedding in enumerate(cached) if embedding is None]
+        self.embedding_cache_hits += len(texts) - len(miss_indices)
+        self.embedding_cache_misses += len(miss_indices)
+
+        if miss_indices:
+            miss_texts = [texts[i] for i in miss_indices]
+            new_embeddings = encode(miss_texts)
+            self.embedding_cache.put_many(
+                miss_texts, new_embeddings, tenant_id=tenant_id
+            )
+            for i, embedding in zip(miss_indices, new_embeddings):
+                cached[i] = embedding
+
+        return [embedding for embedding in cached if embedding is not None]
 
     @log_function_time()
     def embed_chunks(
@@ -147,12 +182,16 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
-            texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
-            large_chunks_present=large_chunks_present,
+        embeddings = self._encode_with_cache(
+            flat_chunk_texts,
+            lambda texts: self.embedding_model.encode(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            ),
             tenant_id=tenant_id,
-            request_id=request_id,
         )
 
         chunk_titles = {
@@ -167,11 +206,15 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Cache the Title embeddings to only have to do it once
         title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
+            title_embeddings = self._encode_with_cache(
                 chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
+                lambda texts: self.embedding_model.encode(
+                    texts,
+                    text_type=EmbedTextType.PASSAGE,
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                ),
                 tenant_id=tenant_id,
-                request_id=request_id,
             )
             title_embed_dict.update(
                 {
@@ -241,6 +284,16 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name=search_settings.deployment_name,
             reduced_dimension=search_settings.reduced_dimension,
             callback=callback,
+            embedding_cache=(
+                RedisEmbeddingCache(
+                    model_name=search_settings.model_name,
+                    normalize=search_settings.normalize,
+                    prefix=search_settings.passage_prefix,
+                    reduced_dimension=search_settings.reduced_dimension,
+                )
+                if ENABLE_EMBEDDING_CACHE
+                else None
+            ),
         )
 
 
@@ -249,9 +302,12 @@ def embed_chunks_with_failure_handling(
     embedder: IndexingEmbedder,
     tenant_id: str | None = None,
     request_id: str | None = None,
-) -> tuple[list[IndexChunk], list[ConnectorFailure]]:
+) -> tuple[list[IndexChunk], list[ConnectorFailure], int]:
     """Tries to embed all chunks in one large batch. If that batch fails for any reason,
-    goes document by document to isolate the failure(s).
+    bisects the batch by document to isolate the failure(s).
+
+    Returns the embedded chunks, the failures and the number of extra calls spent
+    isolating them.
     """
 
     # TODO(rkuo): this doesn't disambiguate calls to the model server on retries.
@@ -264,44 +320,29 @@ def embed_chunks_with_failure_handling(
                 chunks=chunks, tenant_id=tenant_id, request_id=request_id
             ),
             [],
+            0,
         )
     except ConnectorStopSignal as e:
         logger.warning(
             "Connector stop signal detected in embed_chunks_with_failure_handling"
         )
         raise e
-    except Exception:
-        logger.exception("Failed to embed chunk batch. Trying individual docs.")
+    except Exception as e:
+        logger.exception("Failed to embed chunk batch. Isolating failed docs.")
         # wait a couple seconds to let any rate limits or temporary issues resolve
         time.sleep(2)
-
-    # Try embedding each document's chunks individually
-    chunks_by_doc: dict[str, list[DocAwareChunk]] = defaultdict(list)
-    for chunk in chunks:
-        chunks_by_doc[chunk.source_document.id].append(chunk)
-
-    embedded_chunks: list[IndexChunk] = []
-    failures: list[ConnectorFailure] = []
-
-    for doc_id, chunks_for_doc in chunks_by_doc.items():
-        try:
-            doc_embedded_chunks = embedder.embed_chunks(
-                chunks=chunks_for_doc, tenant_id=tenant_id, request_id=request_id
-            )
-            embedded_chunks.extend(doc_embedded_chunks)
-        except Exception as e:
-            logger.exception(f"Failed to embed chunks for document '{doc_id}'")
-            failures.append(
-                ConnectorFailure(
-                    failed_document=DocumentFailure(
-                        document_id=doc_id,
-                        document_link=(
-                            chunks_for_doc[0].get_link() if chunks_for_doc else None
-                        ),
-                    ),
-                    failure_message=str(e),
-                    exception=e,
-                )
-            )
-
-    return embedded_chunks, failures
+        batch_exception = e
+
+    # Bisect the batch to find the document(s) that fail to embed
+    isolation_result = isolate_failed_documents(
+        chunks=chunks,
+        process=lambda chunks_to_embed: embedder.embed_chunks(
+            chunks=chunks_to_embed, tenant_id=tenant_id, request_id=request_id
+        ),
+        batch_exception=batch_exception,
+    )
+    return (
+        isolation_result.results,
+        isolation_result.failures,
+        isolation_result.extra_calls,
+    )
@@ -0,0 +1,182 @@
+import hashlib
+import time
+from abc import ABC
+from abc import abstractmethod
+from typing import cast
+
+import numpy as np
+
+from onyx.configs.model_configs import EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import EMBEDDING_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+EMBEDDING_CACHE_PREFIX = "embedding_cache"
+# Sorted set of cache entry digests scored by last access time, used for LRU eviction
+EMBEDDING_CACHE_LRU_KEY = f"{EMBEDDING_CACHE_PREFIX}_lru"
+
+
+class EmbeddingCache(ABC):
+    """Stores passage embeddings so that identical text embedded with identical model
+    settings is never sent to the embedding model twice."""
+
+    def __init__(
+        self,
+        model_name: str,
+        normalize: bool,
+        prefix: str | None,
+        reduced_dimension: int | None,
+        text_type: EmbedTextType = EmbedTextType.PASSAGE,
+    ) -> None:
+        # Everything that changes the produced vector for a given text must be part
+        # of the key, otherwise a settings change would serve stale embeddings.
+        # Some providers embed queries and passages differently even without a
+        # prefix, so the text type is part of it as well.
+        settings_str = (
+            f"{model_name}|{normalize}|{prefix or ''}|{reduced_dimension}"
+            f"|{text_type.value}"
+        )
+        self._settings_digest = hashlib.sha256(
+            settings_str.encode("utf-8")
+        ).hexdigest()[:16]
+
+    def _entry_digest(self, text: str) -> str:
+        text_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self._settings_digest}:{text_digest}"
+
+    @abstractmethod
+    def get_many(
+        self, texts: list[str], tenant_id: str | None = None
+    ) -> list[Embedding | None]:
+        """Returns the cached embedding for each text, or None on a miss."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_many(
+        self,
+        texts: list[str],
+        embeddings: list[Embedding],
+        tenant_id: str | None = None,
+    ) -> None:
+        raise NotImplementedError
+
+
+class RedisEmbeddingCache(EmbeddingCache):
+    """Tenant scoped embedding cache in Redis. Entries expire after a TTL and the
+    least recently used entries are evicted once the cache grows past max_entries.
+
+    Embeddings are stored as packed float32. Redis failures are logged and treated as
+    cache misses so that indexing never fails because of the cache."""
+
+    def __init__(
+        self,
+        model_name: str,
+        normalize: bool,
+        prefix: str | None,
+        reduced_dimension: int | None,
+        text_type: EmbedTextType = EmbedTextType.PASSAGE,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = EMBEDDING_CACHE_TTL_SECONDS,
+    ) -> None:
+        super().__init__(model_name, normalize, prefix, reduced_dimension, text_type)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _tenant_prefix(tenant_id: str | None) -> str:
+        # mget and pipelines don't automatically add the tenant_id prefix
+        return f"{tenant_id or get_current_tenant_id()}:"
+
+    def get_many(
+        self, texts: list[str], tenant_id: str | None = None
+    ) -> list[Embedding | None]:
+        if not texts:
+            return []
+
+        tenant_prefix = self._tenant_prefix(tenant_id)
+        digests = [self._entry_digest(text) for text in texts]
+        try:
+            r = get_redis_client(tenant_id=tenant_id)
+            raw_values = cast(
+                list[bytes | None],
+                r.mget(
+                    [
+                        f"{tenant_prefix}{EMBEDDING_CACHE_PREFIX}:{digest}"
+                        for digest in digests
+                    ]
+                ),
+            )
+
+            hit_digests = [
+                digest
+                for digest, raw_value in zip(digests, raw_values)
+                if raw_value is not None
+            ]
+            if hit_digests:
+                # Refresh recency so hot entries survive eviction
+                now = time.time()
+                r.zadd(
+                    f"{tenant_prefix}{EMBEDDING_CACHE_LRU_KEY}",
+                    {digest: now for digest in hit_digests},
+                )
+        except Exception:
+            logger.exception("Failed to read from the embedding cache")
+            return [None] * len(texts)
+
+        return [
+            (
+                np.frombuffer(raw_value, dtype=np.float32).tolist()
+                if raw_value is not None
+                else None
+            )
+            for raw_value in raw_values
+        ]
+
+    def put_many(
+        self,
+        texts: list[str],
+        embeddings: list[Embedding],
+        tenant_id: str | None = None,
+    ) -> None:
+        if not texts:
+            return
+
+        tenant_prefix = self._tenant_prefix(tenant_id)
+        lru_key = f"{tenant_prefix}{EMBEDDING_CACHE_LRU_KEY}"
+        digests = [self._entry_digest(text) for text in texts]
+        try:
+            r = get_redis_client(tenant_id=tenant_id)
+            now = time.time()
+
+            pipeline = r.pipeline(transaction=False)
+            for digest, embedding in zip(digests, embeddings):
+                pipeline.set(
+                    f"{tenant_prefix}{EMBEDDING_CACHE_PREFIX}:{digest}",
+                    np.asarray(embedding, dtype=np.float32).tobytes(),
+                    ex=self._ttl_seconds,
+                )
+            pipeline.zadd(lru_key, {digest: now for digest in digests})
+            # Entries that expired via TTL leave stale members behind, drop those too
+            pipeline.zremrangebyscore(lru_key, "-inf", now - self._ttl_seconds)
+            pipeline.zcard(lru_key)
+            num_entries = cast(int, pipeline.execute()[-1])
+
+            num_to_evict = num_entries - self._max_entries
+            if num_to_evict > 0:
+                evicted = cast(
+                    list[tuple[bytes, float]], r.zpopmin(lru_key, count=num_to_evict)
+                )
+                pipeline = r.pipeline(transaction=False)
+                for evicted_digest, _ in evicted:
+                    pipeline.delete(
+                        f"{tenant_prefix}{EMBEDDING_CACHE_PREFIX}:"
+                        f"{evicted_digest.decode('utf-8')}"
+                    )
+                pipeline.execute()
+        except Exception:
+            logger.exception("Failed to write to the embedding cache")
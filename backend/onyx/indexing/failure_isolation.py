@@ -0,0 +1,133 @@
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic
+from typing import TypeVar
+
+from onyx.connectors.models import ConnectorFailure
+from onyx.connectors.models import ConnectorStopSignal
+from onyx.connectors.models import DocumentFailure
+from onyx.indexing.models import DocAwareChunk
+from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+
+logger = setup_logger()
+
+ChunkT = TypeVar("ChunkT", bound=DocAwareChunk)
+R = TypeVar("R")
+
+
+@dataclass
+class FailureIsolationResult(Generic[R]):
+    results: list[R]
+    failures: list[ConnectorFailure]
+    # calls made on top of the initial full batch call that failed
+    extra_calls: int
+
+
+def _build_failure(
+    doc_id: str, chunks_for_doc: list[ChunkT], e: Exception
+) -> ConnectorFailure:
+    return ConnectorFailure(
+        failed_document=DocumentFailure(
+            document_id=doc_id,
+            document_link=chunks_for_doc[0].get_link() if chunks_for_doc else None,
+        ),
+        failure_message=str(e),
+        exception=e,
+    )
+
+
+def _split(
+    docs: list[tuple[str, list[ChunkT]]],
+) -> list[list[tuple[str, list[ChunkT]]]]:
+    mid = len(docs) // 2
+    return [docs[:mid], docs[mid:]]
+
+
+def _try_docs(
+    docs: list[tuple[str, list[ChunkT]]],
+    process: Callable[[list[ChunkT]], list[R]],
+) -> list[R] | Exception:
+    try:
+        chunks = [chunk for _, chunks_for_doc in docs for chunk in chunks_for_doc]
+        return process(chunks)
+    except ConnectorStopSignal:
+        raise
+    except Exception as e:
+        return e
+
+
+def isolate_failed_documents(
+    chunks: list[ChunkT],
+    process: Callable[[list[ChunkT]], list[R]],
+    batch_exception: Exception,
+    parallel: bool = True,
+) -> FailureIsolationResult[R]:
+    """Finds the documents that made process fail on the whole batch of chunks.
+
+    The documents are split in halves repeatedly and each half is retried, so k bad
+    documents out of n are isolated in O(k log n) calls instead of the n calls that
+    retrying every document on its own takes. Halves that succeed are not split any
+    further. The chunks of a document are always processed together.
+
+    Args:
+        chunks: the chunks that process already failed on with batch_exception
+        process: processes the chunks of one or more documents, raising on failure
+        batch_exception: the exception of the failed full batch call, reported if
+            the batch only holds a single document
+        parallel: whether to retry the halves of a level of the split concurrently
+    """
+    chunks_by_doc: dict[str, list[ChunkT]] = defaultdict(list)
+    for chunk in chunks:
+        chunks_by_doc[chunk.source_document.id].append(chunk)
+    docs = list(chunks_by_doc.items())
+
+    if len(docs) <= 1:
+        # nothing to split, the full batch call already isolated the failure
+        return FailureIsolationResult(
+            results=[],
+            failures=[
+                _build_failure(doc_id, chunks_for_doc, batch_exception)
+                for doc_id, chunks_for_doc in docs
+            ],
+            extra_calls=0,
+        )
+
+    results: list[R] = []
+    failures: list[ConnectorFailure] = []
+    extra_calls = 0
+    # Each level of the split is retried from here rather than from the retries
+    # of the level above, so parallel retries never wait on each other
+    groups = _split(docs)
+    while groups:
+        extra_calls += len(groups)
+        if parallel:
+            outcomes = run_functions_tuples_in_parallel(
+                [(_try_docs, (group, process)) for group in groups]
+            )
+        else:
+            outcomes = [_try_docs(group, process) for group in groups]
+
+        failed_groups: list[list[tuple[str, list[ChunkT]]]] = []
+        for group, outcome in zip(groups, outcomes):
+            if not isinstance(outcome, Exception):
+                results.extend(outcome)
+            elif len(group) == 1:
+                doc_id, chunks_for_doc = group[0]
+                logger.error(
+                    f"Failed to process chunks for document '{doc_id}'",
+                    exc_info=outcome,
+                )
+                failures.append(_build_failure(doc_id, chunks_for_doc, outcome))
+            else:
+                failed_groups.extend(_split(group))
+        groups = failed_groups
+
+    logger.info(
+        f"Isolated {len(failures)} failed documents out of {len(docs)} "
+        f"with {extra_calls} extra calls"
+    )
+    return FailureIsolationResult(
+        results=results, failures=failures, extra_calls=extra_calls
+    )
@@ -1,14 +1,32 @@
+import queue
+import random
+import threading
+import time
 from collections import defaultdict
 from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
 from typing import Protocol
+from typing import TypeVar
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS
+from onyx.configs.app_configs import CONTEXTUAL_RAG_RATE_LIMIT_RETRIES
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from onyx.configs.app_configs import ENABLE_INCREMENTAL_CHUNK_INDEXING
+from onyx.configs.app_configs import ENABLE_PARALLEL_DOCUMENT_INDEX_WRITES
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_MAX_CONCURRENCY
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_SYSTEM_PROMPT
+from onyx.configs.app_configs import IMAGE_SUMMARIZATION_USER_PROMPT
+from onyx.configs.app_configs import INDEXING_PIPELINE_QUEUE_SIZE
+from onyx.configs.app_configs import INDEXING_PIPELINE_SUB_BATCH_SIZE
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
@@ -42,17 +60,27 @@ from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.document_index.interfaces import DocumentMetadata
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.file_processing.image_summarization import summarize_image_with_error_handling
+from onyx.file_processing.image_summary_cache import cache_image_summary
+from onyx.file_processing.image_summary_cache import get_cached_image_summary
+from onyx.file_processing.image_summary_cache import get_image_summary_cache_key
 from onyx.file_store.file_store import get_default_file_store
+from onyx.indexing.chunk_content_hash import diff_chunks
 from onyx.indexing.chunker import Chunker
+from onyx.indexing.contextual_rag_cache import cache_contextual_rag_response
+from onyx.indexing.contextual_rag_cache import get_cached_contextual_rag_response
+from onyx.indexing.contextual_rag_cache import get_contextual_rag_cache_key
 from onyx.indexing.embedder import embed_chunks_with_failure_handling
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.models import DocAwareChunk
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import IndexChunk
 from onyx.indexing.models import IndexingBatchAdapter
 from onyx.indexing.models import UpdatableChunkData
 from onyx.indexing.vector_db_insertion import write_chunks_to_vector_db_with_backoff
 from onyx.llm.factory import get_default_llm_with_vision
 from onyx.llm.factory import get_llm_for_contextual_rag
 from onyx.llm.interfaces import LLM
+from onyx.llm.models import LanguageModelInput
 from onyx.llm.models import UserMessage
 from onyx.llm.multi_llm import LLMRateLimitError
 from onyx.llm.utils import llm_response_to_string
@@ -65,16 +93,28 @@ from onyx.prompts.contextual_retrieval import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.contextual_retrieval import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.timing import log_function_time
+from shared_configs.utils import batch_list
 
 
 logger = setup_logger()
 
+R = TypeVar("R")
+
 
 class DocumentBatchPrepareContext(BaseModel):
     updatable_docs: list[Document]
     id_to_boost_map: dict[str, int]
     indexable_docs: list[IndexingDocument] = []
+    # chunk content hashes stored by the last indexing of each document, only
+    # loaded if incremental chunk indexing is enabled
+    doc_id_to_previous_chunk_hashes: dict[str, list[str]] = {}
+    # number of chunks of each document that were left out of the write since
+    # they are already in the document index
+    doc_id_to_unchanged_chunk_cnt: dict[str, int] = {}
+    # chunk content hashes to store for each document, None clears them
+    doc_id_to_chunk_content_hashes: dict[str, list[str] | None] = {}
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
@@ -90,6 +130,45 @@ class IndexingPipelineResult(BaseModel):
 
     failures: list[ConnectorFailure]
 
+    # wall-clock seconds spent writing the batch to each document index, keyed
+    # by index name
+    document_index_write_seconds: dict[str, float] = {}
+    # seconds each stage (chunk, embed, write) spent working and the wall-clock
+    # seconds of the whole pipeline, the stages overlap in pipelined mode
+    stage_seconds: dict[str, float] = {}
+    pipeline_seconds: float = 0.0
+    # extra calls spent isolating the documents that failed a batch, by stage
+    # (embed, write)
+    failure_isolation_calls: dict[str, int] = {}
+
+
+class DocumentIndexWriteResult(BaseModel):
+    insertion_records: list[DocumentInsertionRecord]
+    vector_db_write_failures: list[ConnectorFailure]
+    elapsed_seconds: float
+    failure_isolation_calls: int = 0
+
+
+def _write_chunks_to_document_index(
+    document_index: DocumentIndex,
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_batch_params: IndexBatchParams,
+) -> DocumentIndexWriteResult:
+    start = time.monotonic()
+    insertion_records, vector_db_write_failures, failure_isolation_calls = (
+        write_chunks_to_vector_db_with_backoff(
+            document_index=document_index,
+            chunks=chunks,
+            index_batch_params=index_batch_params,
+        )
+    )
+    return DocumentIndexWriteResult(
+        insertion_records=insertion_records,
+        vector_db_write_failures=vector_db_write_failures,
+        elapsed_seconds=time.monotonic() - start,
+        failure_isolation_calls=failure_isolation_calls,
+    )
+
 
 class IndexingPipelineProtocol(Protocol):
     def __call__(
@@ -289,8 +368,19 @@ def index_doc_batch_prepare(
         return None
 
     id_to_boost_map = {doc.id: doc.boost for doc in db_docs}
+    doc_id_to_previous_chunk_hashes = (
+        {
+            doc.id: doc.chunk_content_hashes
+            for doc in db_docs
+            if doc.chunk_content_hashes
+        }
+        if ENABLE_INCREMENTAL_CHUNK_INDEXING
+        else {}
+    )
     return DocumentBatchPrepareContext(
-        updatable_docs=updatable_docs, id_to_boost_map=id_to_boost_map
+        updatable_docs=updatable_docs,
+        id_to_boost_map=id_to_boost_map,
+        doc_id_to_previous_chunk_hashes=doc_id_to_previous_chunk_hashes,
     )
 
 
@@ -373,6 +463,70 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
+class _ImageSummarizer:
+    """Summarizes images by file ID. Identical images, even under different file IDs,
+    are summarized once: summaries are cached per tenant by image content and
+    concurrent requests for the same image wait for the first one."""
+
+    def __init__(self, llm: LLM) -> None:
+        self._llm = llm
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[str | None]] = {}
+
+    def summarize(self, image_file_id: str) -> str:
+        """Returns the text to index for the image, never raises."""
+        try:
+            file_store = get_default_file_store()
+
+            file_record = file_store.read_file_record(file_id=image_file_id)
+            if not file_record:
+                logger.warning(f"Image file {image_file_id} not found in FileStore")
+                return "[Image could not be processed]"
+
+            image_data = file_store.read_file(file_id=image_file_id).read()
+            summary = self._summarize_image_data(
+                image_data=image_data,
+                context_name=file_record.display_name or "Image",
+            )
+            return summary or "[Image could not be summarized]"
+        except Exception as e:
+            logger.error(f"Error processing image section: {e}")
+            return "[Error processing image]"
+
+    def _summarize_image_data(self, image_data: bytes, context_name: str) -> str | None:
+        cache_key = get_image_summary_cache_key(
+            llm=self._llm,
+            image_data=image_data,
+            system_prompt=IMAGE_SUMMARIZATION_SYSTEM_PROMPT,
+            user_prompt_template=IMAGE_SUMMARIZATION_USER_PROMPT,
+        )
+        with self._lock:
+            summary_future = self._in_flight.get(cache_key)
+            is_owner = summary_future is None
+            if summary_future is None:
+                summary_future = self._in_flight[cache_key] = Future()
+        if not is_owner:
+            return summary_future.result()
+
+        try:
+            summary = get_cached_image_summary(cache_key)
+            if summary is None:
+                summary = summarize_image_with_error_handling(
+                    llm=self._llm,
+                    image_data=image_data,
+                    context_name=context_name,
+                    system_prompt=IMAGE_SUMMARIZATION_SYSTEM_PROMPT,
+                    user_prompt_template=IMAGE_SUMMARIZATION_USER_PROMPT,
+                )
+                if summary:
+                    cache_image_summary(cache_key, summary)
+        except Exception as e:
+            summary_future.set_exception(e)
+            raise
+        summary_future.set_result(summary)
+        return summary
+
+
 def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     """
     Process all sections in documents by:
@@ -414,55 +568,44 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
             for document in documents
         ]
 
+    # Each distinct image of the batch is summarized once, concurrently
+    image_summarizer = _ImageSummarizer(llm)
+    image_file_ids = list(
+        {
+            section.image_file_id
+            for document in documents
+            for section in document.sections
+            if isinstance(section, ImageSection)
+        }
+    )
+    image_file_id_to_summary = dict(
+        zip(
+            image_file_ids,
+            run_functions_tuples_in_parallel(
+                [
+                    (image_summarizer.summarize, (image_file_id,))
+                    for image_file_id in image_file_ids
+                ],
+                max_workers=IMAGE_SUMMARIZATION_MAX_CONCURRENCY,
+            ),
+        )
+    )
+
     indexed_documents: list[IndexingDocument] = []
 
     for document in documents:
         processed_sections: list[Section] = []
 
         for section in document.sections:
-            # For ImageSection, process and create base Section with both text and image_file_id
+            # For ImageSection, create base Section with both text and image_file_id
             if isinstance(section, ImageSection):
-                # Default section with image path preserved - ensure text is always a string
-                processed_section = Section(
-                    link=section.link,
-                    image_file_id=section.image_file_id,
-                    text="",  # Initialize with empty string
-                )
-
-                # Try to get image summary
-                try:
-                    file_store = get_default_file_store()
-
-                    file_record = file_store.read_file_record(
-                        file_id=section.image_file_id
+                processed_sections.append(
+                    Section(
+                        link=section.link,
+                        image_file_id=section.image_file_id,
+                        text=image_file_id_to_summary[section.image_file_id],
                     )
-                    if not file_record:
-                        logger.warning(
-                            f"Image file {section.image_file_id} not found in FileStore"
-                        )
-
-                        processed_section.text = "[Image could not be processed]"
-                    else:
-                        # Get the image data
-                        image_data_io = file_store.read_file(
-                            file_id=section.image_file_id
-                        )
-                        image_data = image_data_io.read()
-                        summary = summarize_image_with_error_handling(
-                            llm=llm,
-                            image_data=image_data,
-                            context_name=file_record.display_name or "Image",
-                        )
-
-                        if summary:
-                            processed_section.text = summary
-                        else:
-                            processed_section.text = "[Image could not be summarized]"
-                except Exception as e:
-                    logger.error(f"Error processing image section: {e}")
-                    processed_section.text = "[Error processing image]"
-
-                processed_sections.append(processed_section)
+                )
 
             # For TextSection, create a base Section with text and link
             elif isinstance(section, TextSection):
@@ -482,6 +625,68 @@ def process_image_sections(documents: list[Document]) -> list[IndexingDocument]:
     return indexed_documents
 
 
+_CONTEXTUAL_RAG_BACKOFF_BASE_SECONDS = 2.0
+_CONTEXTUAL_RAG_BACKOFF_MAX_SECONDS = 60.0
+
+
+class _ContextualRagLLMLimiter:
+    """Bounds the contextual RAG LLM calls in flight across all documents (and all
+    batches) of the process. Rate limited calls are retried with exponential
+    backoff, and while backing off no other call is sent to the LLM either."""
+
+    def __init__(self, max_concurrency: int) -> None:
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._backoff_until = 0.0
+
+    def invoke(self, llm: LLM, prompt: LanguageModelInput) -> str:
+        attempt = 0
+        while True:
+            with self._semaphore:
+                backoff_seconds = self._backoff_until - time.monotonic()
+                if backoff_seconds > 0:
+                    time.sleep(backoff_seconds)
+                try:
+                    response = llm.invoke(prompt, max_tokens=MAX_CONTEXT_TOKENS)
+                    return llm_response_to_string(response)
+                except LLMRateLimitError:
+                    if attempt >= CONTEXTUAL_RAG_RATE_LIMIT_RETRIES:
+                        raise
+                    self._back_off(attempt)
+            attempt += 1
+
+    def _back_off(self, attempt: int) -> None:
+        backoff_seconds = min(
+            _CONTEXTUAL_RAG_BACKOFF_BASE_SECONDS * 2**attempt,
+            _CONTEXTUAL_RAG_BACKOFF_MAX_SECONDS,
+        ) * random.uniform(0.5, 1.0)
+        logger.warning(
+            f"Contextual RAG LLM call was rate limited, backing off for "
+            f"{backoff_seconds:.1f}s"
+        )
+        with self._lock:
+            self._backoff_until = max(
+                self._backoff_until, time.monotonic() + backoff_seconds
+            )
+
+
+_contextual_rag_llm_limiter = _ContextualRagLLMLimiter(
+    CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS
+)
+
+
+def _invoke_contextual_rag_llm(
+    llm: LLM, prompt: LanguageModelInput, cache_key: str
+) -> str:
+    cached_response = get_cached_contextual_rag_response(cache_key)
+    if cached_response is not None:
+        return cached_response
+
+    response = _contextual_rag_llm_limiter.invoke(llm, prompt)
+    cache_contextual_rag_response(cache_key, response)
+    return response
+
+
 def add_document_summaries(
     chunks_by_doc: list[DocAwareChunk],
     llm: LLM,
@@ -509,8 +714,13 @@ def add_document_summaries(
     summary_prompt = DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
     prompt_msg = UserMessage(content=summary_prompt)
 
-    response = llm.invoke(prompt_msg, max_tokens=MAX_CONTEXT_TOKENS)
-    doc_summary = llm_response_to_string(response)
+    doc_summary = _invoke_contextual_rag_llm(
+        llm,
+        prompt_msg,
+        cache_key=get_contextual_rag_cache_key(
+            llm, DOCUMENT_SUMMARY_PROMPT, doc_content
+        ),
+    )
 
     for chunk in chunks_by_doc:
         chunk.doc_summary = doc_summary
@@ -518,22 +728,15 @@ def add_document_summaries(
     return doc_tokens
 
 
-def add_chunk_summaries(
+def _get_chunk_summary_doc_info(
     chunks_by_doc: list[DocAwareChunk],
     llm: LLM,
     tokenizer: BaseTokenizer,
     trunc_doc_chunk_tokens: int,
     doc_tokens: list[int] | None,
-) -> None:
-    """
-    Adds chunk summaries to the chunks grouped by document id.
-    Chunk summaries look at the chunk as well as the entire document (or a summary,
-    if the document is too long) and describe how the chunk relates to the document.
-    """
-    # all chunks within a document have the same contextual_rag_reserved_tokens
-    if chunks_by_doc[0].contextual_rag_reserved_tokens == 0:
-        return
-
+) -> str:
+    """Returns the document content, or a summary if the document is too long, that
+    the chunk summaries of the document are based on."""
     # use values computed in above doc summary section if available
     doc_tokens = doc_tokens or tokenizer.encode(
         chunks_by_doc[0].source_document.get_text_content()
@@ -552,39 +755,93 @@ def add_chunk_summaries(
         fallback_prompt = UserMessage(
             content=DOCUMENT_SUMMARY_PROMPT.format(document=doc_content)
         )
-        response = llm.invoke(fallback_prompt, max_tokens=MAX_CONTEXT_TOKENS)
-        doc_info = llm_response_to_string(response)
+        doc_info = _invoke_contextual_rag_llm(
+            llm,
+            fallback_prompt,
+            cache_key=get_contextual_rag_cache_key(
+                llm, DOCUMENT_SUMMARY_PROMPT, doc_content
+            ),
+        )
+    return doc_info
+
 
+def _add_chunk_summary(chunk: DocAwareChunk, llm: LLM, doc_info: str) -> None:
     from onyx.llm.prompt_cache.processor import process_with_prompt_cache
 
     context_prompt1 = CONTEXTUAL_RAG_PROMPT1.format(document=doc_info)
+    context_prompt2 = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
+    try:
+        # Apply prompt caching: cache the document context (prompt1), chunk content is the suffix
+        # For string inputs with continuation=True, the result will be a concatenated string
+        processed_prompt, _ = process_with_prompt_cache(
+            llm_config=llm.config,
+            cacheable_prefix=UserMessage(content=context_prompt1),
+            suffix=UserMessage(content=context_prompt2),
+            continuation=True,  # Append chunk to the document context
+        )
 
-    def assign_context(chunk: DocAwareChunk) -> None:
-        context_prompt2 = CONTEXTUAL_RAG_PROMPT2.format(chunk=chunk.content)
-        try:
-            # Apply prompt caching: cache the document context (prompt1), chunk content is the suffix
-            # For string inputs with continuation=True, the result will be a concatenated string
-            processed_prompt, _ = process_with_prompt_cache(
-                llm_config=llm.config,
-                cacheable_prefix=UserMessage(content=context_prompt1),
-                suffix=UserMessage(content=context_prompt2),
-                continuation=True,  # Append chunk to the document context
-            )
+        chunk.chunk_context = _invoke_contextual_rag_llm(
+            llm,
+            processed_prompt,
+            cache_key=get_contextual_rag_cache_key(
+                llm,
+                CONTEXTUAL_RAG_PROMPT1,
+                CONTEXTUAL_RAG_PROMPT2,
+                doc_info,
+                chunk.content,
+            ),
+        )
 
-            response = llm.invoke(processed_prompt, max_tokens=MAX_CONTEXT_TOKENS)
-            chunk.chunk_context = llm_response_to_string(response)
+    except LLMRateLimitError as e:
+        # Erroring during chunker is undesirable, so we log the error and continue
+        logger.exception(
+            f"Rate limit adding chunk summary after retrying: {e}", exc_info=e
+        )
+        chunk.chunk_context = ""
+    except Exception as e:
+        logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
+        chunk.chunk_context = ""
 
-        except LLMRateLimitError as e:
-            # Erroring during chunker is undesirable, so we log the error and continue
-            # TODO: for v2, add robust retry logic
-            logger.exception(f"Rate limit adding chunk summary: {e}", exc_info=e)
-            chunk.chunk_context = ""
-        except Exception as e:
-            logger.exception(f"Error adding chunk summary: {e}", exc_info=e)
-            chunk.chunk_context = ""
+
+def add_chunk_summaries(
+    chunks_by_docs: list[list[DocAwareChunk]],
+    llm: LLM,
+    tokenizer: BaseTokenizer,
+    trunc_doc_chunk_tokens: int,
+    doc_tokens_by_docs: list[list[int] | None],
+) -> None:
+    """
+    Adds chunk summaries to the chunks grouped by document id.
+    Chunk summaries look at the chunk as well as the entire document (or a summary,
+    if the document is too long) and describe how the chunk relates to the document.
+
+    The chunks of all documents are summarized concurrently, the number of LLM calls
+    in flight is bounded by the contextual RAG LLM limiter.
+    """
+    # all chunks within a document have the same contextual_rag_reserved_tokens
+    docs_to_summarize = [
+        (chunks_by_doc, doc_tokens)
+        for chunks_by_doc, doc_tokens in zip(chunks_by_docs, doc_tokens_by_docs)
+        if chunks_by_doc[0].contextual_rag_reserved_tokens != 0
+    ]
+    doc_infos = run_functions_tuples_in_parallel(
+        [
+            (
+                _get_chunk_summary_doc_info,
+                (chunks_by_doc, llm, tokenizer, trunc_doc_chunk_tokens, doc_tokens),
+            )
+            for chunks_by_doc, doc_tokens in docs_to_summarize
+        ],
+        max_workers=CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS,
+    )
 
     run_functions_tuples_in_parallel(
-        [(assign_context, (chunk,)) for chunk in chunks_by_doc]
+        [
+            (_add_chunk_summary, (chunk, llm, doc_info))
+            for (chunks_by_doc, _), doc_info in zip(docs_to_summarize, doc_infos)
+            for chunk in chunks_by_doc
+        ],
+        max_workers=CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS,
     )
 
 
@@ -601,6 +858,7 @@ def add_contextual_summaries(
     doc2chunks = defaultdict(list)
     for chunk in chunks:
         doc2chunks[chunk.source_document.id].append(chunk)
+    chunks_by_docs = list(doc2chunks.values())
 
     # The number of tokens allowed for the document when computing a document summary
     trunc_doc_summary_tokens = llm.config.max_input_tokens - len(
@@ -615,90 +873,96 @@ def add_contextual_summaries(
     trunc_doc_chunk_tokens = (
         llm.config.max_input_tokens - prompt_tokens - chunk_token_limit
     )
-    for chunks_by_doc in doc2chunks.values():
-        doc_tokens = None
-        if USE_DOCUMENT_SUMMARY:
-            doc_tokens = add_document_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens
-            )
 
-        if USE_CHUNK_SUMMARY:
-            add_chunk_summaries(
-                chunks_by_doc, llm, tokenizer, trunc_doc_chunk_tokens, doc_tokens
-            )
+    # All documents of the batch are summarized concurrently
+    doc_tokens_by_docs: list[list[int] | None] = [None] * len(chunks_by_docs)
+    if USE_DOCUMENT_SUMMARY:
+        doc_tokens_by_docs = run_functions_tuples_in_parallel(
+            [
+                (
+                    add_document_summaries,
+                    (chunks_by_doc, llm, tokenizer, trunc_doc_summary_tokens),
+                )
+                for chunks_by_doc in chunks_by_docs
+            ],
+            max_workers=CONTEXTUAL_RAG_MAX_CONCURRENT_LLM_CALLS,
+        )
+
+    if USE_CHUNK_SUMMARY:
+        add_chunk_summaries(
+            chunks_by_docs,
+            llm,
+            tokenizer,
+            trunc_doc_chunk_tokens,
+            doc_tokens_by_docs,
+        )
 
     return chunks
 
 
-@log_function_time(debug_only=True)
-def index_doc_batch(
-    *,
-    document_batch: list[Document],
-    chunker: Chunker,
-    embedder: IndexingEmbedder,
-    document_indices: list[DocumentIndex],
-    request_id: str | None,
-    tenant_id: str,
-    adapter: IndexingBatchAdapter,
-    enable_contextual_rag: bool = False,
-    llm: LLM | None = None,
-    ignore_time_skip: bool = False,
-    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
-) -> IndexingPipelineResult:
-    """End-to-end indexing for a pre-batched set of documents."""
-    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
-    Note that the documents should already be batched at this point so that it does not inflate the
-    memory requirements
+_CHUNK_STAGE = "chunk"
+_EMBED_STAGE = "embed"
+_WRITE_STAGE = "write"
 
-    Returns a tuple where the first element is the number of new docs and the
-    second element is the number of chunks."""
+# How often threads blocked on a full or empty stage queue check if the pipeline
+# was aborted
+_STAGE_QUEUE_POLL_SECONDS = 0.5
+_STAGE_DONE = object()
 
-    # Log connector info for debugging OOM issues
-    connector_id = getattr(adapter, "connector_id", None)
-    credential_id = getattr(adapter, "credential_id", None)
-    logger.debug(
-        f"Starting index_doc_batch: connector_id={connector_id}, "
-        f"credential_id={credential_id}, tenant_id={tenant_id}, "
-        f"num_docs={len(document_batch)}"
-    )
 
-    filtered_documents = filter_fnc(document_batch)
-    context = adapter.prepare(filtered_documents, ignore_time_skip)
-    if not context:
-        return IndexingPipelineResult(
-            new_docs=0,
-            total_docs=len(filtered_documents),
-            total_chunks=0,
-            failures=[],
-        )
+@dataclass
+class _ChunkedSubBatch:
+    docs: list[Document]
+    indexable_docs: list[IndexingDocument]
+    # only the chunks that need to be written
+    chunks: list[DocAwareChunk]
+    # None if the documents are fully rewritten without hashing their chunks
+    doc_id_to_chunk_hashes: dict[str, list[str]] | None = None
+    doc_id_to_unchanged_chunk_cnt: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _EmbeddedSubBatch:
+    docs: list[Document]
+    indexable_docs: list[IndexingDocument]
+    chunks_with_embeddings: list[IndexChunk]
+    embedding_failures: list[ConnectorFailure]
+    doc_id_to_chunk_hashes: dict[str, list[str]] | None = None
+    doc_id_to_unchanged_chunk_cnt: dict[str, int] = field(default_factory=dict)
+    embedding_failure_isolation_calls: int = 0
+
+
+class _PipelineAborted(Exception):
+    """Raised in a pipeline stage when another stage has failed."""
+
 
+def _chunk_sub_batch(
+    docs: list[Document],
+    chunker: Chunker,
+    llm: LLM | None,
+    llm_tokenizer: BaseTokenizer | None,
+    doc_id_to_previous_chunk_hashes: dict[str, list[str]],
+    chunk_hash_seed: str | None,
+) -> _ChunkedSubBatch:
     # Convert documents to IndexingDocument objects with processed section
-    # logger.debug("Processing image sections")
-    context.indexable_docs = process_image_sections(context.updatable_docs)
+    indexable_docs = process_image_sections(docs)
 
     doc_descriptors = [
         {
             "doc_id": doc.id,
             "doc_length": doc.get_total_char_length(),
         }
-        for doc in context.indexable_docs
+        for doc in indexable_docs
     ]
     logger.debug(f"Starting indexing process for documents: {doc_descriptors}")
 
     logger.debug("Starting chunking")
     # NOTE: no special handling for failures here, since the chunker is not
     # a common source of failure for the indexing pipeline
-    chunks: list[DocAwareChunk] = chunker.chunk(context.indexable_docs)
-    llm_tokenizer: BaseTokenizer | None = None
+    chunks: list[DocAwareChunk] = chunker.chunk(indexable_docs)
 
     # contextual RAG
-    if enable_contextual_rag:
-        assert llm is not None, "must provide an LLM for contextual RAG"
-        llm_tokenizer = get_tokenizer(
-            model_name=llm.config.model_name,
-            provider_type=llm.config.model_provider,
-        )
-
+    if llm is not None and llm_tokenizer is not None:
         # Because the chunker's tokens are different from the LLM's tokens,
         # We add a fudge factor to ensure we truncate prompts to the LLM's token limit
         chunks = add_contextual_summaries(
@@ -708,21 +972,91 @@ def index_doc_batch(
             chunk_token_limit=chunker.chunk_token_limit * 2,
         )
 
+    if chunk_hash_seed is None:
+        return _ChunkedSubBatch(docs=docs, indexable_docs=indexable_docs, chunks=chunks)
+
+    # Chunks that are already in the document index as they are now don't need
+    # to be embedded or written again
+    chunk_diff = diff_chunks(
+        chunks=chunks,
+        doc_id_to_previous_chunk_hashes=doc_id_to_previous_chunk_hashes,
+        seed=chunk_hash_seed,
+    )
+    if chunk_diff.doc_id_to_unchanged_chunk_cnt:
+        logger.debug(
+            f"Skipping {len(chunks) - len(chunk_diff.changed_chunks)} unchanged "
+            f"chunks out of {len(chunks)}"
+        )
+    return _ChunkedSubBatch(
+        docs=docs,
+        indexable_docs=indexable_docs,
+        chunks=chunk_diff.changed_chunks,
+        doc_id_to_chunk_hashes=chunk_diff.doc_id_to_chunk_hashes,
+        doc_id_to_unchanged_chunk_cnt=chunk_diff.doc_id_to_unchanged_chunk_cnt,
+    )
+
+
+def _embed_sub_batch(
+    chunked: _ChunkedSubBatch,
+    embedder: IndexingEmbedder,
+    tenant_id: str,
+    request_id: str | None,
+) -> _EmbeddedSubBatch:
     logger.debug("Starting embedding")
-    chunks_with_embeddings, embedding_failures = (
+    chunks_with_embeddings, embedding_failures, failure_isolation_calls = (
         embed_chunks_with_failure_handling(
-            chunks=chunks,
+            chunks=chunked.chunks,
             embedder=embedder,
             tenant_id=tenant_id,
             request_id=request_id,
         )
-        if chunks
-        else ([], [])
+        if chunked.chunks
+        else ([], [], 0)
+    )
+    return _EmbeddedSubBatch(
+        docs=chunked.docs,
+        indexable_docs=chunked.indexable_docs,
+        chunks_with_embeddings=chunks_with_embeddings,
+        embedding_failures=embedding_failures,
+        doc_id_to_chunk_hashes=chunked.doc_id_to_chunk_hashes,
+        doc_id_to_unchanged_chunk_cnt=chunked.doc_id_to_unchanged_chunk_cnt,
+        embedding_failure_isolation_calls=failure_isolation_calls,
+    )
+
+
+def _write_sub_batch(
+    embedded: _EmbeddedSubBatch,
+    context: DocumentBatchPrepareContext,
+    filtered_documents: list[Document],
+    chunker: Chunker,
+    document_indices: list[DocumentIndex],
+    tenant_id: str,
+    adapter: IndexingBatchAdapter,
+) -> IndexingPipelineResult:
+    chunks_with_embeddings = embedded.chunks_with_embeddings
+    embedding_failures = embedded.embedding_failures
+    embedding_failed_doc_ids = {
+        failure.failed_document.document_id
+        for failure in embedding_failures
+        if failure.failed_document
+    }
+    # The unchanged chunks of a document that failed to embed are deleted along
+    # with the rest of its chunks
+    doc_id_to_unchanged_chunk_cnt = {
+        doc_id: chunk_cnt
+        for doc_id, chunk_cnt in embedded.doc_id_to_unchanged_chunk_cnt.items()
+        if doc_id not in embedding_failed_doc_ids
+    }
+    sub_batch_context = DocumentBatchPrepareContext(
+        updatable_docs=embedded.docs,
+        id_to_boost_map=context.id_to_boost_map,
+        indexable_docs=embedded.indexable_docs,
+        doc_id_to_unchanged_chunk_cnt=doc_id_to_unchanged_chunk_cnt,
     )
 
     chunk_content_scores = [1.0] * len(chunks_with_embeddings)
 
-    updatable_ids = [doc.id for doc in context.updatable_docs]
+    updatable_ids = [doc.id for doc in embedded.docs]
     updatable_chunk_data = [
         UpdatableChunkData(
             chunk_id=chunk.chunk_id,
@@ -735,7 +1069,7 @@ def index_doc_batch(
     # Acquires a lock on the documents so that no other process can modify them
     # NOTE: don't need to acquire till here, since this is when the actual race condition
     # with Vespa can occur.
-    with adapter.lock_context(context.updatable_docs):
+    with adapter.lock_context(embedded.docs):
         # we're concerned about race conditions where multiple simultaneous indexings might result
         # in one set of metadata overwriting another one in vespa.
         # we still write data here for the immediate and most likely correct sync, but
@@ -745,49 +1079,54 @@ def index_doc_batch(
             chunks_with_embeddings=chunks_with_embeddings,
             chunk_content_scores=chunk_content_scores,
             tenant_id=tenant_id,
-            context=context,
+            context=sub_batch_context,
         )
 
         short_descriptor_list = [chunk.to_short_descriptor() for chunk in result.chunks]
         short_descriptor_log = str(short_descriptor_list)[:1024]
         logger.debug(f"Indexing the following chunks: {short_descriptor_log}")
 
-        primary_doc_idx_insertion_records: list[DocumentInsertionRecord] | None = None
-        primary_doc_idx_vector_db_write_failures: list[ConnectorFailure] | None = None
-        for document_index in document_indices:
-            # A document will not be spread across different batches, so all the
-            # documents with chunks in this set, are fully represented by the chunks
-            # in this set
+        # A document will not be spread across different batches, so all the
+        # documents with chunks in this set, are fully represented by the chunks
+        # in this set
+        index_batch_params = IndexBatchParams(
+            doc_id_to_previous_chunk_cnt=result.doc_id_to_previous_chunk_cnt,
+            doc_id_to_new_chunk_cnt=result.doc_id_to_new_chunk_cnt,
+            tenant_id=tenant_id,
+            large_chunks_enabled=chunker.enable_large_chunks,
+        )
+        write_functions: list[tuple[Callable, tuple]] = [
             (
-                insertion_records,
-                vector_db_write_failures,
-            ) = write_chunks_to_vector_db_with_backoff(
-                document_index=document_index,
-                chunks=result.chunks,
-                index_batch_params=IndexBatchParams(
-                    doc_id_to_previous_chunk_cnt=result.doc_id_to_previous_chunk_cnt,
-                    doc_id_to_new_chunk_cnt=result.doc_id_to_new_chunk_cnt,
-                    tenant_id=tenant_id,
-                    large_chunks_enabled=chunker.enable_large_chunks,
-                ),
+                _write_chunks_to_document_index,
+                (document_index, result.chunks, index_batch_params),
             )
-
+            for document_index in document_indices
+        ]
+        write_results: list[DocumentIndexWriteResult]
+        if ENABLE_PARALLEL_DOCUMENT_INDEX_WRITES and len(write_functions) > 1:
+            # The indices are independent of each other, so dual writing costs
+            # as much wall-clock time as the slowest index rather than the sum.
+            write_results = run_functions_tuples_in_parallel(write_functions)
+        else:
+            write_results = [func(*args) for func, args in write_functions]
+
+        # Documents without a single changed chunk were not written at all
+        written_doc_ids = {chunk.source_document.id for chunk in result.chunks}
+        unchanged_doc_ids = set(doc_id_to_unchanged_chunk_cnt) - written_doc_ids
+        write_failed_doc_ids: set[str] = set()
+        document_index_write_seconds: dict[str, float] = {}
+        for document_index, write_result in zip(document_indices, write_results):
+            vector_db_write_failed_doc_ids = {
+                record.failed_document.document_id
+                for record in write_result.vector_db_write_failures
+                if record.failed_document
+            }
+            write_failed_doc_ids |= vector_db_write_failed_doc_ids
             all_returned_doc_ids: set[str] = (
-                {record.document_id for record in insertion_records}
-                .union(
-                    {
-                        record.failed_document.document_id
-                        for record in vector_db_write_failures
-                        if record.failed_document
-                    }
-                )
-                .union(
-                    {
-                        record.failed_document.document_id
-                        for record in embedding_failures
-                        if record.failed_document
-                    }
-                )
+                {record.document_id for record in write_result.insertion_records}
+                .union(vector_db_write_failed_doc_ids)
+                .union(embedding_failed_doc_ids)
+                .union(unchanged_doc_ids)
             )
             if all_returned_doc_ids != set(updatable_ids):
                 raise RuntimeError(
@@ -797,29 +1136,337 @@ def index_doc_batch(
                     "This should never happen."
                     f"This occured for document index {document_index.__class__.__name__}"
                 )
-            # We treat the first document index we got as the primary one used
-            # for reporting the state of indexing.
-            if primary_doc_idx_insertion_records is None:
-                primary_doc_idx_insertion_records = insertion_records
-            if primary_doc_idx_vector_db_write_failures is None:
-                primary_doc_idx_vector_db_write_failures = vector_db_write_failures
+            document_index_write_seconds[document_index.index_name] = (
+                write_result.elapsed_seconds
+            )
+
+        logger.debug(
+            f"Wrote {len(result.chunks)} chunks to document indices: "
+            + ", ".join(
+                f"{name}={elapsed:.2f}s"
+                for name, elapsed in document_index_write_seconds.items()
+            )
+        )
+
+        # Only documents that were fully written can skip their unchanged chunks
+        # next time, the rest are rewritten from scratch
+        if embedded.doc_id_to_chunk_hashes is not None:
+            sub_batch_context.doc_id_to_chunk_content_hashes = {
+                doc_id: (
+                    chunk_hashes
+                    if doc_id not in embedding_failed_doc_ids
+                    and doc_id not in write_failed_doc_ids
+                    else None
+                )
+                for doc_id, chunk_hashes in embedded.doc_id_to_chunk_hashes.items()
+            }
 
         adapter.post_index(
-            context=context,
+            context=sub_batch_context,
             updatable_chunk_data=updatable_chunk_data,
             filtered_documents=filtered_documents,
             result=result,
         )
 
-    assert primary_doc_idx_insertion_records is not None
-    assert primary_doc_idx_vector_db_write_failures is not None
+    # We treat the first document index we got as the primary one used for
+    # reporting the state of indexing.
+    primary_write_result = write_results[0]
     return IndexingPipelineResult(
         new_docs=len(
-            [r for r in primary_doc_idx_insertion_records if not r.already_existed]
+            [r for r in primary_write_result.insertion_records if not r.already_existed]
         ),
         total_docs=len(filtered_documents),
         total_chunks=len(chunks_with_embeddings),
-        failures=primary_doc_idx_vector_db_write_failures + embedding_failures,
+        failures=primary_write_result.vector_db_write_failures + embedding_failures,
+        document_index_write_seconds=document_index_write_seconds,
+        failure_isolation_calls={
+            _EMBED_STAGE: embedded.embedding_failure_isolation_calls,
+            _WRITE_STAGE: sum(
+                write_result.failure_isolation_calls for write_result in write_results
+            ),
+        },
+    )
+
+
+def _timed(
+    stage_seconds: dict[str, float], stage: str, func: Callable[[Any], R], arg: Any
+) -> R:
+    start = time.monotonic()
+    try:
+        return func(arg)
+    finally:
+        stage_seconds[stage] = stage_seconds.get(stage, 0.0) + (
+            time.monotonic() - start
+        )
+
+
+def _put_unless_aborted(
+    stage_queue: "queue.Queue[Any]", item: Any, aborted: threading.Event
+) -> None:
+    while True:
+        if aborted.is_set():
+            raise _PipelineAborted()
+        try:
+            stage_queue.put(item, timeout=_STAGE_QUEUE_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _get_unless_aborted(
+    stage_queue: "queue.Queue[Any]", aborted: threading.Event, drain: bool = False
+) -> Any:
+    """With drain, items queued before the abort are still returned."""
+    while True:
+        if drain:
+            try:
+                return stage_queue.get_nowait()
+            except queue.Empty:
+                pass
+        if aborted.is_set():
+            raise _PipelineAborted()
+        try:
+            return stage_queue.get(timeout=_STAGE_QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+
+
+def _run_pipeline_stage(
+    func: Callable[[Any], Any],
+    get_input: Callable[[], Any],
+    output_queue: "queue.Queue[Any]",
+    aborted: threading.Event,
+) -> float:
+    """Applies func to every input until the previous stage is done and passes
+    the results on to the next stage. Returns the seconds spent in func."""
+    busy_seconds = 0.0
+    try:
+        while (item := get_input()) is not _STAGE_DONE:
+            start = time.monotonic()
+            result = func(item)
+            busy_seconds += time.monotonic() - start
+            _put_unless_aborted(output_queue, result, aborted)
+        _put_unless_aborted(output_queue, _STAGE_DONE, aborted)
+    except Exception:
+        aborted.set()
+        raise
+    return busy_seconds
+
+
+def _run_pipelined(
+    sub_batches: list[list[Document]],
+    chunk: Callable[[list[Document]], _ChunkedSubBatch],
+    embed: Callable[[_ChunkedSubBatch], _EmbeddedSubBatch],
+    write: Callable[[_EmbeddedSubBatch], None],
+) -> dict[str, float]:
+    """Runs the chunk and embed stages in background threads, connected by
+    bounded queues, while the sub-batches are written in the calling thread
+    (which owns the DB session used for locking and finalizing documents).
+
+    Returns the seconds each stage spent working."""
+    chunked_queue: queue.Queue[Any] = queue.Queue(maxsize=INDEXING_PIPELINE_QUEUE_SIZE)
+    embedded_queue: queue.Queue[Any] = queue.Queue(maxsize=INDEXING_PIPELINE_QUEUE_SIZE)
+    aborted = threading.Event()
+    next_sub_batches = iter(sub_batches)
+
+    stage_threads = [
+        run_in_background(
+            _run_pipeline_stage,
+            chunk,
+            lambda: next(next_sub_batches, _STAGE_DONE),
+            chunked_queue,
+            aborted,
+        ),
+        run_in_background(
+            _run_pipeline_stage,
+            embed,
+            lambda: _get_unless_aborted(chunked_queue, aborted),
+            embedded_queue,
+            aborted,
+        ),
+    ]
+
+    write_seconds = 0.0
+    write_exception: Exception | None = None
+    try:
+        while (
+            # sub-batches embedded before a failure are still written
+            embedded := _get_unless_aborted(embedded_queue, aborted, drain=True)
+        ) is not _STAGE_DONE:
+            start = time.monotonic()
+            write(embedded)
+            write_seconds += time.monotonic() - start
+    except _PipelineAborted:
+        # the failed stage's exception is raised below
+        pass
+    except Exception as e:
+        aborted.set()
+        write_exception = e
+
+    for stage_thread in stage_threads:
+        stage_thread.join()
+    if write_exception is not None:
+        raise write_exception
+    for stage_thread in stage_threads:
+        if stage_thread.exception is not None and not isinstance(
+            stage_thread.exception, _PipelineAborted
+        ):
+            raise stage_thread.exception
+
+    chunk_seconds, embed_seconds = (
+        stage_thread.result for stage_thread in stage_threads
+    )
+    return {
+        _CHUNK_STAGE: chunk_seconds,
+        _EMBED_STAGE: embed_seconds,
+        _WRITE_STAGE: write_seconds,
+    }
+
+
+@log_function_time(debug_only=True)
+def index_doc_batch(
+    *,
+    document_batch: list[Document],
+    chunker: Chunker,
+    embedder: IndexingEmbedder,
+    document_indices: list[DocumentIndex],
+    request_id: str | None,
+    tenant_id: str,
+    adapter: IndexingBatchAdapter,
+    enable_contextual_rag: bool = False,
+    llm: LLM | None = None,
+    ignore_time_skip: bool = False,
+    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+) -> IndexingPipelineResult:
+    """End-to-end indexing for a pre-batched set of documents."""
+    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
+    Note that the documents should already be batched at this point so that it does not inflate the
+    memory requirements
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+
+    # Log connector info for debugging OOM issues
+    connector_id = getattr(adapter, "connector_id", None)
+    credential_id = getattr(adapter, "credential_id", None)
+    logger.debug(
+        f"Starting index_doc_batch: connector_id={connector_id}, "
+        f"credential_id={credential_id}, tenant_id={tenant_id}, "
+        f"num_docs={len(document_batch)}"
+    )
+
+    filtered_documents = filter_fnc(document_batch)
+    context = adapter.prepare(filtered_documents, ignore_time_skip)
+    if not context:
+        return IndexingPipelineResult(
+            new_docs=0,
+            total_docs=len(filtered_documents),
+            total_chunks=0,
+            failures=[],
+        )
+
+    pipeline_start = time.monotonic()
+    llm_tokenizer: BaseTokenizer | None = None
+    if enable_contextual_rag:
+        assert llm is not None, "must provide an LLM for contextual RAG"
+        llm_tokenizer = get_tokenizer(
+            model_name=llm.config.model_name,
+            provider_type=llm.config.model_provider,
+        )
+
+    # Unchanged chunks can only be left out if every index keeps them, the hashes
+    # are tied to the indices so they are never reused for a different index
+    chunk_hash_seed = (
+        ",".join(sorted(index.index_name for index in document_indices))
+        if ENABLE_INCREMENTAL_CHUNK_INDEXING
+        and document_indices
+        and all(index.supports_partial_document_writes for index in document_indices)
+        else None
+    )
+
+    def _chunk(docs: list[Document]) -> _ChunkedSubBatch:
+        return _chunk_sub_batch(
+            docs=docs,
+            chunker=chunker,
+            llm=llm,
+            llm_tokenizer=llm_tokenizer,
+            doc_id_to_previous_chunk_hashes=context.doc_id_to_previous_chunk_hashes,
+            chunk_hash_seed=chunk_hash_seed,
+        )
+
+    def _embed(chunked: _ChunkedSubBatch) -> _EmbeddedSubBatch:
+        return _embed_sub_batch(
+            chunked=chunked,
+            embedder=embedder,
+            tenant_id=tenant_id,
+            request_id=request_id,
+        )
+
+    # Documents that were filtered out as up to date are still marked as indexed,
+    # which is done together with the first sub-batch
+    updatable_ids = {doc.id for doc in context.updatable_docs}
+    up_to_date_documents = [
+        doc for doc in filtered_documents if doc.id not in updatable_ids
+    ]
+    sub_batch_results: list[IndexingPipelineResult] = []
+
+    def _write(embedded: _EmbeddedSubBatch) -> None:
+        sub_batch_results.append(
+            _write_sub_batch(
+                embedded=embedded,
+                context=context,
+                filtered_documents=(
+                    embedded.docs
+                    if sub_batch_results
+                    else embedded.docs + up_to_date_documents
+                ),
+                chunker=chunker,
+                document_indices=document_indices,
+                tenant_id=tenant_id,
+                adapter=adapter,
+            )
+        )
+
+    if (
+        INDEXING_PIPELINE_SUB_BATCH_SIZE > 0
+        and len(context.updatable_docs) > INDEXING_PIPELINE_SUB_BATCH_SIZE
+    ):
+        # Sub-batches flow through chunking, embedding and writing concurrently.
+        # A document is never split across sub-batches, and each sub-batch is
+        # written and finalized under its own lock_context.
+        stage_seconds = _run_pipelined(
+            sub_batches=batch_list(
+                context.updatable_docs, INDEXING_PIPELINE_SUB_BATCH_SIZE
+            ),
+            chunk=_chunk,
+            embed=_embed,
+            write=_write,
+        )
+    else:
+        stage_seconds = {}
+        chunked = _timed(stage_seconds, _CHUNK_STAGE, _chunk, context.updatable_docs)
+        embedded = _timed(stage_seconds, _EMBED_STAGE, _embed, chunked)
+        _timed(stage_seconds, _WRITE_STAGE, _write, embedded)
+
+    document_index_write_seconds: dict[str, float] = defaultdict(float)
+    failure_isolation_calls: dict[str, int] = defaultdict(int)
+    for sub_batch_result in sub_batch_results:
+        for name, elapsed in sub_batch_result.document_index_write_seconds.items():
+            document_index_write_seconds[name] += elapsed
+        for stage, calls in sub_batch_result.failure_isolation_calls.items():
+            failure_isolation_calls[stage] += calls
+
+    return IndexingPipelineResult(
+        new_docs=sum(result.new_docs for result in sub_batch_results),
+        total_docs=len(filtered_documents),
+        total_chunks=sum(result.total_chunks for result in sub_batch_results),
+        failures=[
+            failure for result in sub_batch_results for failure in result.failures
+        ],
+        document_index_write_seconds=dict(document_index_write_seconds),
+        stage_seconds=stage_seconds,
+        pipeline_seconds=time.monotonic() - pipeline_start,
+        failure_isolation_calls=dict(failure_isolation_calls),
     )
 
 
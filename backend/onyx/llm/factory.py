@@ -5,6 +5,8 @@ from onyx.auth.schemas import UserRole
 from onyx.configs.model_configs import GEN_AI_TEMPERATURE
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import LLMModelFlowType
+from onyx.db.hot_config_cache import get_hot_config
+from onyx.db.hot_config_cache import HotConfigNamespace
 from onyx.db.llm import can_user_access_llm_provider
 from onyx.db.llm import fetch_default_llm_model
 from onyx.db.llm import fetch_default_vision_model
@@ -75,6 +77,30 @@ def _build_model_kwargs(
     return model_kwargs
 
 
+def _get_llm_provider_view(provider_name: str) -> LLMProviderView | None:
+    def _load() -> LLMProviderView | None:
+        with get_session_with_current_tenant() as db_session:
+            provider_model = fetch_existing_llm_provider(provider_name, db_session)
+            if not provider_model:
+                return None
+            return LLMProviderView.from_model(provider_model)
+
+    return get_hot_config(
+        HotConfigNamespace.LLM_PROVIDERS, f"provider:{provider_name}", _load
+    )
+
+
+def _get_default_llm_model() -> tuple[str, LLMProviderView] | None:
+    def _load() -> tuple[str, LLMProviderView] | None:
+        with get_session_with_current_tenant() as db_session:
+            model = fetch_default_llm_model(db_session)
+            if not model:
+                return None
+            return model.name, LLMProviderView.from_model(model.llm_provider)
+
+    return get_hot_config(HotConfigNamespace.LLM_PROVIDERS, "default_model", _load)
+
+
 def get_llm_for_persona(
     persona: Persona | None,
     user: User,
@@ -96,29 +122,33 @@ def get_llm_for_persona(
             additional_headers=additional_headers,
         )
 
-    with get_session_with_current_tenant() as db_session:
-        provider_model = fetch_existing_llm_provider(provider_name, db_session)
-        if not provider_model:
-            raise ValueError("No LLM provider found")
-
-        # Fetch user group IDs for access control check
-        user_group_ids = fetch_user_group_ids(db_session, user)
-
-        if not can_user_access_llm_provider(
-            provider_model, user_group_ids, persona, user.role == UserRole.ADMIN
-        ):
-            logger.warning(
-                "User %s with persona %s cannot access provider %s. Falling back to default provider.",
-                user.id,
-                persona.id,
-                provider_model.name,
-            )
-            return get_default_llm(
-                temperature=temperature_override or GEN_AI_TEMPERATURE,
-                additional_headers=additional_headers,
-            )
+    llm_provider = _get_llm_provider_view(provider_name)
+    if not llm_provider:
+        raise ValueError("No LLM provider found")
+
+    # Everyone may use public providers, only restricted ones need the user's groups
+    if not llm_provider.is_public:
+        with get_session_with_current_tenant() as db_session:
+            provider_model = fetch_existing_llm_provider(provider_name, db_session)
+            if not provider_model:
+                raise ValueError("No LLM provider found")
 
-        llm_provider = LLMProviderView.from_model(provider_model)
+            # Fetch user group IDs for access control check
+            user_group_ids = fetch_user_group_ids(db_session, user)
+
+            if not can_user_access_llm_provider(
+                provider_model, user_group_ids, persona, user.role == UserRole.ADMIN
+            ):
+                logger.warning(
+                    "User %s with persona %s cannot access provider %s. Falling back to default provider.",
+                    user.id,
+                    persona.id,
+                    provider_model.name,
+                )
+                return get_default_llm(
+                    temperature=temperature_override or GEN_AI_TEMPERATURE,
+                    additional_headers=additional_headers,
+                )
 
     model = model_version_override or persona.llm_model_version_override
     if not model:
@@ -255,19 +285,18 @@ def get_default_llm(
     temperature: float | None = None,
     additional_headers: dict[str, str] | None = None,
 ) -> LLM:
-    with get_session_with_current_tenant() as db_session:
-        model = fetch_default_llm_model(db_session)
+    default_model = _get_default_llm_model()
+    if not default_model:
+        raise ValueError("No default LLM model found")
 
-        if not model:
-            raise ValueError("No default LLM model found")
-
-        return llm_from_provider(
-            model_name=model.name,
-            llm_provider=LLMProviderView.from_model(model.llm_provider),
-            timeout=timeout,
-            temperature=temperature,
-            additional_headers=additional_headers,
-        )
+    model_name, llm_provider = default_model
+    return llm_from_provider(
+        model_name=model_name,
+        llm_provider=llm_provider,
+        timeout=timeout,
+        temperature=temperature,
+        additional_headers=additional_headers,
+    )
 
 
 def get_llm(
@@ -14,25 +14,25 @@ from typing import cast
 
 import aioboto3  # type: ignore
 import httpx
-import requests
 import voyageai  # type: ignore[import-untyped]
 from cohere import AsyncClient as CohereAsyncClient
 from cohere.core.api_error import ApiError
 from google.oauth2 import service_account
 from httpx import HTTPError
-from requests import JSONDecodeError
-from requests import RequestException
-from requests import Response
 from retry import retry
 
 from onyx.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
+from onyx.configs.app_configs import INDEXING_LOCAL_EMBEDDING_MODEL_NUM_THREADS
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.configs.model_configs import BATCH_SIZE_ENCODE_CHUNKS
 from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
+from onyx.configs.model_configs import EMBEDDING_BATCH_TOKEN_BUDGET
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.db.models import SearchSettings
+from onyx.httpx.httpx_pool import AsyncHttpxPool
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.natural_language_processing.constants import DEFAULT_COHERE_MODEL
 from onyx.natural_language_processing.constants import DEFAULT_OPENAI_MODEL
@@ -49,8 +49,10 @@ from onyx.utils.text_processing import remove_invalid_unicode_chars
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import DOC_EMBEDDING_CONTEXT_SIZE
+from shared_configs.configs import EMBEDDING_API_HTTP_POOL_SIZE
 from shared_configs.configs import INDEXING_ONLY
 from shared_configs.configs import MODEL_SERVER_HOST
+from shared_configs.configs import MODEL_SERVER_HTTP_POOL_SIZE
 from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import SKIP_WARM_UP
@@ -84,94 +86,6 @@ _AUTH_ERROR_UNAUTHORIZED = "unauthorized"
 _AUTH_ERROR_INVALID_API_KEY = "invalid api key"
 _AUTH_ERROR_PERMISSION = "permission"
 
-# Thread-local storage for event loops
-# This prevents creating thousands of event loops during batch processing,
-# which was causing severe memory leaks with API-based embedding providers
-_thread_local = threading.local()
-
-
-def _get_or_create_event_loop() -> asyncio.AbstractEventLoop:
-    """Get or create a thread-local event loop for API embedding calls.
-
-    This prevents creating a new event loop for every batch during embedding,
-    which was causing memory leaks. Instead, each thread reuses the same loop.
-
-    Returns:
-        asyncio.AbstractEventLoop: The thread-local event loop
-    """
-    if (
-        not hasattr(_thread_local, "loop")
-        or _thread_local.loop is None
-        or _thread_local.loop.is_closed()
-    ):
-        _thread_local.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_thread_local.loop)
-    return _thread_local.loop
-
-
-def cleanup_embedding_thread_locals() -> None:
-    """Clean up thread-local event loops to prevent memory leaks.
-
-    This should be called after each task completes to ensure that
-    event loops and their associated resources are properly released.
-    Thread-local storage persists across Celery tasks when using the
-    thread pool, so explicit cleanup is necessary.
-
-    NOTE: This must be called from the SAME thread that created the event loop.
-    For ThreadPoolExecutor-based embedding, this cleanup happens automatically
-    via the _cleanup_thread_local wrapper.
-    """
-    if hasattr(_thread_local, "loop") and _thread_local.loop is not None:
-        loop = _thread_local.loop
-        if not loop.is_closed():
-            # Cancel all pending tasks in the event loop
-            try:
-                # Ensure loop is set as current event loop before accessing tasks
-                asyncio.set_event_loop(loop)
-                pending = asyncio.all_tasks(loop)
-                if pending:
-                    logger.debug(
-                        f"Cleaning up event loop with {len(pending)} pending tasks in thread {threading.current_thread().name}"
-                    )
-                    for task in pending:
-                        task.cancel()
-                    # Run the loop briefly to allow cancelled tasks to complete
-                    loop.run_until_complete(
-                        asyncio.gather(*pending, return_exceptions=True)
-                    )
-            except Exception as e:
-                # If gathering tasks fails, just close the loop
-                logger.debug(f"Error gathering tasks during cleanup: {e}")
-
-            # Close the event loop
-            loop.close()
-            logger.debug(
-                f"Closed event loop in thread {threading.current_thread().name}"
-            )
-
-        # Clear the thread-local reference
-        _thread_local.loop = None
-
-
-def _cleanup_thread_local(func: Callable) -> Callable:
-    """Decorator to ensure thread-local cleanup after function execution.
-
-    This wraps functions that run in ThreadPoolExecutor threads to ensure
-    that thread-local event loops are cleaned up after each execution,
-    preventing memory leaks from persistent thread-local storage.
-    """
-
-    @wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        try:
-            return func(*args, **kwargs)
-        finally:
-            # Clean up thread-local event loop after this thread's work is done
-            cleanup_embedding_thread_locals()
-
-    return wrapper
-
-
 WARM_UP_STRINGS = [
     "Onyx is amazing!",
     "Check out our easy deployment guide at",
@@ -179,6 +93,68 @@ WARM_UP_STRINGS = [
 ]
 
 
+def _get_model_server_client() -> httpx.Client:
+    """Returns the kept-alive client shared by all model server requests of this
+    process. The pid is part of the name so that forked processes never reuse
+    the connections of their parent."""
+    name = f"model_server_{os.getpid()}"
+    HttpxPool.init_client(
+        name=name,
+        http2=False,
+        # model server requests have never had a timeout
+        timeout=None,
+        limits=httpx.Limits(
+            max_connections=MODEL_SERVER_HTTP_POOL_SIZE,
+            max_keepalive_connections=MODEL_SERVER_HTTP_POOL_SIZE,
+        ),
+    )
+    return HttpxPool.get(name)
+
+
+def _get_embedding_api_client(
+    provider: EmbeddingProvider, timeout: float
+) -> httpx.AsyncClient:
+    """Returns the kept-alive client shared by all requests to the provider from
+    the running event loop."""
+    return AsyncHttpxPool.get(
+        f"embedding_{provider.value}",
+        http2=False,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=EMBEDDING_API_HTTP_POOL_SIZE,
+            max_keepalive_connections=EMBEDDING_API_HTTP_POOL_SIZE,
+        ),
+    )
+
+
+def build_token_budgeted_batches(
+    token_counts: list[int], max_batch_tokens: int, max_batch_size: int | None
+) -> list[list[int]]:
+    """Groups the indices of the texts into batches of texts with a similar token
+    count, so that little compute is wasted on padding short texts to the length
+    of the longest text in their batch.
+
+    A batch is closed once padding all of its texts to the longest one would go
+    over max_batch_tokens or it holds max_batch_size texts. Batches are returned
+    from the shortest to the longest texts."""
+    batches: list[list[int]] = []
+    current_batch: list[int] = []
+    for idx in sorted(range(len(token_counts)), key=lambda i: token_counts[i]):
+        # the texts are sorted, so this text is the longest one of the batch
+        padded_tokens = (len(current_batch) + 1) * max(token_counts[idx], 1)
+        if current_batch and (
+            padded_tokens > max_batch_tokens
+            or (max_batch_size is not None and len(current_batch) >= max_batch_size)
+        ):
+            batches.append(current_batch)
+            current_batch = []
+        current_batch.append(idx)
+
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
 def clean_model_name(model_str: str) -> str:
     return model_str.replace("/", "_").replace("-", "_").replace(".", "_")
 
@@ -261,7 +237,6 @@ class CloudEmbedding:
         self.api_url = api_url
         self.api_version = api_version
         self.timeout = timeout
-        self.http_client = httpx.AsyncClient(timeout=timeout)
         self._closed = False
         self.sanitized_api_key = api_key[:4] + "********" + api_key[-4:]
 
@@ -275,7 +250,11 @@ class CloudEmbedding:
 
         # Use the OpenAI specific timeout for this one
         client = openai.AsyncOpenAI(
-            api_key=self.api_key, timeout=OPENAI_EMBEDDING_TIMEOUT
+            api_key=self.api_key,
+            timeout=OPENAI_EMBEDDING_TIMEOUT,
+            http_client=_get_embedding_api_client(
+                self.provider, OPENAI_EMBEDDING_TIMEOUT
+            ),
         )
 
         final_embeddings: list[Embedding] = []
@@ -297,7 +276,11 @@ class CloudEmbedding:
         if not model:
             model = DEFAULT_COHERE_MODEL
 
-        client = CohereAsyncClient(api_key=self.api_key)
+        client = CohereAsyncClient(
+            api_key=self.api_key,
+            timeout=self.timeout,
+            httpx_client=_get_embedding_api_client(self.provider, self.timeout),
+        )
 
         final_embeddings: list[Embedding] = []
         for text_batch in batch_list(texts, _COHERE_MAX_INPUT_LEN):
@@ -459,7 +442,8 @@ class CloudEmbedding:
             {} if not self.api_key else {"Authorization": f"Bearer {self.api_key}"}
         )
 
-        response = await self.http_client.post(
+        http_client = _get_embedding_api_client(self.provider, self.timeout)
+        response = await http_client.post(
             self.api_url,
             json={
                 "model": model_name,
@@ -547,10 +531,9 @@ class CloudEmbedding:
         return CloudEmbedding(api_key, provider, api_url, api_version)
 
     async def aclose(self) -> None:
-        """Explicitly close the client."""
-        if not self._closed:
-            await self.http_client.aclose()
-            self._closed = True
+        """Explicitly close the client. The pooled http clients are shared and
+        stay open."""
+        self._closed = True
 
     async def __aenter__(self) -> "CloudEmbedding":
         return self
@@ -780,7 +763,7 @@ class EmbeddingModel:
         # Store the endpoint in a local variable to help mypy understand it's not None
         endpoint = self.embed_server_endpoint
 
-        def _make_request() -> Response:
+        def _make_request() -> httpx.Response:
             headers = {}
             if tenant_id:
                 headers["X-Onyx-Tenant-ID"] = tenant_id
@@ -788,7 +771,7 @@ class EmbeddingModel:
             if request_id:
                 headers["X-Onyx-Request-ID"] = request_id
 
-            response = requests.post(
+            response = _get_model_server_client().post(
                 endpoint,
                 headers=headers,
                 json=embed_request.model_dump(),
@@ -808,28 +791,23 @@ class EmbeddingModel:
             final_make_request_func = retry(
                 tries=3,
                 delay=5,
-                exceptions=(RequestException, ValueError, JSONDecodeError),
+                exceptions=(HTTPError, ValueError, json.JSONDecodeError),
             )(final_make_request_func)
             # use 10 second delay as per Azure suggestion
             final_make_request_func = retry(
                 tries=10, delay=10, exceptions=ModelServerRateLimitError
             )(final_make_request_func)
 
-        response: Response | None = None
-
         try:
             response = final_make_request_func()
             return EmbedResponse(**response.json())
-        except requests.HTTPError as e:
-            if not response:
-                raise HTTPError("HTTP error occurred - response is None.") from e
-
+        except httpx.HTTPStatusError as e:
             try:
-                error_detail = response.json().get("detail", str(e))
+                error_detail = e.response.json().get("detail", str(e))
             except Exception:
-                error_detail = response.text
+                error_detail = e.response.text
             raise HTTPError(f"HTTP error occurred: {error_detail}") from e
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise HTTPError(f"Request failed: {str(e)}") from e
 
     def _batch_encode_texts(
@@ -838,17 +816,36 @@ class EmbeddingModel:
         text_type: EmbedTextType,
         batch_size: int,
         max_seq_length: int,
-        num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
+        num_threads: int | None = None,
         tenant_id: str | None = None,
         request_id: str | None = None,
+        max_batch_tokens: int | None = None,
     ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+        if len(texts) > 1:
+            # the model truncates everything past max_seq_length
+            token_counts = [
+                min(len(self.tokenizer.encode(text)), max_seq_length) for text in texts
+            ]
+            index_batches = build_token_budgeted_batches(
+                token_counts,
+                max_batch_tokens=max_batch_tokens or batch_size * max_seq_length,
+                # API providers cap the number of texts per request, local models
+                # are only limited by the total number of tokens
+                max_batch_size=batch_size if self.provider_type else None,
+            )
+        else:
+            index_batches = [list(range(len(texts)))]
+        text_batches = [[texts[idx] for idx in batch] for batch in index_batches]
 
         logger.debug(f"Encoding {len(texts)} texts in {len(text_batches)} batches")
 
-        embeddings: list[Embedding] = []
+        if num_threads is None:
+            num_threads = (
+                INDEXING_EMBEDDING_MODEL_NUM_THREADS
+                if self.provider_type
+                else INDEXING_LOCAL_EMBEDDING_MODEL_NUM_THREADS
+            )
 
-        @_cleanup_thread_local
         def process_batch(
             batch_idx: int,
             batch_len: int,
@@ -882,11 +879,10 @@ class EmbeddingModel:
 
             # Route between direct API calls and model server calls
             if self.provider_type is not None:
-                # For API providers, make direct API call
-                # Use thread-local event loop to prevent memory leaks from creating
-                # thousands of event loops during batch processing
-                loop = _get_or_create_event_loop()
-                response = loop.run_until_complete(
+                # For API providers, make direct API call. All calls share one
+                # long-lived event loop, so the pooled provider clients and their
+                # connections are reused across batches and encode calls
+                response = AsyncHttpxPool.run(
                     self._make_direct_api_call(
                         embed_request, tenant_id=tenant_id, request_id=request_id
                     )
@@ -908,9 +904,9 @@ class EmbeddingModel:
 
         # only multi thread if:
         #   1. num_threads is greater than 1
-        #   2. we are using an API-based embedding model (provider_type is not None)
-        #   3. there are more than 1 batch (no point in threading if only 1)
-        if num_threads >= 1 and self.provider_type and len(text_batches) > 1:
+        #   2. there are more than 1 batch (no point in threading if only 1)
+        batch_results: list[tuple[int, list[Embedding]]] = []
+        if num_threads > 1 and len(text_batches) > 1:
             with ThreadPoolExecutor(max_workers=num_threads) as executor:
                 future_to_batch = {
                     executor.submit(
@@ -926,33 +922,32 @@ class EmbeddingModel:
                     for idx, batch in enumerate(text_batches, start=1)
                 }
 
-                # Collect results in order
-                batch_results: list[tuple[int, list[Embedding]]] = []
                 for future in as_completed(future_to_batch):
                     try:
-                        result = future.result()
-                        batch_results.append(result)
+                        batch_results.append(future.result())
                     except Exception as e:
                         logger.exception("Embedding model failed to process batch")
                         raise e
-
-                # Sort by batch index and extend embeddings
-                batch_results.sort(key=lambda x: x[0])
-                for _, batch_embeddings in batch_results:
-                    embeddings.extend(batch_embeddings)
         else:
-            # Original sequential processing
             for idx, text_batch in enumerate(text_batches, start=1):
-                _, batch_embeddings = process_batch(
-                    idx,
-                    len(text_batches),
-                    text_batch,
-                    tenant_id=tenant_id,
-                    request_id=request_id,
+                batch_results.append(
+                    process_batch(
+                        idx,
+                        len(text_batches),
+                        text_batch,
+                        tenant_id=tenant_id,
+                        request_id=request_id,
+                    )
                 )
-                embeddings.extend(batch_embeddings)
 
-        return embeddings
+        # Restore the original order of the texts
+        embeddings: list[Embedding | None] = [None] * len(texts)
+        for batch_idx, batch_embeddings in batch_results:
+            for text_idx, embedding in zip(
+                index_batches[batch_idx - 1], batch_embeddings
+            ):
+                embeddings[text_idx] = embedding
+        return cast(list[Embedding], embeddings)
 
     @log_function_time(print_only=True, debug_only=True)
     def encode(
@@ -1002,6 +997,7 @@ class EmbeddingModel:
             max_seq_length=max_seq_length,
             tenant_id=tenant_id,
             request_id=request_id,
+            max_batch_tokens=EMBEDDING_BATCH_TOKEN_BUDGET,
         )
 
     @classmethod
@@ -1119,7 +1115,7 @@ class RerankingModel:
                 api_url=self.api_url,
             )
 
-            response = requests.post(
+            response = _get_model_server_client().post(
                 self.rerank_server_endpoint, json=rerank_request.model_dump()
             )
             response.raise_for_status()
@@ -1152,7 +1148,7 @@ class QueryAnalysisModel:
             semantic_percent_threshold=self.semantic_percent_threshold,
         )
 
-        response = requests.post(
+        response = _get_model_server_client().post(
             self.intent_server_endpoint, json=intent_request.model_dump()
         )
         response.raise_for_status()
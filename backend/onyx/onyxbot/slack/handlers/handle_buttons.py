@@ -13,7 +13,6 @@ from onyx.chat.process_message import remove_answer_citations
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import SearchFeedbackType
 from onyx.configs.onyxbot_configs import ONYX_BOT_FOLLOWUP_EMOJI
-from onyx.connectors.slack.utils import expert_info_from_slack_id
 from onyx.context.search.models import SavedSearchDoc
 from onyx.context.search.models import SearchDoc
 from onyx.db.chat import get_chat_message
@@ -38,9 +37,11 @@ from onyx.onyxbot.slack.handlers.handle_message import (
 from onyx.onyxbot.slack.handlers.handle_regular_answer import (
     handle_regular_answer,
 )
+from onyx.onyxbot.slack.metadata_cache import get_slack_user_info
 from onyx.onyxbot.slack.models import SlackMessageInfo
 from onyx.onyxbot.slack.utils import build_feedback_id
 from onyx.onyxbot.slack.utils import decompose_action_id
+from onyx.onyxbot.slack.utils import fetch_expert_info_from_slack_id
 from onyx.onyxbot.slack.utils import fetch_group_ids_from_names
 from onyx.onyxbot.slack.utils import fetch_slack_user_ids_from_emails
 from onyx.onyxbot.slack.utils import get_channel_name_from_id
@@ -131,7 +132,7 @@ def handle_generate_answer_button(
     message_ts = req.payload["message"]["ts"]
     thread_ts = req.payload["container"].get("thread_ts", None)
     user_id = req.payload["user"]["id"]
-    expert_info = expert_info_from_slack_id(user_id, client.web_client, user_cache={})
+    expert_info = fetch_expert_info_from_slack_id(user_id, client.web_client)
     email = expert_info.email if expert_info else None
 
     if not thread_ts:
@@ -371,9 +372,7 @@ def handle_slack_feedback(
     message_id, doc_id, doc_rank = decompose_action_id(feedback_id)
 
     # Get Onyx user from Slack ID
-    expert_info = expert_info_from_slack_id(
-        user_id_to_post_confirmation, client, user_cache={}
-    )
+    expert_info = fetch_expert_info_from_slack_id(user_id_to_post_confirmation, client)
     email = expert_info.email if expert_info else None
 
     with get_session_with_current_tenant() as db_session:
@@ -518,10 +517,9 @@ def get_clicker_name(
     clicker_name = req.payload.get("user", {}).get("name", "Someone")
     clicker_real_name = None
     try:
-        clicker = client.web_client.users_info(user=req.payload["user"]["id"])
-        clicker_real_name = (
-            cast(dict, clicker.data).get("user", {}).get("profile", {}).get("real_name")
-        )
+        clicker = get_slack_user_info(client.web_client, req.payload["user"]["id"])
+        if clicker:
+            clicker_real_name = clicker["profile"].get("real_name")
     except Exception:
         # Likely a scope issue
         pass
@@ -31,7 +31,6 @@ from onyx.configs.app_configs import POD_NAMESPACE
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.onyxbot_configs import NOTIFY_SLACKBOT_NO_ANSWER
-from onyx.connectors.slack.utils import expert_info_from_slack_id
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.engine.sql_engine import get_session_with_tenant
 from onyx.db.engine.sql_engine import SqlEngine
@@ -81,6 +80,7 @@ from onyx.onyxbot.slack.models import SlackMessageInfo
 from onyx.onyxbot.slack.models import ThreadMessage
 from onyx.onyxbot.slack.utils import check_message_limit
 from onyx.onyxbot.slack.utils import decompose_action_id
+from onyx.onyxbot.slack.utils import fetch_expert_info_from_slack_id
 from onyx.onyxbot.slack.utils import get_channel_name_from_id
 from onyx.onyxbot.slack.utils import get_channel_type_from_id
 from onyx.onyxbot.slack.utils import get_onyx_bot_auth_ids
@@ -840,9 +840,7 @@ def build_request_details(
         message_ts = event.get("ts")
         thread_ts = event.get("thread_ts")
         sender_id = event.get("user") or None
-        expert_info = expert_info_from_slack_id(
-            sender_id, client.web_client, user_cache={}
-        )
+        expert_info = fetch_expert_info_from_slack_id(sender_id, client.web_client)
         email = expert_info.email if expert_info else None
 
         msg = remove_onyx_bot_tag(tenant_id, msg, client=client.web_client)
@@ -919,9 +917,7 @@ def build_request_details(
         channel_name = req.payload["channel_name"]
         msg = req.payload["text"]
         sender = req.payload["user_id"]
-        expert_info = expert_info_from_slack_id(
-            sender, client.web_client, user_cache={}
-        )
+        expert_info = fetch_expert_info_from_slack_id(sender, client.web_client)
         email = expert_info.email if expert_info else None
 
         # Get proper channel type for slash commands too
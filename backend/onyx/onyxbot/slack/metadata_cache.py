@@ -0,0 +1,232 @@
+"""Per-tenant cache of Slack channel and user metadata, shared by the Slack bot and
+federated Slack search.
+
+The bot looks up the channel and the sender of every incoming message, which in
+busy workspaces quickly runs into the Tier 3 rate limits of conversations.info and
+users.info, while the metadata itself rarely changes. Values are cached in process
+and in Redis (under the tenant's prefix) and are scoped by the token they were
+fetched with, since different bots and users may see different channels and
+users. Lookups of users that do not exist are cached for a shorter time.
+
+Values read from Redis are only kept in process for the rest of their Redis TTL,
+so no value is served for longer than the TTL after it was fetched.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+from typing import cast
+from typing import TypeVar
+
+from prometheus_client import Counter
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from onyx.configs.app_configs import SLACK_METADATA_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import SLACK_METADATA_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import SLACK_METADATA_NEGATIVE_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+_KEY_PREFIX = "slack_metadata_cache"
+
+# Slack API errors meaning that the looked up user does not exist (or is not
+# visible to the token), anything else (e.g. rate limits) is not cached
+_USER_NOT_FOUND_ERRORS = {"user_not_found", "users_not_found"}
+
+# The only user fields read by the Slack bot, users.info returns many more
+_USER_FIELDS = ("id", "name", "real_name", "is_bot", "deleted")
+_USER_PROFILE_FIELDS = ("email", "display_name", "real_name", "first_name", "last_name")
+
+
+class SlackMetadataKind(str, Enum):
+    CHANNEL = "channel"
+    CHANNEL_LIST = "channel_list"
+    USER = "user"
+    USER_ID_BY_EMAIL = "user_id_by_email"
+    USER_PROFILE_NAME = "user_profile_name"
+
+
+_slack_metadata_lookups = Counter(
+    "onyx_slack_metadata_cache_lookups_total",
+    "Total Slack metadata cache lookups by kind and result",
+    ["kind", "result"],
+)
+
+
+@dataclass(frozen=True)
+class _CachedValue:
+    expires_at: float
+    value: Any
+
+
+# tenant ID, kind, scope, key
+_CacheKey = tuple[str, SlackMetadataKind, str, str]
+
+_local_cache: OrderedDict[_CacheKey, _CachedValue] = OrderedDict()
+_lock = threading.Lock()
+
+
+def slack_token_scope(token: str | None) -> str:
+    """Scope of the metadata fetched with a token, the token itself is not used in
+    cache keys."""
+    return hashlib.sha256(str(token or "").encode()).hexdigest()[:16]
+
+
+def _redis_key(kind: SlackMetadataKind, scope: str, key: str) -> str:
+    return f"{_KEY_PREFIX}:{kind.value}:{scope}:{key}"
+
+
+def _store_local(cache_key: _CacheKey, value: Any, ttl_seconds: int) -> None:
+    with _lock:
+        _local_cache[cache_key] = _CachedValue(
+            expires_at=time.monotonic() + ttl_seconds, value=value
+        )
+        _local_cache.move_to_end(cache_key)
+        while len(_local_cache) > SLACK_METADATA_CACHE_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def get_slack_metadata(
+    kind: SlackMetadataKind,
+    scope: str,
+    key: str,
+    fetch: Callable[[], T | None],
+    ttl_seconds: int | None = None,
+    negative_ttl_seconds: int | None = None,
+) -> T | None:
+    """Returns the value cached under `key`, calling `fetch` to fetch and cache it
+    otherwise. `fetch` returns None if the entity does not exist, which is cached
+    for the negative TTL, and raises on errors that must not be cached (e.g. rate
+    limits). Values must be JSON serializable and must not be modified by callers
+    since they are shared."""
+    if ttl_seconds is None:
+        ttl_seconds = SLACK_METADATA_CACHE_TTL_SECONDS
+    if negative_ttl_seconds is None:
+        negative_ttl_seconds = SLACK_METADATA_NEGATIVE_CACHE_TTL_SECONDS
+    if ttl_seconds <= 0:
+        return fetch()
+
+    tenant_id = get_current_tenant_id()
+    cache_key = (tenant_id, kind, scope, key)
+    with _lock:
+        cached = _local_cache.get(cache_key)
+        if cached is not None and cached.expires_at > time.monotonic():
+            _local_cache.move_to_end(cache_key)
+            _slack_metadata_lookups.labels(kind=kind.value, result="local_hit").inc()
+            return cached.value
+
+    redis_key = _redis_key(kind, scope, key)
+    redis_client = None
+    try:
+        redis_client = get_redis_client(tenant_id=tenant_id)
+        raw_value = cast(bytes | None, redis_client.get(redis_key))
+        if raw_value is not None:
+            value = json.loads(raw_value)
+            _slack_metadata_lookups.labels(kind=kind.value, result="redis_hit").inc()
+            local_ttl_seconds = (
+                ttl_seconds if value is not None else negative_ttl_seconds
+            )
+            # -1 if the key has no expiry, -2 if it expired since it was read
+            remaining_ttl_seconds = cast(int, redis_client.ttl(redis_key))
+            if remaining_ttl_seconds != -1:
+                local_ttl_seconds = min(local_ttl_seconds, remaining_ttl_seconds)
+            if local_ttl_seconds > 0:
+                _store_local(cache_key, value, local_ttl_seconds)
+            return value
+    except Exception:
+        logger.exception(f"Failed to read the Slack {kind.value} metadata cache")
+
+    value = fetch()
+    _slack_metadata_lookups.labels(kind=kind.value, result="miss").inc()
+
+    value_ttl_seconds = ttl_seconds if value is not None else negative_ttl_seconds
+    if value_ttl_seconds <= 0:
+        return value
+    _store_local(cache_key, value, value_ttl_seconds)
+    if redis_client is not None:
+        try:
+            redis_client.set(redis_key, json.dumps(value), ex=value_ttl_seconds)
+        except Exception:
+            logger.exception(f"Failed to cache the Slack {kind.value} metadata")
+    return value
+
+
+def _is_user_not_found(e: SlackApiError) -> bool:
+    return e.response is not None and e.response.get("error") in _USER_NOT_FOUND_ERRORS
+
+
+def get_slack_channel_info(client: WebClient, channel_id: str) -> dict[str, Any]:
+    """conversations.info of the channel. Raises SlackApiError if the lookup fails,
+    failed lookups are not cached since events always come from existing channels."""
+
+    def _fetch() -> dict[str, Any]:
+        response = client.conversations_info(channel=channel_id)
+        response.validate()
+        return cast(dict[str, Any], response["channel"])
+
+    channel = get_slack_metadata(
+        SlackMetadataKind.CHANNEL, slack_token_scope(client.token), channel_id, _fetch
+    )
+    return cast(dict[str, Any], channel)
+
+
+def get_slack_user_info(client: WebClient, user_id: str) -> dict[str, Any] | None:
+    """users.info of the user reduced to the fields used by the Slack bot, None if
+    the user does not exist."""
+
+    def _fetch() -> dict[str, Any] | None:
+        try:
+            response = client.users_info(user=user_id)
+        except SlackApiError as e:
+            if _is_user_not_found(e):
+                return None
+            raise
+        if not response["ok"]:
+            return None
+
+        user: dict[str, Any] = cast(dict[str, Any], response.data).get("user", {})
+        profile: dict[str, Any] = user.get("profile", {})
+        return {
+            **{field: user[field] for field in _USER_FIELDS if field in user},
+            "profile": {
+                field: profile[field]
+                for field in _USER_PROFILE_FIELDS
+                if field in profile
+            },
+        }
+
+    return get_slack_metadata(
+        SlackMetadataKind.USER, slack_token_scope(client.token), user_id, _fetch
+    )
+
+
+def get_slack_user_id_by_email(client: WebClient, email: str) -> str | None:
+    """ID of the user with the email, None if there is no such user."""
+
+    def _fetch() -> str | None:
+        try:
+            response = client.users_lookupByEmail(email=email)
+        except SlackApiError as e:
+            if _is_user_not_found(e):
+                return None
+            raise
+        return cast(dict[str, Any], response.data)["user"]["id"]
+
+    return get_slack_metadata(
+        SlackMetadataKind.USER_ID_BY_EMAIL,
+        slack_token_scope(client.token),
+        email.lower(),
+        _fetch,
+    )
@@ -31,10 +31,15 @@ from onyx.configs.onyxbot_configs import (
 from onyx.configs.onyxbot_configs import (
     ONYX_BOT_RESPONSE_LIMIT_TIME_PERIOD_SECONDS,
 )
+from onyx.connectors.models import BasicExpertInfo
+from onyx.connectors.slack.utils import expert_info_from_slack_user
 from onyx.connectors.slack.utils import SlackTextCleaner
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.users import get_user_by_email
 from onyx.onyxbot.slack.constants import FeedbackVisibility
+from onyx.onyxbot.slack.metadata_cache import get_slack_channel_info
+from onyx.onyxbot.slack.metadata_cache import get_slack_user_id_by_email
+from onyx.onyxbot.slack.metadata_cache import get_slack_user_info
 from onyx.onyxbot.slack.models import ChannelType
 from onyx.onyxbot.slack.models import ThreadMessage
 from onyx.utils.logger import setup_logger
@@ -85,25 +90,19 @@ def get_channel_type_from_id(web_client: WebClient, channel_id: str) -> ChannelT
     Returns: ChannelType enum value
     """
     try:
-        channel_info = web_client.conversations_info(channel=channel_id)
-        if channel_info.get("ok") and channel_info.get("channel"):
-            channel: dict[str, Any] = channel_info.get("channel", {})
-
-            if channel.get("is_im"):
-                return ChannelType.IM  # Direct message
-            elif channel.get("is_mpim"):
-                return ChannelType.MPIM  # Multi-person direct message
-            elif channel.get("is_private"):
-                return ChannelType.PRIVATE_CHANNEL  # Private channel
-            elif channel.get("is_channel"):
-                return ChannelType.PUBLIC_CHANNEL  # Public channel
-            else:
-                logger.warning(
-                    f"Could not determine channel type for {channel_id}, defaulting to unknown"
-                )
-                return ChannelType.UNKNOWN
+        channel = get_slack_channel_info(web_client, channel_id)
+        if channel.get("is_im"):
+            return ChannelType.IM  # Direct message
+        elif channel.get("is_mpim"):
+            return ChannelType.MPIM  # Multi-person direct message
+        elif channel.get("is_private"):
+            return ChannelType.PRIVATE_CHANNEL  # Private channel
+        elif channel.get("is_channel"):
+            return ChannelType.PUBLIC_CHANNEL  # Public channel
         else:
-            logger.warning(f"Invalid channel info response for {channel_id}")
+            logger.warning(
+                f"Could not determine channel type for {channel_id}, defaulting to unknown"
+            )
             return ChannelType.UNKNOWN
     except Exception as e:
         logger.warning(
@@ -425,9 +424,7 @@ def remove_slack_text_interactions(slack_str: str) -> str:
 
 
 def get_channel_from_id(client: WebClient, channel_id: str) -> dict[str, Any]:
-    response = client.conversations_info(channel=channel_id)
-    response.validate()
-    return response["channel"]
+    return get_slack_channel_info(client, channel_id)
 
 
 def get_channel_name_from_id(
@@ -450,9 +447,12 @@ def fetch_slack_user_ids_from_emails(
     failed_to_find: list[str] = []
     for email in user_emails:
         try:
-            user = client.users_lookupByEmail(email=email)
-            user_ids.append(user.data["user"]["id"])  # type: ignore
+            user_id = get_slack_user_id_by_email(client, email)
         except Exception:
+            user_id = None
+        if user_id:
+            user_ids.append(user_id)
+        else:
             logger.error(f"Was not able to find slack user by email: {email}")
             failed_to_find.append(email)
 
@@ -533,12 +533,10 @@ def fetch_user_semantic_id_from_id(
     if not user_id:
         return None
 
-    response = client.users_info(user=user_id)
-    if not response["ok"]:
+    user = get_slack_user_info(client, user_id)
+    if not user:
         return None
 
-    user: dict = cast(dict[Any, dict], response.data).get("user", {})
-
     return (
         user.get("real_name")
         or user.get("name")
@@ -546,6 +544,16 @@ def fetch_user_semantic_id_from_id(
     )
 
 
+def fetch_expert_info_from_slack_id(
+    user_id: str | None, client: WebClient
+) -> BasicExpertInfo | None:
+    if not user_id:
+        return None
+
+    user = get_slack_user_info(client, user_id)
+    return expert_info_from_slack_user(user) if user else None
+
+
 def read_slack_thread(
     tenant_id: str, channel: str, thread: str, client: WebClient
 ) -> list[ThreadMessage]:
@@ -633,7 +641,8 @@ def slack_usage_report(action: str, sender_id: str | None, client: WebClient) ->
     onyx_user = None
     sender_email = None
     try:
-        sender_email = client.users_info(user=sender_id).data["user"]["profile"]["email"]  # type: ignore
+        sender = get_slack_user_info(client, sender_id) if sender_id else None
+        sender_email = sender["profile"]["email"] if sender else None
     except Exception:
         logger.warning("Unable to find sender email")
 
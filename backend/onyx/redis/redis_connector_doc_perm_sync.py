@@ -175,29 +175,26 @@ class RedisConnectorPermissionSync:
         credential_id: int,
         task_logger: Logger | None = None,
     ) -> PermissionSyncResult:
-        """Update permissions for documents and hierarchy nodes.
+        """Update permissions for documents and hierarchy nodes. All elements are
+        written to the DB as a single batch.
 
         Returns:
             PermissionSyncResult containing counts of successful updates and errors
         """
-        last_lock_time = time.monotonic()
+        if lock:
+            lock.reacquire()
 
+        elements_update_permissions_fn = fetch_versioned_implementation(
+            "onyx.background.celery.tasks.doc_permission_syncing.tasks",
+            "elements_update_permissions",
+        )
         element_update_permissions_fn = fetch_versioned_implementation(
             "onyx.background.celery.tasks.doc_permission_syncing.tasks",
             "element_update_permissions",
         )
 
-        num_permissions = 0
-        num_errors = 0
-        # Create a task for each permission sync
+        permissions_to_update: list[ElementExternalAccess] = []
         for permissions in new_permissions:
-            current_time = time.monotonic()
-            if lock and current_time - last_lock_time >= (
-                CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
-            ):
-                lock.reacquire()
-                last_lock_time = current_time
-
             if (
                 permissions.external_access.num_entries
                 > permissions.external_access.MAX_NUM_ENTRIES
@@ -219,12 +216,47 @@ class RedisConnectorPermissionSync:
                         f"{permissions.external_access.MAX_NUM_ENTRIES=}"
                     )
                 continue
+            permissions_to_update.append(permissions)
+
+        if not permissions_to_update:
+            return PermissionSyncResult(num_updated=0, num_errors=0)
+
+        # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
+        # but the permissions can be excessively large if sent over the wire.
+        # On the other hand, the downside of doing db updates here is that we can
+        # block and fail if we can't make the calls to the DB ... but that's probably
+        # a rare enough case to be acceptable.
+
+        # The whole batch is written together, if that fails the elements are
+        # retried one by one so a single bad element doesn't fail the entire batch
+        try:
+            elements_update_permissions_fn(
+                self.tenant_id,
+                permissions_to_update,
+                source_string,
+                connector_id,
+                credential_id,
+            )
+            return PermissionSyncResult(
+                num_updated=len(permissions_to_update), num_errors=0
+            )
+        except Exception:
+            if task_logger:
+                task_logger.exception(
+                    f"Failed to update permissions for a batch of "
+                    f"{len(permissions_to_update)} elements, retrying one by one"
+                )
 
-            # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
-            # but the permissions can be excessively large if sent over the wire.
-            # On the other hand, the downside of doing db updates here is that we can
-            # block and fail if we can't make the calls to the DB ... but that's probably
-            # a rare enough case to be acceptable.
+        last_lock_time = time.monotonic()
+        num_permissions = 0
+        num_errors = 0
+        for permissions in permissions_to_update:
+            current_time = time.monotonic()
+            if lock and current_time - last_lock_time >= (
+                CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
+            ):
+                lock.reacquire()
+                last_lock_time = current_time
 
             # This can internally exception due to db issues but still continue
             # Catch exceptions per-element to avoid breaking the entire sync
@@ -54,7 +54,7 @@ from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SearchDocsResponse
 from onyx.context.search.pipeline import merge_individual_chunks
-from onyx.context.search.pipeline import search_pipeline
+from onyx.context.search.pipeline import multi_query_search_pipeline
 from onyx.context.search.utils import convert_inference_sections_to_search_docs
 from onyx.db.connector import check_connectors_exist
 from onyx.db.connector import check_federated_connectors_exist
@@ -99,7 +99,7 @@ from onyx.tools.tool_implementations.search.constants import (
 )
 from onyx.tools.tool_implementations.search.constants import ORIGINAL_QUERY_WEIGHT
 from onyx.tools.tool_implementations.search.search_utils import (
-    expand_section_with_context,
+    expand_sections_with_context,
 )
 from onyx.tools.tool_implementations.search.search_utils import (
     merge_overlapping_sections,
@@ -420,37 +420,41 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         finally:
             db_session.close()
 
-    def _run_search_for_query(
+    def _run_multi_query_search(
         self,
-        query: str,
-        hybrid_alpha: float | None,
+        queries: list[tuple[str, float | None]],
         num_hits: int,
-    ) -> list[InferenceChunk]:
-        """Run search pipeline for a single query.
+    ) -> list[list[InferenceChunk]]:
+        """Run the search pipeline for several queries at once.
 
         Args:
-            query: The search query string
-            hybrid_alpha: Hybrid search alpha parameter (None for default)
-            num_hits: Maximum number of hits to return
+            queries: The search query strings with their hybrid search alpha
+                parameter (None for default)
+            num_hits: Maximum number of hits to return per query
 
         Returns:
-            List of InferenceChunk results
+            List of InferenceChunk results for each query, in order
         """
         # Create a thread-safe session for this search
         search_db_session = self._get_thread_safe_session()
         try:
-            return search_pipeline(
+            return multi_query_search_pipeline(
                 db_session=search_db_session,
-                chunk_search_request=ChunkSearchRequest(
-                    query=query,
-                    hybrid_alpha=hybrid_alpha,
-                    # For projects, the search scope is the project and has no other limits
-                    user_selected_filters=(
-                        self.user_selected_filters if self.project_id is None else None
-                    ),
-                    bypass_acl=self.bypass_acl,
-                    limit=num_hits,
-                ),
+                chunk_search_requests=[
+                    ChunkSearchRequest(
+                        query=query,
+                        hybrid_alpha=hybrid_alpha,
+                        # For projects, the search scope is the project and has no other limits
+                        user_selected_filters=(
+                            self.user_selected_filters
+                            if self.project_id is None
+                            else None
+                        ),
+                        bypass_acl=self.bypass_acl,
+                        limit=num_hits,
+                    )
+                    for query, hybrid_alpha in queries
+                ],
                 project_id=self.project_id,
                 document_index=self.document_index,
                 user=self.user,
@@ -539,6 +543,7 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
 
         # Initialize timing variables (in case of early exceptions)
         query_expansion_elapsed = 0.0
+        search_elapsed = 0.0
         document_selection_elapsed = 0.0
         document_expansion_elapsed = 0.0
 
@@ -670,41 +675,39 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 )
             )
 
-            # Run all searches in parallel with appropriate hybrid_alpha values
+            # Run all index searches as one multi query search with appropriate hybrid_alpha values
             # Keyword queries use hybrid_alpha=0.2 (favor keyword search)
             # Other queries use default hybrid_alpha (balanced semantic/keyword)
-            search_functions: list[tuple[Callable, tuple]] = []
+            index_queries: list[tuple[str, float | None]] = []
             search_weights: list[float] = []
 
             # Add deduplicated semantic queries (use hybrid_alpha=None)
             for query, weight in deduplicated_semantic_queries:
-                search_functions.append(
-                    (
-                        self._run_search_for_query,
-                        (query, None, override_kwargs.num_hits),
-                    )
-                )
+                index_queries.append((query, None))
                 search_weights.append(weight)
 
             # Add deduplicated keyword queries (use hybrid_alpha=0.2)
             for query, weight in deduplicated_keyword_queries:
-                search_functions.append(
-                    (
-                        self._run_search_for_query,
-                        (query, KEYWORD_QUERY_HYBRID_ALPHA, override_kwargs.num_hits),
-                    )
-                )
+                index_queries.append((query, KEYWORD_QUERY_HYBRID_ALPHA))
                 search_weights.append(weight)
 
+            search_functions: list[tuple[Callable, tuple]] = [
+                (
+                    self._run_multi_query_search,
+                    (index_queries, override_kwargs.num_hits),
+                )
+            ]
+
             # Add Slack federated search (runs once in parallel with all Vespa queries)
             # This avoids the query multiplication problem where each Vespa query
             # would trigger a separate Slack search
             # Run if we have slack_context (bot) or user (might have OAuth token)
-            if (
+            run_slack_search = bool(
                 (self.enable_slack_search or self.slack_context)
                 and (self.slack_context or self.user)
                 and override_kwargs.original_query
-            ):
+            )
+            if run_slack_search:
                 search_functions.append(
                     (
                         self._run_slack_search,
@@ -714,8 +717,13 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 # Use same weight as original query for Slack results
                 search_weights.append(ORIGINAL_QUERY_WEIGHT)
 
-            # Run all searches in parallel (Vespa queries + Slack)
-            all_search_results = run_functions_tuples_in_parallel(search_functions)
+            # Run the index searches and Slack in parallel
+            search_start_time = time.time()
+            search_results = run_functions_tuples_in_parallel(search_functions)
+            search_elapsed = time.time() - search_start_time
+            all_search_results: list[list[InferenceChunk]] = search_results[0]
+            if run_slack_search:
+                all_search_results = all_search_results + [search_results[1]]
 
             # Merge results using weighted Reciprocal Rank Fusion
             # This intelligently combines rankings from different queries
@@ -796,51 +804,18 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 )
             )
 
-            # Create wrapper function to handle errors gracefully
-            def expand_section_safe(
-                section: InferenceSection,
-                user_query: str,
-                llm: LLM,
-                document_index: DocumentIndex,
-                expand_override: bool,
-            ) -> InferenceSection:
-                """Wrapper that handles exceptions and returns original section on error."""
-                try:
-                    expanded_section = expand_section_with_context(
-                        section=section,
-                        user_query=user_query,
-                        llm=llm,
-                        document_index=document_index,
-                        expand_override=expand_override,
-                    )
-                    # Return expanded section if not None, otherwise original
-                    return expanded_section if expanded_section is not None else section
-                except Exception as e:
-                    logger.warning(
-                        f"Error processing section context expansion: {e}. Using original section."
-                    )
-                    return section
-
-            # Build parallel function calls for all sections
-            expansion_functions: list[tuple[Callable, tuple]] = [
-                (
-                    expand_section_safe,
-                    (
-                        section,
-                        secondary_flows_user_query,
-                        self.llm,
-                        self.document_index,
-                        section.center_chunk.document_id in best_doc_ids_set,
-                    ),
-                )
-                for section in selected_sections
-            ]
-
             # Start timing for document expansion
             document_expansion_start_time = time.time()
 
-            # Run all expansions in parallel
-            expanded_sections = run_functions_tuples_in_parallel(expansion_functions)
+            # Classify and expand all sections, fetching the surrounding chunks of all
+            # of them together
+            expanded_sections = expand_sections_with_context(
+                sections=selected_sections,
+                user_query=secondary_flows_user_query,
+                llm=self.llm,
+                document_index=self.document_index,
+                expand_override_doc_ids=best_doc_ids_set,
+            )
 
             # End timing for document expansion
             document_expansion_elapsed = time.time() - document_expansion_start_time
@@ -868,6 +843,7 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             logger.debug(
                 f"Search tool - Total execution time: {overall_elapsed:.3f} seconds "
                 f"(query expansion: {query_expansion_elapsed:.3f}s, "
+                f"search: {search_elapsed:.3f}s, "
                 f"document selection: {document_selection_elapsed:.3f}s, "
                 f"document expansion: {document_expansion_elapsed:.3f}s)"
             )
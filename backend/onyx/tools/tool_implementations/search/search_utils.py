@@ -1,3 +1,4 @@
+import threading
 from collections import defaultdict
 from collections.abc import Callable
 from typing import TypeVar
@@ -20,6 +21,7 @@ from onyx.tools.tool_implementations.search.constants import (
 )
 from onyx.tools.tool_implementations.search.constants import RRF_K_VALUE
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -129,82 +131,133 @@ def section_to_dict(section: InferenceSection, section_num: int) -> dict:
     return doc_dict
 
 
-def _retrieve_adjacent_chunks(
+class AdjacentChunkCache:
+    """Short lived, per request cache of the chunks fetched by ID to expand search
+    sections with their surrounding context.
+
+    All ranges passed to fetch are retrieved with a single id_based_retrieval call,
+    and chunks that were already fetched (or attempted) are never fetched again, so
+    sections with overlapping ranges share the same round trip.
+    """
+
+    def __init__(self, document_index: DocumentIndex) -> None:
+        self._document_index = document_index
+        self._chunks: dict[tuple[str, int], InferenceChunk] = {}
+        self._attempted_chunk_ids: dict[str, set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def fetch(self, chunk_ranges: list[tuple[str, int, int]]) -> None:
+        """Fetches all chunks in the (document_id, min_chunk_id, max_chunk_id) ranges
+        that are not cached yet."""
+        missing_chunk_ids: dict[str, set[int]] = defaultdict(set)
+        with self._lock:
+            for document_id, min_chunk_id, max_chunk_id in chunk_ranges:
+                attempted = self._attempted_chunk_ids[document_id]
+                for chunk_id in range(min_chunk_id, max_chunk_id + 1):
+                    if chunk_id not in attempted:
+                        missing_chunk_ids[document_id].add(chunk_id)
+                # Chunks past the end of a document do not exist, a failed fetch
+                # is also not retried, same as for a single section
+                attempted.update(missing_chunk_ids[document_id])
+
+        chunk_requests = [
+            VespaChunkRequest(
+                document_id=replace_invalid_doc_id_characters(document_id),
+                min_chunk_ind=min_chunk_id,
+                max_chunk_ind=max_chunk_id,
+            )
+            for document_id, chunk_ids in missing_chunk_ids.items()
+            for min_chunk_id, max_chunk_id in _to_contiguous_ranges(chunk_ids)
+        ]
+        if not chunk_requests:
+            return
+
+        try:
+            # The document fetching already enforced permissions
+            # the expansion does not need to do this unless it's for performance reasons
+            retrieved_chunks = self._document_index.id_based_retrieval(
+                chunk_requests=chunk_requests,
+                filters=IndexFilters(access_control_list=None),
+                batch_retrieval=True,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to retrieve adjacent chunks: {e}")
+            return
+
+        with self._lock:
+            for chunk in retrieved_chunks:
+                # Keyed by the ID as queried, which may differ from the section's
+                document_id = replace_invalid_doc_id_characters(chunk.document_id)
+                self._chunks[(document_id, chunk.chunk_id)] = chunk
+
+    def get(
+        self, document_id: str, min_chunk_id: int, max_chunk_id: int
+    ) -> list[InferenceChunk]:
+        """Returns the chunks in the range sorted by chunk_id, fetching any that were
+        not fetched yet."""
+        self.fetch([(document_id, min_chunk_id, max_chunk_id)])
+        queried_document_id = replace_invalid_doc_id_characters(document_id)
+        with self._lock:
+            return [
+                self._chunks[(queried_document_id, chunk_id)]
+                for chunk_id in range(min_chunk_id, max_chunk_id + 1)
+                if (queried_document_id, chunk_id) in self._chunks
+            ]
+
+
+def _to_contiguous_ranges(chunk_ids: set[int]) -> list[tuple[int, int]]:
+    ranges: list[tuple[int, int]] = []
+    for chunk_id in sorted(chunk_ids):
+        if ranges and ranges[-1][1] == chunk_id - 1:
+            ranges[-1] = (ranges[-1][0], chunk_id)
+        else:
+            ranges.append((chunk_id, chunk_id))
+    return ranges
+
+
+def _adjacent_chunk_ranges(
     section: InferenceSection,
-    document_index: DocumentIndex,
     num_chunks_above: int,
     num_chunks_below: int,
-) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
-    """Retrieve adjacent chunks above and below a section.
-
-    Args:
-        section: The InferenceSection to get adjacent chunks for
-        document_index: The document index to query
-        num_chunks_above: Number of chunks to retrieve above the section
-        num_chunks_below: Number of chunks to retrieve below the section
-
-    Returns:
-        Tuple of (chunks_above, chunks_below)
-    """
-    # Get the document_id and chunk range from the section
+) -> tuple[tuple[str, int, int] | None, tuple[str, int, int] | None]:
+    """Returns the (document_id, min_chunk_id, max_chunk_id) ranges above and below
+    the section, or None where there is nothing to retrieve."""
     document_id = section.center_chunk.document_id
 
-    # The document fetching already enforced permissions
-    # the expansion does not need to do this unless it's for performance reasons
-    filters = IndexFilters(access_control_list=None)
-
     # Find the min and max chunk_id in the section
     chunk_ids = [chunk.chunk_id for chunk in section.chunks]
     min_chunk_id = min(chunk_ids)
     max_chunk_id = max(chunk_ids)
 
-    chunks_above: list[InferenceChunk] = []
-    chunks_below: list[InferenceChunk] = []
-
-    # Retrieve chunks above (if any)
+    above_range = None
     if num_chunks_above > 0 and min_chunk_id > 0:
-        above_min = max(0, min_chunk_id - num_chunks_above)
-        above_max = min_chunk_id - 1
-
-        above_request = VespaChunkRequest(
-            document_id=replace_invalid_doc_id_characters(document_id),
-            min_chunk_ind=above_min,
-            max_chunk_ind=above_max,
+        above_range = (
+            document_id,
+            max(0, min_chunk_id - num_chunks_above),
+            min_chunk_id - 1,
         )
 
-        try:
-            chunks_above = document_index.id_based_retrieval(
-                chunk_requests=[above_request],
-                filters=filters,
-                batch_retrieval=True,
-            )
-            # Sort by chunk_id to ensure correct order
-            chunks_above.sort(key=lambda c: c.chunk_id)
-        except Exception as e:
-            logger.warning(f"Failed to retrieve chunks above section: {e}")
-
-    # Retrieve chunks below (if any)
+    below_range = None
     if num_chunks_below > 0:
-        below_min = max_chunk_id + 1
-        below_max = max_chunk_id + num_chunks_below
+        below_range = (document_id, max_chunk_id + 1, max_chunk_id + num_chunks_below)
 
-        below_request = VespaChunkRequest(
-            document_id=replace_invalid_doc_id_characters(document_id),
-            min_chunk_ind=below_min,
-            max_chunk_ind=below_max,
-        )
+    return above_range, below_range
 
-        try:
-            chunks_below = document_index.id_based_retrieval(
-                chunk_requests=[below_request],
-                filters=filters,
-                batch_retrieval=True,
-            )
-            # Sort by chunk_id to ensure correct order
-            chunks_below.sort(key=lambda c: c.chunk_id)
-        except Exception as e:
-            logger.warning(f"Failed to retrieve chunks below section: {e}")
 
+def _get_adjacent_chunks(
+    section: InferenceSection,
+    chunk_cache: AdjacentChunkCache,
+    num_chunks_above: int,
+    num_chunks_below: int,
+) -> tuple[list[InferenceChunk], list[InferenceChunk]]:
+    above_range, below_range = _adjacent_chunk_ranges(
+        section, num_chunks_above, num_chunks_below
+    )
+    # Fetch both sides in one round trip
+    chunk_cache.fetch([r for r in (above_range, below_range) if r is not None])
+
+    chunks_above = chunk_cache.get(*above_range) if above_range else []
+    chunks_below = chunk_cache.get(*below_range) if below_range else []
     return chunks_above, chunks_below
 
 
@@ -351,69 +404,72 @@ def merge_overlapping_sections(
     return result
 
 
-def expand_section_with_context(
+def classify_section_for_expansion(
     section: InferenceSection,
     user_query: str,
     llm: LLM,
-    document_index: DocumentIndex,
+    chunk_cache: AdjacentChunkCache,
     expand_override: bool = False,
-) -> InferenceSection | None:
-    """Use LLM to classify section relevance and return expanded section with appropriate context.
-
-    This function combines classification and expansion into a single operation:
-    1. Retrieves chunks needed for classification (2 chunks for prompt)
-    2. Uses LLM to classify relevance (situations 1-4) unless expand_override is True
-    3. For FULL_DOCUMENT, fetches additional chunks (5 total above/below)
-    4. Returns the expanded section or None if not relevant
+) -> ContextExpansionType:
+    """Use LLM to classify how much context around the section is relevant.
 
     Args:
-        section: The InferenceSection to classify and expand
-        search_query: The user's search query
+        section: The InferenceSection to classify
+        user_query: The user's search query
         llm: LLM instance to use for classification
-        document_index: Document index for retrieving adjacent chunks
+        chunk_cache: Cache for retrieving the 2 chunks above/below for the prompt
         expand_override: If True, skip LLM classification and use FULL_DOCUMENT expansion
-
-    Returns:
-        Expanded InferenceSection with appropriate context, or None if NOT_RELEVANT
     """
-    chunks_above_for_prompt: list[InferenceChunk] = []
-    chunks_below_for_prompt: list[InferenceChunk] = []
-
-    # If expand_override is True, skip LLM classification and use FULL_DOCUMENT
     if expand_override:
-        classification = ContextExpansionType.FULL_DOCUMENT
-        # These are not used, but need to be defined to avoid type errors
-    else:
-        # Retrieve 2 chunks above and below for the LLM classification prompt
-        chunks_above_for_prompt, chunks_below_for_prompt = _retrieve_adjacent_chunks(
-            section=section,
-            document_index=document_index,
-            num_chunks_above=2,
-            num_chunks_below=2,
-        )
+        return ContextExpansionType.FULL_DOCUMENT
+
+    # Retrieve 2 chunks above and below for the LLM classification prompt
+    chunks_above_for_prompt, chunks_below_for_prompt = _get_adjacent_chunks(
+        section=section,
+        chunk_cache=chunk_cache,
+        num_chunks_above=2,
+        num_chunks_below=2,
+    )
 
-        # Format the section content for the prompt
-        section_above_text = (
-            " ".join([c.content for c in chunks_above_for_prompt])
-            if chunks_above_for_prompt
-            else None
-        )
-        section_below_text = (
-            " ".join([c.content for c in chunks_below_for_prompt])
-            if chunks_below_for_prompt
-            else None
-        )
+    # Format the section content for the prompt
+    section_above_text = (
+        " ".join([c.content for c in chunks_above_for_prompt])
+        if chunks_above_for_prompt
+        else None
+    )
+    section_below_text = (
+        " ".join([c.content for c in chunks_below_for_prompt])
+        if chunks_below_for_prompt
+        else None
+    )
 
-        # Classify section relevance using LLM
-        classification = classify_section_relevance(
-            document_title=section.center_chunk.semantic_identifier,
-            section_text=section.combined_content,
-            user_query=user_query,
-            llm=llm,
-            section_above_text=section_above_text,
-            section_below_text=section_below_text,
-        )
+    # Classify section relevance using LLM
+    return classify_section_relevance(
+        document_title=section.center_chunk.semantic_identifier,
+        section_text=section.combined_content,
+        user_query=user_query,
+        llm=llm,
+        section_above_text=section_above_text,
+        section_below_text=section_below_text,
+    )
 
+
+def _num_chunks_around_for_expansion(classification: ContextExpansionType) -> int:
+    if classification == ContextExpansionType.INCLUDE_ADJACENT_SECTIONS:
+        return 2
+    if classification == ContextExpansionType.FULL_DOCUMENT:
+        return FULL_DOC_NUM_CHUNKS_AROUND
+    return 0
+
+
+def build_expanded_section(
+    section: InferenceSection,
+    classification: ContextExpansionType,
+    chunk_cache: AdjacentChunkCache,
+    expand_override: bool = False,
+) -> InferenceSection | None:
+    """Returns the section expanded with the context its classification calls for,
+    or None if it is NOT_RELEVANT."""
     # Now build the expanded section based on classification
     if classification == ContextExpansionType.NOT_RELEVANT:
         # Filter out this section
@@ -429,27 +485,16 @@ def expand_section_with_context(
         )
         return section
 
-    elif classification == ContextExpansionType.INCLUDE_ADJACENT_SECTIONS:
-        # Use the 2 chunks we already retrieved for the prompt
-        logger.debug(
-            f"LLM classified section as INCLUDE_ADJACENT_SECTIONS: {section.center_chunk.semantic_identifier}"
-        )
-
-        all_chunks = chunks_above_for_prompt + section.chunks + chunks_below_for_prompt
-        if not all_chunks:
-            return section
-
-        # Create new InferenceSection with expanded chunks
-        expanded_section = inference_section_from_chunks(
-            center_chunk=section.center_chunk,
-            chunks=all_chunks,
-        )
-
-        return expanded_section if expanded_section else section
-
-    elif classification == ContextExpansionType.FULL_DOCUMENT:
-        # Fetch 5 chunks above and below (optimal single retrieval)
-        if expand_override:
+    elif classification in (
+        ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+        ContextExpansionType.FULL_DOCUMENT,
+    ):
+        if classification == ContextExpansionType.INCLUDE_ADJACENT_SECTIONS:
+            # Uses the 2 chunks already retrieved for the prompt
+            logger.debug(
+                f"LLM classified section as INCLUDE_ADJACENT_SECTIONS: {section.center_chunk.semantic_identifier}"
+            )
+        elif expand_override:
             logger.debug(
                 f"Section marked for FULL_DOCUMENT expansion (override): {section.center_chunk.semantic_identifier}"
             )
@@ -458,23 +503,22 @@ def expand_section_with_context(
                 f"LLM classified section as FULL_DOCUMENT: {section.center_chunk.semantic_identifier}"
             )
 
-        chunks_above_full, chunks_below_full = _retrieve_adjacent_chunks(
+        num_chunks_around = _num_chunks_around_for_expansion(classification)
+        chunks_above, chunks_below = _get_adjacent_chunks(
             section=section,
-            document_index=document_index,
-            num_chunks_above=FULL_DOC_NUM_CHUNKS_AROUND,
-            num_chunks_below=FULL_DOC_NUM_CHUNKS_AROUND,
+            chunk_cache=chunk_cache,
+            num_chunks_above=num_chunks_around,
+            num_chunks_below=num_chunks_around,
         )
 
-        # Combine all chunks: 5 above + section + 5 below
-        all_chunks = chunks_above_full + section.chunks + chunks_below_full
-
+        all_chunks = chunks_above + section.chunks + chunks_below
         if not all_chunks:
             logger.warning(
-                f"No chunks found for full document context expansion: {section.center_chunk.semantic_identifier}"
+                f"No chunks found for context expansion: {section.center_chunk.semantic_identifier}"
             )
             return section
 
-        # Create new InferenceSection with full context
+        # Create new InferenceSection with expanded chunks
         expanded_section = inference_section_from_chunks(
             center_chunk=section.center_chunk,
             chunks=all_chunks,
@@ -488,3 +532,103 @@ def expand_section_with_context(
             f"Unknown context classification {classification}, returning original section"
         )
         return section
+
+
+def expand_sections_with_context(
+    sections: list[InferenceSection],
+    user_query: str,
+    llm: LLM,
+    document_index: DocumentIndex,
+    expand_override_doc_ids: set[str],
+) -> list[InferenceSection]:
+    """Uses the LLM to classify the relevance of every section of a request and
+    expands each with the appropriate context.
+
+    The chunks around all sections are retrieved in two index round trips instead of
+    up to two per section: one for the classification prompts (and the sections
+    that are expanded to FULL_DOCUMENT regardless), and one for the sections the LLM
+    classified as FULL_DOCUMENT. Sections that fail to expand or are classified as
+    NOT_RELEVANT are returned unchanged.
+    """
+    chunk_cache = AdjacentChunkCache(document_index)
+    expand_overrides = [
+        section.center_chunk.document_id in expand_override_doc_ids
+        for section in sections
+    ]
+
+    def _ranges_for(
+        section: InferenceSection, num_chunks_around: int
+    ) -> list[tuple[str, int, int]]:
+        return [
+            chunk_range
+            for chunk_range in _adjacent_chunk_ranges(
+                section, num_chunks_around, num_chunks_around
+            )
+            if chunk_range is not None
+        ]
+
+    chunk_cache.fetch(
+        [
+            chunk_range
+            for section, expand_override in zip(sections, expand_overrides)
+            for chunk_range in _ranges_for(
+                section, FULL_DOC_NUM_CHUNKS_AROUND if expand_override else 2
+            )
+        ]
+    )
+
+    def classify_section_safe(
+        section: InferenceSection, expand_override: bool
+    ) -> ContextExpansionType:
+        try:
+            return classify_section_for_expansion(
+                section=section,
+                user_query=user_query,
+                llm=llm,
+                chunk_cache=chunk_cache,
+                expand_override=expand_override,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Error processing section context expansion: {e}. Using original section."
+            )
+            return ContextExpansionType.MAIN_SECTION_ONLY
+
+    classifications: list[ContextExpansionType] = run_functions_tuples_in_parallel(
+        [
+            (classify_section_safe, (section, expand_override))
+            for section, expand_override in zip(sections, expand_overrides)
+        ]
+    )
+
+    chunk_cache.fetch(
+        [
+            chunk_range
+            for section, classification in zip(sections, classifications)
+            for chunk_range in _ranges_for(
+                section, _num_chunks_around_for_expansion(classification)
+            )
+        ]
+    )
+
+    expanded_sections: list[InferenceSection] = []
+    for section, classification, expand_override in zip(
+        sections, classifications, expand_overrides
+    ):
+        try:
+            expanded_section = build_expanded_section(
+                section=section,
+                classification=classification,
+                chunk_cache=chunk_cache,
+                expand_override=expand_override,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Error processing section context expansion: {e}. Using original section."
+            )
+            expanded_section = None
+        expanded_sections.append(
+            expanded_section if expanded_section is not None else section
+        )
+
+    return expanded_sections
@@ -3,6 +3,7 @@ import collections.abc
 import concurrent
 import contextvars
 import copy
+import os
 import threading
 import uuid
 from collections.abc import Awaitable
@@ -22,10 +23,12 @@ from typing import overload
 from typing import Protocol
 from typing import TypeVar
 
+from prometheus_client import Gauge
 from pydantic import GetCoreSchemaHandler
 from pydantic.types import T
 from pydantic_core import core_schema
 
+from onyx.configs.app_configs import SHARED_THREAD_POOL_MAX_WORKERS
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -281,6 +284,115 @@ class CallableProtocol(Protocol):
     def __call__(self, *args: Any, **kwargs: Any) -> Any: ...
 
 
+_pool_queued_tasks = Gauge(
+    "onyx_thread_pool_queued_tasks",
+    "Tasks submitted to a shared thread pool that have not started yet",
+    ["pool"],
+)
+
+_pool_active_threads = Gauge(
+    "onyx_thread_pool_active_threads",
+    "Threads of a shared thread pool that are currently running a task",
+    ["pool"],
+)
+
+# Set in the context of every shared pool task. Being a contextvar rather than a
+# thread local, it is also set in threads started from a task with a copy of its
+# context, e.g. by the short lived pools of nested parallel calls.
+_in_shared_pool = contextvars.ContextVar("in_shared_pool", default=False)
+
+
+def in_shared_pool_thread() -> bool:
+    """Whether the caller runs in a shared pool task, directly or in a thread
+    started from one."""
+    return _in_shared_pool.get()
+
+
+class SharedThreadPool:
+    """A bounded, long lived thread pool shared by everything in the process, so
+    that parallel calls on hot paths (e.g. every search) do not spin up and join
+    a new set of threads each time.
+
+    Tasks must not wait on other tasks of the same pool, since a full pool would
+    then deadlock. run_functions_tuples_in_parallel avoids this by running calls
+    made from a pool task, or from threads started by one, on a short lived pool
+    instead.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._queued_tasks = _pool_queued_tasks.labels(pool=name)
+        self._active_threads = _pool_active_threads.labels(pool=name)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # Threads do not survive a fork (e.g. celery prefork workers), so a
+            # forked process needs its own executor
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"onyx-{self.name}",
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run_task(self, func: Callable[[], None]) -> None:
+        self._queued_tasks.dec()
+        self._active_threads.inc()
+        try:
+            func()
+        finally:
+            self._active_threads.dec()
+
+    def submit_all(
+        self,
+        functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
+        max_concurrency: int,
+    ) -> list[Future]:
+        """Runs the functions with at most max_concurrency of them at a time, each
+        in a copy of the caller's context. Returns one future per function."""
+        calls: list[
+            tuple[contextvars.Context, CallableProtocol, tuple[Any, ...], Future[Any]]
+        ] = [
+            (contextvars.copy_context(), func, args, Future())
+            for func, args in functions_with_args
+        ]
+        for context, _, _, _ in calls:
+            context.run(_in_shared_pool.set, True)
+        remaining_calls = iter(calls)
+        remaining_calls_lock = threading.Lock()
+
+        def run_remaining_calls() -> None:
+            while True:
+                with remaining_calls_lock:
+                    call = next(remaining_calls, None)
+                if call is None:
+                    return
+                context, func, args, future = call
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(context.run(func, *args))
+                except BaseException as e:
+                    future.set_exception(e)
+
+        executor = self._get_executor()
+        for _ in range(max_concurrency):
+            self._queued_tasks.inc()
+            executor.submit(self._run_task, run_remaining_calls)
+
+        return [future for _, _, _, future in calls]
+
+
+_SHARED_THREAD_POOL = SharedThreadPool(
+    name="shared", max_workers=SHARED_THREAD_POOL_MAX_WORKERS
+)
+
+
 def run_functions_tuples_in_parallel(
     functions_with_args: Sequence[tuple[CallableProtocol, tuple[Any, ...]]],
     allow_failures: bool = False,
@@ -289,12 +401,18 @@ def run_functions_tuples_in_parallel(
     timeout_callback: (
         Callable[[int, CallableProtocol, tuple[Any, ...]], Any] | None
     ) = None,
+    use_shared_pool: bool = True,
 ) -> list[Any]:
     """
     Executes multiple functions in parallel and returns a list of the results for each function.
     This function preserves contextvars across threads, which is important for maintaining
     context like tenant IDs in database sessions.
 
+    The functions run on the process wide shared thread pool, except when a timeout is set
+    (timed out functions would keep occupying shared threads), when called from a shared
+    pool task or a thread it started (waiting on the shared pool from inside it could
+    deadlock) or when use_shared_pool is False. In those cases a new pool is created for the call.
+
     Args:
         functions_with_args: List of tuples each containing the function callable and a tuple of arguments.
         allow_failures: if set to True, then the function result will just be None
@@ -309,6 +427,8 @@ def run_functions_tuples_in_parallel(
             for each timed-out function. If provided, its return value is used as the result.
             If not provided and allow_failures is False, TimeoutError is raised.
             If not provided and allow_failures is True, None is returned for timed-out functions.
+        use_shared_pool: set to False to run on a dedicated pool, e.g. when the functions
+            depend on each other running at the same time or rely on thread local state.
 
     Returns:
         list: A list of results from each function, in the same order as the input functions.
@@ -323,17 +443,26 @@ def run_functions_tuples_in_parallel(
         return []
 
     results: list[tuple[int, Any]] = []
-    executor = ThreadPoolExecutor(max_workers=workers)
-
-    try:
+    executor: ThreadPoolExecutor | None = None
+    if use_shared_pool and timeout is None and not in_shared_pool_thread():
         # The primary reason for propagating contextvars is to allow acquiring a db session
         # that respects tenant id. Context.run is expected to be low-overhead, but if we later
         # find that it is increasing latency we can make using it optional.
+        future_to_index = {
+            future: i
+            for i, future in enumerate(
+                _SHARED_THREAD_POOL.submit_all(functions_with_args, workers)
+            )
+        }
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
         future_to_index = {
             executor.submit(contextvars.copy_context().run, func, *args): i
             for i, (func, args) in enumerate(functions_with_args)
         }
 
+    try:
+
         if timeout is not None:
             # Wait for completion or timeout
             done, not_done = wait(future_to_index.keys(), timeout=timeout)
@@ -381,10 +510,13 @@ def run_functions_tuples_in_parallel(
                     if not allow_failures:
                         raise
     finally:
-        # When timeout is used, don't wait for timed-out threads to complete
-        # (they will continue running in the background)
-        # When no timeout, wait for all threads to complete (original behavior)
-        executor.shutdown(wait=(timeout is None))
+        if executor is not None:
+            # When timeout is used, don't wait for timed-out threads to complete
+            # (they will continue running in the background)
+            # When no timeout, wait for all threads to complete (original behavior)
+            executor.shutdown(wait=(timeout is None))
+        else:
+            wait(future_to_index.keys())
 
     results.sort(key=lambda x: x[0])
     return [result for index, result in results]
@@ -0,0 +1,126 @@
+"""
+launch:
+- postgres
+- vespa
+
+Compares chunks/sec of the thread pool based Vespa indexing path
+(batch_index_vespa_chunks) against the pipelined bulk feed (feed_vespa_chunks).
+Both write the same dummy chunks into the current search settings' index, so
+run this against a throwaway index.
+
+python -m scripts.query_time_check.benchmark_vespa_feed --num-docs 2000
+"""
+
+import argparse
+import concurrent.futures
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
+from onyx.db.search_settings import get_current_search_settings
+from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import feed_vespa_chunks
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+from onyx.document_index.vespa_constants import BATCH_SIZE
+from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.utils.batching import batch_generator
+from scripts.query_time_check.seed_dummy_docs import generate_dummy_chunk
+from scripts.query_time_check.seed_dummy_docs import TOTAL_ACL_ENTRIES_PER_CATEGORY
+from scripts.query_time_check.seed_dummy_docs import TOTAL_DOC_SETS
+
+
+def generate_chunks(
+    run_name: str, num_docs: int, chunks_per_doc: int, embedding_dim: int
+) -> list[DocMetadataAwareIndexChunk]:
+    timestamp = datetime.now().isoformat()
+    return [
+        generate_dummy_chunk(
+            doc_id=f"feed_benchmark_{run_name}_{doc_num}_{timestamp}",
+            chunk_id=chunk_num,
+            embedding_dim=embedding_dim,
+            number_of_acl_entries=TOTAL_ACL_ENTRIES_PER_CATEGORY,
+            number_of_document_sets=TOTAL_DOC_SETS,
+        )
+        for doc_num in range(num_docs)
+        for chunk_num in range(chunks_per_doc)
+    ]
+
+
+def index_with_thread_pool(
+    chunks: list[DocMetadataAwareIndexChunk], index_name: str
+) -> None:
+    with (
+        concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+        get_vespa_http_client() as http_client,
+    ):
+        for chunk_batch in batch_generator(chunks, BATCH_SIZE):
+            batch_index_vespa_chunks(
+                chunks=chunk_batch,
+                index_name=index_name,
+                http_client=http_client,
+                multitenant=False,
+                executor=executor,
+            )
+
+
+def index_with_bulk_feed(
+    chunks: list[DocMetadataAwareIndexChunk], index_name: str, max_in_flight: int
+) -> None:
+    feed_vespa_chunks(
+        chunks=chunks,
+        index_name=index_name,
+        multitenant=False,
+        max_in_flight=max_in_flight,
+    )
+
+
+def time_run(
+    name: str, chunks: list[DocMetadataAwareIndexChunk], run: Callable[[], None]
+) -> float:
+    start = time.monotonic()
+    run()
+    elapsed = time.monotonic() - start
+    chunks_per_sec = len(chunks) / elapsed
+    print(
+        f"{name}: {len(chunks)} chunks in {elapsed:.2f}s ({chunks_per_sec:.1f} chunks/sec)"
+    )
+    return chunks_per_sec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-docs", type=int, default=1000)
+    parser.add_argument("--chunks-per-doc", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=VESPA_FEED_MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    with get_session_with_current_tenant() as db_session:
+        search_settings = get_current_search_settings(db_session)
+        index_name = search_settings.index_name
+        embedding_dim = search_settings.final_embedding_dim
+
+    thread_pool_chunks = generate_chunks(
+        "thread_pool", args.num_docs, args.chunks_per_doc, embedding_dim
+    )
+    bulk_feed_chunks = generate_chunks(
+        "bulk_feed", args.num_docs, args.chunks_per_doc, embedding_dim
+    )
+
+    thread_pool_rate = time_run(
+        "thread pool",
+        thread_pool_chunks,
+        lambda: index_with_thread_pool(thread_pool_chunks, index_name),
+    )
+    bulk_feed_rate = time_run(
+        "bulk feed",
+        bulk_feed_chunks,
+        lambda: index_with_bulk_feed(bulk_feed_chunks, index_name, args.max_in_flight),
+    )
+    print(f"speedup: {bulk_feed_rate / thread_pool_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
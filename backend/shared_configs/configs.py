@@ -61,6 +61,16 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Concurrent embedding requests for the same local model are merged into
+# micro-batches so that many small query requests share a single forward pass.
+# A micro-batch is run once it has EMBEDDING_MAX_BATCH_SIZE texts or its oldest
+# text has waited EMBEDDING_MAX_BATCH_WAIT_MS.
+EMBEDDING_DYNAMIC_BATCHING_ENABLED = (
+    os.environ.get("EMBEDDING_DYNAMIC_BATCHING_ENABLED") or "true"
+).lower() == "true"
+EMBEDDING_MAX_BATCH_SIZE = int(os.environ.get("EMBEDDING_MAX_BATCH_SIZE") or 64)
+EMBEDDING_MAX_BATCH_WAIT_MS = float(os.environ.get("EMBEDDING_MAX_BATCH_WAIT_MS") or 5)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
@@ -91,6 +101,11 @@ OPENAI_EMBEDDING_TIMEOUT = int(
     os.environ.get("OPENAI_EMBEDDING_TIMEOUT", API_BASED_EMBEDDING_TIMEOUT)
 )
 
+# Max number of kept-alive connections per process to the model server and per
+# process, event loop and provider to API-based embedding providers
+MODEL_SERVER_HTTP_POOL_SIZE = int(os.environ.get("MODEL_SERVER_HTTP_POOL_SIZE") or 20)
+EMBEDDING_API_HTTP_POOL_SIZE = int(os.environ.get("EMBEDDING_API_HTTP_POOL_SIZE") or 20)
+
 # Whether or not to strictly enforce token limit for chunking.
 STRICT_CHUNK_TOKEN_LIMIT = (
     os.environ.get("STRICT_CHUNK_TOKEN_LIMIT", "").lower() == "true"
@@ -70,9 +70,11 @@ def mock_nlp_embeddings_post() -> Iterator[None]:
         resp.raise_for_status = MagicMock()
         return resp
 
+    mock_client = MagicMock()
+    mock_client.post.side_effect = _mock_post
     with patch(
-        "onyx.natural_language_processing.search_nlp_models.requests.post",
-        side_effect=_mock_post,
+        "onyx.natural_language_processing.search_nlp_models._get_model_server_client",
+        return_value=mock_client,
     ):
         yield
 
@@ -14,7 +14,6 @@ from onyx.context.search.models import SearchDoc
 from onyx.db.models import Persona
 from onyx.db.models import User
 from onyx.document_index.interfaces import DocumentIndex
-from onyx.llm.interfaces import LLM
 
 
 def run_functions_tuples_sequential(
@@ -130,22 +129,23 @@ def use_mock_search_pipeline(
     ) -> list[DocumentSource]:
         return connectors
 
-    def override_search_pipeline(
-        chunk_search_request: ChunkSearchRequest,
+    def override_multi_query_search_pipeline(
+        chunk_search_requests: list[ChunkSearchRequest],
         document_index: DocumentIndex,  # noqa: ARG001
         user: User | None,  # noqa: ARG001
         persona: Persona | None,  # noqa: ARG001
         db_session: Session,  # noqa: ARG001
-        auto_detect_filters: bool = False,  # noqa: ARG001
-        llm: LLM | None = None,  # noqa: ARG001
         project_id: int | None = None,  # noqa: ARG001
-    ) -> list[InferenceChunk]:
-        return controller.get_search_results(chunk_search_request.query)
+    ) -> list[list[InferenceChunk]]:
+        return [
+            controller.get_search_results(chunk_search_request.query)
+            for chunk_search_request in chunk_search_requests
+        ]
 
     with (
         patch(
-            "onyx.tools.tool_implementations.search.search_tool.search_pipeline",
-            new=override_search_pipeline,
+            "onyx.tools.tool_implementations.search.search_tool.multi_query_search_pipeline",
+            new=override_multi_query_search_pipeline,
         ),
         patch(
             "onyx.tools.tool_implementations.search.search_tool.check_connectors_exist",
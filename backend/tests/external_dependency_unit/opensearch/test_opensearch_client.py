@@ -621,6 +621,148 @@ class TestOpenSearchClient:
                 properties_to_update={"hidden": True},
             )
 
+    def test_bulk_update_documents(
+        self, test_client: OpenSearchClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests updating many document chunks in one bulk request."""
+        # Precondition.
+        _patch_global_tenant_state(monkeypatch, False)
+        tenant_state = TenantState(tenant_id=POSTGRES_DEFAULT_SCHEMA, multitenant=False)
+        mappings = DocumentSchema.get_document_schema(
+            vector_dimension=128, multitenant=tenant_state.multitenant
+        )
+        settings = DocumentSchema.get_index_settings()
+        test_client.create_index(mappings=mappings, settings=settings)
+
+        docs = [
+            _create_test_document_chunk(
+                document_id=f"test-doc-bulk-update-{i % 2}",
+                chunk_index=i // 2,
+                content=f"Content {i}",
+                tenant_state=tenant_state,
+            )
+            for i in range(6)
+        ]
+        test_client.bulk_index_documents(documents=docs, tenant_state=tenant_state)
+        doc_chunk_ids = [
+            get_opensearch_doc_chunk_id(
+                tenant_state=tenant_state,
+                document_id=doc.document_id,
+                chunk_index=doc.chunk_index,
+                max_chunk_size=doc.max_chunk_size,
+            )
+            for doc in docs
+        ]
+
+        # Under test.
+        test_client.bulk_update_documents(
+            [(doc_chunk_id, {"hidden": True}) for doc_chunk_id in doc_chunk_ids]
+        )
+
+        # Postcondition.
+        for doc, doc_chunk_id in zip(docs, doc_chunk_ids):
+            updated_doc = test_client.get_document(document_chunk_id=doc_chunk_id)
+            assert updated_doc.hidden is True
+            assert updated_doc.content == doc.content
+
+    def test_bulk_update_nonexistent_document(
+        self, test_client: OpenSearchClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests bulk updating a nonexistent document chunk raises NotFoundError
+        and still updates the other document chunks."""
+        # Precondition.
+        _patch_global_tenant_state(monkeypatch, False)
+        tenant_state = TenantState(tenant_id=POSTGRES_DEFAULT_SCHEMA, multitenant=False)
+        mappings = DocumentSchema.get_document_schema(
+            vector_dimension=128, multitenant=tenant_state.multitenant
+        )
+        settings = DocumentSchema.get_index_settings()
+        test_client.create_index(mappings=mappings, settings=settings)
+
+        doc = _create_test_document_chunk(
+            document_id="test-doc-bulk-update-existing",
+            chunk_index=0,
+            content="Content",
+            tenant_state=tenant_state,
+        )
+        test_client.bulk_index_documents(documents=[doc], tenant_state=tenant_state)
+        doc_chunk_id = get_opensearch_doc_chunk_id(
+            tenant_state=tenant_state,
+            document_id=doc.document_id,
+            chunk_index=doc.chunk_index,
+            max_chunk_size=doc.max_chunk_size,
+        )
+
+        # Under test.
+        with pytest.raises(NotFoundError):
+            test_client.bulk_update_documents(
+                [
+                    (doc_chunk_id, {"hidden": True}),
+                    ("test_source__nonexistent__512__0", {"hidden": True}),
+                ]
+            )
+
+        # Postcondition.
+        assert test_client.get_document(document_chunk_id=doc_chunk_id).hidden is True
+
+    def test_delete_multiple_documents_by_query(
+        self, test_client: OpenSearchClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Tests counting and deleting the chunks of several documents at once."""
+        # Precondition.
+        _patch_global_tenant_state(monkeypatch, False)
+        tenant_state = TenantState(tenant_id=POSTGRES_DEFAULT_SCHEMA, multitenant=False)
+        mappings = DocumentSchema.get_document_schema(
+            vector_dimension=128, multitenant=tenant_state.multitenant
+        )
+        settings = DocumentSchema.get_index_settings()
+        test_client.create_index(mappings=mappings, settings=settings)
+
+        docs = [
+            _create_test_document_chunk(
+                document_id=document_id,
+                chunk_index=i,
+                content=f"{document_id} {i}",
+                tenant_state=tenant_state,
+                # Hidden chunks must be counted and deleted too.
+                hidden=i == 0,
+            )
+            for document_id, num_chunks in [
+                ("delete-me-1", 2),
+                ("delete-me-2", 3),
+                ("keep-me", 1),
+            ]
+            for i in range(num_chunks)
+        ]
+        test_client.bulk_index_documents(documents=docs, tenant_state=tenant_state)
+        test_client.refresh_index()
+
+        # Under test.
+        chunk_counts = test_client.get_chunk_counts_by_document_id(
+            DocumentQuery.get_chunk_counts_by_document_id_query(
+                document_ids=["delete-me-1", "delete-me-2", "nonexistent"],
+                tenant_state=tenant_state,
+            )
+        )
+        num_deleted = test_client.delete_by_query(
+            query_body=DocumentQuery.delete_from_document_ids_query(
+                document_ids=["delete-me-1", "delete-me-2", "nonexistent"],
+                tenant_state=tenant_state,
+            )
+        )
+
+        # Postcondition.
+        assert chunk_counts == {"delete-me-1": 2, "delete-me-2": 3}
+        assert num_deleted == 5
+        test_client.refresh_index()
+        remaining_counts = test_client.get_chunk_counts_by_document_id(
+            DocumentQuery.get_chunk_counts_by_document_id_query(
+                document_ids=["delete-me-1", "delete-me-2", "keep-me"],
+                tenant_state=tenant_state,
+            )
+        )
+        assert remaining_counts == {"keep-me": 1}
+
     def test_hybrid_search_with_pipeline(
         self,
         test_client: OpenSearchClient,
@@ -1,6 +1,7 @@
 # NOTE: ruff and black disagree after applying this noqa, so we just set file-level.
 # ruff: noqa: ARG005
 import os
+from collections import OrderedDict
 from typing import Any
 from unittest.mock import MagicMock
 from unittest.mock import Mock
@@ -628,7 +629,8 @@ class TestSlackBotFederatedSearch:
             self._teardown_common_mocks(patches)
 
 
-@patch("onyx.context.search.federated.slack_search.get_redis_client")
+@patch("onyx.onyxbot.slack.metadata_cache._local_cache", new=OrderedDict())
+@patch("onyx.onyxbot.slack.metadata_cache.get_redis_client")
 @patch("onyx.context.search.federated.slack_search.WebClient")
 def test_missing_scope_resilience(
     mock_web_client: Mock, mock_redis_client: Mock
@@ -718,7 +720,8 @@ def test_missing_scope_resilience(
     assert result["D9876543210"]["type"] == "im"
 
 
-@patch("onyx.context.search.federated.slack_search.get_redis_client")
+@patch("onyx.onyxbot.slack.metadata_cache._local_cache", new=OrderedDict())
+@patch("onyx.onyxbot.slack.metadata_cache.get_redis_client")
 @patch("onyx.context.search.federated.slack_search.WebClient")
 def test_multiple_missing_scopes_resilience(
     mock_web_client: Mock, mock_redis_client: Mock
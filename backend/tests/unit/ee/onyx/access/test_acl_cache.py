@@ -0,0 +1,96 @@
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from ee.onyx.access import acl_cache
+from ee.onyx.access.acl_cache import get_cached_acl_for_user
+from ee.onyx.access.acl_cache import invalidate_user_acl_cache
+
+_MODULE = "ee.onyx.access.acl_cache"
+
+
+class _InMemoryRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, **_: Any) -> None:
+        self.values[key] = value.encode("utf-8")
+
+    def incr(self, key: str) -> int:
+        value = int(self.values.get(key, b"0")) + 1
+        self.values[key] = str(value).encode("utf-8")
+        return value
+
+
+class _AclComputer:
+    def __init__(self, acl: set[str]) -> None:
+        self.acl = acl
+        self.calls = 0
+
+    def __call__(self) -> set[str]:
+        self.calls += 1
+        return set(self.acl)
+
+
+@pytest.fixture
+def redis_client(monkeypatch: pytest.MonkeyPatch) -> _InMemoryRedis:
+    client = _InMemoryRedis()
+    monkeypatch.setattr(f"{_MODULE}.get_redis_client", lambda **_: client)
+    monkeypatch.setattr(f"{_MODULE}.get_current_tenant_id", lambda: "tenant")
+    monkeypatch.setattr(f"{_MODULE}.USER_ACL_CACHE_TTL_SECONDS", 300)
+    acl_cache._local_cache.clear()
+    return client
+
+
+def test_acl_is_computed_once(redis_client: _InMemoryRedis) -> None:  # noqa: ARG001
+    user_id = uuid4()
+    compute_acl = _AclComputer({"group:a", "user_email:a@b.com"})
+
+    for _ in range(3):
+        assert get_cached_acl_for_user(user_id, compute_acl) == compute_acl.acl
+
+    assert compute_acl.calls == 1
+
+
+def test_acl_is_shared_through_redis(redis_client: _InMemoryRedis) -> None:
+    user_id = uuid4()
+    compute_acl = _AclComputer({"group:a"})
+    get_cached_acl_for_user(user_id, compute_acl)
+
+    # another process only has the Redis entry
+    acl_cache._local_cache.clear()
+    assert get_cached_acl_for_user(user_id, compute_acl) == {"group:a"}
+
+    assert compute_acl.calls == 1
+    assert len(redis_client.values) == 1
+
+
+def test_invalidation_recomputes_acl(
+    redis_client: _InMemoryRedis,  # noqa: ARG001
+) -> None:
+    user_id = uuid4()
+    compute_acl = _AclComputer({"group:a"})
+    get_cached_acl_for_user(user_id, compute_acl)
+
+    compute_acl.acl = {"group:a", "group:b"}
+    invalidate_user_acl_cache()
+
+    assert get_cached_acl_for_user(user_id, compute_acl) == {"group:a", "group:b"}
+    assert compute_acl.calls == 2
+
+
+def test_redis_failure_falls_back_to_computing(
+    redis_client: _InMemoryRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _fail(key: str) -> bytes | None:  # noqa: ARG001
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(redis_client, "get", _fail)
+    compute_acl = _AclComputer({"group:a"})
+
+    assert get_cached_acl_for_user(uuid4(), compute_acl) == {"group:a"}
+    assert compute_acl.calls == 1
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from ee.onyx.db.external_perm import ExternalUserGroup
+from ee.onyx.db.external_perm import remove_stale_external_groups
+from ee.onyx.db.external_perm import upsert_external_groups
+from onyx.configs.constants import DocumentSource
+
+_MODULE = "ee.onyx.db.external_perm"
+
+
+def test_upsert_external_groups_does_not_invalidate_user_acl_cache() -> None:
+    user = MagicMock(id=uuid4(), email="user@example.com")
+
+    with (
+        patch(f"{_MODULE}.batch_add_ext_perm_user_if_not_exists", return_value=[user]),
+        patch(f"{_MODULE}.invalidate_user_acl_cache") as mock_invalidate,
+    ):
+        upsert_external_groups(
+            db_session=MagicMock(),
+            cc_pair_id=1,
+            external_groups=[
+                ExternalUserGroup(id="group", user_emails=["user@example.com"])
+            ],
+            source=DocumentSource.CONFLUENCE,
+        )
+
+    # the whole sync is invalidated once, when the stale groups are removed
+    mock_invalidate.assert_not_called()
+
+
+def test_remove_stale_external_groups_invalidates_user_acl_cache() -> None:
+    db_session = MagicMock()
+
+    with patch(f"{_MODULE}.invalidate_user_acl_cache") as mock_invalidate:
+        mock_invalidate.side_effect = lambda: db_session.commit.assert_called_once()
+        remove_stale_external_groups(db_session, cc_pair_id=1)
+
+    mock_invalidate.assert_called_once_with()
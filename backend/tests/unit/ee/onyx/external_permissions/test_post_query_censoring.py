@@ -0,0 +1,157 @@
+import threading
+import time
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from ee.onyx.external_permissions import post_query_censoring
+from ee.onyx.external_permissions.post_query_censoring import (
+    _post_query_chunk_censoring,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+
+_MODULE = "ee.onyx.external_permissions.post_query_censoring"
+
+_CensorFunc = Callable[[list[InferenceChunk], str], list[InferenceChunk]]
+
+
+def _make_chunk(document_id: str, source: DocumentSource) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        chunk_id=0,
+        content=f"{document_id} content",
+        source_type=source,
+        semantic_identifier=document_id,
+        title=document_id,
+        boost=1,
+        score=0.5,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+        image_file_id=None,
+        source_links={},
+        section_continuation=False,
+        blurb=document_id,
+    )
+
+
+def _redacted(chunks: list[InferenceChunk], _user_email: str) -> list[InferenceChunk]:
+    # keeps every chunk other than "secret" ones, with redacted content
+    return [
+        chunk.model_copy(update={"content": "redacted"})
+        for chunk in chunks
+        if "secret" not in chunk.document_id
+    ]
+
+
+@pytest.fixture
+def censoring_funcs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> dict[DocumentSource, _CensorFunc]:
+    funcs: dict[DocumentSource, _CensorFunc] = {}
+
+    def _get_source_perm_sync_config(source: DocumentSource) -> MagicMock:
+        sync_config = MagicMock()
+        sync_config.censoring_config.chunk_censoring_func = funcs[source]
+        return sync_config
+
+    monkeypatch.setattr(
+        f"{_MODULE}._get_all_censoring_enabled_sources",
+        lambda: {DocumentSource.SALESFORCE, DocumentSource.JIRA},
+    )
+    monkeypatch.setattr(
+        f"{_MODULE}.get_source_perm_sync_config", _get_source_perm_sync_config
+    )
+    monkeypatch.setattr(f"{_MODULE}.get_current_tenant_id", lambda: "tenant")
+    monkeypatch.setattr(f"{_MODULE}.CENSORING_DECISION_CACHE_TTL_SECONDS", 60)
+    post_query_censoring._censoring_decisions.clear()
+    return funcs
+
+
+def _user() -> MagicMock:
+    user = MagicMock()
+    user.is_anonymous = False
+    user.email = "user@example.com"
+    return user
+
+
+def test_sources_are_censored_in_parallel(
+    censoring_funcs: dict[DocumentSource, _CensorFunc],
+) -> None:
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _censor(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        # only passes if both sources are being censored at the same time
+        barrier.wait()
+        return _redacted(chunks, user_email)
+
+    censoring_funcs[DocumentSource.SALESFORCE] = _censor
+    censoring_funcs[DocumentSource.JIRA] = _censor
+    chunks = [
+        _make_chunk("sf1", DocumentSource.SALESFORCE),
+        _make_chunk("web1", DocumentSource.WEB),
+        _make_chunk("jira-secret", DocumentSource.JIRA),
+        _make_chunk("jira1", DocumentSource.JIRA),
+    ]
+
+    result = _post_query_chunk_censoring(chunks, _user())
+
+    assert [chunk.document_id for chunk in result] == ["sf1", "web1", "jira1"]
+    assert [chunk.content for chunk in result] == [
+        "redacted",
+        "web1 content",
+        "redacted",
+    ]
+
+
+def test_timed_out_source_is_thrown_out(
+    censoring_funcs: dict[DocumentSource, _CensorFunc],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(f"{_MODULE}.POST_QUERY_CENSORING_TIMEOUT_SECONDS", 0.2)
+
+    def _slow_censor(
+        chunks: list[InferenceChunk], user_email: str
+    ) -> list[InferenceChunk]:
+        time.sleep(1)
+        return _redacted(chunks, user_email)
+
+    censoring_funcs[DocumentSource.SALESFORCE] = _slow_censor
+    censoring_funcs[DocumentSource.JIRA] = _redacted
+    chunks = [
+        _make_chunk("sf1", DocumentSource.SALESFORCE),
+        _make_chunk("jira1", DocumentSource.JIRA),
+    ]
+
+    result = _post_query_chunk_censoring(chunks, _user())
+
+    assert [chunk.document_id for chunk in result] == ["jira1"]
+
+
+def test_censoring_decisions_are_reused(
+    censoring_funcs: dict[DocumentSource, _CensorFunc],
+) -> None:
+    censored_document_ids: list[str] = []
+
+    def _censor(chunks: list[InferenceChunk], user_email: str) -> list[InferenceChunk]:
+        censored_document_ids.extend(chunk.document_id for chunk in chunks)
+        return _redacted(chunks, user_email)
+
+    censoring_funcs[DocumentSource.SALESFORCE] = _censor
+    first_chunks = [
+        _make_chunk("sf1", DocumentSource.SALESFORCE),
+        _make_chunk("sf-secret", DocumentSource.SALESFORCE),
+    ]
+    _post_query_chunk_censoring(first_chunks, _user())
+
+    second_chunks = first_chunks + [_make_chunk("sf2", DocumentSource.SALESFORCE)]
+    result = _post_query_chunk_censoring(second_chunks, _user())
+
+    assert censored_document_ids == ["sf1", "sf-secret", "sf2"]
+    assert [chunk.document_id for chunk in result] == ["sf1", "sf2"]
+    assert all(chunk.content == "redacted" for chunk in result)
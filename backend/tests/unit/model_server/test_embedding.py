@@ -50,9 +50,11 @@ async def test_embed_text_local_model() -> None:
 
 @pytest.mark.asyncio
 async def test_concurrent_embeddings() -> None:
-    def mock_encode(*args: Any, **kwargs: Any) -> List[List[float]]:  # noqa: ARG001
+    def mock_encode(
+        texts: List[str], **kwargs: Any  # noqa: ARG001
+    ) -> List[List[float]]:
         time.sleep(5)
-        return [[0.1, 0.2, 0.3]]
+        return [[0.1, 0.2, 0.3] for _ in texts]
 
     test_req = EmbedRequest(
         texts=["test"],
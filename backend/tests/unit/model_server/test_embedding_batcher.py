@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+from model_server.embedding_batcher import EmbeddingBatcher
+from shared_configs.enums import EmbedTextType
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch() -> None:
+    encoded_batches: list[list[str]] = []
+
+    def encode(texts: list[str]) -> list[list[float]]:
+        encoded_batches.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(max_batch_size=8, max_wait_ms=50)
+    results = await asyncio.gather(
+        *[
+            batcher.embed(
+                texts=["a" * (i + 1), "b" * (i + 1)],
+                text_type=EmbedTextType.QUERY,
+                batch_key="model",
+                model_label="model",
+                encode=encode,
+            )
+            for i in range(3)
+        ]
+    )
+
+    assert results == [[[1.0], [1.0]], [[2.0], [2.0]], [[3.0], [3.0]]]
+    assert len(encoded_batches) == 1
+    # Sorted by length to reduce padding
+    assert [len(text) for text in encoded_batches[0]] == [1, 1, 2, 2, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_queries_are_embedded_before_passages() -> None:
+    encoded_batches: list[list[str]] = []
+
+    def encode(texts: list[str]) -> list[list[float]]:
+        encoded_batches.append(texts)
+        # Keep the first batch busy so that the rest queue up behind it
+        time.sleep(0.05)
+        return [[0.0] for _ in texts]
+
+    batcher = EmbeddingBatcher(max_batch_size=2, max_wait_ms=0)
+
+    def embed(texts: list[str], text_type: EmbedTextType) -> asyncio.Task:
+        return asyncio.create_task(
+            batcher.embed(
+                texts=texts,
+                text_type=text_type,
+                batch_key="model",
+                model_label="model",
+                encode=encode,
+            )
+        )
+
+    first = embed(["p1"], EmbedTextType.PASSAGE)
+    await asyncio.sleep(0.01)
+    passages = embed(["p2", "p3", "p4"], EmbedTextType.PASSAGE)
+    query = embed(["q1"], EmbedTextType.QUERY)
+    await asyncio.gather(first, passages, query)
+
+    assert encoded_batches[0] == ["p1"]
+    assert "q1" in encoded_batches[1]
+
+
+@pytest.mark.asyncio
+async def test_encode_failure_fails_every_request_in_the_batch() -> None:
+    def encode(texts: list[str]) -> list[list[float]]:  # noqa: ARG001
+        raise RuntimeError("boom")
+
+    batcher = EmbeddingBatcher(max_batch_size=8, max_wait_ms=10)
+    results = await asyncio.gather(
+        *[
+            batcher.embed(
+                texts=["text"],
+                text_type=EmbedTextType.PASSAGE,
+                batch_key="model",
+                model_label="model",
+                encode=encode,
+            )
+            for _ in range(2)
+        ],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_request() -> None:
+    encoded_batches: list[list[str]] = []
+
+    def encode(texts: list[str]) -> list[list[float]]:
+        encoded_batches.append(texts)
+        if "bad" in texts:
+            raise RuntimeError("boom")
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(max_batch_size=8, max_wait_ms=10)
+    good, bad = await asyncio.gather(
+        *[
+            batcher.embed(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                batch_key="model",
+                model_label="model",
+                encode=encode,
+            )
+            for texts in (["good", "ok"], ["bad"])
+        ],
+        return_exceptions=True,
+    )
+
+    assert good == [[4.0], [2.0]]
+    assert isinstance(bad, RuntimeError)
+    assert len(encoded_batches) == 3
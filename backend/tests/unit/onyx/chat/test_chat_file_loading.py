@@ -0,0 +1,151 @@
+"""Tests for loading chat files with the chat file text cache."""
+
+from io import BytesIO
+from typing import Any
+from typing import IO
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.chat.chat_utils import load_chat_file
+from onyx.file_store import chat_file_text_cache
+from onyx.file_store.chat_file_text_cache import _ChatFileTextLRU
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import FileDescriptor
+
+
+class _FileStore:
+    def __init__(self) -> None:
+        self.files: dict[str, bytes] = {
+            "report": b"%PDF report",
+            "logo": b"png bytes",
+        }
+        self.metadata: dict[str, dict[str, Any] | None] = {}
+        self.reads: list[str] = []
+
+    def read_file(self, file_id: str, **_: Any) -> IO[bytes]:
+        self.reads.append(file_id)
+        return BytesIO(self.files[file_id])
+
+    def read_file_record(self, file_id: str) -> MagicMock:
+        if file_id not in self.files:
+            raise RuntimeError(f"File by id {file_id} does not exist or was deleted")
+        file_record = MagicMock()
+        file_record.file_metadata = self.metadata.get(file_id)
+        return file_record
+
+    def save_file(
+        self,
+        content: IO[bytes],
+        file_metadata: dict[str, Any] | None,
+        file_id: str,
+        **_: Any,
+    ) -> str:
+        self.files[file_id] = content.read()
+        self.metadata[file_id] = file_metadata
+        return file_id
+
+
+class _Extractor:
+    def __init__(self) -> None:
+        self.num_calls = 0
+
+    def __call__(self, file: IO[bytes], **_: Any) -> str:  # noqa: ARG002
+        self.num_calls += 1
+        return "extracted report text"
+
+
+@pytest.fixture
+def file_store(monkeypatch: pytest.MonkeyPatch) -> _FileStore:
+    file_store = _FileStore()
+    for module in ("onyx.chat.chat_utils", "onyx.file_store.chat_file_text_cache"):
+        monkeypatch.setattr(f"{module}.get_default_file_store", lambda: file_store)
+    monkeypatch.setattr(
+        chat_file_text_cache, "_chat_file_text_lru", _ChatFileTextLRU(max_chars=1000)
+    )
+    return file_store
+
+
+@pytest.fixture
+def extractor(monkeypatch: pytest.MonkeyPatch) -> _Extractor:
+    extractor = _Extractor()
+    monkeypatch.setattr("onyx.chat.chat_utils.extract_file_text", extractor)
+    return extractor
+
+
+def _db_session(token_count: int | None) -> MagicMock:
+    db_session = MagicMock()
+    user_file = MagicMock()
+    user_file.token_count = token_count
+    db_session.query.return_value.filter.return_value.first.return_value = user_file
+    return db_session
+
+
+_REPORT: FileDescriptor = {
+    "id": "report",
+    "type": ChatFileType.DOC,
+    "name": "report.pdf",
+    "user_file_id": "00000000-0000-0000-0000-000000000001",
+}
+
+
+def test_text_is_extracted_once(file_store: _FileStore, extractor: _Extractor) -> None:
+    db_session = _db_session(token_count=42)
+
+    first = load_chat_file(_REPORT, db_session, load_content=False)
+    second = load_chat_file(_REPORT, db_session, load_content=False)
+
+    assert extractor.num_calls == 1
+    assert file_store.reads == ["report"]
+    assert db_session.query.call_count == 1
+    assert first.content_text == second.content_text == "extracted report text"
+    assert first.token_count == second.token_count == 42
+    assert second.content == b""
+
+
+@pytest.mark.usefixtures("file_store")
+def test_text_is_loaded_from_the_file_store(
+    extractor: _Extractor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    load_chat_file(_REPORT, _db_session(token_count=42), load_content=False)
+    # e.g. a different api server process
+    monkeypatch.setattr(
+        chat_file_text_cache, "_chat_file_text_lru", _ChatFileTextLRU(max_chars=1000)
+    )
+    db_session = _db_session(token_count=42)
+
+    loaded_file = load_chat_file(_REPORT, db_session, load_content=True)
+
+    assert extractor.num_calls == 1
+    assert db_session.query.call_count == 0
+    assert loaded_file.content_text == "extracted report text"
+    assert loaded_file.token_count == 42
+    # the raw bytes are still there when asked for
+    assert loaded_file.content == b"%PDF report"
+
+
+@pytest.mark.usefixtures("file_store")
+def test_unknown_token_count_is_looked_up_until_known(extractor: _Extractor) -> None:
+    load_chat_file(_REPORT, _db_session(token_count=None), load_content=False)
+    loaded_file = load_chat_file(
+        _REPORT, _db_session(token_count=42), load_content=False
+    )
+    assert loaded_file.token_count == 42
+
+    db_session = _db_session(token_count=42)
+    load_chat_file(_REPORT, db_session, load_content=False)
+
+    assert extractor.num_calls == 1
+    assert db_session.query.call_count == 0
+
+
+@pytest.mark.usefixtures("file_store")
+def test_images_are_always_loaded(extractor: _Extractor) -> None:
+    image: FileDescriptor = {"id": "logo", "type": ChatFileType.IMAGE, "name": None}
+
+    loaded_file = load_chat_file(image, MagicMock(), load_content=False)
+
+    assert loaded_file.content == b"png bytes"
+    assert loaded_file.content_text is None
+    assert extractor.num_calls == 0
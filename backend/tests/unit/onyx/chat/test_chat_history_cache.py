@@ -0,0 +1,181 @@
+"""Tests for reusing converted assistant messages across turns of a chat session."""
+
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from onyx.chat import chat_utils
+from onyx.chat.chat_utils import _SimpleHistoryCache
+from onyx.chat.chat_utils import convert_chat_history
+from onyx.chat.models import ChatHistoryResult
+from onyx.configs.constants import MessageType
+
+
+class _ToolCalls(list):
+    """Counts how often the tool calls of a message are iterated, i.e. converted."""
+
+    def __init__(self, tool_calls: list[SimpleNamespace]) -> None:
+        super().__init__(tool_calls)
+        self.num_iterations = 0
+
+    def __iter__(self) -> Iterator[SimpleNamespace]:
+        self.num_iterations += 1
+        return super().__iter__()
+
+
+class _AssistantMessage:
+    """Counts how often the tool calls of the message are converted."""
+
+    def __init__(self, id: int, chat_session_id: Any, message: str) -> None:
+        self.id = id
+        self.chat_session_id = chat_session_id
+        self.message = message
+        self.token_count = len(message)
+        self.message_type = MessageType.ASSISTANT
+        self.files = None
+        self.tool_calls = _ToolCalls(
+            [
+                SimpleNamespace(
+                    turn_number=0,
+                    tool_id=1,
+                    tool_call_id=f"call_{id}",
+                    tool_call_arguments={"query": "onyx"},
+                    tool_call_tokens=5,
+                )
+            ]
+        )
+
+    @property
+    def tool_call_reads(self) -> int:
+        return self.tool_calls.num_iterations
+
+
+def _user_message(id: int, chat_session_id: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id,
+        chat_session_id=chat_session_id,
+        message=f"question {id}",
+        token_count=2,
+        message_type=MessageType.USER,
+        files=None,
+    )
+
+
+@pytest.fixture(autouse=True)
+def simple_history_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        chat_utils, "_simple_history_cache", _SimpleHistoryCache(max_sessions=10)
+    )
+
+
+def _convert(
+    chat_history: list[Any],
+    tool_id_to_name_map: dict[int, str] | None = None,
+    db_session: MagicMock | None = None,
+) -> ChatHistoryResult:
+    return convert_chat_history(
+        chat_history=chat_history,
+        files=[],
+        project_image_files=[],
+        additional_context=None,
+        token_counter=len,
+        tool_id_to_name_map=tool_id_to_name_map or {1: "internal_search"},
+        db_session=db_session,
+    )
+
+
+def test_assistant_messages_are_converted_once() -> None:
+    chat_session_id = uuid4()
+    answer = _AssistantMessage(2, chat_session_id, "answer")
+    history = [_user_message(1, chat_session_id), answer]
+
+    first = _convert(history + [_user_message(3, chat_session_id)])
+    next_answer = _AssistantMessage(4, chat_session_id, "next answer")
+    history += [_user_message(3, chat_session_id), next_answer]
+    second = _convert(history + [_user_message(5, chat_session_id)])
+
+    assert answer.tool_call_reads == 1
+    assert next_answer.tool_call_reads == 1
+    assert second.simple_messages[: len(first.simple_messages)] == first.simple_messages
+    assert [message.message_type for message in second.simple_messages] == [
+        MessageType.USER,
+        MessageType.ASSISTANT,
+        MessageType.TOOL_CALL_RESPONSE,
+        MessageType.ASSISTANT,
+        MessageType.USER,
+        MessageType.ASSISTANT,
+        MessageType.TOOL_CALL_RESPONSE,
+        MessageType.ASSISTANT,
+        MessageType.USER,
+    ]
+
+
+def test_changed_assistant_message_is_converted_again() -> None:
+    chat_session_id = uuid4()
+    answer = _AssistantMessage(2, chat_session_id, "")
+    history = [_user_message(1, chat_session_id), answer]
+    _convert(history)
+
+    answer.message = "the final answer"
+    answer.token_count = 4
+    result = _convert(history)
+
+    assert answer.tool_call_reads == 2
+    assert result.simple_messages[-1].message == "the final answer"
+
+
+def test_changed_tool_names_invalidate_the_session() -> None:
+    chat_session_id = uuid4()
+    answer = _AssistantMessage(2, chat_session_id, "answer")
+    history = [_user_message(1, chat_session_id), answer]
+    _convert(history, tool_id_to_name_map={1: "internal_search"})
+
+    result = _convert(history, tool_id_to_name_map={1: "renamed_search"})
+
+    assert answer.tool_call_reads == 2
+    tool_calls = result.simple_messages[1].tool_calls
+    assert tool_calls is not None
+    assert tool_calls[0].tool_name == "renamed_search"
+
+
+def test_cached_messages_are_not_shared_between_turns() -> None:
+    chat_session_id = uuid4()
+    history = [
+        _user_message(1, chat_session_id),
+        _AssistantMessage(2, chat_session_id, "answer"),
+    ]
+    first = _convert(history)
+    first.simple_messages[-1].should_cache = True
+
+    second = _convert(history)
+
+    assert second.simple_messages[-1].should_cache is False
+
+
+def test_tool_calls_are_only_prefetched_for_new_messages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    prefetched: list[list[int]] = []
+    monkeypatch.setattr(
+        chat_utils,
+        "prefetch_chat_message_tool_calls",
+        lambda chat_messages, _: prefetched.append([m.id for m in chat_messages]),
+    )
+    chat_session_id = uuid4()
+    history = [
+        _user_message(1, chat_session_id),
+        _AssistantMessage(2, chat_session_id, "answer"),
+    ]
+    _convert(history, db_session=MagicMock())
+
+    history += [
+        _user_message(3, chat_session_id),
+        _AssistantMessage(4, chat_session_id, "next answer"),
+    ]
+    _convert(history, db_session=MagicMock())
+
+    assert prefetched == [[2], [4]]
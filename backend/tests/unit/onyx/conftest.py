@@ -0,0 +1,54 @@
+"""Fixtures shared by the unit tests of Redis backed caches."""
+
+import pytest
+
+from shared_configs.contextvars import get_current_tenant_id
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis client commands used by the caches.
+
+    Like the client returned by get_redis_client, single key commands prefix the
+    key with the tenant ID while mget does not, so `store` holds the raw keys.
+    """
+
+    def __init__(self, tenant_id: str) -> None:
+        self.tenant_prefix = f"{tenant_id}:"
+        self.store: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.num_mgets = 0
+
+    def _prefixed(self, key: str) -> str:
+        return f"{self.tenant_prefix}{key}"
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(self._prefixed(key))
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.num_mgets += 1
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key: str, value: str | bytes, ex: int | None = None) -> None:
+        key = self._prefixed(key)
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        if ex is not None:
+            self.ttls[key] = ex
+        else:
+            self.ttls.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        key = self._prefixed(key)
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+    def ttl(self, key: str) -> int:
+        key = self._prefixed(key)
+        if key not in self.store:
+            return -2
+        return self.ttls.get(key, -1)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis(tenant_id=get_current_tenant_id())
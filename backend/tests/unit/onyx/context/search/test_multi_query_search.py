@@ -0,0 +1,172 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import ChunkSearchRequest
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.pipeline import multi_query_search_pipeline
+from onyx.document_index.interfaces import DocumentIndex
+
+
+def _make_chunk(
+    document_id: str, chunk_id: int = 0, score: float = 1.0
+) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        source_type=DocumentSource.WEB,
+        semantic_identifier=document_id,
+        title=document_id,
+        chunk_id=chunk_id,
+        blurb="",
+        content="",
+        source_links=None,
+        image_file_id=None,
+        section_continuation=False,
+        boost=0,
+        score=score,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+    )
+
+
+_PIPELINE_MODULE = "onyx.context.search.pipeline"
+_SEARCH_RUNNER_MODULE = "onyx.context.search.retrieval.search_runner"
+
+
+def test_multi_query_search_builds_filters_and_embeds_once() -> None:
+    results_by_query = {
+        "first": [_make_chunk("a"), _make_chunk("b")],
+        "second": [_make_chunk("b"), _make_chunk("c")],
+    }
+    document_index = MagicMock(spec=DocumentIndex)
+    document_index.hybrid_retrieval.side_effect = lambda query, **_: (
+        results_by_query[query]
+    )
+
+    with (
+        patch(
+            f"{_PIPELINE_MODULE}._build_index_filters",
+            return_value=IndexFilters(access_control_list=None),
+        ) as mock_build_filters,
+        patch(
+            f"{_PIPELINE_MODULE}.get_query_embeddings",
+            return_value=[[1.0], [2.0]],
+        ) as mock_get_query_embeddings,
+        patch(
+            f"{_SEARCH_RUNNER_MODULE}.get_federated_retrieval_functions",
+            return_value=[],
+        ),
+        patch(
+            f"{_PIPELINE_MODULE}._censor_chunks",
+            side_effect=lambda chunks, user: [  # noqa: ARG005
+                chunk for chunk in chunks if chunk.document_id != "c"
+            ],
+        ) as mock_censor_chunks,
+    ):
+        results = multi_query_search_pipeline(
+            chunk_search_requests=[
+                ChunkSearchRequest(query="first"),
+                ChunkSearchRequest(query="second", hybrid_alpha=0.2),
+            ],
+            document_index=document_index,
+            user=MagicMock(),
+            persona=None,
+            db_session=MagicMock(),
+        )
+
+    assert [[chunk.document_id for chunk in chunks] for chunks in results] == [
+        ["a", "b"],
+        ["b"],
+    ]
+    mock_build_filters.assert_called_once()
+    mock_get_query_embeddings.assert_called_once()
+    assert mock_get_query_embeddings.call_args.args[0] == ["first", "second"]
+    # Chunks retrieved by both queries are only censored once
+    mock_censor_chunks.assert_called_once()
+    assert len(mock_censor_chunks.call_args.args[0]) == 3
+
+    embeddings_by_query = {
+        call.kwargs["query"]: call.kwargs["query_embedding"]
+        for call in document_index.hybrid_retrieval.call_args_list
+    }
+    assert embeddings_by_query == {"first": [1.0], "second": [2.0]}
+
+
+def test_multi_query_search_keeps_per_query_chunks_when_censoring() -> None:
+    results_by_query = {
+        "first": [_make_chunk("a", score=0.9), _make_chunk("b", score=0.1)],
+        "second": [_make_chunk("a", score=0.2), _make_chunk("b", score=0.8)],
+    }
+    document_index = MagicMock(spec=DocumentIndex)
+    document_index.hybrid_retrieval.side_effect = lambda query, **_: (
+        results_by_query[query]
+    )
+
+    def censor_chunks(
+        chunks: list[InferenceChunk], user: MagicMock  # noqa: ARG001
+    ) -> list[InferenceChunk]:
+        # "a" is kept as is, the content of "b" is censored
+        return [
+            (
+                chunk
+                if chunk.document_id == "a"
+                else chunk.model_copy(update={"content": "censored"})
+            )
+            for chunk in chunks
+        ]
+
+    with (
+        patch(
+            f"{_PIPELINE_MODULE}._build_index_filters",
+            return_value=IndexFilters(access_control_list=None),
+        ),
+        patch(
+            f"{_PIPELINE_MODULE}.get_query_embeddings",
+            return_value=[[1.0], [2.0]],
+        ),
+        patch(
+            f"{_SEARCH_RUNNER_MODULE}.get_federated_retrieval_functions",
+            return_value=[],
+        ),
+        patch(f"{_PIPELINE_MODULE}._censor_chunks", side_effect=censor_chunks),
+    ):
+        results = multi_query_search_pipeline(
+            chunk_search_requests=[
+                ChunkSearchRequest(query="first"),
+                ChunkSearchRequest(query="second"),
+            ],
+            document_index=document_index,
+            user=MagicMock(),
+            persona=None,
+            db_session=MagicMock(),
+        )
+
+    # every query keeps the scores of its own retrieval
+    assert [
+        {chunk.document_id: (chunk.score, chunk.content) for chunk in chunks}
+        for chunks in results
+    ] == [
+        {"a": (0.9, ""), "b": (0.1, "censored")},
+        {"a": (0.2, ""), "b": (0.8, "censored")},
+    ]
+
+
+def test_multi_query_search_requires_shared_filters() -> None:
+    with pytest.raises(ValueError):
+        multi_query_search_pipeline(
+            chunk_search_requests=[
+                ChunkSearchRequest(query="first"),
+                ChunkSearchRequest(query="second", bypass_acl=True),
+            ],
+            document_index=MagicMock(spec=DocumentIndex),
+            user=MagicMock(),
+            persona=None,
+            db_session=MagicMock(),
+        )
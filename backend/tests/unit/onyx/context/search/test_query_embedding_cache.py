@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.context.search.query_embedding_cache import embed_queries_with_cache
+from onyx.context.search.query_embedding_cache import LRUTTLCache
+from onyx.context.search.query_embedding_cache import QueryEmbeddingModelSnapshot
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbedTextType
+
+
+def _make_snapshot(search_settings_id: int = 1) -> QueryEmbeddingModelSnapshot:
+    model = MagicMock(spec=EmbeddingModel)
+    model.encode.side_effect = lambda texts, text_type: [  # noqa: ARG005
+        [float(len(text))] for text in texts
+    ]
+    return QueryEmbeddingModelSnapshot(
+        search_settings_id=search_settings_id,
+        settings_fingerprint=(search_settings_id,),
+        model=model,
+        redis_cache=None,
+        refresh_at=0.0,
+    )
+
+
+def test_repeated_queries_are_embedded_once() -> None:
+    cache = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    snapshot = _make_snapshot()
+
+    first = embed_queries_with_cache(
+        ["hello world", "  hello   world "], snapshot, cache
+    )
+    second = embed_queries_with_cache(["hello world"], snapshot, cache)
+
+    assert first == [[11.0], [11.0]]
+    assert second == [[11.0]]
+    snapshot.model.encode.assert_called_once_with(  # type: ignore[attr-defined]
+        ["hello world"], text_type=EmbedTextType.QUERY
+    )
+
+
+def test_cache_is_scoped_to_search_settings() -> None:
+    cache = LRUTTLCache(max_entries=10, ttl_seconds=60)
+    old_snapshot = _make_snapshot(search_settings_id=1)
+    new_snapshot = _make_snapshot(search_settings_id=2)
+
+    embed_queries_with_cache(["query"], old_snapshot, cache)
+    embed_queries_with_cache(["query"], new_snapshot, cache)
+
+    assert new_snapshot.model.encode.call_count == 1  # type: ignore[attr-defined]
+
+
+def test_lru_ttl_cache_evicts_least_recently_used() -> None:
+    cache = LRUTTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    # Touch "a" so that "b" is the least recently used entry
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+
+    assert cache.get("a") == [1.0]
+    assert cache.get("b") is None
+    assert cache.get("c") == [3.0]
+
+
+def test_lru_ttl_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(
+        "onyx.context.search.query_embedding_cache.time.monotonic", lambda: now
+    )
+    cache = LRUTTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", [1.0])
+
+    now += 61
+    assert cache.get("a") is None
@@ -114,6 +114,27 @@ def test_delete_user_commits_and_removes_invited(
     mock_remove_invited.assert_called_once_with("deleted@example.com")
 
 
+@patch("onyx.db.users.remove_user_from_invited_users")
+@patch("onyx.db.users.fetch_ee_implementation_or_noop")
+def test_delete_user_invalidates_user_acl_cache_after_commit(
+    mock_ee: Any, _mock_remove_invited: Any
+) -> None:
+    db_session = MagicMock()
+    db_session.query.return_value = _make_query_chain()
+    invalidate_user_acl_cache = MagicMock(
+        side_effect=lambda: db_session.commit.assert_called_once()
+    )
+    mock_ee.side_effect = lambda _module, attribute: (
+        invalidate_user_acl_cache
+        if attribute == "invalidate_user_acl_cache"
+        else MagicMock()
+    )
+
+    delete_user_from_db(_mock_user(), db_session)
+
+    invalidate_user_acl_cache.assert_called_once_with()
+
+
 @patch("onyx.db.users.remove_user_from_invited_users")
 @patch(
     "onyx.db.users.fetch_ee_implementation_or_noop",
@@ -0,0 +1,120 @@
+"""Tests for the tenant-scoped hot config cache."""
+
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from onyx.db import hot_config_cache
+from onyx.db.hot_config_cache import _invalidate_committed_changes
+from onyx.db.hot_config_cache import _mark_changed
+from onyx.db.hot_config_cache import get_hot_config
+from onyx.db.hot_config_cache import HotConfigNamespace
+from onyx.db.hot_config_cache import invalidate_hot_config
+from tests.unit.onyx.conftest import FakeRedis
+
+
+class _Loader:
+    def __init__(self, value: str) -> None:
+        self.value = value
+        self.num_calls = 0
+
+    def __call__(self) -> str:
+        self.num_calls += 1
+        return self.value
+
+
+@pytest.fixture
+def redis_client(fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    monkeypatch.setattr(hot_config_cache, "get_redis_client", lambda **_: fake_redis)
+    monkeypatch.setattr(hot_config_cache, "HOT_CONFIG_CACHE_TTL_SECONDS", 300)
+    monkeypatch.setattr(hot_config_cache, "HOT_CONFIG_VERSION_CHECK_SECONDS", 60.0)
+    monkeypatch.setattr(hot_config_cache, "_tenant_versions", {})
+    monkeypatch.setattr(hot_config_cache, "_local_cache", OrderedDict())
+    return fake_redis
+
+
+def test_value_is_loaded_once(redis_client: FakeRedis) -> None:
+    load = _Loader("tools")
+
+    first = get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+    second = get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+    get_hot_config(HotConfigNamespace.MEMORIES, "user", _Loader("memories"))
+
+    assert first == second == "tools"
+    assert load.num_calls == 1
+    # the versions of all namespaces are checked at once
+    assert redis_client.num_mgets == 1
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_invalidation_reloads_only_the_namespace() -> None:
+    load_tools = _Loader("tools")
+    load_memories = _Loader("memories")
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load_tools)
+    get_hot_config(HotConfigNamespace.MEMORIES, "user", load_memories)
+
+    load_tools.value = "renamed tools"
+    invalidate_hot_config([HotConfigNamespace.TOOLS])
+
+    tools = get_hot_config(HotConfigNamespace.TOOLS, "all", load_tools)
+    get_hot_config(HotConfigNamespace.MEMORIES, "user", load_memories)
+    assert tools == "renamed tools"
+    assert load_tools.num_calls == 2
+    assert load_memories.num_calls == 1
+
+
+def test_invalidation_by_another_process(
+    redis_client: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    load = _Loader("tools")
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+
+    redis_client.incr(hot_config_cache._version_key(HotConfigNamespace.TOOLS))
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+    # the version is only checked again after HOT_CONFIG_VERSION_CHECK_SECONDS
+    assert load.num_calls == 1
+
+    monkeypatch.setattr(hot_config_cache, "HOT_CONFIG_VERSION_CHECK_SECONDS", 0.0)
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+    assert load.num_calls == 2
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_commit_invalidates_changed_namespaces() -> None:
+    load = _Loader("memories")
+    get_hot_config(HotConfigNamespace.MEMORIES, "user", load)
+
+    session = Session()
+    _mark_changed(session, {HotConfigNamespace.MEMORIES})
+    _invalidate_committed_changes(session)
+    get_hot_config(HotConfigNamespace.MEMORIES, "user", load)
+
+    assert load.num_calls == 2
+    assert not session.info
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_falls_back_to_loading_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    failing_redis = MagicMock()
+    failing_redis.mget.side_effect = ConnectionError("redis is down")
+    monkeypatch.setattr(hot_config_cache, "get_redis_client", lambda **_: failing_redis)
+    load = _Loader("tools")
+
+    assert get_hot_config(HotConfigNamespace.TOOLS, "all", load) == "tools"
+    assert get_hot_config(HotConfigNamespace.TOOLS, "all", load) == "tools"
+    assert load.num_calls == 2
+
+
+def test_disabled_cache_always_loads(
+    redis_client: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(hot_config_cache, "HOT_CONFIG_CACHE_TTL_SECONDS", 0)
+    load = _Loader("tools")
+
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+    get_hot_config(HotConfigNamespace.TOOLS, "all", load)
+
+    assert load.num_calls == 2
+    assert redis_client.num_mgets == 0
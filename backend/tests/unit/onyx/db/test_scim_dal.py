@@ -1,5 +1,7 @@
 import logging
+from typing import Any
 from unittest.mock import MagicMock
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
@@ -8,6 +10,7 @@ from ee.onyx.db.scim import ScimDAL
 from onyx.db.models import ScimGroupMapping
 from onyx.db.models import ScimToken
 from onyx.db.models import ScimUserMapping
+from onyx.db.models import UserGroup
 from tests.unit.onyx.db.conftest import model_attrs
 
 
@@ -183,3 +186,46 @@ class TestScimDALGroupMappings:
 
         mock_db_session.delete.assert_not_called()
         assert "SCIM group mapping 999 not found" in caplog.text
+
+
+class TestScimDALGroupMembers:
+    """Tests for the user ACL cache invalidation of group member changes."""
+
+    @pytest.mark.parametrize(
+        "change_members",
+        [
+            lambda dal: dal.upsert_group_members(1, [uuid4()]),
+            lambda dal: dal.replace_group_members(1, []),
+            lambda dal: dal.remove_group_members(1, [uuid4()]),
+            lambda dal: dal.delete_group_with_members(UserGroup(id=1, name="g")),
+        ],
+    )
+    def test_commit_invalidates_user_acl_cache_once(
+        self, scim_dal: ScimDAL, change_members: Any
+    ) -> None:
+        with patch("ee.onyx.db.scim.invalidate_user_acl_cache") as mock_invalidate:
+            change_members(scim_dal)
+            mock_invalidate.assert_not_called()
+
+            scim_dal.commit()
+            scim_dal.commit()
+
+        mock_invalidate.assert_called_once()
+
+    def test_commit_without_member_changes_does_not_invalidate(
+        self, scim_dal: ScimDAL
+    ) -> None:
+        with patch("ee.onyx.db.scim.invalidate_user_acl_cache") as mock_invalidate:
+            scim_dal.upsert_group_members(1, [])
+            scim_dal.create_group_mapping(external_id="ext-g1", user_group_id=1)
+            scim_dal.commit()
+
+        mock_invalidate.assert_not_called()
+
+    def test_rollback_discards_member_changes(self, scim_dal: ScimDAL) -> None:
+        with patch("ee.onyx.db.scim.invalidate_user_acl_cache") as mock_invalidate:
+            scim_dal.remove_group_members(1, [uuid4()])
+            scim_dal.rollback()
+            scim_dal.commit()
+
+        mock_invalidate.assert_not_called()
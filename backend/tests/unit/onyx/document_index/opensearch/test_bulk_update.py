@@ -0,0 +1,71 @@
+"""Tests for handling missing document chunks in OpenSearch bulk updates."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from opensearchpy import NotFoundError
+
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.opensearch import client as opensearch_client
+from onyx.document_index.opensearch.client import OpenSearchClient
+from onyx.document_index.opensearch.opensearch_document_index import (
+    OpenSearchOldDocumentIndex,
+)
+
+
+def _patch_bulk(
+    monkeypatch: pytest.MonkeyPatch, success: int, errors: list[dict[str, Any]]
+) -> MagicMock:
+    bulk = MagicMock(return_value=(success, errors))
+    monkeypatch.setattr(opensearch_client, "bulk", bulk)
+    return bulk
+
+
+def _error(document_chunk_id: str, status: int) -> dict[str, Any]:
+    return {"update": {"_id": document_chunk_id, "status": status, "error": {}}}
+
+
+def test_missing_chunk_raises_not_found(monkeypatch: pytest.MonkeyPatch) -> None:
+    bulk = _patch_bulk(monkeypatch, success=1, errors=[_error("doc__1", 404)])
+
+    with pytest.raises(NotFoundError):
+        OpenSearchClient(index_name="test_index").bulk_update_documents(
+            [("doc__0", {"hidden": True}), ("doc__1", {"hidden": True})]
+        )
+
+    assert bulk.call_args.kwargs["raise_on_error"] is False
+
+
+def test_other_errors_are_not_treated_as_not_found(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _patch_bulk(
+        monkeypatch, success=0, errors=[_error("doc__0", 404), _error("doc__1", 400)]
+    )
+
+    with pytest.raises(RuntimeError):
+        OpenSearchClient(index_name="test_index").bulk_update_documents(
+            [("doc__0", {"hidden": True}), ("doc__1", {"hidden": True})]
+        )
+
+
+def test_update_single_skips_document_with_missing_chunk(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _patch_bulk(monkeypatch, success=1, errors=[_error("missing", 404)])
+    index = OpenSearchOldDocumentIndex(
+        index_name="test_index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+    )
+
+    # Does not raise, the document is updated once its chunks are indexed
+    index.update_single(
+        "doc",
+        tenant_id="public",
+        chunk_count=2,
+        fields=VespaDocumentFields(hidden=True),
+        user_fields=None,
+    )
@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+from typing import Any
+from typing import cast
+
+import httpx
+import pytest
+
+from onyx.document_index.vespa import indexing_utils
+from onyx.document_index.vespa.indexing_utils import feed_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import get_final_chunk_index_via_visit
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_async_http_client
+from onyx.document_index.vespa_constants import CHUNK_ID
+from onyx.httpx.httpx_pool import AsyncHttpxPool
+from onyx.indexing.models import DocMetadataAwareIndexChunk
+
+
+def _make_chunk(doc_id: str, chunk_id: int) -> DocMetadataAwareIndexChunk:
+    return cast(
+        DocMetadataAwareIndexChunk,
+        SimpleNamespace(chunk_id=chunk_id, source_document=SimpleNamespace(id=doc_id)),
+    )
+
+
+@pytest.fixture
+def patched_feed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(indexing_utils, "INDEXING_BASE_DELAY", 0.0)
+    monkeypatch.setattr(
+        indexing_utils,
+        "_build_vespa_chunk_fields",
+        lambda chunk, multitenant: (  # noqa: ARG005
+            f"{chunk.source_document.id}_{chunk.chunk_id}",
+            {"chunk_id": chunk.chunk_id},
+        ),
+    )
+
+
+def _use_transport(monkeypatch: pytest.MonkeyPatch, handler: Any) -> None:
+    monkeypatch.setattr(
+        indexing_utils,
+        "get_vespa_async_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+@pytest.mark.usefixtures("patched_feed")
+def test_feed_vespa_chunks_retries_on_backpressure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        chunk_key = request.url.path.rsplit("/", 1)[-1]
+        attempts[chunk_key] = attempts.get(chunk_key, 0) + 1
+        # Every chunk is rejected once before being accepted
+        if attempts[chunk_key] == 1:
+            return httpx.Response(429)
+        return httpx.Response(200)
+
+    _use_transport(monkeypatch, handler)
+
+    feed_vespa_chunks(
+        chunks=[_make_chunk("doc", i) for i in range(10)],
+        index_name="test_index",
+        multitenant=False,
+        max_in_flight=4,
+    )
+
+    assert attempts == {f"doc_{i}": 2 for i in range(10)}
+
+
+@pytest.mark.usefixtures("patched_feed")
+def test_feed_vespa_chunks_does_not_retry_bad_request(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    num_requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:  # noqa: ARG001
+        nonlocal num_requests
+        num_requests += 1
+        return httpx.Response(400)
+
+    _use_transport(monkeypatch, handler)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        feed_vespa_chunks(
+            chunks=[_make_chunk("doc", 0)],
+            index_name="test_index",
+            multitenant=False,
+        )
+    assert num_requests == 1
+
+
+def test_get_final_chunk_index_via_visit_follows_continuation() -> None:
+    pages = {
+        None: {"documents": [{"fields": {CHUNK_ID: 2}}], "continuation": "next"},
+        "next": {"documents": [{"fields": {CHUNK_ID: 3}}, {"fields": {CHUNK_ID: 5}}]},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=pages[request.url.params.get("continuation")])
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        # Chunk 4 is missing, so chunk 5 is not contiguous and is ignored
+        assert (
+            get_final_chunk_index_via_visit(
+                document_id="doc",
+                start_index=2,
+                index_name="test_index",
+                http_client=http_client,
+            )
+            == 4
+        )
+
+
+def test_get_final_chunk_index_via_visit_filters_by_tenant() -> None:
+    selections: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        selections.append(request.url.params["selection"])
+        return httpx.Response(200, json={"documents": []})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        get_final_chunk_index_via_visit(
+            document_id="doc",
+            start_index=0,
+            index_name="test_index",
+            http_client=http_client,
+            tenant_id="tenant_1",
+        )
+
+    assert selections[0].endswith(" and test_index.tenant_id=='tenant_1'")
+
+
+def test_feeds_share_one_vespa_client() -> None:
+    async def _get_client() -> httpx.AsyncClient:
+        return get_vespa_async_http_client()
+
+    first = AsyncHttpxPool.run(_get_client())
+    second = AsyncHttpxPool.run(_get_client())
+
+    assert first is second
+    assert not first.is_closed
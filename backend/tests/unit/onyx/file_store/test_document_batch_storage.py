@@ -0,0 +1,117 @@
+import json
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from typing import Any
+from typing import IO
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+from onyx.file_store.file_store import FileStore
+
+
+class _InMemoryFileStore:
+    def __init__(self) -> None:
+        self.files: dict[str, tuple[str, bytes]] = {}
+
+    def save_file(self, content: IO, file_type: str, file_id: str, **_: Any) -> str:
+        data = content.read()
+        self.files[file_id] = (
+            file_type,
+            data if isinstance(data, bytes) else data.encode("utf-8"),
+        )
+        return file_id
+
+    def has_file(self, file_id: str, file_type: str, **_: Any) -> bool:
+        return file_id in self.files and self.files[file_id][0] == file_type
+
+    def read_file(self, file_id: str, **_: Any) -> IO[bytes]:
+        return BytesIO(self.files[file_id][1])
+
+
+def _make_storage(file_store: _InMemoryFileStore) -> FileStoreDocumentBatchStorage:
+    mock_file_store = MagicMock(spec=FileStore)
+    mock_file_store.save_file.side_effect = file_store.save_file
+    mock_file_store.has_file.side_effect = file_store.has_file
+    mock_file_store.read_file.side_effect = file_store.read_file
+    return FileStoreDocumentBatchStorage(
+        cc_pair_id=1, index_attempt_id=2, file_store=mock_file_store
+    )
+
+
+def _make_documents(count: int) -> list[Document]:
+    return [
+        Document(
+            id=f"doc{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Document {i}",
+            metadata={"tags": ["a", "b"], "owner": "someone"},
+            doc_updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            sections=[TextSection(text="some text\nwith a newline " * 50, link="l")],
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_store_and_get_batch_round_trip(
+    compress: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        "onyx.file_store.document_batch_storage.COMPRESS_DOCUMENT_BATCHES", compress
+    )
+    file_store = _InMemoryFileStore()
+    storage = _make_storage(file_store)
+    documents = _make_documents(20)
+
+    storage.store_batch(5, documents)
+
+    assert storage.get_batch(5) == documents
+    file_type, _ = file_store.files["iab/1/2/5.json"]
+    assert file_type == ("application/gzip" if compress else "application/json")
+
+
+def test_compressed_batch_is_smaller_than_legacy_json(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    documents = _make_documents(20)
+
+    monkeypatch.setattr(
+        "onyx.file_store.document_batch_storage.COMPRESS_DOCUMENT_BATCHES", True
+    )
+    compressed_store = _InMemoryFileStore()
+    _make_storage(compressed_store).store_batch(0, documents)
+
+    monkeypatch.setattr(
+        "onyx.file_store.document_batch_storage.COMPRESS_DOCUMENT_BATCHES", False
+    )
+    json_store = _InMemoryFileStore()
+    _make_storage(json_store).store_batch(0, documents)
+
+    compressed_size = len(compressed_store.files["iab/1/2/0.json"][1])
+    json_size = len(json_store.files["iab/1/2/0.json"][1])
+    assert compressed_size * 5 < json_size
+
+
+def test_get_batch_reads_legacy_json_with_non_string_metadata() -> None:
+    file_store = _InMemoryFileStore()
+    doc_dict = _make_documents(1)[0].model_dump(mode="json")
+    doc_dict["metadata"] = {"is_public": True}
+    file_store.files["iab/1/2/0.json"] = (
+        "application/json",
+        json.dumps([doc_dict], indent=2).encode("utf-8"),
+    )
+
+    documents = _make_storage(file_store).get_batch(0)
+
+    assert documents is not None
+    assert documents[0].metadata == {"is_public": "True"}
+
+
+def test_get_batch_returns_none_for_missing_batch() -> None:
+    assert _make_storage(_InMemoryFileStore()).get_batch(0) is None
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from uuid import uuid4
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from onyx.httpx.httpx_pool import AsyncHttpxPool
+from onyx.httpx.httpx_pool import HttpxPool
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _sample(metric: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(metric, {"pool": pool}) or 0.0
+
+
+def test_connections_are_reused(server_url: str) -> None:
+    name = f"test_{uuid4().hex}"
+    HttpxPool.init_client(name=name, http2=False)
+    try:
+        for _ in range(3):
+            HttpxPool.get(name).get(server_url).raise_for_status()
+    finally:
+        HttpxPool.close_client(name)
+
+    assert _sample("onyx_httpx_pool_requests_total", name) == 3
+    assert _sample("onyx_httpx_pool_new_connections_total", name) == 1
+
+
+def test_async_clients_are_shared_per_event_loop(server_url: str) -> None:
+    name = f"test_{uuid4().hex}"
+
+    async def _get_clients() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        first = AsyncHttpxPool.get(name, http2=False)
+        second = AsyncHttpxPool.get(name, http2=False)
+        for client in (first, second):
+            (await client.get(server_url)).raise_for_status()
+        await AsyncHttpxPool.aclose_loop_clients()
+        return first, second
+
+    first, second = asyncio.run(_get_clients())
+    other_loop_client, _ = asyncio.run(_get_clients())
+
+    assert first is second
+    assert first.is_closed
+    assert other_loop_client is not first
+    assert _sample("onyx_httpx_pool_requests_total", name) == 4
+    assert _sample("onyx_httpx_pool_new_connections_total", name) == 2
+
+
+def test_clients_are_reused_across_runs(server_url: str) -> None:
+    name = f"test_{uuid4().hex}"
+
+    async def _get_client() -> httpx.AsyncClient:
+        client = AsyncHttpxPool.get(name, http2=False)
+        (await client.get(server_url)).raise_for_status()
+        return client
+
+    first = AsyncHttpxPool.run(_get_client())
+    second = AsyncHttpxPool.run(_get_client())
+
+    assert first is second
+    assert not first.is_closed
+    assert _sample("onyx_httpx_pool_requests_total", name) == 2
+    assert _sample("onyx_httpx_pool_new_connections_total", name) == 1
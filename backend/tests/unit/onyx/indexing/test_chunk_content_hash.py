@@ -0,0 +1,106 @@
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.indexing.chunk_content_hash import diff_chunks
+from onyx.indexing.models import DocAwareChunk
+
+_SEED = "danswer_chunk_test"
+
+
+def _make_chunks(
+    doc_id: str, contents: list[str], title: str = "Title"
+) -> list[DocAwareChunk]:
+    document = Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        title=title,
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text=" ".join(contents), link=f"https://{doc_id}")],
+    )
+    return [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb=content,
+            content=content,
+            source_links={0: f"https://{doc_id}"},
+            image_file_id=None,
+            section_continuation=False,
+            source_document=document,
+            title_prefix=title,
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            contextual_rag_reserved_tokens=0,
+            doc_summary="",
+            chunk_context="",
+            mini_chunk_texts=None,
+            large_chunk_id=None,
+        )
+        for chunk_id, content in enumerate(contents)
+    ]
+
+
+def _chunk_ids(chunks: list[DocAwareChunk]) -> list[tuple[str, int]]:
+    return [(chunk.source_document.id, chunk.chunk_id) for chunk in chunks]
+
+
+def test_new_documents_are_fully_written() -> None:
+    chunks = _make_chunks("doc1", ["a", "b"]) + _make_chunks("doc2", ["c"])
+
+    chunk_diff = diff_chunks(chunks, {}, _SEED)
+
+    assert chunk_diff.changed_chunks == chunks
+    assert [len(h) for h in chunk_diff.doc_id_to_chunk_hashes.values()] == [2, 1]
+    assert chunk_diff.doc_id_to_unchanged_chunk_cnt == {}
+
+
+def test_only_changed_chunks_are_written() -> None:
+    previous = diff_chunks(_make_chunks("doc1", ["a", "b", "c", "d"]), {}, _SEED)
+
+    chunk_diff = diff_chunks(
+        _make_chunks("doc1", ["a", "B", "c"]),
+        previous.doc_id_to_chunk_hashes,
+        _SEED,
+    )
+
+    assert _chunk_ids(chunk_diff.changed_chunks) == [("doc1", 1)]
+    assert chunk_diff.doc_id_to_unchanged_chunk_cnt == {"doc1": 2}
+    assert len(chunk_diff.doc_id_to_chunk_hashes["doc1"]) == 3
+
+
+def test_moved_chunks_are_rewritten() -> None:
+    previous = diff_chunks(_make_chunks("doc1", ["a", "b"]), {}, _SEED)
+
+    chunk_diff = diff_chunks(
+        _make_chunks("doc1", ["new", "a", "b"]),
+        previous.doc_id_to_chunk_hashes,
+        _SEED,
+    )
+
+    assert _chunk_ids(chunk_diff.changed_chunks) == [
+        ("doc1", 0),
+        ("doc1", 1),
+        ("doc1", 2),
+    ]
+
+
+def test_document_level_changes_rewrite_every_chunk() -> None:
+    previous = diff_chunks(_make_chunks("doc1", ["a", "b"]), {}, _SEED)
+
+    chunk_diff = diff_chunks(
+        _make_chunks("doc1", ["a", "b"], title="New Title"),
+        previous.doc_id_to_chunk_hashes,
+        _SEED,
+    )
+
+    assert len(chunk_diff.changed_chunks) == 2
+
+
+def test_hashes_are_not_reused_for_another_index() -> None:
+    chunks = _make_chunks("doc1", ["a", "b"])
+    previous = diff_chunks(chunks, {}, _SEED)
+
+    chunk_diff = diff_chunks(chunks, previous.doc_id_to_chunk_hashes, "other_index")
+
+    assert chunk_diff.changed_chunks == chunks
@@ -0,0 +1,181 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.indexing import indexing_pipeline
+from onyx.indexing.indexing_pipeline import _ContextualRagLLMLimiter
+from onyx.indexing.indexing_pipeline import add_contextual_summaries
+from onyx.indexing.models import DocAwareChunk
+from onyx.llm.interfaces import LLMConfig
+from onyx.llm.model_response import Choice
+from onyx.llm.model_response import Message
+from onyx.llm.model_response import ModelResponse
+from onyx.llm.multi_llm import LLMRateLimitError
+from onyx.natural_language_processing.utils import BaseTokenizer
+
+_MODULE = "onyx.indexing.indexing_pipeline"
+
+
+class _CharTokenizer(BaseTokenizer):
+    def encode(self, string: str) -> list[int]:
+        return [ord(char) for char in string]
+
+    def tokenize(self, string: str) -> list[str]:
+        return list(string)
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(token) for token in tokens)
+
+
+class _InMemoryRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, **_: Any) -> None:
+        self.values[key] = value.encode("utf-8")
+
+
+class _LLM:
+    def __init__(self, num_rate_limits: int = 0, delay: float = 0.0) -> None:
+        self.config = LLMConfig(
+            model_provider="openai",
+            model_name="gpt-4o-mini",
+            temperature=0,
+            max_input_tokens=100_000,
+        )
+        self.num_rate_limits = num_rate_limits
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt: Any, **_: Any) -> ModelResponse:  # noqa: ARG002
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            rate_limited = self.calls <= self.num_rate_limits
+        try:
+            time.sleep(self.delay)
+            if rate_limited:
+                raise LLMRateLimitError("rate limited")
+            return ModelResponse(
+                id="test",
+                created="2024-01-01T00:00:00Z",
+                choice=Choice(message=Message(content="context")),
+            )
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def redis_client(monkeypatch: pytest.MonkeyPatch) -> _InMemoryRedis:
+    client = _InMemoryRedis()
+    monkeypatch.setattr(
+        "onyx.indexing.contextual_rag_cache.get_redis_client", lambda: client
+    )
+    monkeypatch.setattr(f"{_MODULE}._CONTEXTUAL_RAG_BACKOFF_BASE_SECONDS", 0.01)
+    return client
+
+
+def _make_chunks(doc_id: str, num_chunks: int) -> list[DocAwareChunk]:
+    document = Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        metadata={},
+        sections=[TextSection(text=f"{doc_id} text", link=doc_id)],
+    )
+    return [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb=f"{doc_id} chunk {chunk_id}",
+            content=f"{doc_id} chunk {chunk_id}",
+            source_links=None,
+            image_file_id=None,
+            section_continuation=False,
+            source_document=document,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            contextual_rag_reserved_tokens=100,
+            doc_summary="",
+            chunk_context="",
+            mini_chunk_texts=None,
+            large_chunk_id=None,
+        )
+        for chunk_id in range(num_chunks)
+    ]
+
+
+def _add_contextual_summaries(llm: _LLM, chunks: list[DocAwareChunk]) -> None:
+    add_contextual_summaries(
+        chunks=chunks,
+        llm=llm,  # type: ignore[arg-type]
+        tokenizer=_CharTokenizer(),
+        chunk_token_limit=512,
+    )
+
+
+def test_limiter_bounds_concurrent_calls() -> None:
+    limiter = _ContextualRagLLMLimiter(max_concurrency=2)
+    llm = _LLM(delay=0.05)
+
+    threads = [
+        threading.Thread(target=limiter.invoke, args=(llm, MagicMock()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert llm.calls == 8
+    assert llm.max_in_flight == 2
+
+
+def test_limiter_retries_rate_limited_calls() -> None:
+    limiter = _ContextualRagLLMLimiter(max_concurrency=2)
+    llm = _LLM(num_rate_limits=2)
+
+    assert limiter.invoke(llm, MagicMock()) == "context"  # type: ignore[arg-type]
+    assert llm.calls == 3
+
+
+def test_unchanged_documents_are_not_summarized_again() -> None:
+    llm = _LLM()
+    chunks = _make_chunks("doc1", 3) + _make_chunks("doc2", 2)
+    _add_contextual_summaries(llm, chunks)
+    # a document summary for each document, a context for each chunk
+    assert llm.calls == 2 + 5
+
+    reindexed_chunks = _make_chunks("doc1", 3) + _make_chunks("doc2", 2)
+    _add_contextual_summaries(llm, reindexed_chunks)
+
+    assert llm.calls == 2 + 5
+    assert all(chunk.chunk_context == "context" for chunk in reindexed_chunks)
+    assert all(chunk.doc_summary == "context" for chunk in reindexed_chunks)
+
+
+def test_changed_chunks_are_summarized(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(indexing_pipeline, "USE_DOCUMENT_SUMMARY", False)
+    llm = _LLM()
+    _add_contextual_summaries(llm, _make_chunks("doc1", 2))
+    assert llm.calls == 2
+
+    changed_chunks = _make_chunks("doc1", 2)
+    changed_chunks[1].content = "new content"
+    _add_contextual_summaries(llm, changed_chunks)
+
+    assert llm.calls == 3
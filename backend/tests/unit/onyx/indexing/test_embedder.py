@@ -8,11 +8,13 @@ from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
 from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.embedding_cache import EmbeddingCache
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
 
 
 @pytest.fixture
@@ -103,3 +105,99 @@ def test_default_indexing_embedder_embed_chunks(
         tenant_id=None,
         request_id=None,
     )
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    def __init__(self) -> None:
+        super().__init__(
+            model_name="test-model",
+            normalize=True,
+            prefix=None,
+            reduced_dimension=None,
+        )
+        self.store: dict[str, Embedding] = {}
+
+    def get_many(
+        self, texts: list[str], tenant_id: str | None = None  # noqa: ARG002
+    ) -> list[Embedding | None]:
+        return [self.store.get(self._entry_digest(text)) for text in texts]
+
+    def put_many(
+        self,
+        texts: list[str],
+        embeddings: list[Embedding],
+        tenant_id: str | None = None,  # noqa: ARG002
+    ) -> None:
+        for text, embedding in zip(texts, embeddings):
+            self.store[self._entry_digest(text)] = embedding
+
+
+def test_default_indexing_embedder_only_encodes_cache_misses(
+    mock_embedding_model: Mock,
+) -> None:
+    cache = InMemoryEmbeddingCache()
+    cache.put_many(["Cached chunk"], [[1.0, 1.0, 1.0]])
+    embedder = DefaultIndexingEmbedder(
+        model_name="test-model",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        provider_type=EmbeddingProvider.OPENAI,
+        embedding_cache=cache,
+    )
+    mock_embedding_model.return_value.encode.side_effect = [
+        [[2.0, 2.0, 2.0]],  # Only the uncached chunk
+        [[3.0, 3.0, 3.0]],  # Title embedding
+    ]
+
+    source_doc = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text="Cached chunk New chunk", link="link1")],
+    )
+    chunks = [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb=content,
+            content=content,
+            source_links={0: "link1"},
+            section_continuation=False,
+            source_document=source_doc,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            mini_chunk_texts=None,
+            large_chunk_reference_ids=[],
+            large_chunk_id=None,
+            image_file_id=None,
+            chunk_context="",
+            doc_summary="",
+            contextual_rag_reserved_tokens=0,
+        )
+        for chunk_id, content in enumerate(["Cached chunk", "New chunk"])
+    ]
+
+    result = embedder.embed_chunks(chunks)
+
+    assert [chunk.embeddings.full_embedding for chunk in result] == [
+        [1.0, 1.0, 1.0],
+        [2.0, 2.0, 2.0],
+    ]
+    assert all(chunk.title_embedding == [3.0, 3.0, 3.0] for chunk in result)
+    mock_embedding_model.return_value.encode.assert_any_call(
+        texts=["New chunk"],
+        text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
+        tenant_id=None,
+        request_id=None,
+    )
+    assert embedder.embedding_cache_hits == 1
+    assert embedder.embedding_cache_misses == 2
+
+    # Everything is cached now, so a second pass never hits the model
+    embedder.embed_chunks(chunks)
+    assert mock_embedding_model.return_value.encode.call_count == 2
+    assert embedder.embedding_cache_hits == 4
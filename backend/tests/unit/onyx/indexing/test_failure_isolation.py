@@ -0,0 +1,170 @@
+import threading
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import ConnectorFailure
+from onyx.connectors.models import ConnectorStopSignal
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.indexing.failure_isolation import isolate_failed_documents
+from onyx.indexing.models import DocAwareChunk
+from onyx.utils import threadpool_concurrency
+from onyx.utils.threadpool_concurrency import run_with_timeout
+
+
+def _make_chunks(doc_id: str, num_chunks: int = 2) -> list[DocAwareChunk]:
+    source_doc = Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text="text", link=f"https://{doc_id}")],
+    )
+    return [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb="text",
+            content="text",
+            source_links={0: f"https://{doc_id}"},
+            section_continuation=False,
+            source_document=source_doc,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            mini_chunk_texts=None,
+            large_chunk_reference_ids=[],
+            large_chunk_id=None,
+            image_file_id=None,
+            chunk_context="",
+            doc_summary="",
+            contextual_rag_reserved_tokens=0,
+        )
+        for chunk_id in range(num_chunks)
+    ]
+
+
+def _failed_doc_ids(failures: list[ConnectorFailure]) -> list[str]:
+    doc_ids = []
+    for failure in failures:
+        assert failure.failed_document is not None
+        doc_ids.append(failure.failed_document.document_id)
+    return doc_ids
+
+
+class _FailingProcessor:
+    def __init__(self, bad_doc_ids: set[str]) -> None:
+        self.bad_doc_ids = bad_doc_ids
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, chunks: list[DocAwareChunk]) -> list[str]:
+        with self._lock:
+            self.calls += 1
+        doc_ids = {chunk.source_document.id for chunk in chunks}
+        # a document's chunks must never be split up
+        assert sum(len(_make_chunks(doc_id)) for doc_id in doc_ids) == len(chunks)
+        if doc_ids & self.bad_doc_ids:
+            raise ValueError(f"bad docs: {sorted(doc_ids & self.bad_doc_ids)}")
+        return [f"{chunk.source_document.id}-{chunk.chunk_id}" for chunk in chunks]
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_isolates_single_bad_document_in_log_n_calls(parallel: bool) -> None:
+    doc_ids = [f"doc{i}" for i in range(16)]
+    chunks = [chunk for doc_id in doc_ids for chunk in _make_chunks(doc_id)]
+    processor = _FailingProcessor(bad_doc_ids={"doc5"})
+
+    result = isolate_failed_documents(
+        chunks=chunks,
+        process=processor,
+        batch_exception=ValueError("batch failed"),
+        parallel=parallel,
+    )
+
+    assert _failed_doc_ids(result.failures) == ["doc5"]
+    failed_document = result.failures[0].failed_document
+    assert failed_document is not None
+    assert failed_document.document_link == "https://doc5"
+    assert sorted(result.results) == sorted(
+        f"{doc_id}-{chunk_id}"
+        for doc_id in doc_ids
+        if doc_id != "doc5"
+        for chunk_id in range(2)
+    )
+    # two calls per level of the split, log2(16) = 4 levels
+    assert result.extra_calls == processor.calls == 8
+
+
+def test_isolates_multiple_bad_documents() -> None:
+    doc_ids = [f"doc{i}" for i in range(32)]
+    chunks = [chunk for doc_id in doc_ids for chunk in _make_chunks(doc_id)]
+    processor = _FailingProcessor(bad_doc_ids={"doc0", "doc17"})
+
+    result = isolate_failed_documents(
+        chunks=chunks,
+        process=processor,
+        batch_exception=ValueError("batch failed"),
+    )
+
+    assert sorted(_failed_doc_ids(result.failures)) == ["doc0", "doc17"]
+    assert len(result.results) == 60
+    assert result.extra_calls == processor.calls
+    assert result.extra_calls < len(doc_ids)
+
+
+def test_deep_split_does_not_wait_on_the_shared_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # with a single shared thread, any retry waiting on other retries deadlocks
+    monkeypatch.setattr(
+        threadpool_concurrency,
+        "_SHARED_THREAD_POOL",
+        threadpool_concurrency.SharedThreadPool("test", 1),
+    )
+    doc_ids = [f"doc{i}" for i in range(64)]
+    chunks = [chunk for doc_id in doc_ids for chunk in _make_chunks(doc_id)]
+    processor = _FailingProcessor(bad_doc_ids={"doc3", "doc42"})
+
+    result = run_with_timeout(
+        10.0,
+        isolate_failed_documents,
+        chunks=chunks,
+        process=processor,
+        batch_exception=ValueError("batch failed"),
+    )
+
+    assert sorted(_failed_doc_ids(result.failures)) == ["doc3", "doc42"]
+    assert len(result.results) == 124
+    # both bad documents are found through all log2(64) = 6 levels of the split
+    assert result.extra_calls == processor.calls == 2 + 4 * 5
+
+
+def test_single_document_batch_is_not_retried() -> None:
+    processor = _FailingProcessor(bad_doc_ids={"doc0"})
+    batch_exception = ValueError("batch failed")
+
+    result = isolate_failed_documents(
+        chunks=_make_chunks("doc0"),
+        process=processor,
+        batch_exception=batch_exception,
+    )
+
+    assert processor.calls == 0
+    assert result.extra_calls == 0
+    assert len(result.failures) == 1
+    assert result.failures[0].exception is batch_exception
+
+
+def test_stop_signal_is_propagated() -> None:
+    def process(chunks: list[DocAwareChunk]) -> list[str]:  # noqa: ARG001
+        raise ConnectorStopSignal("stop")
+
+    with pytest.raises(ConnectorStopSignal):
+        isolate_failed_documents(
+            chunks=_make_chunks("doc0") + _make_chunks("doc1"),
+            process=process,
+            batch_exception=ValueError("batch failed"),
+            parallel=False,
+        )
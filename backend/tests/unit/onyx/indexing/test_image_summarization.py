@@ -0,0 +1,112 @@
+import threading
+from io import BytesIO
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import ImageSection
+from onyx.connectors.models import TextSection
+from onyx.indexing.indexing_pipeline import process_image_sections
+
+_MODULE = "onyx.indexing.indexing_pipeline"
+
+# file ID -> image content, "logo" and "logo_copy" are the same image
+_IMAGES = {"logo": b"logo", "logo_copy": b"logo", "diagram": b"diagram"}
+
+
+class _InMemoryRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, **_: Any) -> None:
+        self.values[key] = value.encode("utf-8")
+
+
+class _FileStore:
+    def read_file_record(self, file_id: str) -> MagicMock | None:
+        if file_id not in _IMAGES:
+            return None
+        file_record = MagicMock()
+        file_record.display_name = file_id
+        return file_record
+
+    def read_file(self, file_id: str) -> BytesIO:
+        return BytesIO(_IMAGES[file_id])
+
+
+class _Summarizer:
+    def __init__(self) -> None:
+        self.summarized: list[bytes] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, llm: Any, image_data: bytes, **_: Any) -> str:  # noqa: ARG002
+        with self.lock:
+            self.summarized.append(image_data)
+        return f"summary of {image_data.decode('utf-8')}"
+
+
+@pytest.fixture
+def summarizer(monkeypatch: pytest.MonkeyPatch) -> _Summarizer:
+    summarizer = _Summarizer()
+    redis_client = _InMemoryRedis()
+    llm = MagicMock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = "gpt-4o"
+    monkeypatch.setattr(
+        f"{_MODULE}.get_image_extraction_and_analysis_enabled", lambda: True
+    )
+    monkeypatch.setattr(f"{_MODULE}.get_default_llm_with_vision", lambda: llm)
+    monkeypatch.setattr(f"{_MODULE}.get_default_file_store", _FileStore)
+    monkeypatch.setattr(f"{_MODULE}.summarize_image_with_error_handling", summarizer)
+    monkeypatch.setattr(
+        "onyx.file_processing.image_summary_cache.get_redis_client",
+        lambda: redis_client,
+    )
+    return summarizer
+
+
+def _make_doc(doc_id: str, image_file_ids: list[str]) -> Document:
+    return Document(
+        id=doc_id,
+        source=DocumentSource.CONFLUENCE,
+        semantic_identifier=doc_id,
+        metadata={},
+        sections=[TextSection(text=f"{doc_id} text", link=doc_id)]
+        + [
+            ImageSection(image_file_id=image_file_id, link=doc_id)
+            for image_file_id in image_file_ids
+        ],
+    )
+
+
+def test_identical_images_are_summarized_once(summarizer: _Summarizer) -> None:
+    documents = [
+        _make_doc("page1", ["logo", "diagram"]),
+        _make_doc("page2", ["logo_copy", "missing"]),
+    ]
+
+    indexing_documents = process_image_sections(documents)
+
+    assert sorted(summarizer.summarized) == [b"diagram", b"logo"]
+    assert [
+        [section.text for section in document.processed_sections]
+        for document in indexing_documents
+    ] == [
+        ["page1 text", "summary of logo", "summary of diagram"],
+        ["page2 text", "summary of logo", "[Image could not be processed]"],
+    ]
+
+
+def test_summaries_are_reused_across_batches(summarizer: _Summarizer) -> None:
+    process_image_sections([_make_doc("page1", ["logo"])])
+
+    indexing_documents = process_image_sections([_make_doc("page2", ["logo_copy"])])
+
+    assert summarizer.summarized == [b"logo"]
+    assert indexing_documents[0].processed_sections[1].text == "summary of logo"
@@ -0,0 +1,272 @@
+import contextlib
+import threading
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.engine.util import TransactionalContext
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.document_index.interfaces import DocumentInsertionRecord
+from onyx.document_index.interfaces import IndexBatchParams
+from onyx.indexing.indexing_pipeline import _ChunkedSubBatch
+from onyx.indexing.indexing_pipeline import _EmbeddedSubBatch
+from onyx.indexing.indexing_pipeline import _run_pipelined
+from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
+from onyx.indexing.indexing_pipeline import DocumentIndexWriteResult
+from onyx.indexing.indexing_pipeline import index_doc_batch
+from onyx.indexing.models import BuildMetadataAwareChunksResult
+from onyx.indexing.models import IndexChunk
+from onyx.indexing.models import UpdatableChunkData
+
+_MODULE = "onyx.indexing.indexing_pipeline"
+
+
+def _make_doc(doc_id: str) -> Document:
+    return Document(
+        id=doc_id,
+        source=DocumentSource.WEB,
+        semantic_identifier=doc_id,
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text="text", link=f"https://{doc_id}")],
+    )
+
+
+def _ids(docs: list[Document]) -> list[str]:
+    return [doc.id for doc in docs]
+
+
+def _chunked(docs: list[Document]) -> _ChunkedSubBatch:
+    return _ChunkedSubBatch(docs=docs, indexable_docs=[], chunks=[])
+
+
+def _embedded(sub_batch: _ChunkedSubBatch) -> _EmbeddedSubBatch:
+    return _EmbeddedSubBatch(
+        docs=sub_batch.docs,
+        indexable_docs=[],
+        chunks_with_embeddings=[],
+        embedding_failures=[],
+    )
+
+
+def test_stages_overlap() -> None:
+    sub_batches = [[_make_doc(f"doc{i}")] for i in range(4)]
+    last_sub_batch_chunked = threading.Event()
+    written: list[list[str]] = []
+
+    def _chunk(docs: list[Document]) -> _ChunkedSubBatch:
+        if docs[0].id == "doc2":
+            last_sub_batch_chunked.set()
+        return _chunked(docs)
+
+    def _write(sub_batch: _EmbeddedSubBatch) -> None:
+        if sub_batch.docs[0].id == "doc0":
+            # only passes if later sub-batches are chunked while this one is written
+            assert last_sub_batch_chunked.wait(timeout=5)
+        written.append(_ids(sub_batch.docs))
+
+    stage_seconds = _run_pipelined(
+        sub_batches=sub_batches, chunk=_chunk, embed=_embedded, write=_write
+    )
+
+    assert written == [["doc0"], ["doc1"], ["doc2"], ["doc3"]]
+    assert set(stage_seconds) == {"chunk", "embed", "write"}
+
+
+def test_stage_failure_stops_the_pipeline() -> None:
+    sub_batches = [[_make_doc(f"doc{i}")] for i in range(10)]
+    written: list[list[str]] = []
+
+    def _embed(sub_batch: _ChunkedSubBatch) -> _EmbeddedSubBatch:
+        if sub_batch.docs[0].id == "doc1":
+            raise ValueError("embedding failed")
+        return _embedded(sub_batch)
+
+    with pytest.raises(ValueError, match="embedding failed"):
+        _run_pipelined(
+            sub_batches=sub_batches,
+            chunk=_chunked,
+            embed=_embed,
+            write=lambda sub_batch: written.append(_ids(sub_batch.docs)),
+        )
+
+    assert written == [["doc0"]]
+
+
+def test_write_failure_stops_the_pipeline() -> None:
+    sub_batches = [[_make_doc(f"doc{i}")] for i in range(10)]
+    chunked: list[list[str]] = []
+
+    def _chunk(docs: list[Document]) -> _ChunkedSubBatch:
+        chunked.append(_ids(docs))
+        return _chunked(docs)
+
+    def _write(sub_batch: _EmbeddedSubBatch) -> None:  # noqa: ARG001
+        raise ValueError("write failed")
+
+    with pytest.raises(ValueError, match="write failed"):
+        _run_pipelined(
+            sub_batches=sub_batches,
+            chunk=_chunk,
+            embed=_embedded,
+            write=_write,
+        )
+
+    # the bounded queues keep the chunk stage from running far ahead
+    assert len(chunked) < len(sub_batches)
+
+
+class _FakeAdapter:
+    def __init__(self, up_to_date_doc_ids: set[str]) -> None:
+        self.up_to_date_doc_ids = up_to_date_doc_ids
+        self.locked: list[list[str]] = []
+        self.finalized: list[list[str]] = []
+
+    def prepare(
+        self, documents: list[Document], ignore_time_skip: bool  # noqa: ARG002
+    ) -> DocumentBatchPrepareContext:
+        return DocumentBatchPrepareContext(
+            updatable_docs=[
+                doc for doc in documents if doc.id not in self.up_to_date_doc_ids
+            ],
+            id_to_boost_map={},
+        )
+
+    @contextlib.contextmanager
+    def lock_context(
+        self, documents: list[Document]
+    ) -> Generator[TransactionalContext, None, None]:
+        self.locked.append(_ids(documents))
+        yield MagicMock(spec=TransactionalContext)
+
+    def build_metadata_aware_chunks(
+        self,
+        chunks_with_embeddings: list[IndexChunk],  # noqa: ARG002
+        chunk_content_scores: list[float],  # noqa: ARG002
+        tenant_id: str,  # noqa: ARG002
+        context: DocumentBatchPrepareContext,
+    ) -> BuildMetadataAwareChunksResult:
+        return BuildMetadataAwareChunksResult(
+            chunks=[],
+            doc_id_to_previous_chunk_cnt={},
+            doc_id_to_new_chunk_cnt={doc.id: 0 for doc in context.updatable_docs},
+            user_file_id_to_raw_text={},
+            user_file_id_to_token_count={},
+        )
+
+    def post_index(
+        self,
+        context: DocumentBatchPrepareContext,  # noqa: ARG002
+        updatable_chunk_data: list[UpdatableChunkData],  # noqa: ARG002
+        filtered_documents: list[Document],
+        result: BuildMetadataAwareChunksResult,  # noqa: ARG002
+    ) -> None:
+        self.finalized.append(_ids(filtered_documents))
+
+
+def _write_chunks_to_document_index(
+    document_index: Any,  # noqa: ARG001
+    chunks: list[Any],  # noqa: ARG001
+    index_batch_params: IndexBatchParams,
+) -> DocumentIndexWriteResult:
+    return DocumentIndexWriteResult(
+        insertion_records=[
+            DocumentInsertionRecord(document_id=doc_id, already_existed=False)
+            for doc_id in index_batch_params.doc_id_to_new_chunk_cnt
+        ],
+        vector_db_write_failures=[],
+        elapsed_seconds=0.5,
+        failure_isolation_calls=2,
+    )
+
+
+def test_pipelined_batch_is_written_per_sub_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(f"{_MODULE}.INDEXING_PIPELINE_SUB_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        f"{_MODULE}.get_image_extraction_and_analysis_enabled", lambda: False
+    )
+    monkeypatch.setattr(
+        f"{_MODULE}._write_chunks_to_document_index", _write_chunks_to_document_index
+    )
+    chunker = MagicMock()
+    chunker.chunk.return_value = []
+    adapter = _FakeAdapter(up_to_date_doc_ids={"doc1"})
+
+    result = index_doc_batch(
+        document_batch=[_make_doc(f"doc{i}") for i in range(6)],
+        chunker=chunker,
+        embedder=MagicMock(),
+        document_indices=[MagicMock(index_name="test_index")],
+        request_id=None,
+        tenant_id="tenant",
+        adapter=adapter,
+        filter_fnc=lambda docs: docs,
+    )
+
+    assert adapter.locked == [["doc0", "doc2"], ["doc3", "doc4"], ["doc5"]]
+    # up to date documents are still marked as indexed, with the first sub-batch
+    assert adapter.finalized == [["doc0", "doc2", "doc1"], ["doc3", "doc4"], ["doc5"]]
+    assert result.new_docs == 5
+    assert result.total_docs == 6
+    assert result.failures == []
+    assert result.document_index_write_seconds == {"test_index": 1.5}
+    assert set(result.stage_seconds) == {"chunk", "embed", "write"}
+    assert result.failure_isolation_calls == {"embed": 0, "write": 6}
+
+
+def test_document_indices_are_written_in_parallel(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(f"{_MODULE}.ENABLE_PARALLEL_DOCUMENT_INDEX_WRITES", True)
+    monkeypatch.setattr(
+        f"{_MODULE}.get_image_extraction_and_analysis_enabled", lambda: False
+    )
+    # only passes if both indices are written at the same time
+    both_writing = threading.Barrier(2, timeout=5)
+    elapsed_seconds = {"primary_index": 0.5, "secondary_index": 0.25}
+
+    def _write(
+        document_index: Any,
+        chunks: list[Any],  # noqa: ARG001
+        index_batch_params: IndexBatchParams,
+    ) -> DocumentIndexWriteResult:
+        both_writing.wait()
+        return DocumentIndexWriteResult(
+            insertion_records=[
+                DocumentInsertionRecord(
+                    document_id=doc_id,
+                    # only the primary index is used for reporting
+                    already_existed=document_index.index_name == "secondary_index",
+                )
+                for doc_id in index_batch_params.doc_id_to_new_chunk_cnt
+            ],
+            vector_db_write_failures=[],
+            elapsed_seconds=elapsed_seconds[document_index.index_name],
+        )
+
+    monkeypatch.setattr(f"{_MODULE}._write_chunks_to_document_index", _write)
+    chunker = MagicMock()
+    chunker.chunk.return_value = []
+
+    result = index_doc_batch(
+        document_batch=[_make_doc(f"doc{i}") for i in range(2)],
+        chunker=chunker,
+        embedder=MagicMock(),
+        document_indices=[
+            MagicMock(index_name="primary_index"),
+            MagicMock(index_name="secondary_index"),
+        ],
+        request_id=None,
+        tenant_id="tenant",
+        adapter=_FakeAdapter(up_to_date_doc_ids=set()),
+        filter_fnc=lambda docs: docs,
+    )
+
+    assert result.new_docs == 2
+    assert result.document_index_write_seconds == elapsed_seconds
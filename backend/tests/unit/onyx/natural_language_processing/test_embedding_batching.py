@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from onyx.natural_language_processing.search_nlp_models import (
+    build_token_budgeted_batches,
+)
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
+
+_MAX_SEQ_LENGTH = 512
+_BATCH_SIZE = 8
+# simulated model server compute time per padded token
+_SECONDS_PER_PADDED_TOKEN = 2e-6
+
+
+class _WhitespaceTokenizer:
+    def encode(self, string: str) -> list[int]:
+        return [0] * len(string.split())
+
+
+class _FakeModelServer:
+    """Embeds each text as its own token count. Like a real model server, the
+    time a batch takes grows with the number of texts times the longest text."""
+
+    def __init__(self) -> None:
+        self.padded_tokens = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, embed_request: EmbedRequest, **_: str | None) -> EmbedResponse:
+        lengths = [len(text.split()) for text in embed_request.texts]
+        padded_tokens = len(lengths) * max(lengths)
+        with self.lock:
+            self.padded_tokens += padded_tokens
+        time.sleep(padded_tokens * _SECONDS_PER_PADDED_TOKEN)
+        return EmbedResponse(embeddings=[[float(length)] for length in lengths])
+
+
+def _make_model(
+    fake_server: _FakeModelServer, monkeypatch: pytest.MonkeyPatch
+) -> EmbeddingModel:
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.get_tokenizer",
+        return_value=_WhitespaceTokenizer(),
+    ):
+        model = EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            api_key=None,
+            api_url=None,
+            provider_type=None,
+        )
+    monkeypatch.setattr(model, "_make_model_server_request", fake_server)
+    return model
+
+
+def _mixed_length_corpus(num_texts: int) -> list[str]:
+    # titles, mini chunks and full chunks interleaved like in multipass indexing
+    rng = random.Random(0)
+    lengths = [rng.choice([8, 16, 128, 150, 480, 512]) for _ in range(num_texts)]
+    return [" ".join(["word"] * length) for length in lengths]
+
+
+def test_batches_respect_token_budget() -> None:
+    token_counts = [500, 10, 12, 480, 11, 9]
+
+    batches = build_token_budgeted_batches(
+        token_counts, max_batch_tokens=1024, max_batch_size=None
+    )
+
+    assert batches == [[5, 1, 4, 2], [3, 0]]
+    for batch in batches:
+        assert len(batch) * max(token_counts[idx] for idx in batch) <= 1024
+
+
+def test_batches_respect_max_batch_size() -> None:
+    batches = build_token_budgeted_batches(
+        [1] * 5, max_batch_tokens=1024, max_batch_size=2
+    )
+
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_text_longer_than_budget_gets_its_own_batch() -> None:
+    batches = build_token_budgeted_batches(
+        [2000, 5], max_batch_tokens=1024, max_batch_size=None
+    )
+
+    assert batches == [[1], [0]]
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_embeddings_are_returned_in_original_order(
+    num_threads: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    texts = _mixed_length_corpus(100)
+    model = _make_model(_FakeModelServer(), monkeypatch)
+
+    embeddings = model._batch_encode_texts(
+        texts=texts,
+        text_type=EmbedTextType.PASSAGE,
+        batch_size=_BATCH_SIZE,
+        max_seq_length=_MAX_SEQ_LENGTH,
+        num_threads=num_threads,
+    )
+
+    assert embeddings == [[float(len(text.split()))] for text in texts]
+
+
+def test_mixed_length_throughput_benchmark(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Compares length-bucketed, token-budgeted batching against fixed size
+    batches in arrival order on a mixed-length corpus."""
+    texts = _mixed_length_corpus(400)
+
+    fixed_server = _FakeModelServer()
+    start = time.monotonic()
+    for batch_start in range(0, len(texts), _BATCH_SIZE):
+        fixed_server(
+            EmbedRequest(
+                texts=texts[batch_start : batch_start + _BATCH_SIZE],
+                model_name="test-model",
+                max_context_length=_MAX_SEQ_LENGTH,
+                normalize_embeddings=True,
+                text_type=EmbedTextType.PASSAGE,
+            )
+        )
+    fixed_elapsed = time.monotonic() - start
+
+    bucketed_server = _FakeModelServer()
+    model = _make_model(bucketed_server, monkeypatch)
+    start = time.monotonic()
+    model._batch_encode_texts(
+        texts=texts,
+        text_type=EmbedTextType.PASSAGE,
+        batch_size=_BATCH_SIZE,
+        max_seq_length=_MAX_SEQ_LENGTH,
+        num_threads=1,
+    )
+    bucketed_elapsed = time.monotonic() - start
+
+    print(
+        f"fixed batches: padded_tokens={fixed_server.padded_tokens} "
+        f"texts_per_second={len(texts) / fixed_elapsed:.0f}\n"
+        f"bucketed batches: padded_tokens={bucketed_server.padded_tokens} "
+        f"texts_per_second={len(texts) / bucketed_elapsed:.0f}"
+    )
+    # the padding is what the model server spends its compute on
+    assert bucketed_server.padded_tokens < 0.75 * fixed_server.padded_tokens
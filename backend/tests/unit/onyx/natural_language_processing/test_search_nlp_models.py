@@ -9,7 +9,11 @@ from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 
 from onyx.llm.constants import LlmProviderNames
+from onyx.natural_language_processing.search_nlp_models import (
+    _get_embedding_api_client,
+)
 from onyx.natural_language_processing.search_nlp_models import CloudEmbedding
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 
@@ -84,3 +88,38 @@ async def test_rate_limit_handling() -> None:
                 model_name="fake-model",
                 text_type=EmbedTextType.QUERY,
             )
+
+
+def test_consecutive_encode_calls_reuse_the_provider_client() -> None:
+    used_clients: list[AsyncClient] = []
+
+    async def _embed_litellm_proxy(
+        self: CloudEmbedding, texts: list[str], model_name: str | None  # noqa: ARG001
+    ) -> list[list[float]]:
+        used_clients.append(_get_embedding_api_client(self.provider, self.timeout))
+        return [[0.0] for _ in texts]
+
+    with (
+        patch(
+            "onyx.natural_language_processing.search_nlp_models.get_tokenizer",
+            return_value=MagicMock(),
+        ),
+        patch.object(CloudEmbedding, "_embed_litellm_proxy", _embed_litellm_proxy),
+    ):
+        model = EmbeddingModel(
+            server_host="localhost",
+            server_port=9000,
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            api_key="fake-key",
+            api_url="http://localhost:4000/embeddings",
+            provider_type=EmbeddingProvider.LITELLM,
+        )
+        for _ in range(2):
+            model.encode(["text"], text_type=EmbedTextType.PASSAGE)
+
+    assert len(used_clients) == 2
+    assert used_clients[0] is used_clients[1]
+    assert not used_clients[0].is_closed
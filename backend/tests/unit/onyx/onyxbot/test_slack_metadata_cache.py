@@ -0,0 +1,146 @@
+"""Tests for the Slack metadata cache shared by the Slack bot and federated search."""
+
+import time
+from collections import OrderedDict
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from onyx.onyxbot.slack import metadata_cache
+from onyx.onyxbot.slack.metadata_cache import get_slack_channel_info
+from onyx.onyxbot.slack.metadata_cache import get_slack_user_id_by_email
+from onyx.onyxbot.slack.metadata_cache import get_slack_user_info
+from tests.unit.onyx.conftest import FakeRedis
+
+
+def _response(data: dict[str, Any]) -> MagicMock:
+    response = MagicMock()
+    response.data = data
+    response.__getitem__.side_effect = data.__getitem__
+    return response
+
+
+def _client(token: str = "xoxb-bot") -> MagicMock:
+    client = MagicMock()
+    client.token = token
+    client.conversations_info.return_value = _response(
+        {"ok": True, "channel": {"id": "C1", "name": "general", "is_channel": True}}
+    )
+    client.users_info.return_value = _response(
+        {
+            "ok": True,
+            "user": {
+                "id": "U1",
+                "name": "jdoe",
+                "real_name": "Jane Doe",
+                "profile": {"email": "jane@example.com", "image_512": "https://..."},
+            },
+        }
+    )
+    return client
+
+
+@pytest.fixture
+def redis_client(fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    monkeypatch.setattr(metadata_cache, "get_redis_client", lambda **_: fake_redis)
+    monkeypatch.setattr(metadata_cache, "_local_cache", OrderedDict())
+    monkeypatch.setattr(metadata_cache, "SLACK_METADATA_CACHE_TTL_SECONDS", 3600)
+    monkeypatch.setattr(
+        metadata_cache, "SLACK_METADATA_NEGATIVE_CACHE_TTL_SECONDS", 300
+    )
+    return fake_redis
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_channel_is_fetched_once() -> None:
+    client = _client()
+
+    first = get_slack_channel_info(client, "C1")
+    second = get_slack_channel_info(client, "C1")
+
+    assert first == second == {"id": "C1", "name": "general", "is_channel": True}
+    assert client.conversations_info.call_count == 1
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_values_are_shared_through_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    get_slack_user_info(_client(), "U1")
+    # e.g. federated search in an api server process
+    monkeypatch.setattr(metadata_cache, "_local_cache", OrderedDict())
+    client = _client()
+
+    user = get_slack_user_info(client, "U1")
+
+    assert client.users_info.call_count == 0
+    assert user == {
+        "id": "U1",
+        "name": "jdoe",
+        "real_name": "Jane Doe",
+        "profile": {"email": "jane@example.com"},
+    }
+
+
+def test_values_from_redis_expire_with_their_redis_ttl(
+    redis_client: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    get_slack_channel_info(_client(), "C1")
+    # e.g. the value was cached by another process 59 minutes ago
+    (redis_key,) = redis_client.store
+    redis_client.ttls[redis_key] = 60
+    monkeypatch.setattr(metadata_cache, "_local_cache", OrderedDict())
+    get_slack_channel_info(_client(), "C1")
+
+    ((_, cached),) = metadata_cache._local_cache.items()
+    assert cached.expires_at - time.monotonic() <= 60
+
+
+def test_values_are_scoped_by_token(redis_client: FakeRedis) -> None:
+    get_slack_channel_info(_client(token="xoxb-bot"), "C1")
+    other_bot = _client(token="xoxb-other-bot")
+
+    get_slack_channel_info(other_bot, "C1")
+
+    assert other_bot.conversations_info.call_count == 1
+    assert not any("xoxb" in key for key in redis_client.store)
+
+
+def test_missing_users_are_cached_briefly(redis_client: FakeRedis) -> None:
+    client = _client()
+    client.users_lookupByEmail.side_effect = SlackApiError(
+        "users_not_found", {"ok": False, "error": "users_not_found"}
+    )
+
+    assert get_slack_user_id_by_email(client, "Gone@example.com") is None
+    assert get_slack_user_id_by_email(client, "gone@example.com") is None
+
+    assert client.users_lookupByEmail.call_count == 1
+    assert list(redis_client.ttls.values()) == [300]
+
+
+def test_rate_limited_lookups_are_not_cached(redis_client: FakeRedis) -> None:
+    client = _client()
+    client.users_info.side_effect = SlackApiError(
+        "ratelimited", {"ok": False, "error": "ratelimited"}
+    )
+
+    for _ in range(2):
+        with pytest.raises(SlackApiError):
+            get_slack_user_info(client, "U1")
+
+    assert client.users_info.call_count == 2
+    assert not redis_client.store
+
+
+def test_disabled_cache_always_fetches(
+    redis_client: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(metadata_cache, "SLACK_METADATA_CACHE_TTL_SECONDS", 0)
+    client = _client()
+
+    get_slack_channel_info(client, "C1")
+    get_slack_channel_info(client, "C1")
+
+    assert client.conversations_info.call_count == 2
+    assert not redis_client.store
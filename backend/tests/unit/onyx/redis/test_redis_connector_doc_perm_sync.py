@@ -0,0 +1,104 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.access.models import DocExternalAccess
+from onyx.access.models import ElementExternalAccess
+from onyx.access.models import ExternalAccess
+from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
+
+
+def _make_doc_access(doc_id: str, num_emails: int = 1) -> DocExternalAccess:
+    return DocExternalAccess(
+        external_access=ExternalAccess(
+            external_user_emails={f"user{i}@example.com" for i in range(num_emails)},
+            external_user_group_ids=set(),
+            is_public=False,
+        ),
+        doc_id=doc_id,
+    )
+
+
+class _PermissionUpdater:
+    def __init__(self, bad_doc_ids: set[str]) -> None:
+        self.bad_doc_ids = bad_doc_ids
+        self.batches: list[list[str]] = []
+        self.elements: list[str] = []
+
+    def update_batch(
+        self, _tenant_id: str, permissions_batch: list[ElementExternalAccess], *_: Any
+    ) -> None:
+        doc_ids = [
+            p.doc_id for p in permissions_batch if isinstance(p, DocExternalAccess)
+        ]
+        self.batches.append(doc_ids)
+        if self.bad_doc_ids & set(doc_ids):
+            raise ValueError("bad batch")
+
+    def update_element(
+        self, _tenant_id: str, permissions: DocExternalAccess, *_: Any
+    ) -> bool:
+        self.elements.append(permissions.doc_id)
+        if permissions.doc_id in self.bad_doc_ids:
+            raise ValueError("bad element")
+        return True
+
+
+def _update_db(
+    updater: _PermissionUpdater, new_permissions: list[ElementExternalAccess]
+) -> tuple[int, int]:
+    implementations = {
+        "elements_update_permissions": updater.update_batch,
+        "element_update_permissions": updater.update_element,
+    }
+    with patch(
+        "onyx.redis.redis_connector_doc_perm_sync.fetch_versioned_implementation",
+        side_effect=lambda _module, attribute: implementations[attribute],
+    ):
+        result = RedisConnectorPermissionSync("tenant", 1, MagicMock()).update_db(
+            lock=None,
+            new_permissions=new_permissions,
+            source_string="google_drive",
+            connector_id=1,
+            credential_id=1,
+        )
+    return result.num_updated, result.num_errors
+
+
+def test_update_db_writes_a_single_batch() -> None:
+    updater = _PermissionUpdater(bad_doc_ids=set())
+
+    num_updated, num_errors = _update_db(
+        updater, [_make_doc_access(f"doc{i}") for i in range(10)]
+    )
+
+    assert (num_updated, num_errors) == (10, 0)
+    assert updater.batches == [[f"doc{i}" for i in range(10)]]
+    assert updater.elements == []
+
+
+def test_update_db_skips_oversized_permissions() -> None:
+    updater = _PermissionUpdater(bad_doc_ids=set())
+
+    num_updated, num_errors = _update_db(
+        updater,
+        [
+            _make_doc_access("doc0"),
+            _make_doc_access("huge", num_emails=ExternalAccess.MAX_NUM_ENTRIES + 1),
+        ],
+    )
+
+    assert (num_updated, num_errors) == (1, 0)
+    assert updater.batches == [["doc0"]]
+
+
+def test_update_db_falls_back_to_single_elements() -> None:
+    updater = _PermissionUpdater(bad_doc_ids={"doc3"})
+
+    num_updated, num_errors = _update_db(
+        updater, [_make_doc_access(f"doc{i}") for i in range(5)]
+    )
+
+    assert (num_updated, num_errors) == (4, 1)
+    assert len(updater.batches) == 1
+    assert updater.elements == [f"doc{i}" for i in range(5)]
@@ -1,10 +1,23 @@
 """Unit tests for search utility functions."""
 
+from typing import Any
 from typing import NamedTuple
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import pytest
 
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import ContextExpansionType
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.context.search.utils import inference_section_from_chunks
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.tools.tool_implementations.search.search_tool import deduplicate_queries
+from onyx.tools.tool_implementations.search.search_utils import (
+    expand_sections_with_context,
+)
 from onyx.tools.tool_implementations.search.search_utils import (
     weighted_reciprocal_rank_fusion,
 )
@@ -571,3 +584,147 @@ class TestDeduplicateQueries:
         assert len(result) == 1
         assert result[0][0] == "Café"
         assert result[0][1] == 4.5
+
+
+# =============================================================================
+# Tests for expand_sections_with_context
+# =============================================================================
+
+
+def _make_chunk(document_id: str, chunk_id: int) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        source_type=DocumentSource.WEB,
+        semantic_identifier=document_id,
+        title=document_id,
+        chunk_id=chunk_id,
+        blurb="",
+        content=f"{document_id}-{chunk_id}",
+        source_links=None,
+        image_file_id=None,
+        section_continuation=False,
+        boost=0,
+        score=1.0,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+    )
+
+
+def _make_section(document_id: str, chunk_ids: list[int]) -> InferenceSection:
+    chunks = [_make_chunk(document_id, chunk_id) for chunk_id in chunk_ids]
+    section = inference_section_from_chunks(center_chunk=chunks[0], chunks=chunks)
+    assert section is not None
+    return section
+
+
+class TestExpandSectionsWithContext:
+    """Test suite for expand_sections_with_context function."""
+
+    @staticmethod
+    def _make_document_index(num_chunks_per_doc: int) -> MagicMock:
+        def id_based_retrieval(
+            chunk_requests: list[VespaChunkRequest], **_: Any
+        ) -> list[InferenceChunk]:
+            return [
+                _make_chunk(request.document_id, chunk_id)
+                for request in chunk_requests
+                for chunk_id in range(
+                    request.min_chunk_ind or 0,
+                    min(request.max_chunk_ind or 0, num_chunks_per_doc - 1) + 1,
+                )
+            ]
+
+        document_index = MagicMock(spec=DocumentIndex)
+        document_index.id_based_retrieval.side_effect = id_based_retrieval
+        return document_index
+
+    def test_expands_all_sections_in_two_round_trips(self) -> None:
+        sections = [
+            _make_section("doc_a", [5]),
+            _make_section("doc_a", [7]),
+            _make_section("doc_b", [0, 1]),
+            _make_section("doc_c", [10]),
+        ]
+        classifications = {
+            "doc_a": ContextExpansionType.INCLUDE_ADJACENT_SECTIONS,
+            "doc_b": ContextExpansionType.FULL_DOCUMENT,
+            "doc_c": ContextExpansionType.NOT_RELEVANT,
+        }
+        document_index = self._make_document_index(num_chunks_per_doc=20)
+
+        with patch(
+            "onyx.tools.tool_implementations.search.search_utils.classify_section_relevance",
+            side_effect=lambda document_title, **_: classifications[document_title],
+        ):
+            expanded_sections = expand_sections_with_context(
+                sections=sections,
+                user_query="query",
+                llm=MagicMock(),
+                document_index=document_index,
+                expand_override_doc_ids=set(),
+            )
+
+        # One round trip for the classification prompts, one for FULL_DOCUMENT
+        assert document_index.id_based_retrieval.call_count == 2
+        assert [
+            [chunk.chunk_id for chunk in section.chunks]
+            for section in expanded_sections
+        ] == [
+            [3, 4, 5, 6, 7],
+            [5, 6, 7, 8, 9],
+            [0, 1, 2, 3, 4, 5, 6],
+            # NOT_RELEVANT sections are kept unchanged
+            [10],
+        ]
+
+        # Overlapping ranges of the doc_a sections are only fetched once
+        fetched_chunks = [
+            (request.document_id, chunk_id)
+            for call in document_index.id_based_retrieval.call_args_list
+            for request in call.kwargs["chunk_requests"]
+            for chunk_id in range(request.min_chunk_ind, request.max_chunk_ind + 1)
+        ]
+        assert len(fetched_chunks) == len(set(fetched_chunks))
+
+    def test_expand_override_needs_a_single_round_trip(self) -> None:
+        sections = [_make_section("doc_a", [5]), _make_section("doc_b", [2])]
+        document_index = self._make_document_index(num_chunks_per_doc=20)
+
+        with patch(
+            "onyx.tools.tool_implementations.search.search_utils.classify_section_relevance",
+        ) as mock_classify:
+            expanded_sections = expand_sections_with_context(
+                sections=sections,
+                user_query="query",
+                llm=MagicMock(),
+                document_index=document_index,
+                expand_override_doc_ids={"doc_a", "doc_b"},
+            )
+
+        mock_classify.assert_not_called()
+        assert document_index.id_based_retrieval.call_count == 1
+        assert [chunk.chunk_id for chunk in expanded_sections[0].chunks] == list(
+            range(0, 11)
+        )
+        assert [chunk.chunk_id for chunk in expanded_sections[1].chunks] == list(
+            range(0, 8)
+        )
+
+    def test_failed_retrieval_keeps_original_sections(self) -> None:
+        sections = [_make_section("doc_a", [5])]
+        document_index = MagicMock(spec=DocumentIndex)
+        document_index.id_based_retrieval.side_effect = RuntimeError("index down")
+
+        expanded_sections = expand_sections_with_context(
+            sections=sections,
+            user_query="query",
+            llm=MagicMock(),
+            document_index=document_index,
+            expand_override_doc_ids={"doc_a"},
+        )
+
+        assert expanded_sections == sections
@@ -7,7 +7,10 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from onyx.utils import threadpool_concurrency
+from onyx.utils.threadpool_concurrency import in_shared_pool_thread
 from onyx.utils.threadpool_concurrency import parallel_yield
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import run_with_timeout
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
@@ -389,3 +392,114 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_run_functions_tuples_in_parallel_reuses_shared_pool_threads() -> None:
+    def get_thread_name() -> str:
+        time.sleep(0.01)
+        return threading.current_thread().name
+
+    thread_names: list[str] = []
+    for _ in range(5):
+        thread_names.extend(
+            run_functions_tuples_in_parallel([(get_thread_name, ())] * 4)
+        )
+
+    assert all(name.startswith("onyx-shared") for name in thread_names)
+    # A new pool per call would have used 20 different threads
+    assert len(set(thread_names)) < 20
+
+
+def test_run_functions_tuples_in_parallel_respects_max_workers() -> None:
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def track_concurrency(i: int) -> int:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return i
+
+    results = run_functions_tuples_in_parallel(
+        [(track_concurrency, (i,)) for i in range(10)], max_workers=2
+    )
+
+    assert results == list(range(10))
+    assert max_running <= 2
+
+
+def test_run_functions_tuples_in_parallel_nested_calls_do_not_deadlock() -> None:
+    def inner(i: int) -> tuple[int, bool]:
+        return i, in_shared_pool_thread()
+
+    def outer(i: int) -> list[tuple[int, bool]]:
+        return run_functions_tuples_in_parallel([(inner, (i,)), (inner, (i + 1,))])
+
+    results = run_functions_tuples_in_parallel([(outer, (i,)) for i in range(200)])
+
+    assert results == [[(i, True), (i + 1, True)] for i in range(200)]
+
+
+def test_run_functions_tuples_in_parallel_nested_through_dedicated_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # shared -> dedicated -> shared must not wait on the (full) shared pool
+    monkeypatch.setattr(
+        threadpool_concurrency,
+        "_SHARED_THREAD_POOL",
+        threadpool_concurrency.SharedThreadPool("test", 1),
+    )
+
+    def innermost(i: int) -> tuple[int, bool]:
+        return i, in_shared_pool_thread()
+
+    def inner(i: int) -> list[tuple[int, bool]]:
+        return run_functions_tuples_in_parallel([(innermost, (i,))] * 2)
+
+    def outer(i: int) -> list[list[tuple[int, bool]]]:
+        return run_functions_tuples_in_parallel(
+            [(inner, (i,))] * 2, use_shared_pool=False
+        )
+
+    results = run_with_timeout(
+        5.0, run_functions_tuples_in_parallel, [(outer, (i,)) for i in range(3)]
+    )
+
+    assert results == [[[(i, True)] * 2] * 2 for i in range(3)]
+    assert not in_shared_pool_thread()
+
+
+def test_run_functions_tuples_in_parallel_without_shared_pool() -> None:
+    def get_thread_name() -> str:
+        return threading.current_thread().name
+
+    results = run_functions_tuples_in_parallel(
+        [(get_thread_name, ())] * 2, use_shared_pool=False
+    )
+
+    assert not any(name.startswith("onyx-shared") for name in results)
+
+
+def test_run_functions_tuples_in_parallel_shared_pool_propagates_failure() -> None:
+    completed: list[int] = []
+
+    def maybe_fail(i: int) -> int:
+        if i == 0:
+            raise ValueError("failure")
+        time.sleep(0.02)
+        completed.append(i)
+        return i
+
+    with pytest.raises(ValueError, match="failure"):
+        run_functions_tuples_in_parallel([(maybe_fail, (i,)) for i in range(3)])
+    # Like with a dedicated pool, the other functions are waited on
+    assert sorted(completed) == [1, 2]
+
+    assert run_functions_tuples_in_parallel(
+        [(maybe_fail, (i,)) for i in range(3)], allow_failures=True
+    ) == [None, 1, 2]
@@ -1,7 +1,13 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from types import SimpleNamespace
 from typing import Any
 
+from onyx.access.access import get_null_document_access
+from onyx.access.models import DocumentAccess
+from onyx.background.celery.tasks.vespa import document_sync
 from onyx.background.celery.tasks.vespa import tasks as vespa_tasks
+from onyx.configs.constants import OnyxCeleryTask
 
 
 class _StubRedisDocumentSet:
@@ -96,3 +102,163 @@ def test_monitor_deletes_document_set_with_no_connectors(monkeypatch: Any) -> No
 
     assert calls["deleted"] is True
     assert calls["synced"] is False
+
+
+class _StubScalars:
+    def __init__(self, doc_ids: list[str]) -> None:
+        self._doc_ids = doc_ids
+
+    def yield_per(self, n: int) -> list[str]:  # noqa: ARG002
+        return self._doc_ids
+
+
+def test_generate_document_sync_tasks_batches_documents(monkeypatch: Any) -> None:
+    monkeypatch.setattr(document_sync, "VESPA_SYNC_BATCH_SIZE", 2)
+
+    doc_ids = [f"doc_{i}" for i in range(5)]
+    sent: list[dict[str, Any]] = []
+    taskset: set[str] = set()
+
+    r = SimpleNamespace(
+        sadd=lambda key, task_id: taskset.add(task_id),  # noqa: ARG005
+        expire=lambda key, ttl: None,  # noqa: ARG005
+    )
+    celery_app = SimpleNamespace(
+        send_task=lambda name, kwargs, **_: sent.append({"name": name, **kwargs})
+    )
+    db_session = SimpleNamespace(
+        scalars=lambda stmt: _StubScalars(doc_ids),  # noqa: ARG005
+    )
+
+    tasks_sent, num_docs = document_sync.generate_document_sync_tasks(
+        r=r,  # type: ignore[arg-type]
+        max_docs=100,
+        celery_app=celery_app,  # type: ignore[arg-type]
+        db_session=db_session,  # type: ignore[arg-type]
+        lock=SimpleNamespace(reacquire=lambda: None),  # type: ignore[arg-type]
+        tenant_id="tenant",
+    )
+
+    assert tasks_sent == 3
+    assert num_docs == 5
+    assert len(taskset) == 3
+    assert [task["document_ids"] for task in sent] == [
+        ["doc_0", "doc_1"],
+        ["doc_2", "doc_3"],
+        ["doc_4"],
+    ]
+    assert all(
+        task["name"] == OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK for task in sent
+    )
+
+
+def test_generate_document_sync_tasks_caps_documents(monkeypatch: Any) -> None:
+    monkeypatch.setattr(document_sync, "VESPA_SYNC_BATCH_SIZE", 2)
+
+    sent: list[dict[str, Any]] = []
+    r = SimpleNamespace(
+        sadd=lambda key, task_id: None,  # noqa: ARG005
+        expire=lambda key, ttl: None,  # noqa: ARG005
+    )
+    celery_app = SimpleNamespace(
+        send_task=lambda name, kwargs, **_: sent.append({"name": name, **kwargs})
+    )
+    db_session = SimpleNamespace(
+        scalars=lambda stmt: _StubScalars(  # noqa: ARG005
+            [f"doc_{i}" for i in range(10)]
+        ),
+    )
+
+    tasks_sent, num_docs = document_sync.generate_document_sync_tasks(
+        r=r,  # type: ignore[arg-type]
+        max_docs=3,
+        celery_app=celery_app,  # type: ignore[arg-type]
+        db_session=db_session,  # type: ignore[arg-type]
+        lock=SimpleNamespace(reacquire=lambda: None),  # type: ignore[arg-type]
+        tenant_id="tenant",
+    )
+
+    # The cap is on documents, not on batches
+    assert tasks_sent == 2
+    assert num_docs == 3
+    assert [task["document_ids"] for task in sent] == [["doc_0", "doc_1"], ["doc_2"]]
+
+
+class _StubDocumentIndex:
+    def __init__(self) -> None:
+        self.updates: list[Any] = []
+
+    def update_multiple(self, updates: list[Any], *, tenant_id: str) -> None:
+        assert tenant_id == "tenant"
+        self.updates.extend(updates)
+
+
+def test_metadata_sync_batch_task_syncs_every_document(monkeypatch: Any) -> None:
+    document_index = _StubDocumentIndex()
+    synced: list[str] = []
+
+    @contextmanager
+    def _session() -> Iterator[SimpleNamespace]:
+        yield SimpleNamespace()
+
+    monkeypatch.setattr(vespa_tasks, "get_session_with_current_tenant", _session)
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_active_search_settings",
+        lambda db_session: SimpleNamespace(  # noqa: ARG005
+            primary=None, secondary=None
+        ),
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_all_document_indices",
+        lambda **_: [document_index],
+    )
+    monkeypatch.setattr(vespa_tasks, "RetryDocumentIndex", lambda index: index)
+    monkeypatch.setattr(
+        vespa_tasks.HttpxPool,
+        "get",
+        classmethod(lambda cls, name: None),  # noqa: ARG005
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_documents_by_ids",
+        lambda db_session, document_ids: [  # noqa: ARG005
+            SimpleNamespace(id=doc_id, chunk_count=1, boost=0, hidden=False)
+            for doc_id in document_ids
+        ],
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "fetch_document_sets_for_documents",
+        lambda document_ids, db_session: [("doc_0", ["set"])],  # noqa: ARG005
+    )
+    public_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        is_public=True,
+        external_user_emails=[],
+        external_user_group_ids=[],
+    )
+    # e.g. the EE implementation skips documents without a source
+    monkeypatch.setattr(
+        vespa_tasks,
+        "get_access_for_documents",
+        lambda document_ids, db_session: {"doc_0": public_access},  # noqa: ARG005
+    )
+    monkeypatch.setattr(
+        vespa_tasks,
+        "mark_documents_as_synced",
+        lambda doc_ids, db_session: synced.extend(doc_ids),  # noqa: ARG005
+    )
+
+    assert vespa_tasks.vespa_metadata_sync_batch_task(
+        ["doc_0", "doc_1"], tenant_id="tenant"
+    )
+
+    assert synced == ["doc_0", "doc_1"]
+    updates = {update.doc_id: update for update in document_index.updates}
+    assert updates["doc_0"].fields.access == public_access
+    assert updates["doc_0"].fields.document_sets == {"set"}
+    assert updates["doc_1"].fields.access == get_null_document_access()
+    assert updates["doc_1"].fields.document_sets == set()